@@ -16,6 +16,42 @@ app.config['SECRET_KEY'] = os.getenv('SECRET_KEY', 'dev-secret-key-change-in-pro
 app.config['SESSION_COOKIE_SECURE'] = os.getenv('SESSION_COOKIE_SECURE', 'False').lower() == 'true'  # Set to True in production with HTTPS
 app.config['SESSION_COOKIE_HTTPONLY'] = True
 app.config['SESSION_COOKIE_SAMESITE'] = os.getenv('SESSION_COOKIE_SAMESITE', 'Lax')  # 'Lax', 'Strict', or 'None'
+# Salon-local timezone used to bucket sales, payments, expenses and appointments by business day
+app.config['SALON_TIMEZONE'] = os.getenv('SALON_TIMEZONE', 'Africa/Nairobi')
+# Seconds a cached /api/dashboard/stats payload may be served (commits in this process invalidate it sooner)
+app.config['DASHBOARD_CACHE_TTL'] = int(os.getenv('DASHBOARD_CACHE_TTL', '30'))
+# Seconds between keep-alive comments on idle /api/dashboard/stream connections
+app.config['DASHBOARD_STREAM_HEARTBEAT'] = int(os.getenv('DASHBOARD_STREAM_HEARTBEAT', '15'))
+# Page sizes for cursor-paginated list endpoints (?page_size=, capped at MAX_PAGE_SIZE)
+app.config['DEFAULT_PAGE_SIZE'] = int(os.getenv('DEFAULT_PAGE_SIZE', '50'))
+app.config['MAX_PAGE_SIZE'] = int(os.getenv('MAX_PAGE_SIZE', '200'))
+# Offline till sync: sales accepted per POST /api/sales/batch and stored per transaction
+app.config['SALES_BATCH_MAX_ITEMS'] = int(os.getenv('SALES_BATCH_MAX_ITEMS', '500'))
+app.config['SALES_BATCH_CHUNK_SIZE'] = int(os.getenv('SALES_BATCH_CHUNK_SIZE', '100'))
+# Seconds a cached service/product price snapshot may be used at checkout (local writes invalidate it sooner)
+app.config['CATALOG_CACHE_TTL'] = int(os.getenv('CATALOG_CACHE_TTL', '60'))
+# Seconds between schema re-checks triggered by /api/ready (a check also runs at startup)
+app.config['SCHEMA_CHECK_INTERVAL'] = int(os.getenv('SCHEMA_CHECK_INTERVAL', '300'))
+# bcrypt work factor for new hashes (older hashes are upgraded at login) and hashing threads per process
+app.config['BCRYPT_ROUNDS'] = int(os.getenv('BCRYPT_ROUNDS', '12'))
+app.config['BCRYPT_THREADS'] = int(os.getenv('BCRYPT_THREADS', '2'))
+# Signed access token lifetime and how long after expiry /api/auth/refresh still accepts it (seconds)
+app.config['AUTH_TOKEN_TTL'] = int(os.getenv('AUTH_TOKEN_TTL', '3600'))
+app.config['AUTH_TOKEN_REFRESH_WINDOW'] = int(os.getenv('AUTH_TOKEN_REFRESH_WINDOW', str(7 * 24 * 3600)))
+# Directory for rendered receipts/payslips of completed documents (empty disables the cache)
+app.config['PDF_CACHE_DIR'] = os.getenv('PDF_CACHE_DIR', os.path.join(app.instance_path, 'pdf_cache'))
+# Background jobs (see jobs.py): runner threads and ReportLab render processes per web process,
+# idle poll interval and heartbeat timeout (seconds), artifact directory and retention (hours)
+app.config['JOB_WORKERS'] = int(os.getenv('JOB_WORKERS', '2'))
+app.config['RENDER_PROCESSES'] = int(os.getenv('RENDER_PROCESSES', '2'))
+app.config['JOB_POLL_INTERVAL'] = int(os.getenv('JOB_POLL_INTERVAL', '5'))
+app.config['JOB_STALE_SECONDS'] = int(os.getenv('JOB_STALE_SECONDS', '900'))
+app.config['JOB_ARTIFACT_DIR'] = os.getenv('JOB_ARTIFACT_DIR', os.path.join(app.instance_path, 'job_artifacts'))
+app.config['JOB_RETENTION_HOURS'] = int(os.getenv('JOB_RETENTION_HOURS', '24'))
+# Sales loaded and rendered per round trip by GET /api/sales/receipts/export
+app.config['RECEIPT_EXPORT_CHUNK_SIZE'] = int(os.getenv('RECEIPT_EXPORT_CHUNK_SIZE', '100'))
+# Characters per line on thermal receipts (48 fits Font A on 80 mm paper; 32 for 58 mm)
+app.config['THERMAL_RECEIPT_WIDTH'] = int(os.getenv('THERMAL_RECEIPT_WIDTH', '48'))
 
 # Initialize db with app
 db.init_app(app)
@@ -41,10 +77,32 @@ try:
 except ImportError:
     pass  # Commands module is optional
 
+# Listen for other workers' broadcasts (see broadcast.py) from this process's first request
+@app.before_request
+def start_broadcast_listener():
+    from broadcast import ensure_listener
+    ensure_listener(db.engine)
+
 @app.route('/api/health')
 def health():
     return jsonify({'status': 'ok', 'message': 'Salonyst API is running'})
 
+
+@app.route('/api/ready')
+def ready():
+    """Readiness probe: database reachable and every model table present"""
+    from schema_check import readiness
+    body, is_ready = readiness()
+    return jsonify(body), 200 if is_ready else 503
+
+
+# Verify the schema once at startup so request handlers never introspect it
+with app.app_context():
+    from schema_check import check_schema
+    _startup_schema = check_schema()
+    if not _startup_schema['ready']:
+        print(f"Warning: database schema not ready: {_startup_schema['error'] or _startup_schema['missing_tables']}")
+
 # Enable CORS for all routes - MUST be after routes are registered
 # This handles all CORS including preflight OPTIONS requests
 # In production, set CORS_ORIGINS environment variable to restrict origins
@@ -52,7 +110,8 @@ allowed_origins = os.getenv('CORS_ORIGINS', '*').split(',') if os.getenv('CORS_O
 CORS(app, 
      origins=allowed_origins,  # Use environment variable or allow all in development
      methods=["GET", "POST", "PUT", "DELETE", "OPTIONS", "PATCH"],  # All HTTP methods
-     allow_headers=["Content-Type", "Authorization", "X-Requested-With", "Accept", "X-User-Id"],  # All needed headers including custom auth header
+     allow_headers=["Content-Type", "Authorization", "X-Requested-With", "Accept", "X-User-Id", "If-None-Match"],  # All needed headers including custom auth header
+     expose_headers=["ETag"],  # Conditional GETs on catalog endpoints (see table_versions.py)
      supports_credentials=True,  # Enable credentials for session support
      max_age=3600  # Cache preflight requests for 1 hour
      )
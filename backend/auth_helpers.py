@@ -5,15 +5,60 @@ from functools import wraps
 from flask import request, jsonify, g, session
 from models import User
 from db import db
+from auth_tokens import verify_token
 
 
-def get_current_user():
+class AuthenticatedUser:
     """
-    Get current user from request.
-    First checks session, then request headers, then query params.
-    In production, use JWT tokens or proper session management.
+    The user a request is authenticated as, built from verified token claims.
+
+    id, role and is_active come from the token, so role checks need no
+    database access. Any other attribute (email, to_dict(), ...) loads the
+    full User row once, on first use.
     """
-    # Try session first (if using Flask sessions)
+
+    def __init__(self, claims):
+        self.id = claims['uid']
+        self.role = claims['role']
+        self.is_active = claims['act']
+        self.token_claims = claims
+        self._user = None
+
+    def is_admin(self):
+        """Check if user is an admin"""
+        return self.role == 'admin'
+
+    def is_manager(self):
+        """Check if user is a manager"""
+        return self.role == 'manager'
+
+    def __getattr__(self, name):
+        # Only reached for attributes not set in __init__
+        if self._user is None:
+            self._user = db.session.get(User, self.id)
+            if self._user is None:
+                raise AttributeError(name)
+        return getattr(self._user, name)
+
+
+def get_bearer_token():
+    """Token from an `Authorization: Bearer <token>` header, or None."""
+    header = request.headers.get('Authorization', '')
+    if header[:7].lower() == 'bearer ':
+        return header[7:].strip() or None
+    return None
+
+
+def _resolve_user():
+    token = get_bearer_token()
+    if token:
+        # A presented token is authoritative: if it is invalid, expired or
+        # revoked the request is unauthenticated, with no fallback
+        claims = verify_token(token)
+        return AuthenticatedUser(claims) if claims else None
+
+    # Legacy identification for clients without a token: session, then
+    # X-User-Id header, then query params, then JSON body
     try:
         user_id = session.get('user_id')
     except RuntimeError:
@@ -44,50 +89,52 @@ def get_current_user():
         return None
 
 
+def get_current_user():
+    """
+    Get current user from request, resolving it at most once per request.
+    
+    A Bearer token is verified without touching the database. Without one,
+    falls back to the session, X-User-Id header, query params and JSON body.
+    
+    Returns:
+        AuthenticatedUser, User or None
+    """
+    if '_auth_user' not in g:
+        g._auth_user = _resolve_user()
+    return g._auth_user
+
+
+def _require(check, message):
+    """Build a decorator that authenticates the request and applies a role check."""
+    def decorator(f):
+        @wraps(f)
+        def decorated_function(*args, **kwargs):
+            user = get_current_user()
+            if not user:
+                return jsonify({'error': 'Authentication required'}), 401
+            if not user.is_active:
+                return jsonify({'error': 'Account is inactive'}), 403
+            if check is not None and not check(user):
+                return jsonify({'error': message}), 403
+            g.current_user = user
+            return f(*args, **kwargs)
+        return decorated_function
+    return decorator
+
+
 def require_auth(f):
     """Decorator to require authentication"""
-    @wraps(f)
-    def decorated_function(*args, **kwargs):
-        user = get_current_user()
-        if not user:
-            return jsonify({'error': 'Authentication required'}), 401
-        if not user.is_active:
-            return jsonify({'error': 'Account is inactive'}), 403
-        g.current_user = user
-        return f(*args, **kwargs)
-    return decorated_function
+    return _require(None, None)(f)
 
 
 def require_admin(f):
     """Decorator to require admin role"""
-    @wraps(f)
-    def decorated_function(*args, **kwargs):
-        user = get_current_user()
-        if not user:
-            return jsonify({'error': 'Authentication required'}), 401
-        if not user.is_active:
-            return jsonify({'error': 'Account is inactive'}), 403
-        if not user.is_admin():
-            return jsonify({'error': 'Admin access required'}), 403
-        g.current_user = user
-        return f(*args, **kwargs)
-    return decorated_function
+    return _require(lambda user: user.is_admin(), 'Admin access required')(f)
 
 
 def require_manager_or_admin(f):
     """Decorator to require manager or admin role"""
-    @wraps(f)
-    def decorated_function(*args, **kwargs):
-        user = get_current_user()
-        if not user:
-            return jsonify({'error': 'Authentication required'}), 401
-        if not user.is_active:
-            return jsonify({'error': 'Account is inactive'}), 403
-        if not (user.is_admin() or user.is_manager()):
-            return jsonify({'error': 'Manager or admin access required'}), 403
-        g.current_user = user
-        return f(*args, **kwargs)
-    return decorated_function
+    return _require(lambda user: user.is_admin() or user.is_manager(), 'Manager or admin access required')(f)
 
 
 def can_manage_user(current_user, target_user):
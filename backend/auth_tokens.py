@@ -0,0 +1,126 @@
+"""
+Short-lived HMAC-signed access tokens for manager/admin users.
+
+A token is `<payload>.<signature>`, both base64url. The payload carries the
+user id, role and active flag plus issue/expiry times and a unique id, and
+the signature is HMAC-SHA256 over the payload with the app's SECRET_KEY.
+Verifying a token needs no database access.
+
+Revocation is held in memory: single tokens (logout) by id until they
+expire, and whole users (deactivated, role or password changed) by a
+not-before time that rejects everything issued earlier. Revocations are
+sent to every worker process through broadcast.py.
+"""
+import base64
+import hashlib
+import hmac
+import json
+import secrets
+import threading
+import time
+from flask import current_app
+from db import db
+from broadcast import broadcast, handles
+
+DEFAULT_TOKEN_TTL = 3600  # Seconds an access token is accepted
+DEFAULT_REFRESH_WINDOW = 7 * 24 * 3600  # Seconds after expiry a token may still be exchanged
+
+_lock = threading.Lock()
+_revoked_tokens = {}  # jti -> exp
+_user_not_before = {}  # user id -> issued-at cutoff
+
+
+def _b64encode(raw):
+    return base64.urlsafe_b64encode(raw).decode().rstrip('=')
+
+
+def _b64decode(value):
+    return base64.urlsafe_b64decode(value + '=' * (-len(value) % 4))
+
+
+def _sign(payload):
+    key = current_app.config['SECRET_KEY'].encode('utf-8')
+    return _b64encode(hmac.new(key, payload.encode('ascii'), hashlib.sha256).digest())
+
+
+def issue_token(user):
+    """
+    Issue an access token for a user.
+
+    Args:
+        user: User (or AuthenticatedUser) to issue the token for
+
+    Returns:
+        tuple: (token string, lifetime in seconds)
+    """
+    ttl = current_app.config.get('AUTH_TOKEN_TTL', DEFAULT_TOKEN_TTL)
+    now = time.time()
+    claims = {
+        'uid': user.id,
+        'role': user.role,
+        'act': bool(user.is_active),
+        'iat': round(now, 3),  # Millisecond precision so revocation cutoffs are exact
+        'exp': int(now) + ttl,
+        'jti': secrets.token_hex(8)
+    }
+    payload = _b64encode(json.dumps(claims, separators=(',', ':')).encode())
+    return f"{payload}.{_sign(payload)}", ttl
+
+
+def verify_token(token, allow_expired_for=0):
+    """
+    Check a token's signature, expiry and revocation.
+
+    Args:
+        token: Token string
+        allow_expired_for: Seconds past expiry to still accept (for refresh)
+
+    Returns:
+        dict: Token claims, or None if the token is not acceptable
+    """
+    try:
+        payload, signature = token.split('.')
+        if not hmac.compare_digest(signature.encode('ascii'), _sign(payload).encode('ascii')):
+            return None
+        claims = json.loads(_b64decode(payload))
+    except (AttributeError, UnicodeError, ValueError):
+        # Not a string, not two parts, non-ASCII or not base64/JSON
+        return None
+    if not isinstance(claims, dict):
+        return None
+
+    if claims.get('exp', 0) + allow_expired_for < time.time():
+        return None
+    with _lock:
+        if claims.get('jti') in _revoked_tokens:
+            return None
+        if claims.get('iat', 0) < _user_not_before.get(claims.get('uid'), 0):
+            return None
+    return claims
+
+
+def revoke_token(claims):
+    """Reject one token (by its claims) until it expires."""
+    refresh_window = current_app.config.get('AUTH_TOKEN_REFRESH_WINDOW', DEFAULT_REFRESH_WINDOW)
+    broadcast(db.engine, [('token_revoked', {'jti': claims['jti'], 'until': claims['exp'] + refresh_window})])
+
+
+def revoke_user_tokens(user_id):
+    """Reject every token issued to a user up to now (role, status or password changed, user deleted)."""
+    broadcast(db.engine, [('user_tokens_revoked', {'uid': user_id, 'not_before': round(time.time(), 3)})])
+
+
+@handles('token_revoked')
+def _token_revoked(data):
+    now = time.time()
+    with _lock:
+        _revoked_tokens[data['jti']] = data['until']
+        # Drop entries for tokens that can no longer be used anyway
+        for jti in [jti for jti, until in _revoked_tokens.items() if until < now]:
+            del _revoked_tokens[jti]
+
+
+@handles('user_tokens_revoked')
+def _user_tokens_revoked(data):
+    with _lock:
+        _user_not_before[data['uid']] = max(data['not_before'], _user_not_before.get(data['uid'], 0))
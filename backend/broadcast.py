@@ -0,0 +1,160 @@
+"""
+Cross-process broadcast of small messages over PostgreSQL LISTEN/NOTIFY.
+
+Gunicorn runs several worker processes (see gunicorn.conf.py), and some
+state is held in each process's memory: dashboard streams and stats cache,
+table version counters, revoked access tokens. A write handled by one worker
+has to reach that state in all of them.
+
+Modules register a handler per message kind with @handles. broadcast() calls
+the handler in the sending process at once, then sends the message with
+NOTIFY on the salon_broadcast channel. Each process runs one listener (a
+thread, so a greenlet under the gevent worker) that LISTENs on its own
+connection and calls the handler for every message sent by another process.
+Other databases (SQLite in development, one process) only need the direct
+call.
+
+The listener starts on a process's first request (see app.py). Messages
+sent while a process is not listening are lost to it, the same as all of
+this state is lost on a restart.
+"""
+import json
+import logging
+import os
+import secrets
+import select
+import threading
+import time
+from sqlalchemy import text
+
+# NOTIFY channel shared by all worker processes
+CHANNEL = 'salon_broadcast'
+# Seconds the listener waits on its connection between wake-ups
+LISTEN_POLL_SECONDS = 5
+# Seconds before the listener reconnects after losing its connection
+LISTEN_RETRY_SECONDS = 5
+
+logger = logging.getLogger(__name__)
+
+_handlers = {}
+_listener_lock = threading.Lock()
+_listener_started = False
+_origin = None  # (pid, id) of this process, tagging the messages it sends
+
+
+def handles(kind):
+    """
+    Register the handler for a message kind.
+
+    Handlers are called as handler(data) in every process, outside any app
+    context, and must only touch that process's in-memory state.
+    """
+    def decorator(func):
+        _handlers[kind] = func
+        return func
+    return decorator
+
+
+def uses_notify(engine):
+    """Whether messages on this engine cross processes with LISTEN/NOTIFY."""
+    return engine.dialect.name == 'postgresql'
+
+
+def broadcast(engine, messages):
+    """
+    Deliver messages to every process, this one included.
+
+    Call it after the change the messages describe has committed. This
+    process handles the messages before broadcast() returns; other processes
+    shortly after.
+
+    Args:
+        engine: SQLAlchemy engine of the shared database
+        messages: List of (kind, JSON-serialisable data) tuples
+    """
+    if not messages:
+        return
+    for kind, data in messages:
+        _dispatch(kind, data)
+    if uses_notify(engine):
+        try:
+            _notify(engine, messages)
+        except Exception as e:
+            logger.warning(f"Could not NOTIFY {CHANNEL}: {e}")
+
+
+def ensure_listener(engine):
+    """
+    Start this process's listener if it is not running yet.
+
+    Does nothing on databases without LISTEN/NOTIFY.
+    """
+    global _listener_started
+    if _listener_started or not uses_notify(engine):
+        return
+    with _listener_lock:
+        if _listener_started:
+            return
+        thread = threading.Thread(target=_listen_loop, args=(engine,), name='broadcast-listener', daemon=True)
+        thread.start()
+        _listener_started = True
+
+
+def _origin_id():
+    """Id of this process, renewed after a fork."""
+    global _origin
+    pid = os.getpid()
+    if _origin is None or _origin[0] != pid:
+        _origin = (pid, f"{pid}-{secrets.token_hex(6)}")
+    return _origin[1]
+
+
+def _dispatch(kind, data):
+    handler = _handlers.get(kind)
+    if handler is None:
+        logger.warning(f"No handler for broadcast message '{kind}'")
+        return
+    try:
+        handler(data)
+    except Exception:
+        logger.exception(f"Broadcast handler for '{kind}' failed")
+
+
+def _notify(engine, messages):
+    with engine.connect() as connection:
+        for kind, data in messages:
+            connection.execute(
+                text('SELECT pg_notify(:channel, :payload)'),
+                {'channel': CHANNEL, 'payload': json.dumps({'origin': _origin_id(), 'kind': kind, 'data': data})}
+            )
+        connection.commit()
+
+
+def _listen_loop(engine):
+    while True:
+        try:
+            _listen(engine)
+        except Exception as e:
+            logger.warning(f"Broadcast listener lost its connection: {e}")
+        time.sleep(LISTEN_RETRY_SECONDS)
+
+
+def _listen(engine):
+    # Dedicated connection, detached so it never goes back to the pool in LISTEN mode
+    connection = engine.raw_connection()
+    connection.detach()
+    try:
+        dbapi_connection = connection.driver_connection
+        dbapi_connection.autocommit = True
+        with dbapi_connection.cursor() as cursor:
+            cursor.execute(f'LISTEN {CHANNEL}')
+        while True:
+            if not select.select([dbapi_connection], [], [], LISTEN_POLL_SECONDS)[0]:
+                continue
+            dbapi_connection.poll()
+            while dbapi_connection.notifies:
+                message = json.loads(dbapi_connection.notifies.pop(0).payload)
+                if message.get('origin') != _origin_id():
+                    _dispatch(message['kind'], message['data'])
+    finally:
+        connection.close()
@@ -0,0 +1,84 @@
+"""
+Business-day helpers for the POS Salon backend.
+
+Timestamps are stored as naive UTC (datetime.utcnow), but reports and the
+dashboard bucket by the salon's local trading day. These helpers map one
+onto the other using the configured SALON_TIMEZONE.
+"""
+import os
+from datetime import datetime, date, timezone
+from zoneinfo import ZoneInfo, ZoneInfoNotFoundError
+
+DEFAULT_SALON_TIMEZONE = 'Africa/Nairobi'
+
+
+def get_salon_timezone():
+    """
+    Get the salon's configured timezone.
+
+    Reads SALON_TIMEZONE from the Flask app config when an app context is
+    available, otherwise from the environment.
+
+    Returns:
+        tzinfo: Salon timezone (UTC if the configured name is unknown)
+    """
+    name = None
+    try:
+        from flask import current_app
+        name = current_app.config.get('SALON_TIMEZONE')
+    except RuntimeError:
+        pass  # Outside app context (CLI scripts, migrations)
+
+    name = name or os.getenv('SALON_TIMEZONE') or DEFAULT_SALON_TIMEZONE
+    try:
+        return ZoneInfo(name)
+    except (ZoneInfoNotFoundError, ValueError):
+        return timezone.utc
+
+
+def business_date_for(value, naive_is_utc=True):
+    """
+    Get the salon-local business date for a datetime.
+
+    Args:
+        value: datetime or date (None returns None)
+        naive_is_utc: If True, naive datetimes are UTC timestamps (created_at);
+                      if False, they are salon wall-clock times (appointment_date)
+
+    Returns:
+        date: Business date or None
+    """
+    if value is None:
+        return None
+    if not isinstance(value, datetime):
+        return value if isinstance(value, date) else None
+
+    if value.tzinfo is None:
+        if not naive_is_utc:
+            return value.date()
+        value = value.replace(tzinfo=timezone.utc)
+
+    return value.astimezone(get_salon_timezone()).date()
+
+
+def business_today():
+    """
+    Get today's date in the salon's timezone.
+
+    Returns:
+        date: Current business date
+    """
+    return datetime.now(timezone.utc).astimezone(get_salon_timezone()).date()
+
+
+def business_now():
+    """
+    Get the current salon wall-clock time as a naive datetime.
+
+    Used for columns that store salon-local times (expense_date,
+    appointment_date) rather than UTC timestamps.
+
+    Returns:
+        datetime: Current salon-local time without tzinfo
+    """
+    return datetime.now(timezone.utc).astimezone(get_salon_timezone()).replace(tzinfo=None)
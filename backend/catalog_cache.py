@@ -0,0 +1,129 @@
+"""
+In-process cache of service and product pricing used at checkout.
+
+create_sale only needs a few immutable fields per catalog item (name, price,
+duration, selling/unit price), so those are cached as snapshots keyed by id.
+IDs that are not cached yet are fetched with one IN query per model.
+
+The cache carries a version number that is bumped whenever a committed
+transaction touched a Service or Product row; bumping drops every snapshot.
+A load that raced with a bump is not stored. Other worker processes drop
+their snapshots too, through broadcast.py, and a TTL bounds staleness if a
+message is missed. Stock levels are never cached.
+"""
+import threading
+import time
+from collections import namedtuple
+from itertools import chain
+from sqlalchemy import event
+from sqlalchemy.orm import Session
+from models import Service, Product
+from broadcast import broadcast, handles
+
+ServiceSnapshot = namedtuple('ServiceSnapshot', ['id', 'name', 'price', 'duration'])
+ProductSnapshot = namedtuple('ProductSnapshot', ['id', 'name', 'unit_price', 'selling_price'])
+
+WATCHED_MODELS = (Service, Product)
+
+_STALE_FLAG = 'catalog_stale'
+
+_lock = threading.Lock()
+_version = 0
+_entries = {Service: {}, Product: {}}
+
+
+def _snapshot(obj):
+    if isinstance(obj, Service):
+        return ServiceSnapshot(obj.id, obj.name, obj.price, obj.duration)
+    return ProductSnapshot(obj.id, obj.name, obj.unit_price, obj.selling_price)
+
+
+def _resolve(model, ids, ttl):
+    """Return {id: snapshot} for the ids that exist, querying only uncached ones."""
+    ids = {i for i in ids if i is not None}
+    now = time.monotonic()
+    found = {}
+    with _lock:
+        version = _version
+        cache = _entries[model]
+        for i in ids:
+            entry = cache.get(i)
+            if entry is not None and now - entry[0] <= ttl:
+                found[i] = entry[1]
+
+    missing = ids - found.keys()
+    if missing:
+        loaded = {obj.id: _snapshot(obj) for obj in model.query.filter(model.id.in_(missing)).all()}
+        found.update(loaded)
+        with _lock:
+            # Skip storing if the catalog changed while we were loading
+            if version == _version:
+                for i, snapshot in loaded.items():
+                    _entries[model][i] = (now, snapshot)
+    return found
+
+
+def get_services(ids, ttl):
+    """
+    Resolve service IDs to snapshots.
+
+    Args:
+        ids: Iterable of service IDs
+        ttl: Maximum age in seconds of a cached snapshot
+
+    Returns:
+        dict: {service_id: ServiceSnapshot} for the services that exist
+    """
+    return _resolve(Service, ids, ttl)
+
+
+def get_products(ids, ttl):
+    """
+    Resolve product IDs to snapshots (pricing only, not stock).
+
+    Args:
+        ids: Iterable of product IDs
+        ttl: Maximum age in seconds of a cached snapshot
+
+    Returns:
+        dict: {product_id: ProductSnapshot} for the products that exist
+    """
+    return _resolve(Product, ids, ttl)
+
+
+def catalog_version():
+    """Current catalog version (changes whenever cached snapshots are dropped)."""
+    with _lock:
+        return _version
+
+
+@handles('catalog_changed')
+def invalidate_catalog(data=None):
+    """Drop all cached snapshots and bump the version."""
+    global _version
+    with _lock:
+        _version += 1
+        for cache in _entries.values():
+            cache.clear()
+
+
+@event.listens_for(Session, 'after_flush')
+def _track_catalog_changes(session, flush_context):
+    # new/dirty/deleted still hold the pre-flush state here
+    if session.info.get(_STALE_FLAG):
+        return
+    for obj in chain(session.new, session.dirty, session.deleted):
+        if isinstance(obj, WATCHED_MODELS):
+            session.info[_STALE_FLAG] = True
+            return
+
+
+@event.listens_for(Session, 'after_commit')
+def _invalidate_on_commit(session):
+    if session.info.pop(_STALE_FLAG, False):
+        broadcast(session.get_bind(), [('catalog_changed', None)])
+
+
+@event.listens_for(Session, 'after_rollback')
+def _clear_on_rollback(session):
+    session.info.pop(_STALE_FLAG, None)
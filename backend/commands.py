@@ -237,6 +237,67 @@ def seed_services(force):
         click.echo("All seed services already exist with correct categories.")
 
 
+@click.command('rebuild-rollups')
+@click.option('--start', 'start_date', default=None, help='First business date to rebuild (YYYY-MM-DD)')
+@click.option('--end', 'end_date', default=None, help='Last business date to rebuild (YYYY-MM-DD)')
+@with_appcontext
+def rebuild_rollups_command(start_date, end_date):
+    """Recompute the daily sales rollup from completed sales"""
+    from sales_rollup import rebuild_rollups
+    try:
+        start = datetime.strptime(start_date, '%Y-%m-%d').date() if start_date else None
+        end = datetime.strptime(end_date, '%Y-%m-%d').date() if end_date else None
+    except ValueError:
+        click.echo('Error: Dates must be in YYYY-MM-DD format', err=True)
+        return
+
+    if start and end and start > end:
+        click.echo('Error: --start must be on or before --end', err=True)
+        return
+
+    written = rebuild_rollups(start, end)
+    db.session.commit()
+    click.echo(f'✓ Rebuilt {written} daily rollup row(s)')
+
+
+@click.command('reconcile-commissions')
+@click.option('--dry-run', is_flag=True, help='Report drift without saving the rebuilt balances')
+@with_appcontext
+def reconcile_commissions_command(dry_run):
+    """Rebuild staff commission balances from sales and commission payments"""
+    from commission_ledger import reconcile_balances
+    result = reconcile_balances()
+    if dry_run:
+        db.session.rollback()
+    else:
+        db.session.commit()
+
+    if result['entries_added']:
+        click.echo(f"{'Would add' if dry_run else '✓ Added'} {result['entries_added']} missing ledger entr{'y' if result['entries_added'] == 1 else 'ies'}")
+    if not result['drift']:
+        click.echo('✓ Commission balances match sales and payments')
+        return
+
+    click.echo(f"Found {len(result['drift'])} mismatched balance value(s):")
+    click.echo('-' * 70)
+    click.echo(f"{'Staff':<8} {'Demo':<6} {'Field':<12} {'Stored':>15} {'Expected':>15}")
+    click.echo('-' * 70)
+    for row in result['drift']:
+        click.echo(f"{row['staff_id']:<8} {str(row['is_demo']):<6} {row['field']:<12} {row['stored']:>15.2f} {row['expected']:>15.2f}")
+    if not dry_run:
+        click.echo('✓ Balances rebuilt')
+
+
+@click.command('sweep-jobs')
+@with_appcontext
+def sweep_jobs_command():
+    """Fail interrupted background jobs and delete expired job artifacts"""
+    from jobs import sweep
+    result = sweep()
+    click.echo(f"✓ Failed {result['failed']} interrupted job(s), expired {result['expired']} job(s), "
+               f"removed {result['removed_dirs']} artifact folder(s)")
+
+
 def register_commands(app):
     """Register all CLI commands with the Flask app"""
     app.cli.add_command(init_db)
@@ -246,4 +307,7 @@ def register_commands(app):
     app.cli.add_command(create_staff)
     app.cli.add_command(reset_db)
     app.cli.add_command(show_demo_login)
+    app.cli.add_command(rebuild_rollups_command)
+    app.cli.add_command(reconcile_commissions_command)
+    app.cli.add_command(sweep_jobs_command)
 
@@ -0,0 +1,231 @@
+"""
+Append-only commission ledger with per-staff running balances.
+
+Every completed sale writes one `earning` entry and every commission payment
+one `payout` entry, in the same transaction as the sale or payment. The
+matching `staff_commission_balances` row (one per staff member and demo flag)
+is adjusted in that transaction with a relative UPDATE, so concurrent writers
+never lose an increment and reading what a staff member is owed is a
+primary-key lookup instead of a scan over sales and payments.
+
+Balances are derived data: `flask reconcile-commissions` recomputes them from
+the sales and commission_payments tables and reports any drift.
+"""
+from datetime import datetime
+from sqlalchemy import update, insert, select, func, literal
+from sqlalchemy.exc import IntegrityError
+from db import db
+from models import Sale, CommissionPayment, CommissionLedgerEntry, StaffCommissionBalance
+
+EARNING = 'earning'
+PAYOUT = 'payout'
+
+# Balance columns adjusted by ledger entries
+_BALANCE_FIELDS = ('earned', 'paid', 'sales_total', 'sale_count')
+
+
+def _adjust_balance(staff_id, is_demo, **deltas):
+    """Add deltas to one balance row, creating it on first use."""
+    values = {
+        field: getattr(StaffCommissionBalance, field) + delta
+        for field, delta in deltas.items()
+    }
+    values['updated_at'] = datetime.utcnow()
+    stmt = (
+        update(StaffCommissionBalance)
+        .where(StaffCommissionBalance.staff_id == staff_id, StaffCommissionBalance.is_demo == is_demo)
+        .values(**values)
+        .execution_options(synchronize_session=False)
+    )
+    if db.session.execute(stmt).rowcount:
+        return
+
+    # First entry for this staff member. Two requests can race to create the
+    # row; the loser hits the primary key and updates the winner's row instead.
+    row = {field: 0 for field in _BALANCE_FIELDS}
+    row.update(deltas)
+    try:
+        with db.session.begin_nested():
+            db.session.execute(insert(StaffCommissionBalance).values(
+                staff_id=staff_id, is_demo=is_demo, updated_at=datetime.utcnow(), **row
+            ))
+    except IntegrityError:
+        db.session.execute(stmt)
+
+
+def record_earnings(sales):
+    """
+    Write earning entries for completed sales and add them to the balances.
+
+    Must run after the sales are flushed (they need ids). Sales without a
+    staff member are skipped.
+
+    Args:
+        sales: Completed Sale instances
+    """
+    entries = []
+    totals = {}
+    for sale in sales:
+        if sale.staff_id is None:
+            continue
+        commission = sale.commission_amount or 0
+        subtotal = sale.subtotal or 0
+        is_demo = bool(sale.is_demo)
+        entries.append({
+            'staff_id': sale.staff_id,
+            'is_demo': is_demo,
+            'entry_type': EARNING,
+            'amount': commission,
+            'sales_amount': subtotal,
+            'sale_id': sale.id,
+            'created_at': sale.completed_at or datetime.utcnow()
+        })
+        total = totals.setdefault((sale.staff_id, is_demo), {'earned': 0, 'sales_total': 0, 'sale_count': 0})
+        total['earned'] += commission
+        total['sales_total'] += subtotal
+        total['sale_count'] += 1
+
+    if not entries:
+        return
+    db.session.execute(insert(CommissionLedgerEntry), entries)
+    for (staff_id, is_demo), deltas in totals.items():
+        _adjust_balance(staff_id, is_demo, **deltas)
+
+
+def record_earning(sale):
+    """Write the earning entry for one completed sale (see record_earnings)."""
+    record_earnings([sale])
+
+
+def record_payouts(payments):
+    """
+    Write payout entries for commission payments and subtract them from the balances.
+
+    Args:
+        payments: Flushed CommissionPayment instances with their final amount_paid
+    """
+    entries = []
+    totals = {}
+    for payment in payments:
+        amount = payment.amount_paid or 0
+        is_demo = bool(payment.is_demo)
+        entries.append({
+            'staff_id': payment.staff_id,
+            'is_demo': is_demo,
+            'entry_type': PAYOUT,
+            'amount': -amount,
+            'sales_amount': 0,
+            'commission_payment_id': payment.id,
+            'created_at': payment.payment_date or datetime.utcnow()
+        })
+        key = (payment.staff_id, is_demo)
+        totals[key] = totals.get(key, 0) + amount
+
+    if not entries:
+        return
+    db.session.execute(insert(CommissionLedgerEntry), entries)
+    for (staff_id, is_demo), paid in totals.items():
+        _adjust_balance(staff_id, is_demo, paid=paid)
+
+
+def record_payout(payment):
+    """Write the payout entry for one commission payment (see record_payouts)."""
+    record_payouts([payment])
+
+
+def get_balance(staff_id, is_demo=False):
+    """Balance row for a staff member, or None if nothing was earned or paid yet."""
+    return db.session.get(StaffCommissionBalance, (staff_id, bool(is_demo)))
+
+
+def get_total_pending(is_demo=False):
+    """Commission earned but not yet paid, summed over all staff."""
+    return db.session.query(
+        func.coalesce(func.sum(StaffCommissionBalance.earned - StaffCommissionBalance.paid), 0)
+    ).filter(StaffCommissionBalance.is_demo == bool(is_demo)).scalar() or 0
+
+
+def delete_staff_entries(staff_id, is_demo):
+    """Remove a staff member's ledger entries and balance (demo data cleanup)."""
+    CommissionLedgerEntry.query.filter_by(staff_id=staff_id, is_demo=is_demo).delete(synchronize_session=False)
+    StaffCommissionBalance.query.filter_by(staff_id=staff_id, is_demo=is_demo).delete(synchronize_session=False)
+
+
+def _backfill_entries():
+    """Add ledger entries for completed sales and payments that have none; returns the count."""
+    has_sale_entry = select(CommissionLedgerEntry.id).where(CommissionLedgerEntry.sale_id == Sale.id).exists()
+    sales = select(
+        Sale.staff_id, Sale.is_demo, literal(EARNING), func.coalesce(Sale.commission_amount, 0),
+        func.coalesce(Sale.subtotal, 0), Sale.id, func.coalesce(Sale.completed_at, Sale.created_at)
+    ).where(Sale.status == 'completed', Sale.staff_id.isnot(None), ~has_sale_entry)
+    added = db.session.execute(insert(CommissionLedgerEntry).from_select(
+        ['staff_id', 'is_demo', 'entry_type', 'amount', 'sales_amount', 'sale_id', 'created_at'], sales
+    )).rowcount
+
+    has_payout_entry = select(CommissionLedgerEntry.id).where(
+        CommissionLedgerEntry.commission_payment_id == CommissionPayment.id
+    ).exists()
+    payments = select(
+        CommissionPayment.staff_id, CommissionPayment.is_demo, literal(PAYOUT),
+        -func.coalesce(CommissionPayment.amount_paid, 0), literal(0.0), CommissionPayment.id, CommissionPayment.payment_date
+    ).where(~has_payout_entry)
+    added += db.session.execute(insert(CommissionLedgerEntry).from_select(
+        ['staff_id', 'is_demo', 'entry_type', 'amount', 'sales_amount', 'commission_payment_id', 'created_at'], payments
+    )).rowcount
+    return added
+
+
+def reconcile_balances():
+    """
+    Rebuild every balance from the sales and commission_payments tables.
+
+    Missing ledger entries (e.g. for history recorded before the ledger
+    existed) are added first. Runs in the caller's transaction; commit to keep
+    the result.
+
+    Returns:
+        dict: {'entries_added': int, 'drift': list of {'staff_id', 'is_demo',
+               'field', 'stored', 'expected'}}
+    """
+    entries_added = _backfill_entries()
+
+    expected = {}
+
+    def _expected(staff_id, is_demo):
+        return expected.setdefault((staff_id, bool(is_demo)), {field: 0 for field in _BALANCE_FIELDS})
+
+    for staff_id, is_demo, earned, sales_total, sale_count in db.session.query(
+        Sale.staff_id, Sale.is_demo,
+        func.coalesce(func.sum(Sale.commission_amount), 0),
+        func.coalesce(func.sum(Sale.subtotal), 0),
+        func.count(Sale.id)
+    ).filter(Sale.status == 'completed', Sale.staff_id.isnot(None)).group_by(Sale.staff_id, Sale.is_demo):
+        _expected(staff_id, is_demo).update(earned=earned, sales_total=sales_total, sale_count=sale_count)
+
+    for staff_id, is_demo, paid in db.session.query(
+        CommissionPayment.staff_id, CommissionPayment.is_demo,
+        func.coalesce(func.sum(CommissionPayment.amount_paid), 0)
+    ).group_by(CommissionPayment.staff_id, CommissionPayment.is_demo):
+        _expected(staff_id, is_demo)['paid'] = paid
+
+    stored = {(row.staff_id, bool(row.is_demo)): row for row in StaffCommissionBalance.query.all()}
+    drift = []
+    now = datetime.utcnow()
+    for key in set(stored) | set(expected):
+        values = expected.get(key, {field: 0 for field in _BALANCE_FIELDS})
+        row = stored.get(key)
+        if row is None:
+            row = StaffCommissionBalance(staff_id=key[0], is_demo=key[1])
+            db.session.add(row)
+        for field in _BALANCE_FIELDS:
+            current = getattr(row, field) or 0
+            if round(current - values[field], 2) != 0:
+                drift.append({
+                    'staff_id': key[0], 'is_demo': key[1], 'field': field,
+                    'stored': round(current, 2), 'expected': round(values[field], 2)
+                })
+            setattr(row, field, values[field])
+        row.updated_at = now
+    db.session.flush()
+
+    return {'entries_added': entries_added, 'drift': drift}
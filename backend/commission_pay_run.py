@@ -0,0 +1,218 @@
+"""
+Bulk commission pay runs: one request pays every selected staff member.
+
+POST /api/commissions/pay-run pays a whole team for a period. All qualifying
+sale-service commission lines are read in one query ordered by staff,
+receipt numbers are reserved as one block, the payments are inserted in one
+flush and their line items in one executemany, and the run commits once, so
+it either pays everyone or no one.
+
+Lines already itemized on an earlier commission payment are left out, so
+re-running a period only pays what was sold since. The staff rows being paid
+are locked (SELECT ... FOR UPDATE, in id order) before the lines are read,
+so overlapping pay runs and POST /commissions/pay for the same staff take
+turns and each sees the lines the other paid. A partial unique index on
+commission_payment_items.sale_service_id backs this up on databases without
+row locks (SQLite).
+"""
+from datetime import datetime
+from itertools import groupby
+from types import SimpleNamespace
+from sqlalchemy import insert, select
+from db import db
+from models import CommissionPayment, CommissionPaymentItem, Sale, SaleService, Service, Staff
+from utils import calculate_gross_pay, calculate_total_deductions, calculate_net_pay
+from sequences import next_commission_receipt_numbers
+from commission_ledger import record_payouts
+
+
+def commission_lines(period_start, period_end, is_demo, staff_ids):
+    """
+    Unpaid commission lines for the period, ordered by staff.
+
+    Lock the staff rows first (see lock_staff) so no other payment can
+    itemize the same lines before this transaction commits.
+
+    Returns:
+        dict: staff_id -> list of (sale_id, sale_number, sale_service_id, service_id, service_name, commission)
+    """
+    already_paid = select(CommissionPaymentItem.id).where(
+        CommissionPaymentItem.sale_service_id == SaleService.id
+    ).exists()
+    query = db.session.query(
+        Sale.staff_id,
+        Sale.id,
+        Sale.sale_number,
+        SaleService.id,
+        SaleService.service_id,
+        Service.name,
+        SaleService.commission_amount
+    ).join(
+        SaleService, SaleService.sale_id == Sale.id
+    ).outerjoin(
+        Service, Service.id == SaleService.service_id
+    ).filter(
+        Sale.status == 'completed',
+        Sale.is_demo == is_demo,
+        Sale.business_date >= period_start,
+        Sale.business_date <= period_end,
+        Sale.staff_id.isnot(None),
+        SaleService.commission_amount > 0,
+        ~already_paid
+    )
+    if staff_ids is not None:
+        query = query.filter(Sale.staff_id.in_(staff_ids))
+
+    rows = query.order_by(Sale.staff_id, Sale.id, SaleService.id).all()
+    return {
+        staff_id: [row[1:] for row in group]
+        for staff_id, group in groupby(rows, key=lambda row: row[0])
+    }
+
+
+def lock_staff(query):
+    """
+    Load staff rows with a row lock held until the transaction ends.
+
+    Args:
+        query: Staff query, already filtered
+
+    Returns:
+        list: Staff, in id order (so concurrent payers lock in the same order)
+    """
+    return query.order_by(Staff.id).with_for_update().all()
+
+
+def _item_row(item_type, display_order, item):
+    """Normalise an earning/deduction payload (as accepted by POST /commissions/pay) to an insert row."""
+    return {
+        'item_type': item_type,
+        'item_name': item.get('item_name', 'Earning' if item_type == 'earning' else 'Deduction'),
+        'amount': float(item.get('amount', 0)),
+        'is_percentage': bool(item.get('is_percentage', False)),
+        'percentage_of': item.get('percentage_of'),
+        'display_order': display_order,
+        'notes': item.get('notes'),
+        'sale_id': item.get('sale_id'),
+        'sale_service_id': item.get('sale_service_id'),
+        'service_name': item.get('service_name'),
+        'sale_number': item.get('sale_number')
+    }
+
+
+def run_pay_run(period_start, period_end, is_demo, staff_ids=None, include_base_pay=False,
+                deductions=None, payment_method=None, notes=None, paid_by=None):
+    """
+    Create one commission payment per staff member for a period.
+
+    Staff are paid when they have unpaid commission lines in the period, or
+    a base pay when include_base_pay is set. Runs in the caller's
+    transaction; commit to keep the payments.
+
+    Args:
+        period_start: First business date of the period
+        period_end: Last business date of the period
+        is_demo: Pay demo or live staff
+        staff_ids: Only pay these staff members (None for all active staff)
+        include_base_pay: Add each staff member's base pay as an earning
+        deductions: Deduction payloads applied to every payment
+        payment_method: Payment method recorded on every payment
+        notes: Notes recorded on every payment
+        paid_by: User ID making the payments
+
+    Returns:
+        tuple: (list of per-staff summary dicts, list of skipped {'staff_id', 'reason'})
+    """
+    staff_query = Staff.query.filter(Staff.is_demo == is_demo)
+    if staff_ids is not None:
+        staff_query = staff_query.filter(Staff.id.in_(staff_ids))
+    else:
+        staff_query = staff_query.filter(Staff.is_active == True)
+    staff_by_id = {staff.id: staff for staff in lock_staff(staff_query)}
+
+    skipped = [
+        {'staff_id': staff_id, 'reason': 'Staff not found'}
+        for staff_id in (staff_ids or []) if staff_id not in staff_by_id
+    ]
+    lines_by_staff = commission_lines(period_start, period_end, is_demo, list(staff_by_id))
+
+    to_pay = []
+    for staff_id, staff in staff_by_id.items():
+        lines = lines_by_staff.get(staff_id, [])
+        base_pay = staff.base_pay or 0
+        if lines or (include_base_pay and base_pay > 0):
+            to_pay.append((staff, lines))
+        else:
+            skipped.append({'staff_id': staff_id, 'reason': 'Nothing to pay for the period'})
+    if not to_pay:
+        return [], skipped
+
+    # Build every payment's item rows and totals before touching the database
+    deduction_rows = [_item_row('deduction', order, d) for order, d in enumerate(deductions or [])]
+    deduction_items = [SimpleNamespace(**row) for row in deduction_rows]
+    payments = []
+    item_rows = []
+    receipt_numbers = next_commission_receipt_numbers(len(to_pay))
+    now = datetime.utcnow()
+    for (staff, lines), receipt_number in zip(to_pay, receipt_numbers):
+        earning_rows = []
+        if include_base_pay and staff.base_pay:
+            earning_rows.append({'item_name': 'Base Pay', 'amount': staff.base_pay})
+        for sale_id, sale_number, sale_service_id, service_id, service_name, commission in lines:
+            service_name = service_name or f"Service #{service_id}"
+            earning_rows.append({
+                'item_name': f"Commission - {service_name}",
+                'amount': commission,
+                'sale_id': sale_id,
+                'sale_service_id': sale_service_id,
+                'service_name': service_name,
+                'sale_number': sale_number
+            })
+        earning_rows = [_item_row('earning', order, e) for order, e in enumerate(earning_rows)]
+
+        gross_pay = calculate_gross_pay([SimpleNamespace(**row) for row in earning_rows])
+        total_deductions = calculate_total_deductions(deduction_items, gross_pay=gross_pay, base_pay=staff.base_pay)
+        net_pay = calculate_net_pay(gross_pay, total_deductions) or 0.0
+
+        payment = CommissionPayment(
+            staff_id=staff.id,
+            amount_paid=net_pay,
+            base_pay=staff.base_pay,
+            gross_pay=gross_pay,
+            total_deductions=total_deductions,
+            net_pay=net_pay,
+            payment_date=now,
+            period_start=period_start,
+            period_end=period_end,
+            payment_method=payment_method.lower().replace("-", "_") if payment_method else None,
+            receipt_number=receipt_number,
+            paid_by=paid_by,
+            notes=notes,
+            is_demo=is_demo
+        )
+        payments.append(payment)
+        item_rows.append(earning_rows + deduction_rows)
+
+    db.session.add_all(payments)
+    db.session.flush()  # One multi-row INSERT; assigns payment ids
+
+    db.session.execute(insert(CommissionPaymentItem), [
+        dict(row, commission_payment_id=payment.id, created_at=now)
+        for payment, rows in zip(payments, item_rows)
+        for row in rows
+    ])
+    record_payouts(payments)
+
+    summary = []
+    for payment, (staff, lines) in zip(payments, to_pay):
+        summary.append({
+            'staff_id': staff.id,
+            'staff_name': staff.name,
+            'payment_id': payment.id,
+            'receipt_number': payment.receipt_number,
+            'commission_lines': len(lines),
+            'gross_pay': payment.gross_pay,
+            'total_deductions': payment.total_deductions,
+            'net_pay': payment.net_pay
+        })
+    return summary, skipped
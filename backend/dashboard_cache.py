@@ -0,0 +1,108 @@
+"""
+In-process cache for the admin dashboard stats payload.
+
+Entries are keyed by the is_demo flag and dropped whenever a committed
+transaction touched a Sale, CommissionPayment or StaffLoginLog row. Commits
+by other worker processes drop them too, through the dashboard event
+listener (see dashboard_events.py). A short TTL bounds staleness for
+anything else, such as time-based fields (currently logged in, business day
+rollover).
+
+Invalidation bumps a generation counter. Callers read it before building a
+payload and pass it back when storing, so a build that started before a
+commit cannot store its pre-commit numbers after that commit invalidated
+the cache (the same guard as catalog_cache.py).
+"""
+import threading
+import time
+from itertools import chain
+from sqlalchemy import event
+from sqlalchemy.orm import Session
+from models import Sale, CommissionPayment, StaffLoginLog
+
+WATCHED_MODELS = (Sale, CommissionPayment, StaffLoginLog)
+
+_STALE_FLAG = 'dashboard_stats_stale'
+
+_lock = threading.Lock()
+_generation = 0
+_entries = {}
+
+
+def get_cached_stats(is_demo, business_date, ttl):
+    """
+    Get a cached stats payload if it is still valid.
+
+    Args:
+        is_demo: Demo flag the payload was built for
+        business_date: Business day the payload was built for
+        ttl: Maximum age in seconds
+
+    Returns:
+        dict: Cached payload or None
+    """
+    with _lock:
+        entry = _entries.get(is_demo)
+    if entry is None:
+        return None
+
+    built_at, built_for, payload = entry
+    if built_for != business_date or time.monotonic() - built_at > ttl:
+        return None
+    return payload
+
+
+def current_generation():
+    """Generation to pass to set_cached_stats; read it before building a payload."""
+    with _lock:
+        return _generation
+
+
+def set_cached_stats(is_demo, business_date, payload, generation):
+    """
+    Store a freshly built stats payload.
+
+    Args:
+        is_demo: Demo flag the payload was built for
+        business_date: Business day the payload was built for
+        payload: Stats payload
+        generation: current_generation() read before the build started
+
+    Returns:
+        bool: False if the cache was invalidated during the build (nothing stored)
+    """
+    with _lock:
+        if generation != _generation:
+            return False
+        _entries[is_demo] = (time.monotonic(), business_date, payload)
+        return True
+
+
+def invalidate_dashboard_stats():
+    """Drop all cached stats payloads."""
+    global _generation
+    with _lock:
+        _generation += 1
+        _entries.clear()
+
+
+@event.listens_for(Session, 'after_flush')
+def _track_dashboard_changes(session, flush_context):
+    # new/dirty/deleted still hold the pre-flush state here
+    if session.info.get(_STALE_FLAG):
+        return
+    for obj in chain(session.new, session.dirty, session.deleted):
+        if isinstance(obj, WATCHED_MODELS):
+            session.info[_STALE_FLAG] = True
+            return
+
+
+@event.listens_for(Session, 'after_commit')
+def _invalidate_on_commit(session):
+    if session.info.pop(_STALE_FLAG, False):
+        invalidate_dashboard_stats()
+
+
+@event.listens_for(Session, 'after_rollback')
+def _clear_on_rollback(session):
+    session.info.pop(_STALE_FLAG, None)
@@ -0,0 +1,149 @@
+"""
+Fan-out of dashboard change events for the admin SSE stream.
+
+Session hooks collect events while a transaction flushes (sale completed,
+commission paid, staff login/logout) and send them only after the
+transaction commits. Every open /api/dashboard/stream connection holds a
+bounded queue that receives each published event.
+
+Events reach streams in every worker process through broadcast.py, so a
+sale committed by one worker shows up on dashboards connected to another;
+each process that hears an event also drops its dashboard stats cache, so
+a client refetching after an event never gets that worker's stale copy.
+"""
+import json
+import queue
+import threading
+from sqlalchemy import event, inspect
+from sqlalchemy.orm import Session
+from models import Sale, CommissionPayment, StaffLoginLog
+from dashboard_cache import invalidate_dashboard_stats
+from broadcast import broadcast, handles
+
+SUBSCRIBER_QUEUE_SIZE = 100
+
+_PENDING_KEY = 'dashboard_pending_events'
+
+_lock = threading.Lock()
+_subscribers = set()
+
+
+def subscribe():
+    """
+    Register a new stream subscriber.
+
+    Returns:
+        queue.Queue: Queue that receives published events
+    """
+    subscriber = queue.Queue(maxsize=SUBSCRIBER_QUEUE_SIZE)
+    with _lock:
+        _subscribers.add(subscriber)
+    return subscriber
+
+
+def unsubscribe(subscriber):
+    """Remove a stream subscriber."""
+    with _lock:
+        _subscribers.discard(subscriber)
+
+
+def subscriber_count():
+    """Number of open streams in this process."""
+    with _lock:
+        return len(_subscribers)
+
+
+def publish(event_type, data):
+    """
+    Send an event to every subscriber in this process.
+
+    Slow subscribers whose queue is full miss the event; clients refetch
+    the full stats on the next event they do receive.
+
+    Args:
+        event_type: SSE event name
+        data: JSON-serialisable payload
+    """
+    message = {'type': event_type, 'data': data}
+    with _lock:
+        subscribers = list(_subscribers)
+    for subscriber in subscribers:
+        try:
+            subscriber.put_nowait(message)
+        except queue.Full:
+            pass
+
+
+@handles('dashboard_event')
+def _receive(message):
+    invalidate_dashboard_stats()
+    publish(message['type'], message['data'])
+
+
+def format_sse(event_type, data):
+    """Format an event as a Server-Sent Events message."""
+    return f"event: {event_type}\ndata: {json.dumps(data)}\n\n"
+
+
+def _added(obj, attr):
+    return inspect(obj).attrs[attr].history.added
+
+
+def _events_for(obj, is_new):
+    if isinstance(obj, Sale):
+        if 'completed' in (_added(obj, 'status') if not is_new else [obj.status]):
+            yield 'sale_completed', {
+                'sale_id': obj.id,
+                'staff_id': obj.staff_id,
+                'is_demo': bool(obj.is_demo),
+                'total_amount': obj.total_amount,
+                'subtotal': obj.subtotal,
+                'commission_amount': obj.commission_amount
+            }
+    elif isinstance(obj, CommissionPayment):
+        if is_new:
+            yield 'commission_paid', {
+                'payment_id': obj.id,
+                'staff_id': obj.staff_id,
+                'is_demo': bool(obj.is_demo),
+                'amount_paid': obj.amount_paid
+            }
+    elif isinstance(obj, StaffLoginLog):
+        # Staff demo status is not on the log row, so these go to all streams
+        if is_new:
+            yield 'staff_login', {
+                'staff_id': obj.staff_id,
+                'is_demo': None,
+                'login_time': obj.login_time.isoformat() if obj.login_time else None
+            }
+        elif _added(obj, 'logout_time'):
+            yield 'staff_logout', {
+                'staff_id': obj.staff_id,
+                'is_demo': None,
+                'logout_time': obj.logout_time.isoformat() if obj.logout_time else None
+            }
+
+
+@event.listens_for(Session, 'after_flush')
+def _collect_dashboard_events(session, flush_context):
+    # new/dirty still hold the pre-flush state and attribute history here
+    pending = session.info.setdefault(_PENDING_KEY, [])
+    for obj in session.new:
+        pending.extend(_events_for(obj, is_new=True))
+    for obj in session.dirty:
+        pending.extend(_events_for(obj, is_new=False))
+
+
+@event.listens_for(Session, 'after_commit')
+def _publish_on_commit(session):
+    pending = session.info.pop(_PENDING_KEY, None)
+    if not pending:
+        return
+    broadcast(session.get_bind(), [
+        ('dashboard_event', {'type': event_type, 'data': data}) for event_type, data in pending
+    ])
+
+
+@event.listens_for(Session, 'after_rollback')
+def _discard_on_rollback(session):
+    session.info.pop(_PENDING_KEY, None)
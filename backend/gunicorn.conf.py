@@ -0,0 +1,36 @@
+"""
+Gunicorn configuration for the POS Salon backend.
+
+Gunicorn loads this file automatically when started from backend/.
+The gevent worker holds each /api/dashboard/stream connection as a
+greenlet rather than a thread, so idle dashboard tabs are cheap.
+
+Several workers run side by side so a request that holds the CPU in one
+process (a report aggregation, an inline PDF) cannot stall every other
+request; ReportLab renders for jobs and exports run in the render pool
+(render_pool.py) and bcrypt runs on real OS threads (password_hashing.py).
+State kept in each worker's memory (dashboard streams, ETag counters,
+revoked tokens) is kept in step over PostgreSQL LISTEN/NOTIFY (see
+broadcast.py).
+"""
+import multiprocessing
+import os
+
+bind = f"0.0.0.0:{os.getenv('PORT', '5001')}"
+worker_class = os.getenv('GUNICORN_WORKER_CLASS', 'gevent')
+workers = int(os.getenv('WEB_CONCURRENCY', str(min(4, multiprocessing.cpu_count() * 2 + 1))))
+# Concurrent connections (including idle SSE streams) per gevent worker
+worker_connections = int(os.getenv('GUNICORN_WORKER_CONNECTIONS', '1000'))
+timeout = int(os.getenv('GUNICORN_TIMEOUT', '120'))
+keepalive = 5
+
+
+def post_fork(server, worker):
+    """Make psycopg2 cooperative so database calls yield to other greenlets."""
+    if worker_class != 'gevent':
+        return
+    try:
+        from psycogreen.gevent import patch_psycopg
+        patch_psycopg()
+    except ImportError:
+        server.log.warning('psycogreen not installed; database calls will block the gevent worker')
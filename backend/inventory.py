@@ -0,0 +1,75 @@
+"""
+Atomic product stock changes.
+
+Stock is never read into Python and written back. Each change is a single
+UPDATE whose new value is computed by the database from the current row,
+so concurrent tills and manual adjustments cannot lose each other's writes
+or take stock below zero.
+"""
+from datetime import datetime
+from sqlalchemy import update, case, func
+from db import db
+from models import Product
+from table_versions import mark_changed
+
+
+def deduct_stock(quantities):
+    """
+    Deduct stock for several products in one conditional UPDATE.
+
+    Every product must have enough stock; the statement only touches rows
+    where stock_quantity >= the requested quantity, and the row count tells
+    whether all of them qualified. On False the caller must roll back, since
+    the products that did have enough stock were already decremented.
+
+    Args:
+        quantities: Dict of product_id -> quantity to deduct
+
+    Returns:
+        bool: True if every product was deducted
+    """
+    if not quantities:
+        return True
+
+    quantity = case(quantities, value=Product.id)
+    current = func.coalesce(Product.stock_quantity, 0)
+    result = db.session.execute(
+        update(Product)
+        .where(Product.id.in_(list(quantities)), current >= quantity)
+        .values(stock_quantity=current - quantity, updated_at=datetime.utcnow())
+        .execution_options(synchronize_session=False)
+    )
+    _expire_stock(quantities)
+    mark_changed(db.session, 'products')
+    return result.rowcount == len(quantities)
+
+
+def adjust_stock(product_id, adjustment):
+    """
+    Add to (or subtract from) a product's stock, clamping at zero.
+
+    Args:
+        product_id: Product ID
+        adjustment: Positive to add, negative to subtract
+
+    Returns:
+        bool: False if the product does not exist
+    """
+    new_stock = func.coalesce(Product.stock_quantity, 0) + adjustment
+    result = db.session.execute(
+        update(Product)
+        .where(Product.id == product_id)
+        .values(stock_quantity=case((new_stock < 0, 0), else_=new_stock), updated_at=datetime.utcnow())
+        .execution_options(synchronize_session=False)
+    )
+    _expire_stock([product_id])
+    mark_changed(db.session, 'products')
+    return result.rowcount == 1
+
+
+def _expire_stock(product_ids):
+    """Make already-loaded Product objects reload stock on next access."""
+    for product_id in product_ids:
+        product = db.session.identity_map.get(db.session.identity_key(Product, product_id))
+        if product is not None:
+            db.session.expire(product, ['stock_quantity', 'updated_at'])
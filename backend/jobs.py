@@ -0,0 +1,320 @@
+"""
+Background jobs for receipts, payslips and exports, without an external broker.
+
+POST /api/jobs/... inserts a `jobs` row and returns at once; the client polls
+GET /api/jobs/<id> for status and progress and downloads the artifact from
+GET /api/jobs/<id>/download when the job has succeeded.
+
+The queue is the jobs table itself. Each web process runs JOB_WORKERS runner
+threads (started by the first /api/jobs request) that claim queued jobs with
+a conditional UPDATE, so when several processes share a database every job
+still runs exactly once. ReportLab rendering is handed to the render pool
+(see render_pool.py) so it never blocks the web worker.
+
+Artifacts are written to JOB_ARTIFACT_DIR/<job id>/ (default
+instance/job_artifacts). Runners also fail jobs whose heartbeat stopped
+(their process died) and, every few minutes, delete artifacts older than
+JOB_RETENTION_HOURS and mark their jobs expired; `flask sweep-jobs` runs the
+same sweep by hand.
+"""
+import io
+import json
+import os
+import shutil
+import tempfile
+import threading
+import time
+import uuid
+from datetime import datetime, timedelta
+from flask import current_app
+from sqlalchemy import update
+from db import db
+from models import Job, Sale, CommissionPayment, Staff, User
+from pdf_generators import sales_receipt_fingerprint, sales_receipt_filename, commission_receipt_fingerprint
+from pdf_cache import cached_pdf
+from render_pool import get_pool, sale_snapshot, payslip_snapshot, render_sales_receipt, render_payslip
+from utils import get_appointments_for_export, export_appointments_ical, export_appointments_csv
+
+QUEUED = 'queued'
+RUNNING = 'running'
+SUCCEEDED = 'succeeded'
+FAILED = 'failed'
+EXPIRED = 'expired'
+
+# Seconds between retention sweeps run by the runner threads
+SWEEP_INTERVAL = 300
+
+_handlers = {}
+_wake = threading.Event()
+_runner_lock = threading.Lock()
+_runners_started = False
+_last_sweep = 0.0
+
+
+class JobError(Exception):
+    """A job failed for a reason worth showing the client (e.g. the sale no longer exists)."""
+
+
+def job_handler(kind):
+    """
+    Register a handler for a job kind.
+
+    Handlers are called as handler(params, report_progress) inside an app
+    context and return (filename, mimetype, data bytes).
+    """
+    def decorator(func):
+        _handlers[kind] = func
+        return func
+    return decorator
+
+
+def enqueue(kind, params, created_by=None):
+    """
+    Add a queued job in the caller's transaction.
+
+    Commit, then call wake_runners() so an idle runner picks it up at once.
+
+    Returns:
+        Job: The new job
+    """
+    now = datetime.utcnow()
+    job = Job(
+        id=uuid.uuid4().hex,
+        kind=kind,
+        status=QUEUED,
+        progress=0,
+        params=json.dumps(params),
+        created_by=created_by,
+        created_at=now,
+        updated_at=now
+    )
+    db.session.add(job)
+    return job
+
+
+def wake_runners():
+    _wake.set()
+
+
+def ensure_runners(app):
+    """Start this process's runner threads if they are not running yet."""
+    global _runners_started
+    with _runner_lock:
+        if _runners_started:
+            return
+        for index in range(max(1, app.config['JOB_WORKERS'])):
+            thread = threading.Thread(target=_runner_loop, args=(app,), name=f'job-runner-{index}', daemon=True)
+            thread.start()
+        _runners_started = True
+
+
+def _runner_loop(app):
+    while True:
+        _wake.wait(app.config['JOB_POLL_INTERVAL'])
+        _wake.clear()
+        with app.app_context():
+            try:
+                _maybe_sweep()
+                while True:
+                    job = _claim_next()
+                    if job is None:
+                        break
+                    _run(job)
+            except Exception as e:
+                db.session.rollback()
+                app.logger.exception(f"Job runner error: {e}")
+            finally:
+                db.session.remove()
+
+
+def _claim_next():
+    """Move the oldest queued job to running, or return None when the queue is empty."""
+    while True:
+        job_id = db.session.query(Job.id).filter(
+            Job.status == QUEUED
+        ).order_by(Job.created_at, Job.id).limit(1).scalar()
+        if job_id is None:
+            db.session.rollback()
+            return None
+
+        now = datetime.utcnow()
+        claimed = db.session.execute(
+            update(Job)
+            .where(Job.id == job_id, Job.status == QUEUED)
+            .values(status=RUNNING, started_at=now, updated_at=now)
+            .execution_options(synchronize_session=False)
+        ).rowcount
+        db.session.commit()
+        if claimed:
+            return db.session.get(Job, job_id)
+        # Another runner took it first; try the next one
+
+
+def _run(job):
+    handler = _handlers.get(job.kind)
+    job_id = job.id
+
+    def report_progress(percent):
+        db.session.execute(
+            update(Job)
+            .where(Job.id == job_id, Job.status == RUNNING)
+            .values(progress=max(0, min(99, int(percent))), updated_at=datetime.utcnow())
+            .execution_options(synchronize_session=False)
+        )
+        db.session.commit()
+
+    try:
+        if handler is None:
+            raise JobError(f"Unknown job kind '{job.kind}'")
+        filename, mimetype, data = handler(job.get_params(), report_progress)
+        path = _write_artifact(job_id, filename, data)
+    except Exception as e:
+        db.session.rollback()
+        if not isinstance(e, JobError):
+            current_app.logger.exception(f"Job {job_id} ({job.kind}) failed: {e}")
+        _finish(job_id, status=FAILED, error=str(e))
+        return
+
+    _finish(
+        job_id, status=SUCCEEDED, progress=100,
+        result_path=path, result_filename=filename, result_mimetype=mimetype
+    )
+
+
+def _finish(job_id, **values):
+    """Record a running job's outcome; a job the sweep already failed keeps that status."""
+    now = datetime.utcnow()
+    finished = db.session.execute(
+        update(Job)
+        .where(Job.id == job_id, Job.status == RUNNING)
+        .values(finished_at=now, updated_at=now, **values)
+        .execution_options(synchronize_session=False)
+    ).rowcount
+    db.session.commit()
+    if not finished:
+        current_app.logger.warning(f"Job {job_id} finished after it stopped running; result discarded")
+
+
+def get_artifact_dir():
+    return current_app.config['JOB_ARTIFACT_DIR']
+
+
+def _write_artifact(job_id, filename, data):
+    """Write an artifact atomically and return its path."""
+    directory = os.path.join(get_artifact_dir(), job_id)
+    os.makedirs(directory, exist_ok=True)
+    path = os.path.join(directory, os.path.basename(filename))
+    fd, tmp_path = tempfile.mkstemp(dir=directory, suffix='.tmp')
+    try:
+        with os.fdopen(fd, 'wb') as f:
+            f.write(data)
+        os.replace(tmp_path, path)
+    except BaseException:
+        if os.path.exists(tmp_path):
+            os.remove(tmp_path)
+        raise
+    return path
+
+
+def _maybe_sweep():
+    global _last_sweep
+    if time.monotonic() - _last_sweep < SWEEP_INTERVAL:
+        return
+    _last_sweep = time.monotonic()
+    sweep()
+
+
+def sweep():
+    """
+    Fail interrupted jobs and expire artifacts past their retention.
+
+    Returns:
+        dict: {'failed': int, 'expired': int, 'removed_dirs': int}
+    """
+    now = datetime.utcnow()
+    stale_before = now - timedelta(seconds=current_app.config['JOB_STALE_SECONDS'])
+    cutoff = now - timedelta(hours=current_app.config['JOB_RETENTION_HOURS'])
+
+    failed = db.session.execute(
+        update(Job)
+        .where(Job.status == RUNNING, Job.updated_at < stale_before)
+        .values(status=FAILED, error='Job was interrupted', finished_at=now, updated_at=now)
+        .execution_options(synchronize_session=False)
+    ).rowcount
+    expired = db.session.execute(
+        update(Job)
+        .where(Job.status == SUCCEEDED, Job.finished_at < cutoff)
+        .values(status=EXPIRED, result_path=None, updated_at=now)
+        .execution_options(synchronize_session=False)
+    ).rowcount
+    db.session.commit()
+
+    # Remove by age on disk, which also catches artifacts of jobs that never
+    # recorded success (the process died between writing and committing)
+    removed_dirs = 0
+    artifact_dir = get_artifact_dir()
+    cutoff_ts = time.time() - current_app.config['JOB_RETENTION_HOURS'] * 3600
+    try:
+        entries = list(os.scandir(artifact_dir))
+    except FileNotFoundError:
+        entries = []
+    for entry in entries:
+        try:
+            if entry.is_dir() and entry.stat().st_mtime < cutoff_ts:
+                shutil.rmtree(entry.path)
+                removed_dirs += 1
+        except OSError as e:
+            current_app.logger.warning(f"Could not remove job artifacts {entry.path}: {e}")
+
+    return {'failed': failed, 'expired': expired, 'removed_dirs': removed_dirs}
+
+
+def render_in_pool(func, snapshot):
+    """Run a render_pool function in the render pool and wait for its bytes."""
+    return get_pool(current_app.config['RENDER_PROCESSES']).submit(func, snapshot).result()
+
+
+@job_handler('sales_receipt')
+def _sales_receipt(params, report_progress):
+    sale = Sale.query.options(*Sale.receipt_load_options()).filter(Sale.id == params.get('sale_id')).first()
+    if sale is None:
+        raise JobError('Sale not found')
+
+    snapshot = sale_snapshot(sale)
+    report_progress(20)
+    render = lambda: io.BytesIO(render_in_pool(render_sales_receipt, snapshot))
+    if sale.status == 'completed':
+        fingerprint = sales_receipt_fingerprint(sale, sale.staff, sale.customer, sale.payment)
+        pdf_buffer = cached_pdf('sales_receipt', fingerprint, render)
+    else:
+        pdf_buffer = render()
+
+    return sales_receipt_filename(sale), 'application/pdf', pdf_buffer.getvalue()
+
+
+@job_handler('commission_receipt')
+def _commission_receipt(params, report_progress):
+    payment = db.session.get(CommissionPayment, params.get('payment_id'))
+    if payment is None:
+        raise JobError('Commission payment not found')
+    staff = db.session.get(Staff, payment.staff_id)
+    payer = db.session.get(User, payment.paid_by) if payment.paid_by else None
+
+    snapshot = payslip_snapshot(payment, staff, payer)
+    report_progress(20)
+    pdf_buffer = cached_pdf(
+        'payslip',
+        commission_receipt_fingerprint(payment, staff, payer),
+        lambda: io.BytesIO(render_in_pool(render_payslip, snapshot))
+    )
+    return f'commission_receipt_{payment.receipt_number}.pdf', 'application/pdf', pdf_buffer.getvalue()
+
+
+@job_handler('calendar_export')
+def _calendar_export(params, report_progress):
+    appointments = get_appointments_for_export(params.get('start_date'), params.get('end_date'), params.get('is_demo'))
+    report_progress(60)
+    stamp = datetime.now().strftime('%Y%m%d')
+    if params.get('format') == 'csv':
+        return f'appointments_{stamp}.csv', 'text/csv', export_appointments_csv(appointments).encode('utf-8')
+    return f'appointments_{stamp}.ics', 'text/calendar', export_appointments_ical(appointments).encode('utf-8')
@@ -0,0 +1,128 @@
+"""Add indexed business_date to sales, payments, expenses and appointments
+
+Revision ID: add_business_date
+Revises: add_hot_path_indexes
+Create Date: 2026-02-03 09:00:00.000000
+
+"""
+import os
+from datetime import datetime, timezone
+from zoneinfo import ZoneInfo, ZoneInfoNotFoundError
+
+from alembic import op
+import sqlalchemy as sa
+
+
+revision = 'add_business_date'
+down_revision = 'add_hot_path_indexes'
+branch_labels = None
+depends_on = None
+
+
+# (table, source column, naive values are UTC) - mirrors the listeners in models.py
+SOURCES = [
+    ('sales', 'created_at', True),
+    ('payments', 'created_at', True),
+    ('expenses', 'expense_date', False),
+    ('appointments', 'appointment_date', False),
+]
+
+INDEXES = [
+    ('ix_sales_is_demo_business_date', 'sales', ['is_demo', 'business_date']),
+    ('ix_sales_staff_id_business_date', 'sales', ['staff_id', 'business_date']),
+    ('ix_payments_business_date', 'payments', ['business_date']),
+    ('ix_expenses_is_demo_business_date', 'expenses', ['is_demo', 'business_date']),
+    ('ix_appointments_business_date', 'appointments', ['business_date']),
+]
+
+BACKFILL_BATCH_SIZE = 1000
+
+
+def _salon_timezone():
+    try:
+        return ZoneInfo(os.getenv('SALON_TIMEZONE') or 'Africa/Nairobi')
+    except (ZoneInfoNotFoundError, ValueError):
+        return timezone.utc
+
+
+def _to_business_date(value, naive_is_utc, tz):
+    if value is None:
+        return None
+    if isinstance(value, str):
+        # SQLite returns DATETIME columns as text through a lightweight table()
+        value = datetime.fromisoformat(value)
+    if value.tzinfo is None:
+        if not naive_is_utc:
+            return value.date()
+        value = value.replace(tzinfo=timezone.utc)
+    return value.astimezone(tz).date()
+
+
+def _backfill(conn, table, source, naive_is_utc, tz):
+    tbl = sa.table(table, sa.column('id', sa.Integer), sa.column(source, sa.DateTime),
+                   sa.column('business_date', sa.Date))
+    update = (
+        tbl.update()
+        .where(tbl.c.id == sa.bindparam('row_id'))
+        .values(business_date=sa.bindparam('bd'))
+    )
+    last_id = 0
+    while True:
+        rows = conn.execute(
+            sa.select(tbl.c.id, tbl.c[source])
+            .where(tbl.c.id > last_id, tbl.c.business_date.is_(None))
+            .order_by(tbl.c.id)
+            .limit(BACKFILL_BATCH_SIZE)
+        ).fetchall()
+        if not rows:
+            break
+        params = [
+            {'row_id': row[0], 'bd': _to_business_date(row[1], naive_is_utc, tz)}
+            for row in rows
+        ]
+        conn.execute(update, params)
+        last_id = rows[-1][0]
+
+
+def upgrade():
+    conn = op.get_bind()
+    inspector = sa.inspect(conn)
+    tables = inspector.get_table_names()
+    tz = _salon_timezone()
+
+    for table, source, naive_is_utc in SOURCES:
+        if table not in tables:
+            continue
+        columns = [col['name'] for col in inspector.get_columns(table)]
+        if 'business_date' not in columns:
+            with op.batch_alter_table(table, schema=None) as batch_op:
+                batch_op.add_column(sa.Column('business_date', sa.Date(), nullable=True))
+        _backfill(conn, table, source, naive_is_utc, tz)
+
+    for name, table, columns in INDEXES:
+        if table not in tables:
+            continue
+        existing = [ix['name'] for ix in sa.inspect(conn).get_indexes(table)]
+        if name not in existing:
+            op.create_index(name, table, columns)
+
+
+def downgrade():
+    conn = op.get_bind()
+    inspector = sa.inspect(conn)
+    tables = inspector.get_table_names()
+
+    for name, table, columns in reversed(INDEXES):
+        if table not in tables:
+            continue
+        existing = [ix['name'] for ix in inspector.get_indexes(table)]
+        if name in existing:
+            op.drop_index(name, table_name=table)
+
+    for table, source, naive_is_utc in SOURCES:
+        if table not in tables:
+            continue
+        columns = [col['name'] for col in inspector.get_columns(table)]
+        if 'business_date' in columns:
+            with op.batch_alter_table(table, schema=None) as batch_op:
+                batch_op.drop_column('business_date')
@@ -0,0 +1,63 @@
+"""Pay each sale-service commission line at most once
+
+Revision ID: add_commission_item_sale_service_unique
+Revises: add_commission_payments_business_date
+Create Date: 2026-02-14 09:00:00.000000
+
+Before pay runs skipped already-itemized lines, paying the same period twice
+itemized a line again. The partial unique index needs those repeats gone:
+later items keep their sale, sale number and service name (so payslips print
+unchanged) but drop their sale_service_id link, leaving the earliest payment
+as the one that paid the line.
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+revision = 'add_commission_item_sale_service_unique'
+down_revision = 'add_commission_payments_business_date'
+branch_labels = None
+depends_on = None
+
+INDEX_NAME = 'ux_commission_payment_items_sale_service_id'
+
+
+def _unlink_repeats(conn):
+    items = sa.table('commission_payment_items', sa.column('id', sa.Integer), sa.column('sale_service_id', sa.Integer))
+    first_items = (
+        sa.select(sa.func.min(items.c.id))
+        .where(items.c.sale_service_id.isnot(None))
+        .group_by(items.c.sale_service_id)
+    )
+    conn.execute(
+        items.update()
+        .where(items.c.sale_service_id.isnot(None), items.c.id.notin_(first_items))
+        .values(sale_service_id=None)
+    )
+
+
+def upgrade():
+    conn = op.get_bind()
+    inspector = sa.inspect(conn)
+    if 'commission_payment_items' not in inspector.get_table_names():
+        return
+
+    existing = [ix['name'] for ix in inspector.get_indexes('commission_payment_items')]
+    if INDEX_NAME not in existing:
+        _unlink_repeats(conn)
+        op.create_index(
+            INDEX_NAME, 'commission_payment_items', ['sale_service_id'], unique=True,
+            postgresql_where=sa.text('sale_service_id IS NOT NULL'),
+            sqlite_where=sa.text('sale_service_id IS NOT NULL')
+        )
+
+
+def downgrade():
+    conn = op.get_bind()
+    inspector = sa.inspect(conn)
+    if 'commission_payment_items' not in inspector.get_table_names():
+        return
+
+    existing = [ix['name'] for ix in inspector.get_indexes('commission_payment_items')]
+    if INDEX_NAME in existing:
+        op.drop_index(INDEX_NAME, table_name='commission_payment_items')
@@ -0,0 +1,149 @@
+"""Add commission_ledger and staff_commission_balances tables
+
+Revision ID: add_commission_ledger
+Revises: add_users_current_subscription
+Create Date: 2026-02-10 09:00:00.000000
+
+"""
+from datetime import datetime
+
+from alembic import op
+import sqlalchemy as sa
+
+
+revision = 'add_commission_ledger'
+down_revision = 'add_users_current_subscription'
+branch_labels = None
+depends_on = None
+
+
+def _backfill(conn):
+    """Populate the ledger and balances from existing history (same result as `flask reconcile-commissions`)."""
+    sales = sa.table(
+        'sales', sa.column('id', sa.Integer), sa.column('staff_id', sa.Integer),
+        sa.column('is_demo', sa.Boolean), sa.column('status', sa.String),
+        sa.column('subtotal', sa.Float), sa.column('commission_amount', sa.Float),
+        sa.column('completed_at', sa.DateTime), sa.column('created_at', sa.DateTime)
+    )
+    payments = sa.table(
+        'commission_payments', sa.column('id', sa.Integer), sa.column('staff_id', sa.Integer),
+        sa.column('is_demo', sa.Boolean), sa.column('amount_paid', sa.Float),
+        sa.column('payment_date', sa.DateTime)
+    )
+    ledger = sa.table(
+        'commission_ledger', sa.column('staff_id', sa.Integer), sa.column('is_demo', sa.Boolean),
+        sa.column('entry_type', sa.String), sa.column('amount', sa.Float),
+        sa.column('sales_amount', sa.Float), sa.column('sale_id', sa.Integer),
+        sa.column('commission_payment_id', sa.Integer), sa.column('created_at', sa.DateTime)
+    )
+    balances = sa.table(
+        'staff_commission_balances', sa.column('staff_id', sa.Integer), sa.column('is_demo', sa.Boolean),
+        sa.column('earned', sa.Float), sa.column('paid', sa.Float),
+        sa.column('sales_total', sa.Float), sa.column('sale_count', sa.Integer),
+        sa.column('updated_at', sa.DateTime)
+    )
+    is_demo = lambda column: sa.func.coalesce(column, sa.false())
+    completed = (sales.c.status == 'completed', sales.c.staff_id.isnot(None))
+
+    conn.execute(ledger.insert().from_select(
+        ['staff_id', 'is_demo', 'entry_type', 'amount', 'sales_amount', 'sale_id', 'created_at'],
+        sa.select(
+            sales.c.staff_id, is_demo(sales.c.is_demo), sa.literal('earning'),
+            sa.func.coalesce(sales.c.commission_amount, 0), sa.func.coalesce(sales.c.subtotal, 0),
+            sales.c.id, sa.func.coalesce(sales.c.completed_at, sales.c.created_at)
+        ).where(*completed)
+    ))
+    conn.execute(ledger.insert().from_select(
+        ['staff_id', 'is_demo', 'entry_type', 'amount', 'sales_amount', 'commission_payment_id', 'created_at'],
+        sa.select(
+            payments.c.staff_id, is_demo(payments.c.is_demo), sa.literal('payout'),
+            -sa.func.coalesce(payments.c.amount_paid, 0), sa.literal(0.0),
+            payments.c.id, payments.c.payment_date
+        )
+    ))
+
+    rows = {}
+    for staff_id, demo, earned, sales_total, sale_count in conn.execute(
+        sa.select(
+            sales.c.staff_id, is_demo(sales.c.is_demo),
+            sa.func.coalesce(sa.func.sum(sales.c.commission_amount), 0),
+            sa.func.coalesce(sa.func.sum(sales.c.subtotal), 0),
+            sa.func.count(sales.c.id)
+        ).where(*completed).group_by(sales.c.staff_id, is_demo(sales.c.is_demo))
+    ):
+        rows[(staff_id, bool(demo))] = {
+            'staff_id': staff_id, 'is_demo': bool(demo), 'earned': earned, 'paid': 0,
+            'sales_total': sales_total, 'sale_count': sale_count
+        }
+    for staff_id, demo, paid in conn.execute(
+        sa.select(
+            payments.c.staff_id, is_demo(payments.c.is_demo),
+            sa.func.coalesce(sa.func.sum(payments.c.amount_paid), 0)
+        ).group_by(payments.c.staff_id, is_demo(payments.c.is_demo))
+    ):
+        row = rows.setdefault((staff_id, bool(demo)), {
+            'staff_id': staff_id, 'is_demo': bool(demo), 'earned': 0, 'paid': 0,
+            'sales_total': 0, 'sale_count': 0
+        })
+        row['paid'] = paid
+
+    if rows:
+        now = datetime.utcnow()
+        conn.execute(balances.insert(), [dict(row, updated_at=now) for row in rows.values()])
+
+
+def upgrade():
+    conn = op.get_bind()
+    inspector = sa.inspect(conn)
+    tables = inspector.get_table_names()
+    if 'sales' not in tables or 'commission_payments' not in tables:
+        return
+
+    if 'commission_ledger' not in tables:
+        op.create_table(
+            'commission_ledger',
+            sa.Column('id', sa.Integer(), nullable=False),
+            sa.Column('staff_id', sa.Integer(), nullable=False),
+            sa.Column('is_demo', sa.Boolean(), nullable=False, server_default=sa.false()),
+            sa.Column('entry_type', sa.String(length=20), nullable=False),
+            sa.Column('amount', sa.Float(), nullable=False),
+            sa.Column('sales_amount', sa.Float(), nullable=False, server_default='0'),
+            sa.Column('sale_id', sa.Integer(), nullable=True),
+            sa.Column('commission_payment_id', sa.Integer(), nullable=True),
+            sa.Column('created_at', sa.DateTime(), nullable=True),
+            sa.ForeignKeyConstraint(['staff_id'], ['staff.id']),
+            sa.ForeignKeyConstraint(['sale_id'], ['sales.id']),
+            sa.ForeignKeyConstraint(['commission_payment_id'], ['commission_payments.id']),
+            sa.PrimaryKeyConstraint('id')
+        )
+        op.create_index('ix_commission_ledger_staff_id_is_demo', 'commission_ledger', ['staff_id', 'is_demo'])
+        op.create_index('ux_commission_ledger_sale_id', 'commission_ledger', ['sale_id'], unique=True)
+        op.create_index('ux_commission_ledger_commission_payment_id', 'commission_ledger', ['commission_payment_id'], unique=True)
+
+    if 'staff_commission_balances' not in tables:
+        op.create_table(
+            'staff_commission_balances',
+            sa.Column('staff_id', sa.Integer(), nullable=False),
+            sa.Column('is_demo', sa.Boolean(), nullable=False),
+            sa.Column('earned', sa.Float(), nullable=False, server_default='0'),
+            sa.Column('paid', sa.Float(), nullable=False, server_default='0'),
+            sa.Column('sales_total', sa.Float(), nullable=False, server_default='0'),
+            sa.Column('sale_count', sa.Integer(), nullable=False, server_default='0'),
+            sa.Column('updated_at', sa.DateTime(), nullable=True),
+            sa.ForeignKeyConstraint(['staff_id'], ['staff.id']),
+            sa.PrimaryKeyConstraint('staff_id', 'is_demo')
+        )
+        _backfill(conn)
+
+
+def downgrade():
+    conn = op.get_bind()
+    inspector = sa.inspect(conn)
+    tables = inspector.get_table_names()
+    if 'staff_commission_balances' in tables:
+        op.drop_table('staff_commission_balances')
+    if 'commission_ledger' in tables:
+        op.drop_index('ux_commission_ledger_commission_payment_id', table_name='commission_ledger')
+        op.drop_index('ux_commission_ledger_sale_id', table_name='commission_ledger')
+        op.drop_index('ix_commission_ledger_staff_id_is_demo', table_name='commission_ledger')
+        op.drop_table('commission_ledger')
@@ -0,0 +1,95 @@
+"""Add indexed business_date to commission_payments
+
+Revision ID: add_commission_payments_business_date
+Revises: add_jobs
+Create Date: 2026-02-13 09:00:00.000000
+
+"""
+import os
+from datetime import datetime, timezone
+from zoneinfo import ZoneInfo, ZoneInfoNotFoundError
+
+from alembic import op
+import sqlalchemy as sa
+
+
+revision = 'add_commission_payments_business_date'
+down_revision = 'add_jobs'
+branch_labels = None
+depends_on = None
+
+INDEX_NAME = 'ix_commission_payments_is_demo_business_date'
+BACKFILL_BATCH_SIZE = 1000
+
+
+def _salon_timezone():
+    try:
+        return ZoneInfo(os.getenv('SALON_TIMEZONE') or 'Africa/Nairobi')
+    except (ZoneInfoNotFoundError, ValueError):
+        return timezone.utc
+
+
+def _to_business_date(value, tz):
+    """payment_date is a naive UTC timestamp (mirrors the listener in models.py)."""
+    if value is None:
+        return None
+    if isinstance(value, str):
+        # SQLite returns DATETIME columns as text through a lightweight table()
+        value = datetime.fromisoformat(value)
+    if value.tzinfo is None:
+        value = value.replace(tzinfo=timezone.utc)
+    return value.astimezone(tz).date()
+
+
+def _backfill(conn, tz):
+    tbl = sa.table('commission_payments', sa.column('id', sa.Integer), sa.column('payment_date', sa.DateTime),
+                   sa.column('business_date', sa.Date))
+    update = (
+        tbl.update()
+        .where(tbl.c.id == sa.bindparam('row_id'))
+        .values(business_date=sa.bindparam('bd'))
+    )
+    last_id = 0
+    while True:
+        rows = conn.execute(
+            sa.select(tbl.c.id, tbl.c.payment_date)
+            .where(tbl.c.id > last_id, tbl.c.business_date.is_(None))
+            .order_by(tbl.c.id)
+            .limit(BACKFILL_BATCH_SIZE)
+        ).fetchall()
+        if not rows:
+            break
+        conn.execute(update, [{'row_id': row[0], 'bd': _to_business_date(row[1], tz)} for row in rows])
+        last_id = rows[-1][0]
+
+
+def upgrade():
+    conn = op.get_bind()
+    inspector = sa.inspect(conn)
+    if 'commission_payments' not in inspector.get_table_names():
+        return
+
+    columns = [col['name'] for col in inspector.get_columns('commission_payments')]
+    if 'business_date' not in columns:
+        with op.batch_alter_table('commission_payments', schema=None) as batch_op:
+            batch_op.add_column(sa.Column('business_date', sa.Date(), nullable=True))
+    _backfill(conn, _salon_timezone())
+
+    existing = [ix['name'] for ix in sa.inspect(conn).get_indexes('commission_payments')]
+    if INDEX_NAME not in existing:
+        op.create_index(INDEX_NAME, 'commission_payments', ['is_demo', 'business_date'])
+
+
+def downgrade():
+    conn = op.get_bind()
+    inspector = sa.inspect(conn)
+    if 'commission_payments' not in inspector.get_table_names():
+        return
+
+    existing = [ix['name'] for ix in inspector.get_indexes('commission_payments')]
+    if INDEX_NAME in existing:
+        op.drop_index(INDEX_NAME, table_name='commission_payments')
+    columns = [col['name'] for col in inspector.get_columns('commission_payments')]
+    if 'business_date' in columns:
+        with op.batch_alter_table('commission_payments', schema=None) as batch_op:
+            batch_op.drop_column('business_date')
@@ -0,0 +1,137 @@
+"""Add daily_sales_rollup table
+
+Revision ID: add_daily_sales_rollup
+Revises: add_business_date
+Create Date: 2026-02-04 09:00:00.000000
+
+"""
+import json
+
+from alembic import op
+import sqlalchemy as sa
+
+
+revision = 'add_daily_sales_rollup'
+down_revision = 'add_business_date'
+branch_labels = None
+depends_on = None
+
+
+def _backfill(conn):
+    """Populate the rollup from existing completed sales (same totals as `flask rebuild-rollups`)."""
+    sales = sa.table(
+        'sales', sa.column('id', sa.Integer), sa.column('staff_id', sa.Integer),
+        sa.column('is_demo', sa.Boolean), sa.column('status', sa.String),
+        sa.column('business_date', sa.Date), sa.column('subtotal', sa.Float),
+        sa.column('tax_amount', sa.Float), sa.column('total_amount', sa.Float),
+        sa.column('commission_amount', sa.Float)
+    )
+    lines = {
+        'services_revenue': sa.table('sale_services', sa.column('sale_id', sa.Integer), sa.column('total_price', sa.Float)),
+        'products_revenue': sa.table('sale_products', sa.column('sale_id', sa.Integer), sa.column('total_price', sa.Float)),
+    }
+    payments = sa.table(
+        'payments', sa.column('sale_id', sa.Integer), sa.column('amount', sa.Float),
+        sa.column('payment_method', sa.String)
+    )
+    rollup = sa.table(
+        'daily_sales_rollup', sa.column('business_date', sa.Date), sa.column('staff_id', sa.Integer),
+        sa.column('is_demo', sa.Boolean), sa.column('services_revenue', sa.Float),
+        sa.column('products_revenue', sa.Float), sa.column('subtotal', sa.Float),
+        sa.column('vat_amount', sa.Float), sa.column('total_amount', sa.Float),
+        sa.column('commission_amount', sa.Float), sa.column('transaction_count', sa.Integer),
+        sa.column('payment_methods', sa.Text)
+    )
+
+    key = (sales.c.business_date, sales.c.staff_id, sales.c.is_demo)
+    criteria = (sales.c.status == 'completed', sales.c.business_date.isnot(None))
+
+    def _key(row):
+        return (str(row[0]), row[1], bool(row[2]))
+
+    rows = {}
+    for row in conn.execute(
+        sa.select(
+            *key,
+            sa.func.coalesce(sa.func.sum(sales.c.subtotal), 0),
+            sa.func.coalesce(sa.func.sum(sales.c.tax_amount), 0),
+            sa.func.coalesce(sa.func.sum(sales.c.total_amount), 0),
+            sa.func.coalesce(sa.func.sum(sales.c.commission_amount), 0),
+            sa.func.count(sales.c.id)
+        ).where(*criteria).group_by(*key)
+    ):
+        rows[_key(row)] = {
+            'business_date': row[0],
+            'staff_id': row[1],
+            'is_demo': bool(row[2]),
+            'services_revenue': 0.0,
+            'products_revenue': 0.0,
+            'subtotal': row[3],
+            'vat_amount': row[4],
+            'total_amount': row[5],
+            'commission_amount': row[6],
+            'transaction_count': row[7],
+            'payment_methods': {}
+        }
+
+    for field, line in lines.items():
+        for row in conn.execute(
+            sa.select(*key, sa.func.sum(line.c.total_price))
+            .select_from(line.join(sales, line.c.sale_id == sales.c.id))
+            .where(*criteria).group_by(*key)
+        ):
+            if _key(row) in rows:
+                rows[_key(row)][field] = row[3] or 0
+
+    for row in conn.execute(
+        sa.select(*key, payments.c.payment_method, sa.func.sum(payments.c.amount))
+        .select_from(payments.join(sales, payments.c.sale_id == sales.c.id))
+        .where(*criteria).group_by(*key, payments.c.payment_method)
+    ):
+        if _key(row) in rows:
+            methods = rows[_key(row)]['payment_methods']
+            method = row[3] or 'cash'
+            methods[method] = methods.get(method, 0) + (row[4] or 0)
+
+    if rows:
+        for values in rows.values():
+            values['payment_methods'] = json.dumps(values['payment_methods'])
+        conn.execute(rollup.insert(), list(rows.values()))
+
+
+def upgrade():
+    conn = op.get_bind()
+    if 'daily_sales_rollup' in sa.inspect(conn).get_table_names():
+        return
+
+    op.create_table(
+        'daily_sales_rollup',
+        sa.Column('id', sa.Integer(), nullable=False),
+        sa.Column('business_date', sa.Date(), nullable=False),
+        sa.Column('staff_id', sa.Integer(), nullable=False),
+        sa.Column('is_demo', sa.Boolean(), nullable=False, server_default=sa.false()),
+        sa.Column('services_revenue', sa.Float(), nullable=False, server_default='0'),
+        sa.Column('products_revenue', sa.Float(), nullable=False, server_default='0'),
+        sa.Column('subtotal', sa.Float(), nullable=False, server_default='0'),
+        sa.Column('vat_amount', sa.Float(), nullable=False, server_default='0'),
+        sa.Column('total_amount', sa.Float(), nullable=False, server_default='0'),
+        sa.Column('commission_amount', sa.Float(), nullable=False, server_default='0'),
+        sa.Column('transaction_count', sa.Integer(), nullable=False, server_default='0'),
+        sa.Column('payment_methods', sa.Text(), nullable=True),
+        sa.Column('updated_at', sa.DateTime(), nullable=True),
+        sa.ForeignKeyConstraint(['staff_id'], ['staff.id']),
+        sa.PrimaryKeyConstraint('id'),
+        sa.UniqueConstraint('business_date', 'staff_id', 'is_demo', name='uq_daily_sales_rollup_day_staff_demo')
+    )
+    op.create_index('ix_daily_sales_rollup_is_demo_business_date', 'daily_sales_rollup', ['is_demo', 'business_date'])
+
+    _backfill(conn)
+
+
+def downgrade():
+    conn = op.get_bind()
+    if 'daily_sales_rollup' not in sa.inspect(conn).get_table_names():
+        return
+
+    op.drop_index('ix_daily_sales_rollup_is_demo_business_date', table_name='daily_sales_rollup')
+    op.drop_table('daily_sales_rollup')
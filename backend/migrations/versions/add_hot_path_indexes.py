@@ -0,0 +1,74 @@
+"""Add composite and foreign key indexes for hot query paths
+
+Revision ID: add_hot_path_indexes
+Revises: add_subscriptions
+Create Date: 2026-02-02 10:00:00.000000
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+revision = 'add_hot_path_indexes'
+down_revision = 'add_subscriptions'
+branch_labels = None
+depends_on = None
+
+
+# (index name, table, columns) - keep in sync with __table_args__ in models.py
+INDEXES = [
+    # Dashboard, reports and pending commissions filter sales on these
+    ('ix_sales_is_demo_status_created_at', 'sales', ['is_demo', 'status', 'created_at']),
+    ('ix_sales_staff_id_status_created_at', 'sales', ['staff_id', 'status', 'created_at']),
+    ('ix_sales_customer_id', 'sales', ['customer_id']),
+    ('ix_sales_appointment_id', 'sales', ['appointment_id']),
+    ('ix_sale_services_sale_id', 'sale_services', ['sale_id']),
+    ('ix_sale_services_service_id', 'sale_services', ['service_id']),
+    ('ix_sale_products_sale_id', 'sale_products', ['sale_id']),
+    ('ix_payments_sale_id', 'payments', ['sale_id']),
+    ('ix_payments_appointment_id', 'payments', ['appointment_id']),
+    ('ix_payments_created_at', 'payments', ['created_at']),
+    ('ix_product_usage_sale_id', 'product_usage', ['sale_id']),
+    # Calendar views filter on staff + date and load services per appointment
+    ('ix_appointments_staff_id_appointment_date', 'appointments', ['staff_id', 'appointment_date']),
+    ('ix_appointments_appointment_date', 'appointments', ['appointment_date']),
+    ('ix_appointments_customer_id', 'appointments', ['customer_id']),
+    ('ix_appointments_status', 'appointments', ['status']),
+    ('ix_appointment_services_appointment_id', 'appointment_services', ['appointment_id']),
+    # Commission payouts are summed per staff and listed by payment date
+    ('ix_commission_payments_staff_id_is_demo', 'commission_payments', ['staff_id', 'is_demo']),
+    ('ix_commission_payments_is_demo_payment_date', 'commission_payments', ['is_demo', 'payment_date']),
+    ('ix_commission_payment_items_commission_payment_id', 'commission_payment_items', ['commission_payment_id']),
+    ('ix_expenses_is_demo_expense_date', 'expenses', ['is_demo', 'expense_date']),
+    ('ix_staff_login_logs_staff_id_login_time', 'staff_login_logs', ['staff_id', 'login_time']),
+    ('ix_staff_login_logs_login_time', 'staff_login_logs', ['login_time']),
+    ('ix_customers_is_demo', 'customers', ['is_demo']),
+]
+
+
+def upgrade():
+    conn = op.get_bind()
+    inspector = sa.inspect(conn)
+    tables = inspector.get_table_names()
+
+    for name, table, columns in INDEXES:
+        if table not in tables:
+            continue
+        existing = [ix['name'] for ix in inspector.get_indexes(table)]
+        if name in existing:
+            continue
+        op.create_index(name, table, columns)
+
+
+def downgrade():
+    conn = op.get_bind()
+    inspector = sa.inspect(conn)
+    tables = inspector.get_table_names()
+
+    for name, table, columns in reversed(INDEXES):
+        if table not in tables:
+            continue
+        existing = [ix['name'] for ix in inspector.get_indexes(table)]
+        if name not in existing:
+            continue
+        op.drop_index(name, table_name=table)
@@ -0,0 +1,51 @@
+"""Add jobs table for background renders and exports
+
+Revision ID: add_jobs
+Revises: add_commission_ledger
+Create Date: 2026-02-12 09:00:00.000000
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+revision = 'add_jobs'
+down_revision = 'add_commission_ledger'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    conn = op.get_bind()
+    inspector = sa.inspect(conn)
+    if 'jobs' in inspector.get_table_names():
+        return
+
+    op.create_table(
+        'jobs',
+        sa.Column('id', sa.String(length=32), nullable=False),
+        sa.Column('kind', sa.String(length=50), nullable=False),
+        sa.Column('status', sa.String(length=20), nullable=False, server_default='queued'),
+        sa.Column('progress', sa.Integer(), nullable=False, server_default='0'),
+        sa.Column('params', sa.Text(), nullable=True),
+        sa.Column('result_path', sa.String(length=500), nullable=True),
+        sa.Column('result_filename', sa.String(length=255), nullable=True),
+        sa.Column('result_mimetype', sa.String(length=100), nullable=True),
+        sa.Column('error', sa.Text(), nullable=True),
+        sa.Column('created_by', sa.Integer(), nullable=True),
+        sa.Column('created_at', sa.DateTime(), nullable=True),
+        sa.Column('started_at', sa.DateTime(), nullable=True),
+        sa.Column('updated_at', sa.DateTime(), nullable=True),
+        sa.Column('finished_at', sa.DateTime(), nullable=True),
+        sa.ForeignKeyConstraint(['created_by'], ['users.id']),
+        sa.PrimaryKeyConstraint('id')
+    )
+    op.create_index('ix_jobs_status_created_at', 'jobs', ['status', 'created_at'])
+
+
+def downgrade():
+    conn = op.get_bind()
+    inspector = sa.inspect(conn)
+    if 'jobs' in inspector.get_table_names():
+        op.drop_index('ix_jobs_status_created_at', table_name='jobs')
+        op.drop_table('jobs')
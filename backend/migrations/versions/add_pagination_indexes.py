@@ -0,0 +1,52 @@
+"""Add indexes backing keyset pagination on list endpoints
+
+Revision ID: add_pagination_indexes
+Revises: add_daily_sales_rollup
+Create Date: 2026-02-05 09:00:00.000000
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+revision = 'add_pagination_indexes'
+down_revision = 'add_daily_sales_rollup'
+branch_labels = None
+depends_on = None
+
+
+# (index name, table, columns) - keep in sync with __table_args__ in models.py
+INDEXES = [
+    ('ix_customers_is_demo_created_at_id', 'customers', ['is_demo', 'created_at', 'id']),
+    ('ix_sales_is_demo_created_at_id', 'sales', ['is_demo', 'created_at', 'id']),
+    ('ix_expenses_expense_date_id', 'expenses', ['expense_date', 'id']),
+    ('ix_shifts_shift_date_start_time_id', 'shifts', ['shift_date', 'start_time', 'id']),
+]
+
+
+def upgrade():
+    conn = op.get_bind()
+    inspector = sa.inspect(conn)
+    tables = inspector.get_table_names()
+
+    for name, table, columns in INDEXES:
+        if table not in tables:
+            continue
+        existing = [ix['name'] for ix in inspector.get_indexes(table)]
+        if name in existing:
+            continue
+        op.create_index(name, table, columns)
+
+
+def downgrade():
+    conn = op.get_bind()
+    inspector = sa.inspect(conn)
+    tables = inspector.get_table_names()
+
+    for name, table, columns in reversed(INDEXES):
+        if table not in tables:
+            continue
+        existing = [ix['name'] for ix in inspector.get_indexes(table)]
+        if name not in existing:
+            continue
+        op.drop_index(name, table_name=table)
@@ -0,0 +1,47 @@
+"""Add client_uuid to sales for offline batch sync
+
+Revision ID: add_sales_client_uuid
+Revises: add_sequences
+Create Date: 2026-02-07 09:00:00.000000
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+revision = 'add_sales_client_uuid'
+down_revision = 'add_sequences'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    conn = op.get_bind()
+    inspector = sa.inspect(conn)
+    if 'sales' not in inspector.get_table_names():
+        return
+
+    columns = [c['name'] for c in inspector.get_columns('sales')]
+    if 'client_uuid' not in columns:
+        with op.batch_alter_table('sales', schema=None) as batch_op:
+            batch_op.add_column(sa.Column('client_uuid', sa.String(length=36), nullable=True))
+
+    indexes = [ix['name'] for ix in inspector.get_indexes('sales')]
+    if 'ix_sales_client_uuid' not in indexes:
+        op.create_index('ix_sales_client_uuid', 'sales', ['client_uuid'], unique=True)
+
+
+def downgrade():
+    conn = op.get_bind()
+    inspector = sa.inspect(conn)
+    if 'sales' not in inspector.get_table_names():
+        return
+
+    indexes = [ix['name'] for ix in inspector.get_indexes('sales')]
+    if 'ix_sales_client_uuid' in indexes:
+        op.drop_index('ix_sales_client_uuid', table_name='sales')
+
+    columns = [c['name'] for c in inspector.get_columns('sales')]
+    if 'client_uuid' in columns:
+        with op.batch_alter_table('sales', schema=None) as batch_op:
+            batch_op.drop_column('client_uuid')
@@ -0,0 +1,43 @@
+"""Add sequences table for sale and receipt numbering
+
+Revision ID: add_sequences
+Revises: add_pagination_indexes
+Create Date: 2026-02-06 09:00:00.000000
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+revision = 'add_sequences'
+down_revision = 'add_pagination_indexes'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    conn = op.get_bind()
+    tables = sa.inspect(conn).get_table_names()
+    if 'sequences' in tables:
+        return
+
+    op.create_table(
+        'sequences',
+        sa.Column('name', sa.String(length=64), nullable=False),
+        sa.Column('value', sa.Integer(), nullable=False, server_default='0'),
+        sa.PrimaryKeyConstraint('name')
+    )
+
+    # Continue commission receipt numbers from the old COUNT(*)-based scheme
+    if 'commission_payments' in tables:
+        count = conn.execute(sa.text('SELECT COUNT(*) FROM commission_payments')).scalar() or 0
+        sequences = sa.table('sequences', sa.column('name', sa.String), sa.column('value', sa.Integer))
+        conn.execute(sequences.insert(), [{'name': 'commission_receipt', 'value': count}])
+
+
+def downgrade():
+    conn = op.get_bind()
+    if 'sequences' not in sa.inspect(conn).get_table_names():
+        return
+
+    op.drop_table('sequences')
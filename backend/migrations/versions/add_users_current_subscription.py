@@ -0,0 +1,57 @@
+"""Add denormalized current_subscription_id to users
+
+Revision ID: add_users_current_subscription
+Revises: add_sales_client_uuid
+Create Date: 2026-02-09 09:00:00.000000
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+revision = 'add_users_current_subscription'
+down_revision = 'add_sales_client_uuid'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    conn = op.get_bind()
+    inspector = sa.inspect(conn)
+    tables = inspector.get_table_names()
+    if 'users' not in tables or 'subscriptions' not in tables:
+        return
+
+    columns = [c['name'] for c in inspector.get_columns('users')]
+    if 'current_subscription_id' not in columns:
+        with op.batch_alter_table('users', schema=None) as batch_op:
+            batch_op.add_column(sa.Column('current_subscription_id', sa.Integer(), nullable=True))
+            batch_op.create_foreign_key(
+                'fk_users_current_subscription_id', 'subscriptions',
+                ['current_subscription_id'], ['id']
+            )
+
+    # Backfill with what User.to_dict() used to compute per request:
+    # the latest active subscription, else the latest of any status
+    op.execute(sa.text("""
+        UPDATE users SET current_subscription_id = (
+            SELECT s.id FROM subscriptions s
+            WHERE s.user_id = users.id
+            ORDER BY CASE WHEN s.status = 'active' THEN 0 ELSE 1 END, s.created_at DESC, s.id DESC
+            LIMIT 1
+        )
+        WHERE current_subscription_id IS NULL
+    """))
+
+
+def downgrade():
+    conn = op.get_bind()
+    inspector = sa.inspect(conn)
+    if 'users' not in inspector.get_table_names():
+        return
+
+    columns = [c['name'] for c in inspector.get_columns('users')]
+    if 'current_subscription_id' in columns:
+        with op.batch_alter_table('users', schema=None) as batch_op:
+            batch_op.drop_constraint('fk_users_current_subscription_id', type_='foreignkey')
+            batch_op.drop_column('current_subscription_id')
@@ -0,0 +1,80 @@
+"""Make list sort columns NOT NULL and index them with their id tie-breaker
+
+Keyset pagination sorts nullable columns through COALESCE, which no index
+serves; backfilling created_at and making it NOT NULL lets the customers,
+sales and payments pages be read in index order.
+
+Revision ID: make_list_sort_columns_not_null
+Revises: add_commission_item_sale_service_unique
+Create Date: 2026-10-17 09:00:00.000000
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+revision = 'make_list_sort_columns_not_null'
+down_revision = 'add_commission_item_sale_service_unique'
+branch_labels = None
+depends_on = None
+
+
+# table -> statement filling in rows written without created_at
+BACKFILLS = {
+    'customers': "UPDATE customers SET created_at = COALESCE(last_visit, CURRENT_TIMESTAMP) "
+                 "WHERE created_at IS NULL",
+    'sales': "UPDATE sales SET created_at = COALESCE(completed_at, CURRENT_TIMESTAMP) "
+             "WHERE created_at IS NULL",
+    'payments': "UPDATE payments SET created_at = COALESCE("
+                "(SELECT sales.created_at FROM sales WHERE sales.id = payments.sale_id), CURRENT_TIMESTAMP) "
+                "WHERE created_at IS NULL",
+}
+
+# (index name, table, columns) - keep in sync with __table_args__ in models.py
+INDEXES = [
+    ('ix_payments_created_at_id', 'payments', ['created_at', 'id']),
+    ('ix_appointments_appointment_date_id', 'appointments', ['appointment_date', 'id']),
+    ('ix_commission_payments_is_demo_payment_date_id', 'commission_payments', ['is_demo', 'payment_date', 'id']),
+]
+
+
+def upgrade():
+    conn = op.get_bind()
+    inspector = sa.inspect(conn)
+    tables = inspector.get_table_names()
+
+    # sales before payments: payments take their sale's backfilled created_at
+    for table, backfill in BACKFILLS.items():
+        if table not in tables:
+            continue
+        op.execute(backfill)
+        with op.batch_alter_table(table, schema=None) as batch_op:
+            batch_op.alter_column('created_at', existing_type=sa.DateTime(), nullable=False)
+
+    for name, table, columns in INDEXES:
+        if table not in tables:
+            continue
+        existing = [ix['name'] for ix in inspector.get_indexes(table)]
+        if name in existing:
+            continue
+        op.create_index(name, table, columns)
+
+
+def downgrade():
+    conn = op.get_bind()
+    inspector = sa.inspect(conn)
+    tables = inspector.get_table_names()
+
+    for name, table, columns in reversed(INDEXES):
+        if table not in tables:
+            continue
+        existing = [ix['name'] for ix in inspector.get_indexes(table)]
+        if name not in existing:
+            continue
+        op.drop_index(name, table_name=table)
+
+    for table in reversed(list(BACKFILLS)):
+        if table not in tables:
+            continue
+        with op.batch_alter_table(table, schema=None) as batch_op:
+            batch_op.alter_column('created_at', existing_type=sa.DateTime(), nullable=True)
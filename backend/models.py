@@ -1,9 +1,18 @@
 from db import db
 from datetime import datetime
-import bcrypt
+import json
+from sqlalchemy import event
+from sqlalchemy.orm import joinedload, selectinload
+from sqlalchemy.orm.attributes import set_committed_value
+from business_time import business_date_for, business_now
+from password_hashing import hash_password, verify_password, needs_rehash
 
 class Customer(db.Model):
     __tablename__ = 'customers'
+    __table_args__ = (
+        db.Index('ix_customers_is_demo', 'is_demo'),
+        db.Index('ix_customers_is_demo_created_at_id', 'is_demo', 'created_at', 'id'),
+    )
     
     id = db.Column(db.Integer, primary_key=True)
     name = db.Column(db.String(100), nullable=False)
@@ -15,7 +24,7 @@ class Customer(db.Model):
     last_visit = db.Column(db.DateTime)
     preferences = db.Column(db.Text)  # JSON string for preferences
     is_demo = db.Column(db.Boolean, default=False)  # Marks demo customer records
-    created_at = db.Column(db.DateTime, default=datetime.utcnow)
+    created_at = db.Column(db.DateTime, nullable=False, default=datetime.utcnow)
     
     # Relationships
     appointments = db.relationship('Appointment', backref='customer', lazy=True)
@@ -124,11 +133,20 @@ class Staff(db.Model):
 
 class Appointment(db.Model):
     __tablename__ = 'appointments'
+    __table_args__ = (
+        db.Index('ix_appointments_staff_id_appointment_date', 'staff_id', 'appointment_date'),
+        db.Index('ix_appointments_appointment_date', 'appointment_date'),
+        db.Index('ix_appointments_appointment_date_id', 'appointment_date', 'id'),
+        db.Index('ix_appointments_customer_id', 'customer_id'),
+        db.Index('ix_appointments_status', 'status'),
+        db.Index('ix_appointments_business_date', 'business_date'),
+    )
     
     id = db.Column(db.Integer, primary_key=True)
     customer_id = db.Column(db.Integer, db.ForeignKey('customers.id'), nullable=False)
     staff_id = db.Column(db.Integer, db.ForeignKey('staff.id'))
     appointment_date = db.Column(db.DateTime, nullable=False)
+    business_date = db.Column(db.Date, nullable=True)  # Salon-local day of appointment_date, set on write
     status = db.Column(db.String(20), default='scheduled')  # scheduled, completed, cancelled
     notes = db.Column(db.Text)
     service_location = db.Column(db.String(20), default='salon')  # "salon" or "home"
@@ -154,7 +172,17 @@ class Appointment(db.Model):
     appointment_notes = db.relationship('AppointmentNote', backref='appointment', lazy=True, cascade='all, delete-orphan')
     modified_by_user = db.relationship('User', foreign_keys=[last_modified_by], backref='modified_appointments')
     
-    def to_dict(self):
+    def to_dict(self, depth=1):
+        """
+        Serialize the appointment with its related records.
+
+        Args:
+            depth: How many more levels of Appointment <-> Sale nesting to follow;
+                the nested sale is serialized with depth - 1 and omitted at 0
+
+        Returns:
+            dict: Appointment data
+        """
         try:
             # Safely get customer
             customer_dict = None
@@ -188,8 +216,8 @@ class Appointment(db.Model):
             # Safely get sale
             sale_dict = None
             try:
-                if hasattr(self, 'sale') and self.sale:
-                    sale_dict = self.sale.to_dict()
+                if depth > 0 and hasattr(self, 'sale') and self.sale:
+                    sale_dict = self.sale.to_dict(depth=depth - 1)
             except Exception:
                 pass  # Skip sale if error
             
@@ -258,8 +286,43 @@ class Appointment(db.Model):
                 'created_at': self.created_at.isoformat() if hasattr(self, 'created_at') and self.created_at else None,
             }
 
+    @classmethod
+    def to_dict_load_options(cls):
+        """
+        Loader options covering every relationship to_dict() reads at the default depth.
+
+        Scalars are joined and collections are fetched with one SELECT ... IN
+        each, so serializing a page of N appointments costs a fixed number of
+        queries instead of several per appointment.
+
+        Returns:
+            list: Options for Query.options()
+        """
+        return [
+            joinedload(cls.customer),
+            joinedload(cls.staff),
+            joinedload(cls.resource),
+            selectinload(cls.services).joinedload(AppointmentService.service),
+            selectinload(cls.sale).joinedload(Sale.staff),
+            selectinload(cls.sale).joinedload(Sale.customer),
+            selectinload(cls.appointment_notes).joinedload(AppointmentNote.creator).joinedload(User.current_subscription)
+        ]
+
+    @classmethod
+    def export_load_options(cls):
+        """Loader options for the iCal/CSV calendar export, which skips sales and notes."""
+        return [
+            joinedload(cls.customer),
+            joinedload(cls.staff),
+            joinedload(cls.resource),
+            selectinload(cls.services).joinedload(AppointmentService.service)
+        ]
+
 class AppointmentService(db.Model):
     __tablename__ = 'appointment_services'
+    __table_args__ = (
+        db.Index('ix_appointment_services_appointment_id', 'appointment_id'),
+    )
     
     id = db.Column(db.Integer, primary_key=True)
     appointment_id = db.Column(db.Integer, db.ForeignKey('appointments.id'), nullable=False)
@@ -331,6 +394,9 @@ class Resource(db.Model):
 class AppointmentNote(db.Model):
     """Separate notes for appointments (popup functionality)"""
     __tablename__ = 'appointment_notes'
+    __table_args__ = (
+        db.Index('ix_appointment_notes_appointment_id', 'appointment_id'),
+    )
     
     id = db.Column(db.Integer, primary_key=True)
     appointment_id = db.Column(db.Integer, db.ForeignKey('appointments.id'), nullable=False)
@@ -354,6 +420,16 @@ class AppointmentNote(db.Model):
 # Sale model for walk-in transactions (Kenyan salon flow - no appointments)
 class Sale(db.Model):
     __tablename__ = 'sales'
+    __table_args__ = (
+        db.Index('ix_sales_is_demo_status_created_at', 'is_demo', 'status', 'created_at'),
+        db.Index('ix_sales_staff_id_status_created_at', 'staff_id', 'status', 'created_at'),
+        db.Index('ix_sales_customer_id', 'customer_id'),
+        db.Index('ix_sales_appointment_id', 'appointment_id'),
+        db.Index('ix_sales_is_demo_business_date', 'is_demo', 'business_date'),
+        db.Index('ix_sales_staff_id_business_date', 'staff_id', 'business_date'),
+        db.Index('ix_sales_is_demo_created_at_id', 'is_demo', 'created_at', 'id'),
+        db.Index('ix_sales_client_uuid', 'client_uuid', unique=True),
+    )
     
     id = db.Column(db.Integer, primary_key=True)
     sale_number = db.Column(db.String(50), unique=True)  # Sale ID like "SALE-20260119-001"
@@ -368,7 +444,8 @@ class Sale(db.Model):
     commission_amount = db.Column(db.Float, default=0.0)  # Finalized commission
     notes = db.Column(db.Text)
     is_demo = db.Column(db.Boolean, default=False)  # Marks demo sale records
-    created_at = db.Column(db.DateTime, default=datetime.utcnow)
+    created_at = db.Column(db.DateTime, nullable=False, default=datetime.utcnow)
+    business_date = db.Column(db.Date, nullable=True)  # Salon-local day of created_at, set on write
     completed_at = db.Column(db.DateTime)  # When sale was completed
     appointment_id = db.Column(db.Integer, db.ForeignKey('appointments.id'), nullable=True)  # Link sale to appointment
     service_start_time = db.Column(db.DateTime, nullable=True)  # When service actually started
@@ -376,6 +453,7 @@ class Sale(db.Model):
     service_duration_minutes = db.Column(db.Integer, nullable=True)  # Calculated duration
     service_location = db.Column(db.String(20), nullable=True)  # "salon" or "home"
     home_service_address = db.Column(db.Text, nullable=True)  # Full address if home-service
+    client_uuid = db.Column(db.String(36), nullable=True)  # Till-generated ID for sales synced via /sales/batch
     
     # Relationships
     staff = db.relationship('Staff', backref='sales', lazy=True)
@@ -385,7 +463,17 @@ class Sale(db.Model):
     sale_products = db.relationship('SaleProduct', backref='sale', lazy=True, cascade='all, delete-orphan')
     payment = db.relationship('Payment', foreign_keys='Payment.sale_id', backref='sale', uselist=False, lazy=True)
     
-    def to_dict(self):
+    def to_dict(self, depth=1):
+        """
+        Serialize the sale with its staff, customer and linked appointment.
+
+        Args:
+            depth: How many more levels of Sale <-> Appointment nesting to follow;
+                the linked appointment is serialized with depth - 1 and omitted at 0
+
+        Returns:
+            dict: Sale data
+        """
         try:
             return {
                 'id': self.id,
@@ -410,7 +498,7 @@ class Sale(db.Model):
                 'completed_at': self.completed_at.isoformat() if self.completed_at else None,
                 'staff': self.staff.to_dict() if self.staff else None,
                 'customer': self.customer.to_dict() if self.customer else None,
-                'appointment': self.appointment.to_dict() if hasattr(self, 'appointment') and self.appointment else None
+                'appointment': self.appointment.to_dict(depth=depth - 1) if depth > 0 and hasattr(self, 'appointment') and self.appointment else None
             }
         except Exception as e:
             # Fallback if there's an error accessing relationships or missing columns
@@ -425,8 +513,23 @@ class Sale(db.Model):
                 'created_at': self.created_at.isoformat() if self.created_at else None,
             }
 
+    @classmethod
+    def receipt_load_options(cls):
+        """Loader options for everything a sales receipt prints."""
+        return [
+            joinedload(cls.staff),
+            joinedload(cls.customer),
+            joinedload(cls.payment),
+            selectinload(cls.sale_services).joinedload(SaleService.service),
+            selectinload(cls.sale_products).joinedload(SaleProduct.product)
+        ]
+
 class SaleService(db.Model):
     __tablename__ = 'sale_services'
+    __table_args__ = (
+        db.Index('ix_sale_services_sale_id', 'sale_id'),
+        db.Index('ix_sale_services_service_id', 'service_id'),
+    )
     
     id = db.Column(db.Integer, primary_key=True)
     sale_id = db.Column(db.Integer, db.ForeignKey('sales.id'), nullable=False)
@@ -455,6 +558,9 @@ class SaleService(db.Model):
 
 class SaleProduct(db.Model):
     __tablename__ = 'sale_products'
+    __table_args__ = (
+        db.Index('ix_sale_products_sale_id', 'sale_id'),
+    )
     
     id = db.Column(db.Integer, primary_key=True)
     sale_id = db.Column(db.Integer, db.ForeignKey('sales.id'), nullable=False)
@@ -481,6 +587,13 @@ class SaleProduct(db.Model):
 
 class Payment(db.Model):
     __tablename__ = 'payments'
+    __table_args__ = (
+        db.Index('ix_payments_sale_id', 'sale_id'),
+        db.Index('ix_payments_appointment_id', 'appointment_id'),
+        db.Index('ix_payments_created_at', 'created_at'),
+        db.Index('ix_payments_created_at_id', 'created_at', 'id'),
+        db.Index('ix_payments_business_date', 'business_date'),
+    )
     
     id = db.Column(db.Integer, primary_key=True)
     sale_id = db.Column(db.Integer, db.ForeignKey('sales.id'), nullable=True)  # Made nullable for backward compatibility
@@ -490,7 +603,8 @@ class Payment(db.Model):
     status = db.Column(db.String(20), default='pending')  # pending, completed, refunded
     transaction_code = db.Column(db.String(50))  # M-Pesa transaction code, etc.
     receipt_number = db.Column(db.String(50))  # Receipt number for tracking
-    created_at = db.Column(db.DateTime, default=datetime.utcnow)
+    created_at = db.Column(db.DateTime, nullable=False, default=datetime.utcnow)
+    business_date = db.Column(db.Date, nullable=True)  # Salon-local day of created_at, set on write
     
     # Relationships are defined on Appointment and Sale models with backrefs
     # No need to define them here to avoid conflicts
@@ -510,6 +624,10 @@ class Payment(db.Model):
 
 class StaffLoginLog(db.Model):
     __tablename__ = 'staff_login_logs'
+    __table_args__ = (
+        db.Index('ix_staff_login_logs_staff_id_login_time', 'staff_id', 'login_time'),
+        db.Index('ix_staff_login_logs_login_time', 'login_time'),
+    )
     
     id = db.Column(db.Integer, primary_key=True)
     staff_id = db.Column(db.Integer, db.ForeignKey('staff.id'), nullable=False)
@@ -570,6 +688,9 @@ class Product(db.Model):
 
 class ProductUsage(db.Model):
     __tablename__ = 'product_usage'
+    __table_args__ = (
+        db.Index('ix_product_usage_sale_id', 'sale_id'),
+    )
     
     id = db.Column(db.Integer, primary_key=True)
     product_id = db.Column(db.Integer, db.ForeignKey('products.id'), nullable=False)
@@ -593,12 +714,18 @@ class ProductUsage(db.Model):
 
 class Expense(db.Model):
     __tablename__ = 'expenses'
+    __table_args__ = (
+        db.Index('ix_expenses_is_demo_expense_date', 'is_demo', 'expense_date'),
+        db.Index('ix_expenses_is_demo_business_date', 'is_demo', 'business_date'),
+        db.Index('ix_expenses_expense_date_id', 'expense_date', 'id'),
+    )
     
     id = db.Column(db.Integer, primary_key=True)
     category = db.Column(db.String(50), nullable=False)  # rent, utilities, supplies, salaries, etc.
     description = db.Column(db.Text, nullable=False)
     amount = db.Column(db.Float, nullable=False)
-    expense_date = db.Column(db.DateTime, nullable=False, default=datetime.utcnow)
+    expense_date = db.Column(db.DateTime, nullable=False, default=business_now)  # Salon wall-clock time
+    business_date = db.Column(db.Date, nullable=True)  # Salon-local day of expense_date, set on write
     receipt_number = db.Column(db.String(50))  # Receipt/invoice number
     paid_by = db.Column(db.String(100))  # Who paid
     created_by = db.Column(db.Integer, db.ForeignKey('staff.id'))  # Staff who recorded
@@ -620,6 +747,9 @@ class Expense(db.Model):
 
 class Shift(db.Model):
     __tablename__ = 'shifts'
+    __table_args__ = (
+        db.Index('ix_shifts_shift_date_start_time_id', 'shift_date', 'start_time', 'id'),
+    )
     
     id = db.Column(db.Integer, primary_key=True)
     staff_id = db.Column(db.Integer, db.ForeignKey('staff.id'), nullable=False)
@@ -661,19 +791,32 @@ class User(db.Model):
     is_demo = db.Column(db.Boolean, default=False)  # Marks demo user accounts
     created_at = db.Column(db.DateTime, default=datetime.utcnow)
     last_login = db.Column(db.DateTime)
+    # Denormalized pointer to the subscription to_dict() reports (latest, active preferred);
+    # set wherever a subscription is created so serializing a user needs no subscription query
+    current_subscription_id = db.Column(
+        db.Integer,
+        db.ForeignKey('subscriptions.id', use_alter=True, name='fk_users_current_subscription_id'),
+        nullable=True
+    )
     
     # Relationships
     manager = db.relationship('User', remote_side=[id], backref='managed_managers')
     created_price_changes = db.relationship('ServicePriceHistory', backref='changed_by_user', lazy=True)
     subscription_rel = db.relationship('Subscription', backref='user', lazy='dynamic', foreign_keys='Subscription.user_id')
+    # post_update breaks the users <-> subscriptions insert cycle (UPDATE users after INSERT subscriptions)
+    current_subscription = db.relationship('Subscription', foreign_keys=[current_subscription_id], post_update=True)
 
     def set_password(self, password):
-        """Hash and set password"""
-        self.password_hash = bcrypt.hashpw(password.encode('utf-8'), bcrypt.gensalt()).decode('utf-8')
+        """Hash and set password (BCRYPT_ROUNDS work factor, on the hashing pool)"""
+        self.password_hash = hash_password(password)
     
     def check_password(self, password):
         """Check if provided password matches hash"""
-        return bcrypt.checkpw(password.encode('utf-8'), self.password_hash.encode('utf-8'))
+        return verify_password(password, self.password_hash)
+    
+    def password_needs_rehash(self):
+        """Check if the stored hash was made with a different work factor than configured"""
+        return needs_rehash(self.password_hash)
     
     def is_admin(self):
         """Check if user is an admin"""
@@ -692,7 +835,7 @@ class User(db.Model):
         return False
     
     def to_dict(self):
-        sub = self._current_subscription()
+        sub = self.current_subscription
         try:
             d = {
                 'id': self.id,
@@ -720,23 +863,37 @@ class User(db.Model):
                 'plan': getattr(sub, 'plan_name', None) if sub else None,
             }
 
-    def _current_subscription(self):
-        """Latest subscription for this user (active preferred)."""
-        try:
-            active = Subscription.query.filter_by(
-                user_id=self.id, status='active'
-            ).order_by(Subscription.created_at.desc()).first()
-            if active:
-                return active
-            return Subscription.query.filter_by(user_id=self.id).order_by(
-                Subscription.created_at.desc()
-            ).first()
-        except Exception:
-            return None
+    @classmethod
+    def to_dict_many(cls, users):
+        """
+        Serialize a list of users, loading their current subscriptions in one query.
+
+        Args:
+            users: User instances
+
+        Returns:
+            list: to_dict() of each user, in order
+        """
+        pending = [u for u in users if 'current_subscription' not in u.__dict__]
+        ids = {u.current_subscription_id for u in pending if u.current_subscription_id}
+        subs = {s.id: s for s in Subscription.query.filter(Subscription.id.in_(ids))} if ids else {}
+        for user in pending:
+            set_committed_value(user, 'current_subscription', subs.get(user.current_subscription_id))
+        return [user.to_dict() for user in users]
+
+    def set_current_subscription(self, subscription):
+        """Point current_subscription at a new subscription unless an active one should win."""
+        current = self.current_subscription
+        if current is None or subscription.status == 'active' or current.status != 'active':
+            self.current_subscription = subscription
 
 class Subscription(db.Model):
     """User subscription to a plan (Stripe-backed for paid plans)."""
     __tablename__ = 'subscriptions'
+    __table_args__ = (
+        db.Index('ix_subscriptions_user_id', 'user_id'),
+        db.Index('ix_subscriptions_stripe_subscription_id', 'stripe_subscription_id'),
+    )
 
     id = db.Column(db.Integer, primary_key=True)
     user_id = db.Column(db.Integer, db.ForeignKey('users.id'), nullable=False)
@@ -760,6 +917,12 @@ class Subscription(db.Model):
 class CommissionPayment(db.Model):
     """Track commission payments made to staff"""
     __tablename__ = 'commission_payments'
+    __table_args__ = (
+        db.Index('ix_commission_payments_staff_id_is_demo', 'staff_id', 'is_demo'),
+        db.Index('ix_commission_payments_is_demo_payment_date', 'is_demo', 'payment_date'),
+        db.Index('ix_commission_payments_is_demo_business_date', 'is_demo', 'business_date'),
+        db.Index('ix_commission_payments_is_demo_payment_date_id', 'is_demo', 'payment_date', 'id'),
+    )
     
     id = db.Column(db.Integer, primary_key=True)
     staff_id = db.Column(db.Integer, db.ForeignKey('staff.id'), nullable=False)
@@ -769,6 +932,7 @@ class CommissionPayment(db.Model):
     total_deductions = db.Column(db.Float, nullable=True)  # Calculated sum of all deductions
     net_pay = db.Column(db.Float, nullable=True)  # Calculated net pay (gross_pay - total_deductions)
     payment_date = db.Column(db.DateTime, nullable=False, default=datetime.utcnow)
+    business_date = db.Column(db.Date, nullable=True)  # Salon-local day of payment_date, set on write
     period_start = db.Column(db.Date, nullable=False)  # Start date of commission period
     period_end = db.Column(db.Date, nullable=False)  # End date of commission period
     payment_method = db.Column(db.String(50))  # cash, m_pesa, bank_transfer, etc.
@@ -820,6 +984,15 @@ class CommissionPayment(db.Model):
 class CommissionPaymentItem(db.Model):
     """Line items for commission payments (earnings and deductions)"""
     __tablename__ = 'commission_payment_items'
+    __table_args__ = (
+        db.Index('ix_commission_payment_items_commission_payment_id', 'commission_payment_id'),
+        # A sale-service commission line can be paid only once
+        db.Index(
+            'ux_commission_payment_items_sale_service_id', 'sale_service_id', unique=True,
+            postgresql_where=db.text('sale_service_id IS NOT NULL'),
+            sqlite_where=db.text('sale_service_id IS NOT NULL')
+        ),
+    )
     
     id = db.Column(db.Integer, primary_key=True)
     commission_payment_id = db.Column(db.Integer, db.ForeignKey('commission_payments.id'), nullable=False)
@@ -873,3 +1046,179 @@ class Setting(db.Model):
 
     def to_dict(self):
         return {'key': self.key, 'value': self.value}
+
+
+class DailySalesRollup(db.Model):
+    """Completed-sale totals per business day, staff member and demo flag"""
+    __tablename__ = 'daily_sales_rollup'
+    __table_args__ = (
+        db.UniqueConstraint('business_date', 'staff_id', 'is_demo', name='uq_daily_sales_rollup_day_staff_demo'),
+        db.Index('ix_daily_sales_rollup_is_demo_business_date', 'is_demo', 'business_date'),
+    )
+
+    id = db.Column(db.Integer, primary_key=True)
+    business_date = db.Column(db.Date, nullable=False)
+    staff_id = db.Column(db.Integer, db.ForeignKey('staff.id'), nullable=False)
+    is_demo = db.Column(db.Boolean, nullable=False, default=False)
+    services_revenue = db.Column(db.Float, nullable=False, default=0.0)
+    products_revenue = db.Column(db.Float, nullable=False, default=0.0)
+    subtotal = db.Column(db.Float, nullable=False, default=0.0)
+    vat_amount = db.Column(db.Float, nullable=False, default=0.0)  # Sum of Sale.tax_amount
+    total_amount = db.Column(db.Float, nullable=False, default=0.0)
+    commission_amount = db.Column(db.Float, nullable=False, default=0.0)
+    transaction_count = db.Column(db.Integer, nullable=False, default=0)
+    payment_methods = db.Column(db.Text)  # JSON string: {"cash": 1200.0, "m_pesa": 800.0}
+    updated_at = db.Column(db.DateTime, default=datetime.utcnow, onupdate=datetime.utcnow)
+
+    def to_dict(self):
+        return {
+            'business_date': self.business_date.isoformat() if self.business_date else None,
+            'staff_id': self.staff_id,
+            'is_demo': self.is_demo,
+            'services_revenue': self.services_revenue,
+            'products_revenue': self.products_revenue,
+            'subtotal': self.subtotal,
+            'vat_amount': self.vat_amount,
+            'total_amount': self.total_amount,
+            'commission_amount': self.commission_amount,
+            'transaction_count': self.transaction_count,
+            'payment_methods': json.loads(self.payment_methods) if self.payment_methods else {}
+        }
+
+
+class CommissionLedgerEntry(db.Model):
+    """Append-only record of commission earned (completed sales) and paid out (commission payments)"""
+    __tablename__ = 'commission_ledger'
+    __table_args__ = (
+        db.Index('ix_commission_ledger_staff_id_is_demo', 'staff_id', 'is_demo'),
+        db.Index('ux_commission_ledger_sale_id', 'sale_id', unique=True),
+        db.Index('ux_commission_ledger_commission_payment_id', 'commission_payment_id', unique=True),
+    )
+
+    id = db.Column(db.Integer, primary_key=True)
+    staff_id = db.Column(db.Integer, db.ForeignKey('staff.id'), nullable=False)
+    is_demo = db.Column(db.Boolean, nullable=False, default=False)
+    entry_type = db.Column(db.String(20), nullable=False)  # earning or payout
+    amount = db.Column(db.Float, nullable=False)  # Signed: earnings positive, payouts negative
+    sales_amount = db.Column(db.Float, nullable=False, default=0.0)  # Sale subtotal (earnings only)
+    sale_id = db.Column(db.Integer, db.ForeignKey('sales.id'), nullable=True)
+    commission_payment_id = db.Column(db.Integer, db.ForeignKey('commission_payments.id'), nullable=True)
+    created_at = db.Column(db.DateTime, default=datetime.utcnow)
+
+    def to_dict(self):
+        return {
+            'id': self.id,
+            'staff_id': self.staff_id,
+            'is_demo': self.is_demo,
+            'entry_type': self.entry_type,
+            'amount': self.amount,
+            'sales_amount': self.sales_amount,
+            'sale_id': self.sale_id,
+            'commission_payment_id': self.commission_payment_id,
+            'created_at': self.created_at.isoformat() if self.created_at else None
+        }
+
+
+class StaffCommissionBalance(db.Model):
+    """Running commission totals per staff member and demo flag (see commission_ledger.py)"""
+    __tablename__ = 'staff_commission_balances'
+
+    staff_id = db.Column(db.Integer, db.ForeignKey('staff.id'), primary_key=True)
+    is_demo = db.Column(db.Boolean, primary_key=True, default=False)
+    earned = db.Column(db.Float, nullable=False, default=0.0)  # Sum of Sale.commission_amount
+    paid = db.Column(db.Float, nullable=False, default=0.0)  # Sum of CommissionPayment.amount_paid
+    sales_total = db.Column(db.Float, nullable=False, default=0.0)  # Sum of Sale.subtotal
+    sale_count = db.Column(db.Integer, nullable=False, default=0)
+    updated_at = db.Column(db.DateTime, default=datetime.utcnow, onupdate=datetime.utcnow)
+
+    @property
+    def balance(self):
+        """Commission earned but not yet paid"""
+        return (self.earned or 0) - (self.paid or 0)
+
+    def to_dict(self):
+        return {
+            'staff_id': self.staff_id,
+            'is_demo': self.is_demo,
+            'earned': round(self.earned or 0, 2),
+            'paid': round(self.paid or 0, 2),
+            'balance': round(self.balance, 2),
+            'sales_total': round(self.sales_total or 0, 2),
+            'sale_count': self.sale_count or 0,
+            'updated_at': self.updated_at.isoformat() if self.updated_at else None
+        }
+
+
+class NumberSequence(db.Model):
+    """Named counters for human-readable document numbers (see sequences.py)"""
+    __tablename__ = 'sequences'
+
+    name = db.Column(db.String(64), primary_key=True)  # e.g. "sale:20260204", "commission_receipt"
+    value = db.Column(db.Integer, nullable=False, default=0)  # Last value handed out
+
+
+class Job(db.Model):
+    """Background job (receipt render or export) and its downloadable artifact (see jobs.py)"""
+    __tablename__ = 'jobs'
+    __table_args__ = (
+        db.Index('ix_jobs_status_created_at', 'status', 'created_at'),
+    )
+
+    id = db.Column(db.String(32), primary_key=True)  # uuid4 hex; unguessable, used in download URLs
+    kind = db.Column(db.String(50), nullable=False)  # sales_receipt, commission_receipt, calendar_export
+    status = db.Column(db.String(20), nullable=False, default='queued')  # queued, running, succeeded, failed, expired
+    progress = db.Column(db.Integer, nullable=False, default=0)  # 0-100
+    params = db.Column(db.Text)  # JSON arguments for the job handler
+    result_path = db.Column(db.String(500))  # Artifact on local disk while it is retained
+    result_filename = db.Column(db.String(255))
+    result_mimetype = db.Column(db.String(100))
+    error = db.Column(db.Text)
+    created_by = db.Column(db.Integer, db.ForeignKey('users.id'), nullable=True)
+    created_at = db.Column(db.DateTime, default=datetime.utcnow)
+    started_at = db.Column(db.DateTime)
+    updated_at = db.Column(db.DateTime, default=datetime.utcnow)  # Heartbeat while running
+    finished_at = db.Column(db.DateTime)
+
+    def get_params(self):
+        return json.loads(self.params) if self.params else {}
+
+    def to_dict(self):
+        return {
+            'id': self.id,
+            'kind': self.kind,
+            'status': self.status,
+            'progress': self.progress or 0,
+            'params': self.get_params(),
+            'filename': self.result_filename,
+            'error': self.error,
+            'created_by': self.created_by,
+            'created_at': self.created_at.isoformat() if self.created_at else None,
+            'started_at': self.started_at.isoformat() if self.started_at else None,
+            'finished_at': self.finished_at.isoformat() if self.finished_at else None
+        }
+
+
+def _business_date_listener(source_attr, naive_is_utc):
+    """Build a mapper listener that stamps business_date from source_attr."""
+    def listener(mapper, connection, target):
+        value = getattr(target, source_attr)
+        if value is None:
+            # Column defaults run after before_insert, so fill the timestamp here
+            value = datetime.utcnow() if naive_is_utc else business_now()
+            setattr(target, source_attr, value)
+        target.business_date = business_date_for(value, naive_is_utc=naive_is_utc)
+    return listener
+
+
+# Timestamps default to naive UTC; appointment and expense dates are entered
+# as salon wall-clock times.
+for _model, _attr, _naive_is_utc in (
+    (Sale, 'created_at', True),
+    (Payment, 'created_at', True),
+    (CommissionPayment, 'payment_date', True),
+    (Expense, 'expense_date', False),
+    (Appointment, 'appointment_date', False),
+):
+    _listener = _business_date_listener(_attr, _naive_is_utc)
+    event.listen(_model, 'before_insert', _listener)
+    event.listen(_model, 'before_update', _listener)
@@ -0,0 +1,175 @@
+"""
+Keyset (cursor) pagination helpers for list endpoints.
+
+A page is ordered by a fixed list of columns ending in the primary key, and
+the cursor encodes the sort values of the last row returned. The next page
+continues strictly after those values, so each page is an index range scan
+no matter how deep the client has paged.
+
+Nullable sort columns are compared as COALESCE(column, <lowest value of its
+type>) in both the ORDER BY and the cursor predicate, because NULL never
+satisfies `<`, `>` or `=` and rows with a NULL sort value would otherwise be
+skipped or repeated. Those rows sort as the oldest; NOT NULL columns are used
+as they are. No index serves the COALESCE, so such a page is sorted after it
+is read: list endpoints should sort on NOT NULL columns.
+"""
+import base64
+import json
+from datetime import datetime, date, time
+from flask import current_app
+from sqlalchemy import and_, or_, func, literal
+
+# Stand-ins for NULL in nullable sort columns, below any real value
+_NULL_SORT_VALUES = {
+    datetime: datetime(1, 1, 1),
+    date: date(1, 1, 1),
+    time: time(0, 0),
+    int: -2 ** 63,
+    float: float('-inf'),
+    str: '',
+}
+
+
+class InvalidCursor(ValueError):
+    """Raised when a client sends a cursor that cannot be decoded."""
+
+
+def get_page_size(request_obj, default=None):
+    """
+    Read the requested page size, clamped to the configured maximum.
+
+    Accepts `page_size` (or the older `limit`) query parameter.
+
+    Args:
+        request_obj: Flask request object
+        default: Page size when none is requested (defaults to DEFAULT_PAGE_SIZE)
+
+    Returns:
+        int: Page size between 1 and MAX_PAGE_SIZE
+    """
+    max_size = current_app.config.get('MAX_PAGE_SIZE', 200)
+    if default is None:
+        default = current_app.config.get('DEFAULT_PAGE_SIZE', 50)
+
+    size = request_obj.args.get('page_size', type=int)
+    if size is None:
+        size = request_obj.args.get('limit', type=int, default=default)
+    return max(1, min(size, max_size))
+
+
+def _encode_value(value):
+    if isinstance(value, (datetime, date, time)):
+        return value.isoformat()
+    return value
+
+
+def _null_sort_value(column):
+    """Value a NULL in `column` sorts as, or None if the column is NOT NULL."""
+    if not getattr(column, 'nullable', False) or getattr(column, 'primary_key', False):
+        return None
+    return _NULL_SORT_VALUES.get(column.type.python_type)
+
+
+def _sort_key(column):
+    """The column, or COALESCE(column, low value) if it is nullable."""
+    null_value = _null_sort_value(column)
+    if null_value is None:
+        return column
+    return func.coalesce(column, literal(null_value, type_=column.type))
+
+
+def _cursor_value(column, value):
+    if value is None:
+        return _null_sort_value(column)
+    return value
+
+
+def _decode_value(column, value):
+    if value is None:
+        return _null_sort_value(column)
+    python_type = column.type.python_type
+    if python_type in (datetime, date, time):
+        return python_type.fromisoformat(value)
+    return value
+
+
+def encode_cursor(values):
+    """Encode a row's sort values as an opaque URL-safe cursor."""
+    raw = json.dumps([_encode_value(v) for v in values]).encode()
+    return base64.urlsafe_b64encode(raw).decode().rstrip('=')
+
+
+def decode_cursor(cursor, order_by):
+    """
+    Decode a cursor produced by encode_cursor.
+
+    Args:
+        cursor: Cursor string from the client
+        order_by: Sort spec the cursor was produced for
+
+    Returns:
+        list: Sort values typed to match the columns
+
+    Raises:
+        InvalidCursor: If the cursor is malformed or does not match the sort spec
+    """
+    try:
+        padded = cursor + '=' * (-len(cursor) % 4)
+        values = json.loads(base64.urlsafe_b64decode(padded.encode()))
+        if not isinstance(values, list) or len(values) != len(order_by):
+            raise ValueError('cursor does not match sort order')
+        return [_decode_value(column, value) for (column, _), value in zip(order_by, values)]
+    except (ValueError, TypeError) as e:
+        raise InvalidCursor(str(e))
+
+
+def _after(order_by, values):
+    """Build the WHERE clause selecting rows strictly after `values` in sort order."""
+    keys = [_sort_key(column) for column, _ in order_by]
+    clauses = []
+    for i, (_, descending) in enumerate(order_by):
+        equal_prefix = [keys[j] == values[j] for j in range(i)]
+        step = keys[i] < values[i] if descending else keys[i] > values[i]
+        clauses.append(and_(*equal_prefix, step))
+    return or_(*clauses)
+
+
+def paginate_keyset(query, order_by, cursor, page_size):
+    """
+    Fetch one page of a query using keyset pagination.
+
+    Args:
+        query: SQLAlchemy query with filters applied (no order_by/limit)
+        order_by: List of (column, descending) tuples; the last must be unique (the id)
+        cursor: Cursor from a previous page, or None for the first page
+        page_size: Number of rows per page
+
+    Returns:
+        tuple: (rows, next_cursor) where next_cursor is None on the last page
+
+    Raises:
+        InvalidCursor: If the cursor cannot be decoded
+    """
+    if cursor:
+        query = query.filter(_after(order_by, decode_cursor(cursor, order_by)))
+
+    keys = [(_sort_key(col), descending) for col, descending in order_by]
+    query = query.order_by(*[key.desc() if descending else key.asc() for key, descending in keys])
+    rows = query.limit(page_size + 1).all()
+
+    next_cursor = None
+    if len(rows) > page_size:
+        rows = rows[:page_size]
+        last = rows[-1]
+        next_cursor = encode_cursor([_cursor_value(col, getattr(last, col.key)) for col, _ in order_by])
+
+    return rows, next_cursor
+
+
+def page_response(items, next_cursor, page_size):
+    """Build the JSON body shared by paginated list endpoints."""
+    return {
+        'items': items,
+        'next_cursor': next_cursor,
+        'page_size': page_size
+    }
@@ -0,0 +1,102 @@
+"""
+bcrypt hashing off the request thread, with a configurable work factor.
+
+bcrypt releases the GIL while it works, so running it on a small pool of
+OS threads keeps the worker free to serve other requests. Under the gevent
+worker (gunicorn.conf.py) the pool is a gevent ThreadPool, whose threads are
+real OS threads even when threading is monkey-patched; otherwise it is a
+concurrent.futures ThreadPoolExecutor. Either way at most BCRYPT_THREADS
+hashes run at once per process.
+"""
+import os
+import threading
+from concurrent.futures import ThreadPoolExecutor
+import bcrypt
+
+DEFAULT_BCRYPT_ROUNDS = 12
+DEFAULT_BCRYPT_THREADS = 2
+
+_lock = threading.Lock()
+_pool = None
+
+
+def _config(key, default):
+    """Read an int setting from the Flask app config, falling back to the environment."""
+    try:
+        from flask import current_app
+        value = current_app.config.get(key)
+    except RuntimeError:
+        value = None  # Outside app context (CLI scripts, migrations)
+    return int(value or os.getenv(key) or default)
+
+
+def get_bcrypt_rounds():
+    """Configured bcrypt work factor (BCRYPT_ROUNDS)."""
+    return _config('BCRYPT_ROUNDS', DEFAULT_BCRYPT_ROUNDS)
+
+
+def _get_pool():
+    global _pool
+    with _lock:
+        if _pool is None:
+            size = _config('BCRYPT_THREADS', DEFAULT_BCRYPT_THREADS)
+            try:
+                from gevent import monkey
+                if monkey.is_module_patched('threading'):
+                    from gevent.threadpool import ThreadPool
+                    _pool = ThreadPool(maxsize=size)
+            except ImportError:
+                pass
+            if _pool is None:
+                _pool = ThreadPoolExecutor(max_workers=size, thread_name_prefix='bcrypt')
+        return _pool
+
+
+def _run(fn, *args):
+    """Run fn(*args) on the hashing pool and wait for the result."""
+    pool = _get_pool()
+    if isinstance(pool, ThreadPoolExecutor):
+        return pool.submit(fn, *args).result()
+    return pool.apply(fn, args)
+
+
+def hash_password(password, rounds=None):
+    """
+    Hash a password with bcrypt.
+
+    Args:
+        password: Plain-text password
+        rounds: Work factor (defaults to BCRYPT_ROUNDS)
+
+    Returns:
+        str: bcrypt hash
+    """
+    salt = bcrypt.gensalt(rounds=rounds or get_bcrypt_rounds())
+    return _run(bcrypt.hashpw, password.encode('utf-8'), salt).decode('utf-8')
+
+
+def verify_password(password, password_hash):
+    """
+    Check a password against a bcrypt hash.
+
+    Args:
+        password: Plain-text password
+        password_hash: Stored bcrypt hash
+
+    Returns:
+        bool: True if the password matches
+    """
+    return _run(bcrypt.checkpw, password.encode('utf-8'), password_hash.encode('utf-8'))
+
+
+def hash_rounds(password_hash):
+    """Work factor encoded in a bcrypt hash ("$2b$12$..."), or None if unparseable."""
+    try:
+        return int(password_hash.split('$')[2])
+    except (AttributeError, IndexError, ValueError):
+        return None
+
+
+def needs_rehash(password_hash):
+    """Whether a stored hash uses a different work factor than BCRYPT_ROUNDS."""
+    return hash_rounds(password_hash) != get_bcrypt_rounds()
@@ -0,0 +1,87 @@
+"""
+On-disk cache of rendered PDFs for documents that no longer change.
+
+Completed sales and commission payments are never edited, so their receipts
+and payslips can be rendered once and served from disk afterwards, skipping
+ReportLab. Files are keyed by a SHA-256 of everything the document prints
+(see the *_fingerprint functions in pdf_generators.py), so a change to the
+data or to PDF_TEMPLATE_VERSION simply misses the cache and renders anew.
+
+The cache lives in PDF_CACHE_DIR (default instance/pdf_cache); set it to an
+empty string to disable caching. Files are written to a temporary name and
+renamed into place, so concurrent requests never see a partial PDF.
+"""
+import hashlib
+import io
+import json
+import os
+import tempfile
+from flask import current_app
+
+
+def get_cache_dir():
+    """Configured cache directory, or None if caching is disabled."""
+    return current_app.config.get('PDF_CACHE_DIR') or None
+
+
+def fingerprint_key(kind, fingerprint):
+    """SHA-256 hex digest identifying a rendered document."""
+    payload = json.dumps([kind, fingerprint], sort_keys=True, separators=(',', ':'), default=str)
+    return hashlib.sha256(payload.encode('utf-8')).hexdigest()
+
+
+def _cache_path(cache_dir, kind, fingerprint):
+    key = fingerprint_key(kind, fingerprint)
+    return os.path.join(cache_dir, kind, key[:2], f"{key}.pdf")
+
+
+def load_cached_pdf(kind, fingerprint):
+    """Cached PDF bytes for a document, or None on a miss or when caching is disabled."""
+    cache_dir = get_cache_dir()
+    if not cache_dir:
+        return None
+    try:
+        with open(_cache_path(cache_dir, kind, fingerprint), 'rb') as f:
+            return f.read()
+    except FileNotFoundError:
+        return None
+
+
+def store_cached_pdf(kind, fingerprint, data):
+    """Store rendered PDF bytes for a document (no-op when caching is disabled)."""
+    cache_dir = get_cache_dir()
+    if not cache_dir:
+        return
+    path = _cache_path(cache_dir, kind, fingerprint)
+    try:
+        directory = os.path.dirname(path)
+        os.makedirs(directory, exist_ok=True)
+        fd, tmp_path = tempfile.mkstemp(dir=directory, suffix='.tmp')
+        with os.fdopen(fd, 'wb') as f:
+            f.write(data)
+        os.replace(tmp_path, path)
+    except OSError as e:
+        # A read-only or full disk only costs the cache, not the download
+        current_app.logger.warning(f"Could not cache PDF {path}: {e}")
+
+
+def cached_pdf(kind, fingerprint, render):
+    """
+    Return a rendered PDF from the cache, rendering and storing it on a miss.
+
+    Args:
+        kind: Document type, used as a subdirectory ('sales_receipt', 'payslip')
+        fingerprint: JSON-serializable data covering everything the document prints
+        render: Callable returning an io.BytesIO with the PDF
+
+    Returns:
+        io.BytesIO: PDF buffer positioned at the start
+    """
+    data = load_cached_pdf(kind, fingerprint)
+    if data is not None:
+        return io.BytesIO(data)
+
+    buffer = render()
+    store_cached_pdf(kind, fingerprint, buffer.getvalue())
+    buffer.seek(0)
+    return buffer
@@ -13,7 +13,10 @@ from reportlab.lib.enums import TA_CENTER, TA_LEFT, TA_RIGHT
 
 def _create_pdf_styles():
     """
-    Create and return PDF styles dictionary.
+    Create the PDF paragraph styles.
+    
+    Called once at import; documents share the result (_STYLES) and must
+    not modify it.
     
     Returns:
         dict: Dictionary of style objects
@@ -62,8 +65,12 @@ def _create_pdf_styles():
         fontName='Helvetica-Bold'
     )
     
-    normal_style = styles['Normal']
-    normal_style.fontSize = 10
+    # A copy, so the sample sheet's shared Normal style is never modified
+    normal_style = ParagraphStyle(
+        'Body',
+        parent=styles['Normal'],
+        fontSize=10
+    )
     
     bold_style = ParagraphStyle(
         'Bold',
@@ -103,6 +110,127 @@ def _create_pdf_styles():
     }
 
 
+_STYLES = _create_pdf_styles()
+
+# Table styles shared by every document; TableStyle only holds commands, so
+# one instance can style any number of tables
+
+# Blue rule under the document title
+_DIVIDER_STYLE = TableStyle([
+    ('LINEBELOW', (0, 0), (0, 0), 1, colors.HexColor('#1e40af')),
+    ('TOPPADDING', (0, 0), (0, 0), 5),
+    ('BOTTOMPADDING', (0, 0), (0, 0), 5),
+])
+
+# Receipt number / date block with shaded labels
+_HEADER_TABLE_STYLE = TableStyle([
+    ('FONTNAME', (0, 0), (0, -1), 'Helvetica-Bold'),
+    ('FONTNAME', (1, 0), (1, -1), 'Helvetica'),
+    ('FONTSIZE', (0, 0), (-1, -1), 10),
+    ('ALIGN', (0, 0), (0, -1), 'LEFT'),
+    ('ALIGN', (1, 0), (1, -1), 'LEFT'),
+    ('VALIGN', (0, 0), (-1, -1), 'MIDDLE'),
+    ('BOTTOMPADDING', (0, 0), (-1, -1), 6),
+    ('TOPPADDING', (0, 0), (-1, -1), 6),
+    ('BACKGROUND', (0, 0), (0, -1), colors.HexColor('#f3f4f6')),
+])
+
+# Label / value blocks (staff, customer, payment details)
+_INFO_TABLE_STYLE = TableStyle([
+    ('FONTNAME', (0, 0), (0, -1), 'Helvetica-Bold'),
+    ('FONTNAME', (1, 0), (1, -1), 'Helvetica'),
+    ('FONTSIZE', (0, 0), (-1, -1), 10),
+    ('ALIGN', (0, 0), (0, -1), 'LEFT'),
+    ('ALIGN', (1, 0), (1, -1), 'LEFT'),
+    ('VALIGN', (0, 0), (-1, -1), 'MIDDLE'),
+    ('BOTTOMPADDING', (0, 0), (-1, -1), 8),
+    ('TOPPADDING', (0, 0), (-1, -1), 4),
+])
+
+# Payslip earnings with a gross pay total row
+_EARNINGS_TABLE_STYLE = TableStyle([
+    ('FONTNAME', (0, 0), (-1, 0), 'Helvetica-Bold'),
+    ('FONTNAME', (0, -1), (-1, -1), 'Helvetica-Bold'),
+    ('FONTSIZE', (0, 0), (-1, -1), 10),
+    ('ALIGN', (0, 0), (0, -1), 'LEFT'),
+    ('ALIGN', (1, 0), (1, -1), 'RIGHT'),
+    ('VALIGN', (0, 0), (-1, -1), 'MIDDLE'),
+    ('BOTTOMPADDING', (0, 0), (-1, -1), 8),
+    ('TOPPADDING', (0, 0), (-1, -1), 6),
+    ('BACKGROUND', (0, 0), (-1, 0), colors.HexColor('#e5e7eb')),
+    ('LINEBELOW', (0, -2), (-1, -2), 1, colors.grey),
+    ('LINEBELOW', (0, -1), (-1, -1), 2, colors.HexColor('#1e40af')),
+    ('FONTSIZE', (0, -1), (-1, -1), 11),
+    ('TEXTCOLOR', (1, -1), (1, -1), colors.HexColor('#059669')),
+])
+
+# Payslip deductions with a total row
+_DEDUCTIONS_TABLE_STYLE = TableStyle([
+    ('FONTNAME', (0, 0), (0, -1), 'Helvetica-Bold'),
+    ('FONTNAME', (0, -1), (-1, -1), 'Helvetica-Bold'),
+    ('FONTSIZE', (0, 0), (-1, -1), 10),
+    ('ALIGN', (0, 0), (0, -1), 'LEFT'),
+    ('ALIGN', (1, 0), (1, -1), 'RIGHT'),
+    ('VALIGN', (0, 0), (-1, -1), 'MIDDLE'),
+    ('BOTTOMPADDING', (0, 0), (-1, -1), 8),
+    ('TOPPADDING', (0, 0), (-1, -1), 6),
+    ('BACKGROUND', (0, 0), (-1, 0), colors.HexColor('#fee2e2')),
+    ('LINEBELOW', (0, -2), (-1, -2), 1, colors.grey),
+    ('LINEBELOW', (0, -1), (-1, -1), 2, colors.HexColor('#dc2626')),
+    ('FONTSIZE', (0, -1), (-1, -1), 11),
+    ('TEXTCOLOR', (1, -1), (1, -1), colors.HexColor('#dc2626')),
+])
+
+# Totals block; the third row is the highlighted total
+_SUMMARY_TABLE_STYLE = TableStyle([
+    ('FONTNAME', (0, 0), (0, -1), 'Helvetica-Bold'),
+    ('FONTNAME', (1, 0), (1, -1), 'Helvetica'),
+    ('FONTNAME', (1, 2), (1, 2), 'Helvetica-Bold'),
+    ('FONTSIZE', (0, 0), (-1, -1), 10),
+    ('FONTSIZE', (1, 2), (1, 2), 14),
+    ('ALIGN', (0, 0), (0, -1), 'LEFT'),
+    ('ALIGN', (1, 0), (1, -1), 'LEFT'),
+    ('VALIGN', (0, 0), (-1, -1), 'MIDDLE'),
+    ('BOTTOMPADDING', (0, 0), (-1, -1), 10),
+    ('TOPPADDING', (0, 0), (-1, -1), 6),
+    ('BACKGROUND', (0, 2), (-1, 2), colors.HexColor('#dbeafe')),
+    ('TEXTCOLOR', (1, 2), (1, 2), colors.HexColor('#1e40af')),
+    ('LINEBELOW', (0, 1), (-1, 1), 1, colors.grey),
+])
+
+# Payslip signature lines
+_SIGNATURE_TABLE_STYLE = TableStyle([
+    ('FONTNAME', (0, 0), (-1, -1), 'Helvetica'),
+    ('FONTSIZE', (0, 0), (-1, -1), 10),
+    ('ALIGN', (0, 0), (-1, -1), 'CENTER'),
+    ('ALIGN', (0, 3), (-1, 3), 'CENTER'),
+    ('ALIGN', (1, 5), (1, 6), 'LEFT'),
+    ('VALIGN', (0, 0), (-1, -1), 'MIDDLE'),
+    ('TOPPADDING', (0, 2), (-1, 2), 25),
+    ('BOTTOMPADDING', (0, 2), (-1, 2), 5),
+])
+
+# Grey rule above the footer
+_FOOTER_DIVIDER_STYLE = TableStyle([
+    ('LINEABOVE', (0, 0), (0, 0), 1, colors.grey),
+    ('TOPPADDING', (0, 0), (0, 0), 5),
+    ('BOTTOMPADDING', (0, 0), (0, 0), 5),
+])
+
+# Gridded service/product line items
+_LINE_ITEMS_TABLE_STYLE = TableStyle([
+    ('FONTNAME', (0, 0), (-1, 0), 'Helvetica-Bold'),
+    ('FONTSIZE', (0, 0), (-1, -1), 10),
+    ('ALIGN', (0, 0), (0, -1), 'LEFT'),
+    ('ALIGN', (1, 0), (-1, -1), 'RIGHT'),
+    ('VALIGN', (0, 0), (-1, -1), 'MIDDLE'),
+    ('BOTTOMPADDING', (0, 0), (-1, -1), 8),
+    ('TOPPADDING', (0, 0), (-1, -1), 6),
+    ('BACKGROUND', (0, 0), (-1, 0), colors.HexColor('#e5e7eb')),
+    ('GRID', (0, 0), (-1, -1), 0.5, colors.grey),
+])
+
+
 def _amount_in_words(amount):
     """
     Convert amount to words.
@@ -133,6 +261,67 @@ def _amount_in_words(amount):
         return f"{amount:,.2f} Kenya Shillings Only"
 
 
+# Bump when a document's layout changes so cached PDFs (pdf_cache.py) are re-rendered
+PDF_TEMPLATE_VERSION = 1
+
+
+def _isoformat(value):
+    return value.isoformat() if value else None
+
+
+def commission_receipt_fingerprint(payment, staff, payer=None):
+    """
+    Everything generate_commission_receipt_pdf prints, as JSON-serializable data.
+
+    Used as the cache key for rendered payslips; keep in step with the generator.
+    """
+    return [
+        PDF_TEMPLATE_VERSION,
+        payment.id, payment.receipt_number, payment.staff_id,
+        _isoformat(payment.period_start), _isoformat(payment.period_end), _isoformat(payment.payment_date),
+        payment.base_pay, payment.gross_pay, payment.total_deductions, payment.net_pay,
+        payment.payment_method, payment.transaction_reference, payment.notes,
+        [
+            [item.item_type, item.item_name, item.amount, item.is_percentage, item.percentage_of,
+             item.display_order, item.sale_number]
+            for item in payment.items
+        ],
+        [staff.name, staff.role] if staff else None,
+        [payer.name, payer.role] if payer else None
+    ]
+
+
+def sales_receipt_fingerprint(sale, staff=None, customer=None, payment=None):
+    """
+    Everything generate_sales_receipt_pdf prints, as JSON-serializable data.
+
+    Used as the cache key for rendered receipts; keep in step with the generator.
+    """
+    return [
+        PDF_TEMPLATE_VERSION,
+        sale.id, sale.sale_number, sale.staff_id, _isoformat(sale.created_at),
+        sale.subtotal, sale.tax_amount, sale.total_amount,
+        [
+            [ss.service.name if ss.service else ss.service_id, ss.quantity, ss.unit_price, ss.total_price]
+            for ss in sale.sale_services
+        ],
+        [
+            [sp.product.name if sp.product else sp.product_id, sp.quantity, sp.unit_price, sp.total_price]
+            for sp in sale.sale_products
+        ],
+        [customer.name, customer.phone, customer.email] if customer else None,
+        staff.name if staff else None,
+        [payment.receipt_number, payment.payment_method, payment.transaction_code] if payment else None
+    ]
+
+
+def sales_receipt_filename(sale):
+    """Download filename for a sale's receipt, named after its receipt (or sale) number."""
+    payment = sale.payment
+    receipt_number = payment.receipt_number if payment and payment.receipt_number else sale.sale_number
+    return f"receipt_{receipt_number.replace(' ', '_')}.pdf"
+
+
 def generate_commission_receipt_pdf(payment, staff, payer=None):
     """
     Generate professional payslip PDF for commission payment.
@@ -154,8 +343,7 @@ def generate_commission_receipt_pdf(payment, staff, payer=None):
     # Container for the 'Flowable' objects
     elements = []
     
-    # Get styles
-    styles_dict = _create_pdf_styles()
+    styles_dict = _STYLES
     
     # Company Header
     elements.append(Paragraph("PREMIUM BEAUTY SALON", styles_dict['company_header']))
@@ -164,11 +352,7 @@ def generate_commission_receipt_pdf(payment, staff, payer=None):
     
     # Divider line using a table
     divider = Table([['']], colWidths=[6.5*inch])
-    divider.setStyle(TableStyle([
-        ('LINEBELOW', (0, 0), (0, 0), 1, colors.HexColor('#1e40af')),
-        ('TOPPADDING', (0, 0), (0, 0), 5),
-        ('BOTTOMPADDING', (0, 0), (0, 0), 5),
-    ]))
+    divider.setStyle(_DIVIDER_STYLE)
     elements.append(divider)
     elements.append(Spacer(1, 0.15*inch))
     
@@ -180,17 +364,7 @@ def generate_commission_receipt_pdf(payment, staff, payer=None):
     ]
     
     receipt_header_table = Table(receipt_header_data, colWidths=[2.5*inch, 4*inch])
-    receipt_header_table.setStyle(TableStyle([
-        ('FONTNAME', (0, 0), (0, -1), 'Helvetica-Bold'),
-        ('FONTNAME', (1, 0), (1, -1), 'Helvetica'),
-        ('FONTSIZE', (0, 0), (-1, -1), 10),
-        ('ALIGN', (0, 0), (0, -1), 'LEFT'),
-        ('ALIGN', (1, 0), (1, -1), 'LEFT'),
-        ('VALIGN', (0, 0), (-1, -1), 'MIDDLE'),
-        ('BOTTOMPADDING', (0, 0), (-1, -1), 6),
-        ('TOPPADDING', (0, 0), (-1, -1), 6),
-        ('BACKGROUND', (0, 0), (0, -1), colors.HexColor('#f3f4f6')),
-    ]))
+    receipt_header_table.setStyle(_HEADER_TABLE_STYLE)
     elements.append(receipt_header_table)
     elements.append(Spacer(1, 0.25*inch))
     
@@ -203,16 +377,7 @@ def generate_commission_receipt_pdf(payment, staff, payer=None):
     ]
     
     staff_table = Table(staff_data, colWidths=[2.5*inch, 4*inch])
-    staff_table.setStyle(TableStyle([
-        ('FONTNAME', (0, 0), (0, -1), 'Helvetica-Bold'),
-        ('FONTNAME', (1, 0), (1, -1), 'Helvetica'),
-        ('FONTSIZE', (0, 0), (-1, -1), 10),
-        ('ALIGN', (0, 0), (0, -1), 'LEFT'),
-        ('ALIGN', (1, 0), (1, -1), 'LEFT'),
-        ('VALIGN', (0, 0), (-1, -1), 'MIDDLE'),
-        ('BOTTOMPADDING', (0, 0), (-1, -1), 8),
-        ('TOPPADDING', (0, 0), (-1, -1), 4),
-    ]))
+    staff_table.setStyle(_INFO_TABLE_STYLE)
     elements.append(staff_table)
     elements.append(Spacer(1, 0.3*inch))
     
@@ -237,21 +402,7 @@ def generate_commission_receipt_pdf(payment, staff, payer=None):
     earnings_table_data.append(['Gross Pay', f"{gross_pay:,.2f}"])
     
     earnings_table = Table(earnings_table_data, colWidths=[4.5*inch, 2*inch])
-    earnings_table.setStyle(TableStyle([
-        ('FONTNAME', (0, 0), (-1, 0), 'Helvetica-Bold'),
-        ('FONTNAME', (0, -1), (-1, -1), 'Helvetica-Bold'),
-        ('FONTSIZE', (0, 0), (-1, -1), 10),
-        ('ALIGN', (0, 0), (0, -1), 'LEFT'),
-        ('ALIGN', (1, 0), (1, -1), 'RIGHT'),
-        ('VALIGN', (0, 0), (-1, -1), 'MIDDLE'),
-        ('BOTTOMPADDING', (0, 0), (-1, -1), 8),
-        ('TOPPADDING', (0, 0), (-1, -1), 6),
-        ('BACKGROUND', (0, 0), (-1, 0), colors.HexColor('#e5e7eb')),
-        ('LINEBELOW', (0, -2), (-1, -2), 1, colors.grey),
-        ('LINEBELOW', (0, -1), (-1, -1), 2, colors.HexColor('#1e40af')),
-        ('FONTSIZE', (0, -1), (-1, -1), 11),
-        ('TEXTCOLOR', (1, -1), (1, -1), colors.HexColor('#059669')),
-    ]))
+    earnings_table.setStyle(_EARNINGS_TABLE_STYLE)
     elements.append(earnings_table)
     elements.append(Spacer(1, 0.3*inch))
     
@@ -286,21 +437,7 @@ def generate_commission_receipt_pdf(payment, staff, payer=None):
     deductions_table_data.append(['Total Deductions', f"{total_deductions:,.2f}"])
     
     deductions_table = Table(deductions_table_data, colWidths=[4.5*inch, 2*inch])
-    deductions_table.setStyle(TableStyle([
-        ('FONTNAME', (0, 0), (0, -1), 'Helvetica-Bold'),
-        ('FONTNAME', (0, -1), (-1, -1), 'Helvetica-Bold'),
-        ('FONTSIZE', (0, 0), (-1, -1), 10),
-        ('ALIGN', (0, 0), (0, -1), 'LEFT'),
-        ('ALIGN', (1, 0), (1, -1), 'RIGHT'),
-        ('VALIGN', (0, 0), (-1, -1), 'MIDDLE'),
-        ('BOTTOMPADDING', (0, 0), (-1, -1), 8),
-        ('TOPPADDING', (0, 0), (-1, -1), 6),
-        ('BACKGROUND', (0, 0), (-1, 0), colors.HexColor('#fee2e2')),
-        ('LINEBELOW', (0, -2), (-1, -2), 1, colors.grey),
-        ('LINEBELOW', (0, -1), (-1, -1), 2, colors.HexColor('#dc2626')),
-        ('FONTSIZE', (0, -1), (-1, -1), 11),
-        ('TEXTCOLOR', (1, -1), (1, -1), colors.HexColor('#dc2626')),
-    ]))
+    deductions_table.setStyle(_DEDUCTIONS_TABLE_STYLE)
     elements.append(deductions_table)
     elements.append(Spacer(1, 0.3*inch))
     
@@ -317,21 +454,7 @@ def generate_commission_receipt_pdf(payment, staff, payer=None):
     ]
     
     summary_table = Table(summary_data, colWidths=[2.5*inch, 4*inch])
-    summary_table.setStyle(TableStyle([
-        ('FONTNAME', (0, 0), (0, -1), 'Helvetica-Bold'),
-        ('FONTNAME', (1, 0), (1, -1), 'Helvetica'),
-        ('FONTNAME', (1, 2), (1, 2), 'Helvetica-Bold'),
-        ('FONTSIZE', (0, 0), (-1, -1), 10),
-        ('FONTSIZE', (1, 2), (1, 2), 14),
-        ('ALIGN', (0, 0), (0, -1), 'LEFT'),
-        ('ALIGN', (1, 0), (1, -1), 'LEFT'),
-        ('VALIGN', (0, 0), (-1, -1), 'MIDDLE'),
-        ('BOTTOMPADDING', (0, 0), (-1, -1), 10),
-        ('TOPPADDING', (0, 0), (-1, -1), 6),
-        ('BACKGROUND', (0, 2), (-1, 2), colors.HexColor('#dbeafe')),
-        ('TEXTCOLOR', (1, 2), (1, 2), colors.HexColor('#1e40af')),
-        ('LINEBELOW', (0, 1), (-1, 1), 1, colors.grey),
-    ]))
+    summary_table.setStyle(_SUMMARY_TABLE_STYLE)
     elements.append(summary_table)
     elements.append(Spacer(1, 0.3*inch))
     
@@ -346,16 +469,7 @@ def generate_commission_receipt_pdf(payment, staff, payer=None):
         payment_details_data.append(['Transaction Reference:', payment.transaction_reference])
     
     payment_details_table = Table(payment_details_data, colWidths=[2.5*inch, 4*inch])
-    payment_details_table.setStyle(TableStyle([
-        ('FONTNAME', (0, 0), (0, -1), 'Helvetica-Bold'),
-        ('FONTNAME', (1, 0), (1, -1), 'Helvetica'),
-        ('FONTSIZE', (0, 0), (-1, -1), 10),
-        ('ALIGN', (0, 0), (0, -1), 'LEFT'),
-        ('ALIGN', (1, 0), (1, -1), 'LEFT'),
-        ('VALIGN', (0, 0), (-1, -1), 'MIDDLE'),
-        ('BOTTOMPADDING', (0, 0), (-1, -1), 8),
-        ('TOPPADDING', (0, 0), (-1, -1), 4),
-    ]))
+    payment_details_table.setStyle(_INFO_TABLE_STYLE)
     elements.append(payment_details_table)
     
     # Notes section if exists
@@ -384,16 +498,7 @@ def generate_commission_receipt_pdf(payment, staff, payer=None):
         signature_data.append(['', f'Position: {(payer.role.upper() if payer.role else "MANAGER")}'])
     
     signature_table = Table(signature_data, colWidths=[3*inch, 3*inch])
-    signature_table.setStyle(TableStyle([
-        ('FONTNAME', (0, 0), (-1, -1), 'Helvetica'),
-        ('FONTSIZE', (0, 0), (-1, -1), 10),
-        ('ALIGN', (0, 0), (-1, -1), 'CENTER'),
-        ('ALIGN', (0, 3), (-1, 3), 'CENTER'),
-        ('ALIGN', (1, 5), (1, 6), 'LEFT'),
-        ('VALIGN', (0, 0), (-1, -1), 'MIDDLE'),
-        ('TOPPADDING', (0, 2), (-1, 2), 25),
-        ('BOTTOMPADDING', (0, 2), (-1, 2), 5),
-    ]))
+    signature_table.setStyle(_SIGNATURE_TABLE_STYLE)
     elements.append(signature_table)
     
     elements.append(Spacer(1, 0.3*inch))
@@ -412,11 +517,7 @@ def generate_commission_receipt_pdf(payment, staff, payer=None):
     
     # Footer divider
     footer_divider = Table([['']], colWidths=[6.5*inch])
-    footer_divider.setStyle(TableStyle([
-        ('LINEABOVE', (0, 0), (0, 0), 1, colors.grey),
-        ('TOPPADDING', (0, 0), (0, 0), 5),
-        ('BOTTOMPADDING', (0, 0), (0, 0), 5),
-    ]))
+    footer_divider.setStyle(_FOOTER_DIVIDER_STYLE)
     elements.append(footer_divider)
     elements.append(Spacer(1, 0.1*inch))
     elements.append(Paragraph("This is a computer-generated payslip and is legally valid.", styles_dict['footer']))
@@ -452,8 +553,7 @@ def generate_sales_receipt_pdf(sale, staff=None, customer=None, payment=None):
     # Container for the 'Flowable' objects
     elements = []
     
-    # Get styles
-    styles_dict = _create_pdf_styles()
+    styles_dict = _STYLES
     
     # Company Header
     elements.append(Paragraph("PREMIUM BEAUTY SALON", styles_dict['company_header']))
@@ -462,11 +562,7 @@ def generate_sales_receipt_pdf(sale, staff=None, customer=None, payment=None):
     
     # Divider line
     divider = Table([['']], colWidths=[6.5*inch])
-    divider.setStyle(TableStyle([
-        ('LINEBELOW', (0, 0), (0, 0), 1, colors.HexColor('#1e40af')),
-        ('TOPPADDING', (0, 0), (0, 0), 5),
-        ('BOTTOMPADDING', (0, 0), (0, 0), 5),
-    ]))
+    divider.setStyle(_DIVIDER_STYLE)
     elements.append(divider)
     elements.append(Spacer(1, 0.15*inch))
     
@@ -480,17 +576,7 @@ def generate_sales_receipt_pdf(sale, staff=None, customer=None, payment=None):
     ]
     
     receipt_header_table = Table(receipt_header_data, colWidths=[2.5*inch, 4*inch])
-    receipt_header_table.setStyle(TableStyle([
-        ('FONTNAME', (0, 0), (0, -1), 'Helvetica-Bold'),
-        ('FONTNAME', (1, 0), (1, -1), 'Helvetica'),
-        ('FONTSIZE', (0, 0), (-1, -1), 10),
-        ('ALIGN', (0, 0), (0, -1), 'LEFT'),
-        ('ALIGN', (1, 0), (1, -1), 'LEFT'),
-        ('VALIGN', (0, 0), (-1, -1), 'MIDDLE'),
-        ('BOTTOMPADDING', (0, 0), (-1, -1), 6),
-        ('TOPPADDING', (0, 0), (-1, -1), 6),
-        ('BACKGROUND', (0, 0), (0, -1), colors.HexColor('#f3f4f6')),
-    ]))
+    receipt_header_table.setStyle(_HEADER_TABLE_STYLE)
     elements.append(receipt_header_table)
     elements.append(Spacer(1, 0.25*inch))
     
@@ -504,16 +590,7 @@ def generate_sales_receipt_pdf(sale, staff=None, customer=None, payment=None):
         ]
         
         customer_table = Table(customer_data, colWidths=[2.5*inch, 4*inch])
-        customer_table.setStyle(TableStyle([
-            ('FONTNAME', (0, 0), (0, -1), 'Helvetica-Bold'),
-            ('FONTNAME', (1, 0), (1, -1), 'Helvetica'),
-            ('FONTSIZE', (0, 0), (-1, -1), 10),
-            ('ALIGN', (0, 0), (0, -1), 'LEFT'),
-            ('ALIGN', (1, 0), (1, -1), 'LEFT'),
-            ('VALIGN', (0, 0), (-1, -1), 'MIDDLE'),
-            ('BOTTOMPADDING', (0, 0), (-1, -1), 8),
-            ('TOPPADDING', (0, 0), (-1, -1), 4),
-        ]))
+        customer_table.setStyle(_INFO_TABLE_STYLE)
         elements.append(customer_table)
         elements.append(Spacer(1, 0.3*inch))
     
@@ -526,16 +603,7 @@ def generate_sales_receipt_pdf(sale, staff=None, customer=None, payment=None):
         ]
         
         staff_table = Table(staff_data, colWidths=[2.5*inch, 4*inch])
-        staff_table.setStyle(TableStyle([
-            ('FONTNAME', (0, 0), (0, -1), 'Helvetica-Bold'),
-            ('FONTNAME', (1, 0), (1, -1), 'Helvetica'),
-            ('FONTSIZE', (0, 0), (-1, -1), 10),
-            ('ALIGN', (0, 0), (0, -1), 'LEFT'),
-            ('ALIGN', (1, 0), (1, -1), 'LEFT'),
-            ('VALIGN', (0, 0), (-1, -1), 'MIDDLE'),
-            ('BOTTOMPADDING', (0, 0), (-1, -1), 8),
-            ('TOPPADDING', (0, 0), (-1, -1), 4),
-        ]))
+        staff_table.setStyle(_INFO_TABLE_STYLE)
         elements.append(staff_table)
         elements.append(Spacer(1, 0.3*inch))
     
@@ -554,17 +622,7 @@ def generate_sales_receipt_pdf(sale, staff=None, customer=None, payment=None):
             ])
         
         services_table = Table(services_table_data, colWidths=[3*inch, 0.8*inch, 1.2*inch, 1.5*inch])
-        services_table.setStyle(TableStyle([
-            ('FONTNAME', (0, 0), (-1, 0), 'Helvetica-Bold'),
-            ('FONTSIZE', (0, 0), (-1, -1), 10),
-            ('ALIGN', (0, 0), (0, -1), 'LEFT'),
-            ('ALIGN', (1, 0), (-1, -1), 'RIGHT'),
-            ('VALIGN', (0, 0), (-1, -1), 'MIDDLE'),
-            ('BOTTOMPADDING', (0, 0), (-1, -1), 8),
-            ('TOPPADDING', (0, 0), (-1, -1), 6),
-            ('BACKGROUND', (0, 0), (-1, 0), colors.HexColor('#e5e7eb')),
-            ('GRID', (0, 0), (-1, -1), 0.5, colors.grey),
-        ]))
+        services_table.setStyle(_LINE_ITEMS_TABLE_STYLE)
         elements.append(services_table)
         elements.append(Spacer(1, 0.3*inch))
     
@@ -583,17 +641,7 @@ def generate_sales_receipt_pdf(sale, staff=None, customer=None, payment=None):
             ])
         
         products_table = Table(products_table_data, colWidths=[3*inch, 0.8*inch, 1.2*inch, 1.5*inch])
-        products_table.setStyle(TableStyle([
-            ('FONTNAME', (0, 0), (-1, 0), 'Helvetica-Bold'),
-            ('FONTSIZE', (0, 0), (-1, -1), 10),
-            ('ALIGN', (0, 0), (0, -1), 'LEFT'),
-            ('ALIGN', (1, 0), (-1, -1), 'RIGHT'),
-            ('VALIGN', (0, 0), (-1, -1), 'MIDDLE'),
-            ('BOTTOMPADDING', (0, 0), (-1, -1), 8),
-            ('TOPPADDING', (0, 0), (-1, -1), 6),
-            ('BACKGROUND', (0, 0), (-1, 0), colors.HexColor('#e5e7eb')),
-            ('GRID', (0, 0), (-1, -1), 0.5, colors.grey),
-        ]))
+        products_table.setStyle(_LINE_ITEMS_TABLE_STYLE)
         elements.append(products_table)
         elements.append(Spacer(1, 0.3*inch))
     
@@ -616,31 +664,13 @@ def generate_sales_receipt_pdf(sale, staff=None, customer=None, payment=None):
             summary_data.append(['Transaction Code:', payment.transaction_code])
     
     summary_table = Table(summary_data, colWidths=[2.5*inch, 4*inch])
-    summary_table.setStyle(TableStyle([
-        ('FONTNAME', (0, 0), (0, -1), 'Helvetica-Bold'),
-        ('FONTNAME', (1, 0), (1, -1), 'Helvetica'),
-        ('FONTNAME', (1, 2), (1, 2), 'Helvetica-Bold'),
-        ('FONTSIZE', (0, 0), (-1, -1), 10),
-        ('FONTSIZE', (1, 2), (1, 2), 14),
-        ('ALIGN', (0, 0), (0, -1), 'LEFT'),
-        ('ALIGN', (1, 0), (1, -1), 'LEFT'),
-        ('VALIGN', (0, 0), (-1, -1), 'MIDDLE'),
-        ('BOTTOMPADDING', (0, 0), (-1, -1), 10),
-        ('TOPPADDING', (0, 0), (-1, -1), 6),
-        ('BACKGROUND', (0, 2), (-1, 2), colors.HexColor('#dbeafe')),
-        ('TEXTCOLOR', (1, 2), (1, 2), colors.HexColor('#1e40af')),
-        ('LINEBELOW', (0, 1), (-1, 1), 1, colors.grey),
-    ]))
+    summary_table.setStyle(_SUMMARY_TABLE_STYLE)
     elements.append(summary_table)
     elements.append(Spacer(1, 0.3*inch))
     
     # Footer
     footer_divider = Table([['']], colWidths=[6.5*inch])
-    footer_divider.setStyle(TableStyle([
-        ('LINEABOVE', (0, 0), (0, 0), 1, colors.grey),
-        ('TOPPADDING', (0, 0), (0, 0), 5),
-        ('BOTTOMPADDING', (0, 0), (0, 0), 5),
-    ]))
+    footer_divider.setStyle(_FOOTER_DIVIDER_STYLE)
     elements.append(footer_divider)
     elements.append(Spacer(1, 0.1*inch))
     elements.append(Paragraph("Thank you for your business!", styles_dict['footer']))
@@ -0,0 +1,108 @@
+"""
+Streaming ZIP export of sales receipts for a date range.
+
+GET /api/sales/receipts/export gives accountants every receipt PDF for a
+month in one download. Sales are read in chunks of RECEIPT_EXPORT_CHUNK_SIZE
+with Query.yield_per (each chunk's line items loaded by selectinload), each
+chunk's PDFs are rendered in parallel by the render pool (see
+render_pool.py), and every finished entry is written to the ZIP and sent
+before the next chunk is read. Only one chunk of sales and PDFs is held at a time, so memory stays
+flat however many receipts the range covers.
+
+Receipts already in the PDF cache (see pdf_cache.py) are read from disk, and
+newly rendered receipts of completed sales are added to it.
+"""
+import io
+import zipfile
+from models import Sale
+from pdf_generators import sales_receipt_fingerprint, sales_receipt_filename
+from pdf_cache import load_cached_pdf, store_cached_pdf
+from render_pool import get_pool, sale_snapshot, render_sales_receipt
+
+
+class _ZipStream(io.RawIOBase):
+    """Unseekable sink for zipfile; collects written bytes until drained."""
+
+    def __init__(self):
+        self._chunks = []
+
+    def writable(self):
+        return True
+
+    def write(self, data):
+        self._chunks.append(bytes(data))
+        return len(data)
+
+    def drain(self):
+        data = b''.join(self._chunks)
+        self._chunks = []
+        return data
+
+
+def _chunks(sales, size):
+    chunk = []
+    for sale in sales:
+        chunk.append(sale)
+        if len(chunk) == size:
+            yield chunk
+            chunk = []
+    if chunk:
+        yield chunk
+
+
+def _entry_name(sale):
+    """Path inside the archive: one folder per business day."""
+    day = sale.business_date.isoformat() if sale.business_date else 'undated'
+    return f"{day}/{sales_receipt_filename(sale)}"
+
+
+def stream_receipts_zip(query, chunk_size=100, render_processes=2):
+    """
+    Yield a ZIP archive of the receipts for the sales a query returns.
+
+    Must be iterated inside an app context (use stream_with_context).
+    Sales whose receipt fails to render are listed in errors.txt at the end
+    of the archive instead of aborting the download.
+
+    Args:
+        query: Sale query, already filtered and ordered
+        chunk_size: Sales loaded and rendered per round trip
+        render_processes: Size of the render pool if it isn't running yet
+
+    Yields:
+        bytes: Consecutive pieces of the ZIP file
+    """
+    stream = _ZipStream()
+    archive = zipfile.ZipFile(stream, mode='w', compression=zipfile.ZIP_STORED)
+    pool = get_pool(render_processes)
+    errors = []
+
+    # Query.yield_per, not execution_options(yield_per=...): only the former
+    # stops the legacy Query from uniquifying the joined staff/customer/payment
+    # rows, which SQLAlchemy refuses to combine with yield_per
+    sales = query.options(*Sale.receipt_load_options()).yield_per(chunk_size)
+    for chunk in _chunks(sales, chunk_size):
+        pending = []
+        for sale in chunk:
+            snapshot = sale_snapshot(sale)
+            fingerprint = sales_receipt_fingerprint(snapshot, snapshot.staff, snapshot.customer, snapshot.payment)
+            data = load_cached_pdf('sales_receipt', fingerprint) if sale.status == 'completed' else None
+            future = pool.submit(render_sales_receipt, snapshot) if data is None else None
+            pending.append((sale, fingerprint, data, future))
+
+        for sale, fingerprint, data, future in pending:
+            if future is not None:
+                try:
+                    data = future.result()
+                except Exception as e:
+                    errors.append(f"{sale.sale_number or sale.id}: {e}")
+                    continue
+                if sale.status == 'completed':
+                    store_cached_pdf('sales_receipt', fingerprint, data)
+            archive.writestr(_entry_name(sale), data)
+            yield stream.drain()
+
+    if errors:
+        archive.writestr('errors.txt', '\n'.join(errors) + '\n')
+    archive.close()
+    yield stream.drain()
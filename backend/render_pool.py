@@ -0,0 +1,115 @@
+"""
+Process pool for CPU-bound ReportLab rendering.
+
+Building a receipt or payslip is pure Python and holds the GIL for tens of
+milliseconds, which stalls every greenlet in the gevent worker. Background
+jobs and bulk exports hand that work to a small pool of processes instead.
+
+Children are started with the 'spawn' method so they never inherit the
+worker's database connections or gevent hub; they import only this module
+and pdf_generators. ORM objects can't cross the process boundary, so callers
+first copy what the document prints into plain SimpleNamespace snapshots
+(sale_snapshot, payslip_snapshot) that the generators read like the models.
+
+The pool is per process (see gunicorn.conf.py) and sized by RENDER_PROCESSES.
+"""
+import multiprocessing
+import threading
+from concurrent.futures import ProcessPoolExecutor
+from types import SimpleNamespace
+from pdf_generators import generate_sales_receipt_pdf, generate_commission_receipt_pdf
+
+_pool = None
+_pool_lock = threading.Lock()
+
+
+def get_pool(max_workers=2):
+    """Return the process's render pool, starting it on first use."""
+    global _pool
+    with _pool_lock:
+        if _pool is None:
+            _pool = ProcessPoolExecutor(
+                max_workers=max(1, max_workers),
+                mp_context=multiprocessing.get_context('spawn')
+            )
+        return _pool
+
+
+def _copy(obj, fields):
+    """Snapshot the given attributes of a model instance (None stays None)."""
+    if obj is None:
+        return None
+    return SimpleNamespace(**{field: getattr(obj, field, None) for field in fields})
+
+
+def sale_snapshot(sale):
+    """
+    Copy everything generate_sales_receipt_pdf prints from a loaded sale.
+
+    Load the sale with Sale.receipt_load_options() first to avoid lazy loads.
+
+    Returns:
+        SimpleNamespace: picklable stand-in for the sale, with staff, customer
+        and payment attached as attributes
+    """
+    sale_services = []
+    for ss in sale.sale_services:
+        item = _copy(ss, ('service_id', 'quantity', 'unit_price', 'total_price'))
+        item.service = _copy(ss.service, ('name',))
+        sale_services.append(item)
+    sale_products = []
+    for sp in sale.sale_products:
+        item = _copy(sp, ('product_id', 'quantity', 'unit_price', 'total_price'))
+        item.product = _copy(sp.product, ('name',))
+        sale_products.append(item)
+
+    snapshot = _copy(sale, (
+        'id', 'sale_number', 'staff_id', 'status', 'created_at',
+        'subtotal', 'tax_amount', 'total_amount'
+    ))
+    snapshot.sale_services = sale_services
+    snapshot.sale_products = sale_products
+    snapshot.staff = _copy(sale.staff, ('name', 'role'))
+    snapshot.customer = _copy(sale.customer, ('name', 'phone', 'email'))
+    snapshot.payment = _copy(sale.payment, ('receipt_number', 'payment_method', 'transaction_code'))
+    return snapshot
+
+
+def payslip_snapshot(payment, staff, payer=None):
+    """
+    Copy everything generate_commission_receipt_pdf prints from a payment.
+
+    Returns:
+        SimpleNamespace: picklable stand-in for the payment, with staff, payer
+        and items attached as attributes
+    """
+    snapshot = _copy(payment, (
+        'id', 'receipt_number', 'staff_id', 'period_start', 'period_end', 'payment_date',
+        'base_pay', 'gross_pay', 'total_deductions', 'net_pay',
+        'payment_method', 'transaction_reference', 'notes'
+    ))
+    snapshot.items = [
+        _copy(item, (
+            'item_type', 'item_name', 'amount', 'is_percentage', 'percentage_of',
+            'display_order', 'sale_number'
+        ))
+        for item in payment.items
+    ]
+    snapshot.staff = _copy(staff, ('name', 'role'))
+    snapshot.payer = _copy(payer, ('name', 'role'))
+    return snapshot
+
+
+def render_sales_receipt(snapshot):
+    """Render a sale_snapshot to PDF bytes (runs in a pool process)."""
+    return generate_sales_receipt_pdf(
+        sale=snapshot,
+        staff=snapshot.staff,
+        customer=snapshot.customer,
+        payment=snapshot.payment
+    ).getvalue()
+
+
+def render_payslip(snapshot):
+    """Render a payslip_snapshot to PDF bytes (runs in a pool process)."""
+    return generate_commission_receipt_pdf(snapshot, snapshot.staff, snapshot.payer).getvalue()
@@ -2,37 +2,95 @@
 Report calculation functions for the POS Salon backend.
 """
 from datetime import datetime, date, timedelta
-from sqlalchemy import func, or_, and_
-from models import Sale, Payment, Expense, CommissionPayment, CommissionPaymentItem, Staff
+from sqlalchemy import func, or_, and_, case
+from models import Sale, SaleService, SaleProduct, Payment, Expense, CommissionPayment, CommissionPaymentItem, Staff
 from utils import get_demo_filter
+from business_time import business_today
+from sales_rollup import get_rollup_totals, split_rollup_range
 
 
-def _calculate_services_products_revenue(sales):
+def _business_day(value):
+    """Salon business date of a report bound (bounds are salon-local days, not UTC instants)."""
+    return value.date() if isinstance(value, datetime) else value
+
+
+def _calculate_services_products_revenue(db_session, *sale_criteria):
     """
-    Calculate revenue breakdown from sales (services vs products).
+    Calculate revenue breakdown (services vs products) for matching sales.
+    
+    Sums line items in SQL so no Sale objects are loaded.
     
     Args:
-        sales: List of Sale objects
+        db_session: SQLAlchemy session
+        *sale_criteria: Filter expressions on Sale
     
     Returns:
         tuple: (services_revenue, products_revenue, total_revenue)
     """
-    services_revenue = 0
-    products_revenue = 0
+    services_revenue = db_session.query(
+        func.coalesce(func.sum(SaleService.total_price), 0)
+    ).join(Sale, SaleService.sale_id == Sale.id).filter(*sale_criteria).scalar() or 0
     
-    for sale in sales:
-        # Revenue from services
-        for sale_service in sale.sale_services:
-            services_revenue += sale_service.total_price
-        
-        # Revenue from products
-        for sale_product in sale.sale_products:
-            products_revenue += sale_product.total_price
+    products_revenue = db_session.query(
+        func.coalesce(func.sum(SaleProduct.total_price), 0)
+    ).join(Sale, SaleProduct.sale_id == Sale.id).filter(*sale_criteria).scalar() or 0
     
     total_revenue = services_revenue + products_revenue
     return services_revenue, products_revenue, total_revenue
 
 
+def _sale_totals(db_session, *sale_criteria):
+    """
+    Aggregate sale-level totals for matching sales in a single statement.
+    
+    Args:
+        db_session: SQLAlchemy session
+        *sale_criteria: Filter expressions on Sale
+    
+    Returns:
+        dict: transaction_count, total_amount, total_commission, staff_count
+    """
+    row = db_session.query(
+        func.count(Sale.id),
+        func.coalesce(func.sum(Sale.total_amount), 0),
+        func.coalesce(func.sum(Sale.commission_amount), 0),
+        func.count(func.distinct(Sale.staff_id))
+    ).filter(*sale_criteria).one()
+    
+    return {
+        'transaction_count': row[0] or 0,
+        'total_amount': row[1] or 0,
+        'total_commission': row[2] or 0,
+        'staff_count': row[3] or 0
+    }
+
+
+def _commission_paid_by_staff(db_session, staff_ids, is_demo):
+    """
+    Sum commission paid per staff member (gross_pay, falling back to amount_paid).
+    
+    Args:
+        db_session: SQLAlchemy session
+        staff_ids: Staff IDs to include
+        is_demo: Demo flag to filter on
+    
+    Returns:
+        dict: staff_id -> paid amount
+    """
+    if not staff_ids:
+        return {}
+    
+    rows = db_session.query(
+        CommissionPayment.staff_id,
+        func.sum(func.coalesce(CommissionPayment.gross_pay, CommissionPayment.amount_paid))
+    ).filter(
+        CommissionPayment.staff_id.in_(staff_ids),
+        CommissionPayment.is_demo == is_demo
+    ).group_by(CommissionPayment.staff_id).all()
+    
+    return {staff_id: paid or 0 for staff_id, paid in rows}
+
+
 def calculate_daily_sales_report(target_date, demo_filter, db_session):
     """
     Calculate daily sales report (Z-report).
@@ -45,34 +103,64 @@ def calculate_daily_sales_report(target_date, demo_filter, db_session):
     Returns:
         dict: Report data
     """
-    # Get all completed sales for the date
-    start_datetime = datetime.combine(target_date, datetime.min.time())
-    end_datetime = datetime.combine(target_date, datetime.max.time())
-    
-    sales = db_session.query(Sale).filter(
+    sale_criteria = (
         Sale.status == 'completed',
-        Sale.created_at >= start_datetime,
-        Sale.created_at <= end_datetime,
+        Sale.business_date == target_date,
         Sale.is_demo == demo_filter['is_demo']
-    ).all()
-    
-    # Calculate totals from sales - separate services and products
-    services_revenue, products_revenue, total_revenue = _calculate_services_products_revenue(sales)
+    )
     
-    total_commission = sum(sale.commission_amount for sale in sales)  # Commission only from services
+    # Closed days come from the rollup; today is summed from raw sales
+    rollup = None
+    if target_date < business_today():
+        rollup = get_rollup_totals(target_date, target_date, demo_filter['is_demo'], db_session)
+    
+    if rollup is not None:
+        services_revenue = rollup['services_revenue']
+        products_revenue = rollup['products_revenue']
+        total_revenue = services_revenue + products_revenue
+        total_commission = rollup['commission_amount']
+        transaction_count = rollup['transaction_count']
+    else:
+        # Calculate totals from sales - separate services and products
+        services_revenue, products_revenue, total_revenue = _calculate_services_products_revenue(db_session, *sale_criteria)
+        totals = _sale_totals(db_session, *sale_criteria)
+        total_commission = totals['total_commission']  # Commission only from services
+        transaction_count = totals['transaction_count']
+    
+    # Payment method breakdown - one payment per sale, read as plain rows. Always
+    # from the payments themselves, so edited payments agree with the list below
+    payment_rows = db_session.query(
+        Payment.id,
+        Payment.sale_id,
+        Payment.appointment_id,
+        Payment.amount,
+        Payment.payment_method,
+        Payment.status,
+        Payment.transaction_code,
+        Payment.receipt_number,
+        Payment.created_at
+    ).join(Sale, Payment.sale_id == Sale.id).filter(*sale_criteria).order_by(Payment.id).all()
     
-    # Payment method breakdown - get from payments
     payment_methods = {}
     payments_list = []
-    for sale in sales:
-        payment = sale.payment if hasattr(sale, 'payment') and sale.payment else db_session.query(Payment).filter_by(sale_id=sale.id).first()
-        if payment:
-            method = payment.payment_method or 'cash'
-            payment_methods[method] = payment_methods.get(method, 0) + payment.amount
-            payments_list.append(payment)
-    
-    # Transaction count
-    transaction_count = len(sales)
+    seen_sales = set()
+    for row in payment_rows:
+        if row.sale_id in seen_sales:
+            continue
+        seen_sales.add(row.sale_id)
+        method = row.payment_method or 'cash'
+        payment_methods[method] = payment_methods.get(method, 0) + row.amount
+        payments_list.append({
+            'id': row.id,
+            'sale_id': row.sale_id,
+            'appointment_id': row.appointment_id,
+            'amount': row.amount,
+            'payment_method': row.payment_method,
+            'status': row.status,
+            'transaction_code': row.transaction_code,
+            'receipt_number': row.receipt_number,
+            'created_at': row.created_at.isoformat() if row.created_at else None
+        })
     
     # VAT calculation (16%)
     vat_rate = 0.16
@@ -90,7 +178,7 @@ def calculate_daily_sales_report(target_date, demo_filter, db_session):
         'total_commission': round(total_commission, 2),
         'transaction_count': transaction_count,
         'payment_methods': {k: round(v, 2) for k, v in payment_methods.items()},
-        'payments': [p.to_dict() for p in payments_list]
+        'payments': payments_list
     }
 
 
@@ -112,64 +200,42 @@ def calculate_commission_payout_report(start_date, end_date, staff_id, demo_filt
     if use_detailed:
         return calculate_detailed_commission_payout_report(start_date, end_date, staff_id, demo_filter, db_session)
     
-    # Get completed sales in date range
-    query = db_session.query(Sale).filter(
+    # Commission by staff for completed sales in date range
+    query = db_session.query(
+        Sale.staff_id,
+        Staff.name,
+        func.coalesce(func.sum(Sale.subtotal), 0),
+        func.coalesce(func.sum(Sale.commission_amount), 0),
+        func.count(Sale.id)
+    ).outerjoin(Staff, Sale.staff_id == Staff.id).filter(
         Sale.status == 'completed',
-        Sale.created_at >= start_date,
-        Sale.created_at <= end_date,
-        Sale.is_demo == demo_filter['is_demo']
+        Sale.business_date >= _business_day(start_date),
+        Sale.business_date <= _business_day(end_date),
+        Sale.is_demo == demo_filter['is_demo'],
+        Sale.staff_id.isnot(None)
     )
     
     if staff_id:
         query = query.filter(Sale.staff_id == staff_id)
     
-    sales = query.all()
+    rows = query.group_by(Sale.staff_id, Staff.name).order_by(func.min(Sale.id)).all()
     
-    # Calculate commission by staff
-    staff_commissions = {}
+    # Paid commissions - gross_pay if available, otherwise amount_paid
+    paid_by_staff = _commission_paid_by_staff(db_session, [row[0] for row in rows], demo_filter['is_demo'])
     
-    for sale in sales:
-        if not sale.staff_id:
-            continue
-        
-        if sale.staff_id not in staff_commissions:
-            staff_commissions[sale.staff_id] = {
-                'staff_id': sale.staff_id,
-                'staff_name': sale.staff.name if sale.staff else 'Unknown',
-                'total_sales': 0,
-                'total_commission': 0,
-                'transaction_count': 0
-            }
-        
-        staff_commissions[sale.staff_id]['total_sales'] += sale.subtotal
-        staff_commissions[sale.staff_id]['total_commission'] += sale.commission_amount
-        staff_commissions[sale.staff_id]['transaction_count'] += 1
-    
-    # Round values and subtract paid commissions
-    # Use gross_pay if available, otherwise fall back to amount_paid
-    for staff_id_key in staff_commissions:
-        staff_commissions[staff_id_key]['total_sales'] = round(staff_commissions[staff_id_key]['total_sales'], 2)
-        staff_commissions[staff_id_key]['total_commission'] = round(staff_commissions[staff_id_key]['total_commission'], 2)
-        
-        # Get paid commissions - prefer gross_pay if available, otherwise use amount_paid
-        paid_query = db_session.query(CommissionPayment).filter(
-            CommissionPayment.staff_id == staff_id_key,
-            CommissionPayment.is_demo == demo_filter['is_demo']
-        )
-        
-        # Calculate paid amount using gross_pay if available
-        paid_commissions = 0
-        payments = paid_query.all()
-        for payment in payments:
-            if payment.gross_pay is not None:
-                paid_commissions += payment.gross_pay
-            else:
-                paid_commissions += payment.amount_paid
-        
-        staff_commissions[staff_id_key]['paid_amount'] = round(paid_commissions, 2)
-        staff_commissions[staff_id_key]['pending_amount'] = round(
-            staff_commissions[staff_id_key]['total_commission'] - paid_commissions, 2
-        )
+    staff_commissions = {}
+    for row_staff_id, staff_name, total_sales, commission, transaction_count in rows:
+        total_commission = round(commission or 0, 2)
+        paid_commissions = paid_by_staff.get(row_staff_id, 0)
+        staff_commissions[row_staff_id] = {
+            'staff_id': row_staff_id,
+            'staff_name': staff_name or 'Unknown',
+            'total_sales': round(total_sales or 0, 2),
+            'total_commission': total_commission,
+            'transaction_count': transaction_count,
+            'paid_amount': round(paid_commissions, 2),
+            'pending_amount': round(total_commission - paid_commissions, 2)
+        }
     
     total_commission = sum(s['total_commission'] for s in staff_commissions.values())
     total_paid = sum(s['paid_amount'] for s in staff_commissions.values())
@@ -201,16 +267,28 @@ def calculate_detailed_commission_payout_report(start_date, end_date, staff_id,
         dict: Detailed report data with earnings/deductions breakdown
     """
     # Get commission payments in date range (filter by payment_date or period)
-    query = db_session.query(CommissionPayment).filter(
+    query = db_session.query(
+        CommissionPayment.id,
+        CommissionPayment.staff_id,
+        CommissionPayment.receipt_number,
+        CommissionPayment.period_start,
+        CommissionPayment.period_end,
+        CommissionPayment.payment_date,
+        CommissionPayment.base_pay,
+        CommissionPayment.gross_pay,
+        CommissionPayment.total_deductions,
+        CommissionPayment.net_pay,
+        CommissionPayment.amount_paid
+    ).filter(
         CommissionPayment.is_demo == demo_filter['is_demo'],
         or_(
             and_(
-                CommissionPayment.payment_date >= start_date,
-                CommissionPayment.payment_date <= end_date
+                CommissionPayment.business_date >= _business_day(start_date),
+                CommissionPayment.business_date <= _business_day(end_date)
             ),
             and_(
-                CommissionPayment.period_start <= end_date.date(),
-                CommissionPayment.period_end >= start_date.date()
+                CommissionPayment.period_start <= _business_day(end_date),
+                CommissionPayment.period_end >= _business_day(start_date)
             )
         )
     )
@@ -220,6 +298,29 @@ def calculate_detailed_commission_payout_report(start_date, end_date, staff_id,
     
     payments = query.order_by(CommissionPayment.period_start, CommissionPayment.staff_id).all()
     
+    # Load line items and staff names for all payments up front
+    payment_ids = [payment.id for payment in payments]
+    items_by_payment = {}
+    if payment_ids:
+        item_rows = db_session.query(
+            CommissionPaymentItem.commission_payment_id,
+            CommissionPaymentItem.item_type,
+            CommissionPaymentItem.item_name,
+            CommissionPaymentItem.amount,
+            CommissionPaymentItem.is_percentage,
+            CommissionPaymentItem.service_name,
+            CommissionPaymentItem.sale_number
+        ).filter(
+            CommissionPaymentItem.commission_payment_id.in_(payment_ids)
+        ).order_by(CommissionPaymentItem.id).all()
+        for item in item_rows:
+            items_by_payment.setdefault(item.commission_payment_id, []).append(item)
+    
+    staff_ids = {payment.staff_id for payment in payments}
+    staff_names = dict(
+        db_session.query(Staff.id, Staff.name).filter(Staff.id.in_(staff_ids)).all()
+    ) if staff_ids else {}
+    
     # Group by staff
     staff_data = {}
     
@@ -227,10 +328,10 @@ def calculate_detailed_commission_payout_report(start_date, end_date, staff_id,
         staff_id_key = payment.staff_id
         
         if staff_id_key not in staff_data:
-            staff = Staff.query.get(staff_id_key)
+            staff_name = staff_names.get(staff_id_key)
             staff_data[staff_id_key] = {
                 'staff_id': staff_id_key,
-                'staff_name': staff.name if staff else f'Staff {staff_id_key}',
+                'staff_name': staff_name if staff_name else f'Staff {staff_id_key}',
                 'payments': [],
                 'totals': {
                     'total_gross_pay': 0,
@@ -244,8 +345,9 @@ def calculate_detailed_commission_payout_report(start_date, end_date, staff_id,
             }
         
         # Get earnings and deductions breakdown
-        earnings_items = [item for item in payment.items if item.item_type == 'earning'] if payment.items else []
-        deductions_items = [item for item in payment.items if item.item_type == 'deduction'] if payment.items else []
+        payment_items = items_by_payment.get(payment.id, [])
+        earnings_items = [item for item in payment_items if item.item_type == 'earning']
+        deductions_items = [item for item in payment_items if item.item_type == 'deduction']
         
         # Organize earnings breakdown
         earnings_breakdown = {
@@ -370,85 +472,93 @@ def calculate_financial_summary(start_date, end_date, demo_filter, db_session, c
     Returns:
         dict: Summary data
     """
+    start_day = _business_day(start_date)
+    end_day = _business_day(end_date)
+    
     # Revenue from completed sales - separate services and products
-    sales = db_session.query(Sale).filter(
+    sale_criteria = (
         Sale.status == 'completed',
-        Sale.created_at >= start_date,
-        Sale.created_at <= end_date,
+        Sale.business_date >= start_day,
+        Sale.business_date <= end_day,
         Sale.is_demo == demo_filter['is_demo']
-    ).all()
+    )
     
-    services_revenue, products_revenue, total_revenue = _calculate_services_products_revenue(sales)
+    services_revenue, products_revenue, total_revenue = _calculate_services_products_revenue(db_session, *sale_criteria)
+    sale_totals = _sale_totals(db_session, *sale_criteria)
     
     vat_rate = 0.16
     vat_amount = total_revenue * vat_rate / (1 + vat_rate)
     revenue_before_vat = total_revenue - vat_amount
     
-    # Expenses
-    expenses = db_session.query(Expense).filter(
-        Expense.expense_date >= start_date,
-        Expense.expense_date <= end_date,
+    # Expenses by category
+    expense_rows = db_session.query(
+        Expense.category,
+        func.sum(Expense.amount)
+    ).filter(
+        Expense.business_date >= start_day,
+        Expense.business_date <= end_day,
         Expense.is_demo == demo_filter['is_demo']
-    ).all()
+    ).group_by(Expense.category).all()
     
-    total_expenses = sum(e.amount for e in expenses)
-    
-    # Expenses by category
     expenses_by_category = {}
-    for expense in expenses:
-        category = expense.category or 'other'
-        expenses_by_category[category] = expenses_by_category.get(category, 0) + expense.amount
+    for category, amount in expense_rows:
+        category = category or 'other'
+        expenses_by_category[category] = expenses_by_category.get(category, 0) + (amount or 0)
+    
+    total_expenses = sum(expenses_by_category.values())
     
     # Commission from sales (earned) - this is what staff earned from sales
-    total_commission_earned = sum(sale.commission_amount for sale in sales)
+    total_commission_earned = sale_totals['total_commission']
     
     # Commission payments made in this period (use gross_pay for accurate cost calculation)
-    commission_payments = db_session.query(CommissionPayment).filter(
+    payment_criteria = (
         CommissionPayment.is_demo == demo_filter['is_demo'],
-        CommissionPayment.payment_date >= start_date,
-        CommissionPayment.payment_date <= end_date
-    ).all()
+        CommissionPayment.business_date >= start_day,
+        CommissionPayment.business_date <= end_day
+    )
+    
+    payment_totals = db_session.query(
+        func.coalesce(func.sum(func.coalesce(CommissionPayment.gross_pay, CommissionPayment.amount_paid)), 0),
+        func.coalesce(func.sum(CommissionPayment.base_pay), 0),
+        func.coalesce(func.sum(CommissionPayment.total_deductions), 0),
+        func.coalesce(func.sum(case(
+            (and_(CommissionPayment.net_pay.isnot(None), CommissionPayment.net_pay != 0), CommissionPayment.net_pay),
+            else_=CommissionPayment.amount_paid
+        )), 0),
+        func.coalesce(func.sum(CommissionPayment.amount_paid), 0)
+    ).filter(*payment_criteria).one()
+    
+    total_gross_pay, total_base_pay, total_deductions, total_net_paid, total_amount_paid = (
+        value or 0 for value in payment_totals
+    )
     
-    # Calculate accurate commission costs using new structure
-    total_base_pay = 0
+    # Breakdown from earning items, summed per item name and classified here
+    # so matching stays case-sensitive on every database
     total_commissions_paid = 0
     total_bonuses_paid = 0
     total_tips_paid = 0
-    total_gross_pay = 0
-    total_deductions = 0
-    total_net_paid = 0
     
-    for payment in commission_payments:
-        if payment.gross_pay is not None:
-            total_gross_pay += payment.gross_pay
-        else:
-            total_gross_pay += payment.amount_paid
-        
-        if payment.base_pay:
-            total_base_pay += payment.base_pay
-        
-        if payment.total_deductions:
-            total_deductions += payment.total_deductions
-        
-        if payment.net_pay:
-            total_net_paid += payment.net_pay
-        else:
-            total_net_paid += payment.amount_paid
-        
-        # Breakdown from items if available
-        if payment.items:
-            for item in payment.items:
-                if item.item_type == 'earning':
-                    if 'Commission' in item.item_name:
-                        total_commissions_paid += item.amount
-                    elif 'Bonus' in item.item_name:
-                        total_bonuses_paid += item.amount
-                    elif 'Tip' in item.item_name:
-                        total_tips_paid += item.amount
+    item_rows = db_session.query(
+        CommissionPaymentItem.item_name,
+        func.sum(CommissionPaymentItem.amount)
+    ).join(
+        CommissionPayment, CommissionPaymentItem.commission_payment_id == CommissionPayment.id
+    ).filter(
+        CommissionPaymentItem.item_type == 'earning',
+        *payment_criteria
+    ).group_by(CommissionPaymentItem.item_name).all()
+    
+    for item_name, amount in item_rows:
+        if 'Commission' in item_name:
+            total_commissions_paid += amount or 0
+        elif 'Bonus' in item_name:
+            total_bonuses_paid += amount or 0
+        elif 'Tip' in item_name:
+            total_tips_paid += amount or 0
     
     # Fallback: if no detailed structure, use amount_paid
     if total_gross_pay == 0:
-        total_gross_pay = sum(cp.amount_paid for cp in commission_payments)
+        total_gross_pay = total_amount_paid
         total_net_paid = total_gross_pay
     
     total_commission_pending = total_commission_earned - total_commissions_paid
@@ -463,12 +573,12 @@ def calculate_financial_summary(start_date, end_date, demo_filter, db_session, c
     profit_margin = round((net_profit / total_revenue * 100) if total_revenue > 0 else 0, 2)
     
     # Additional metrics
-    transaction_count = len(sales)
+    transaction_count = sale_totals['transaction_count']
     avg_transaction_value = round(total_revenue / transaction_count, 2) if transaction_count > 0 else 0
     
-    # Get unique staff count
-    unique_staff = set(sale.staff_id for sale in sales if sale.staff_id)
-    revenue_per_staff = round(total_revenue / len(unique_staff), 2) if unique_staff else 0
+    # Unique staff count
+    staff_count = sale_totals['staff_count']
+    revenue_per_staff = round(total_revenue / staff_count, 2) if staff_count else 0
     
     commission_rate = round((total_commission_earned / total_revenue * 100) if total_revenue > 0 else 0, 2)
     operating_margin = profit_margin
@@ -519,7 +629,7 @@ def calculate_financial_summary(start_date, end_date, demo_filter, db_session, c
     
     # Add period comparison if requested
     if compare_with_previous:
-        period_days = (end_date.date() - start_date.date()).days + 1
+        period_days = (end_day - start_day).days + 1
         prev_start = start_date - timedelta(days=period_days)
         prev_end = start_date - timedelta(days=1)
         comparison_data = calculate_period_comparison(
@@ -545,22 +655,27 @@ def calculate_cash_flow(start_date, end_date, demo_filter, db_session, total_exp
     Returns:
         dict: Cash flow data
     """
+    start_day = _business_day(start_date)
+    end_day = _business_day(end_date)
+    
     # Cash in: Total payments received
-    payments = db_session.query(Payment).filter(
-        Payment.created_at >= start_date,
-        Payment.created_at <= end_date,
-        Payment.status == 'completed'
-    ).join(Sale).filter(
+    method_rows = db_session.query(
+        Payment.payment_method,
+        func.sum(Payment.amount)
+    ).join(Sale, Payment.sale_id == Sale.id).filter(
+        Payment.business_date >= start_day,
+        Payment.business_date <= end_day,
+        Payment.status == 'completed',
         Sale.is_demo == demo_filter['is_demo']
-    ).all()
-    
-    cash_in = sum(p.amount for p in payments)
+    ).group_by(Payment.payment_method).all()
     
     # Payment method breakdown
     payment_methods = {}
-    for payment in payments:
-        method = payment.payment_method or 'cash'
-        payment_methods[method] = payment_methods.get(method, 0) + payment.amount
+    for method, amount in method_rows:
+        method = method or 'cash'
+        payment_methods[method] = payment_methods.get(method, 0) + (amount or 0)
+    
+    cash_in = sum(payment_methods.values())
     
     # Cash out: Expenses + Commission payments made
     cash_out = total_expenses + total_commission_costs
@@ -568,39 +683,44 @@ def calculate_cash_flow(start_date, end_date, demo_filter, db_session, total_exp
     # Net cash flow
     net_cash_flow = cash_in - cash_out
     
-    # Daily breakdown
+    # Daily breakdown - one grouped query per source, merged by day
+    payments_by_day = dict(db_session.query(
+        Payment.business_date,
+        func.sum(Payment.amount)
+    ).join(Sale, Payment.sale_id == Sale.id).filter(
+        Payment.business_date >= start_day,
+        Payment.business_date <= end_day,
+        Payment.status == 'completed',
+        Sale.is_demo == demo_filter['is_demo']
+    ).group_by(Payment.business_date).all())
+    
+    expenses_by_day = dict(db_session.query(
+        Expense.business_date,
+        func.sum(Expense.amount)
+    ).filter(
+        Expense.business_date >= start_day,
+        Expense.business_date <= end_day,
+        Expense.is_demo == demo_filter['is_demo']
+    ).group_by(Expense.business_date).all())
+    
+    commissions_by_day = dict(db_session.query(
+        CommissionPayment.business_date,
+        func.sum(case(
+            (and_(CommissionPayment.gross_pay.isnot(None), CommissionPayment.gross_pay != 0), CommissionPayment.gross_pay),
+            else_=CommissionPayment.amount_paid
+        ))
+    ).filter(
+        CommissionPayment.business_date >= start_day,
+        CommissionPayment.business_date <= end_day,
+        CommissionPayment.is_demo == demo_filter['is_demo']
+    ).group_by(CommissionPayment.business_date).all())
+    
     daily_breakdown = []
-    current_date = start_date.date()
-    end_date_only = end_date.date()
+    current_date = start_day
     
-    while current_date <= end_date_only:
-        day_start = datetime.combine(current_date, datetime.min.time())
-        day_end = datetime.combine(current_date, datetime.max.time())
-        
-        day_payments = db_session.query(Payment).filter(
-            Payment.created_at >= day_start,
-            Payment.created_at <= day_end,
-            Payment.status == 'completed'
-        ).join(Sale).filter(
-            Sale.is_demo == demo_filter['is_demo']
-        ).all()
-        
-        day_expenses = db_session.query(Expense).filter(
-            Expense.expense_date >= day_start,
-            Expense.expense_date <= day_end,
-            Expense.is_demo == demo_filter['is_demo']
-        ).all()
-        
-        day_commissions = db_session.query(CommissionPayment).filter(
-            CommissionPayment.payment_date >= day_start,
-            CommissionPayment.payment_date <= day_end,
-            CommissionPayment.is_demo == demo_filter['is_demo']
-        ).all()
-        
-        day_cash_in = sum(p.amount for p in day_payments)
-        day_cash_out = sum(e.amount for e in day_expenses) + sum(
-            cp.gross_pay if cp.gross_pay else cp.amount_paid for cp in day_commissions
-        )
+    while current_date <= end_day:
+        day_cash_in = payments_by_day.get(current_date) or 0
+        day_cash_out = (expenses_by_day.get(current_date) or 0) + (commissions_by_day.get(current_date) or 0)
         
         daily_breakdown.append({
             'date': current_date.isoformat(),
@@ -697,7 +817,7 @@ def calculate_tax_report(month, demo_filter, db_session):
             end_dt = datetime(year, month_num + 1, 1) - timedelta(days=1)
     else:
         # Current month
-        today = date.today()
+        today = business_today()
         start_dt = datetime(today.year, today.month, 1)
         if today.month == 12:
             end_dt = datetime(today.year + 1, 1, 1) - timedelta(days=1)
@@ -705,25 +825,36 @@ def calculate_tax_report(month, demo_filter, db_session):
             end_dt = datetime(today.year, today.month + 1, 1) - timedelta(days=1)
     
     # Get all completed sales for the month
-    sales = db_session.query(Sale).filter(
-        Sale.status == 'completed',
-        Sale.created_at >= start_dt,
-        Sale.created_at <= end_dt,
-        Sale.is_demo == demo_filter['is_demo']
-    ).all()
+    # Closed days come from the rollup; today onwards from raw sales
+    rollup_range, raw_range = split_rollup_range(start_dt.date(), end_dt.date())
+    total_revenue = 0
+    transaction_count = 0
+    
+    if rollup_range:
+        rollup = get_rollup_totals(rollup_range[0], rollup_range[1], demo_filter['is_demo'], db_session)
+        total_revenue += rollup['total_amount']
+        transaction_count += rollup['transaction_count']
+    
+    if raw_range:
+        totals = _sale_totals(
+            db_session,
+            Sale.status == 'completed',
+            Sale.business_date >= raw_range[0],
+            Sale.business_date <= raw_range[1],
+            Sale.is_demo == demo_filter['is_demo']
+        )
+        total_revenue += totals['total_amount']
+        transaction_count += totals['transaction_count']
     
-    total_revenue = sum(sale.total_amount for sale in sales)
     vat_rate = 0.16
     vat_amount = total_revenue * vat_rate / (1 + vat_rate)
     revenue_before_vat = total_revenue - vat_amount
     
-    transaction_count = len(sales)
-    
     return {
         'period': {
             'start_date': start_dt.isoformat(),
             'end_date': end_dt.isoformat(),
-            'month': month or f"{date.today().year}-{date.today().month:02d}"
+            'month': month or start_dt.strftime('%Y-%m')
         },
         'sales': {
             'total_sales': round(total_revenue, 2),
@@ -22,6 +22,7 @@ from routes_settings import bp_settings
 from routes_slot_blockers import bp_slot_blockers
 from routes_checkout import bp_checkout
 from routes_webhooks import bp_webhooks
+from routes_jobs import bp_jobs
 
 # Create main blueprint
 bp = Blueprint('api', __name__, url_prefix='/api')
@@ -44,4 +45,5 @@ bp.register_blueprint(bp_shifts)
 bp.register_blueprint(bp_dashboard)
 bp.register_blueprint(bp_appointments)
 bp.register_blueprint(bp_settings)
-bp.register_blueprint(bp_slot_blockers)
\ No newline at end of file
+bp.register_blueprint(bp_slot_blockers)
+bp.register_blueprint(bp_jobs)
\ No newline at end of file
@@ -4,13 +4,13 @@ Appointment routes for the POS Salon backend.
 from flask import Blueprint, request, jsonify, current_app, send_file
 from models import Appointment, AppointmentService, Customer, Staff, Service, Sale, Resource, AppointmentNote, User
 from db import db
-from utils import get_demo_filter, export_appointments_ical, export_appointments_csv, check_slot_availability
-from sqlalchemy.orm import joinedload
+from utils import get_demo_filter, get_appointments_for_export, export_appointments_ical, export_appointments_csv, check_slot_availability
 from sqlalchemy.exc import OperationalError, DatabaseError
 from sqlalchemy import and_, or_
 from datetime import datetime, date, timedelta
 from error_helpers import get_user_friendly_error, handle_database_error
 from auth_helpers import get_current_user
+from pagination import get_page_size, paginate_keyset, page_response, InvalidCursor
 from io import BytesIO
 
 bp_appointments = Blueprint('appointments', __name__)
@@ -78,7 +78,8 @@ def get_appointments():
         # Filter by demo status if needed (appointments inherit from customer/staff)
         # For now, we'll filter based on customer's is_demo flag
         if demo_filter['is_demo'] is not None:
-            query = query.join(Customer).filter(Customer.is_demo == demo_filter['is_demo'])
+            # EXISTS rather than a join, so pages are read in appointment_date index order
+            query = query.filter(Appointment.customer.has(Customer.is_demo == demo_filter['is_demo']))
         
         if status:
             query = query.filter(Appointment.status == status)
@@ -87,22 +88,26 @@ def get_appointments():
         if start_date:
             try:
                 start_dt = datetime.fromisoformat(start_date).date()
-                query = query.filter(db.func.date(Appointment.appointment_date) >= start_dt)
+                query = query.filter(Appointment.business_date >= start_dt)
             except ValueError:
                 pass  # Ignore invalid date format
         
         if end_date:
             try:
                 end_dt = datetime.fromisoformat(end_date).date()
-                query = query.filter(db.func.date(Appointment.appointment_date) <= end_dt)
+                query = query.filter(Appointment.business_date <= end_dt)
             except ValueError:
                 pass  # Ignore invalid date format
         
-        appointments = query.options(
-            joinedload(Appointment.customer),
-            joinedload(Appointment.staff),
-            joinedload(Appointment.services).joinedload(AppointmentService.service)
-        ).order_by(Appointment.appointment_date.asc()).all()
+        query = query.options(*Appointment.to_dict_load_options())
+        page_size = get_page_size(request)
+        try:
+            appointments, next_cursor = paginate_keyset(
+                query, [(Appointment.appointment_date, False), (Appointment.id, False)],
+                request.args.get('cursor'), page_size
+            )
+        except InvalidCursor:
+            return jsonify({'error': 'Invalid cursor'}), 400
         
         # Safe to_dict with error handling
         result = []
@@ -116,7 +121,7 @@ def get_appointments():
                     traceback.print_exc()
                 # Skip this appointment if serialization fails
         
-        return jsonify(result)
+        return jsonify(page_response(result, next_cursor, page_size))
     
     except (OperationalError, DatabaseError) as e:
         return jsonify({'error': get_user_friendly_error(e, current_app.debug)}), 500
@@ -141,7 +146,8 @@ def get_pending_appointments():
         
         # Filter by demo status
         if demo_filter['is_demo'] is not None:
-            query = query.join(Customer).filter(Customer.is_demo == demo_filter['is_demo'])
+            # EXISTS rather than a join, so pages are read in appointment_date index order
+            query = query.filter(Appointment.customer.has(Customer.is_demo == demo_filter['is_demo']))
         
         # Filter by staff: show appointments assigned to this staff OR unassigned (staff_id IS NULL)
         if staff_id:
@@ -153,11 +159,7 @@ def get_pending_appointments():
                 )
             )
         
-        appointments = query.options(
-            joinedload(Appointment.customer),
-            joinedload(Appointment.staff),
-            joinedload(Appointment.services).joinedload(AppointmentService.service)
-        ).order_by(Appointment.appointment_date.asc()).all()
+        appointments = query.options(*Appointment.to_dict_load_options()).order_by(Appointment.appointment_date.asc()).all()
         
         # Safe to_dict with error handling
         result = []
@@ -187,11 +189,7 @@ def get_pending_appointments():
 def get_appointment(id):
     """Get a specific appointment"""
     try:
-        appointment = Appointment.query.options(
-            joinedload(Appointment.customer),
-            joinedload(Appointment.staff),
-            joinedload(Appointment.services).joinedload(AppointmentService.service)
-        ).get_or_404(id)
+        appointment = Appointment.query.options(*Appointment.to_dict_load_options()).get_or_404(id)
         
         try:
             return jsonify(appointment.to_dict())
@@ -307,11 +305,7 @@ def create_appointment():
         db.session.commit()
         
         # Reload to get relationships
-        appointment = Appointment.query.options(
-            joinedload(Appointment.customer),
-            joinedload(Appointment.staff),
-            joinedload(Appointment.services).joinedload(AppointmentService.service)
-        ).get(appointment.id)
+        appointment = Appointment.query.options(*Appointment.to_dict_load_options()).get(appointment.id)
         
         try:
             return jsonify(appointment.to_dict()), 201
@@ -462,11 +456,7 @@ def update_appointment(id):
         db.session.commit()
         
         # Reload to get relationships
-        appointment = Appointment.query.options(
-            joinedload(Appointment.customer),
-            joinedload(Appointment.staff),
-            joinedload(Appointment.services).joinedload(AppointmentService.service)
-        ).get(appointment.id)
+        appointment = Appointment.query.options(*Appointment.to_dict_load_options()).get(appointment.id)
         
         try:
             return jsonify(appointment.to_dict())
@@ -557,12 +547,7 @@ def complete_appointment(id):
         db.session.commit()
         
         # Reload to get relationships
-        appointment = Appointment.query.options(
-            joinedload(Appointment.customer),
-            joinedload(Appointment.staff),
-            joinedload(Appointment.services).joinedload(AppointmentService.service),
-            joinedload(Appointment.sale)
-        ).get(appointment.id)
+        appointment = Appointment.query.options(*Appointment.to_dict_load_options()).get(appointment.id)
         
         try:
             return jsonify(appointment.to_dict())
@@ -618,11 +603,7 @@ def accept_appointment(id):
         db.session.commit()
         
         # Reload to get relationships
-        appointment = Appointment.query.options(
-            joinedload(Appointment.customer),
-            joinedload(Appointment.staff),
-            joinedload(Appointment.services).joinedload(AppointmentService.service)
-        ).get(appointment.id)
+        appointment = Appointment.query.options(*Appointment.to_dict_load_options()).get(appointment.id)
         
         try:
             return jsonify(appointment.to_dict())
@@ -668,11 +649,7 @@ def cancel_appointment(id):
         db.session.commit()
         
         # Reload to get relationships
-        appointment = Appointment.query.options(
-            joinedload(Appointment.customer),
-            joinedload(Appointment.staff),
-            joinedload(Appointment.services).joinedload(AppointmentService.service)
-        ).get(appointment.id)
+        appointment = Appointment.query.options(*Appointment.to_dict_load_options()).get(appointment.id)
         
         try:
             return jsonify(appointment.to_dict())
@@ -732,11 +709,7 @@ def reschedule_appointment(id):
         db.session.commit()
         
         # Reload to get relationships
-        appointment = Appointment.query.options(
-            joinedload(Appointment.customer),
-            joinedload(Appointment.staff),
-            joinedload(Appointment.services).joinedload(AppointmentService.service)
-        ).get(appointment.id)
+        appointment = Appointment.query.options(*Appointment.to_dict_load_options()).get(appointment.id)
         
         try:
             return jsonify(appointment.to_dict())
@@ -961,11 +934,7 @@ def create_recurring_appointment():
         # Reload appointments with relationships
         result = []
         for apt in created_appointments:
-            apt = Appointment.query.options(
-                joinedload(Appointment.customer),
-                joinedload(Appointment.staff),
-                joinedload(Appointment.services).joinedload(AppointmentService.service)
-            ).get(apt.id)
+            apt = Appointment.query.options(*Appointment.to_dict_load_options()).get(apt.id)
             result.append(apt.to_dict())
         
         return jsonify(result), 201
@@ -1021,32 +990,7 @@ def export_appointments_calendar():
         end_date = request.args.get('end_date')
         demo_filter = get_demo_filter(None, request)
         
-        query = Appointment.query
-        
-        # Filter by demo status
-        if demo_filter['is_demo'] is not None:
-            query = query.join(Customer).filter(Customer.is_demo == demo_filter['is_demo'])
-        
-        # Date range filtering
-        if start_date:
-            try:
-                start_dt = datetime.fromisoformat(start_date.replace('Z', '+00:00'))
-                query = query.filter(db.func.date(Appointment.appointment_date) >= start_dt.date())
-            except ValueError:
-                pass
-        
-        if end_date:
-            try:
-                end_dt = datetime.fromisoformat(end_date.replace('Z', '+00:00'))
-                query = query.filter(db.func.date(Appointment.appointment_date) <= end_dt.date())
-            except ValueError:
-                pass
-        
-        appointments = query.options(
-            joinedload(Appointment.customer),
-            joinedload(Appointment.staff),
-            joinedload(Appointment.services).joinedload(AppointmentService.service)
-        ).order_by(Appointment.appointment_date.asc()).all()
+        appointments = get_appointments_for_export(start_date, end_date, demo_filter['is_demo'])
         
         if format_type == 'csv':
             csv_content = export_appointments_csv(appointments)
@@ -5,9 +5,11 @@ from flask import Blueprint, request, jsonify, current_app, session
 from models import User, Subscription
 from db import db
 from datetime import datetime
-from auth_helpers import require_auth, require_admin
+from auth_helpers import require_auth, require_admin, get_bearer_token
+from auth_tokens import issue_token, verify_token, revoke_token, DEFAULT_REFRESH_WINDOW
 from sqlalchemy.exc import OperationalError, DatabaseError
 from error_helpers import get_user_friendly_error, handle_database_error
+from schema_check import table_missing, check_schema
 
 bp_auth = Blueprint('auth', __name__)
 
@@ -26,29 +28,14 @@ def login():
         if not email or not password:
             return jsonify({'success': False, 'error': 'Email and password are required'}), 400
         
-        # Check database connection
-        try:
-            db.session.execute(db.text('SELECT 1'))
-        except Exception as db_conn_error:
+        # Schema is verified at startup and by /api/ready, not per request;
+        # only re-check here if the cached result says the table is missing
+        if table_missing('users') and 'users' in check_schema()['missing_tables']:
             return jsonify({
                 'success': False,
-                'error': get_user_friendly_error(db_conn_error, current_app.debug)
+                'error': get_user_friendly_error('Database not initialized', current_app.debug)
             }), 500
         
-        # Check if users table exists
-        try:
-            from sqlalchemy import inspect
-            inspector = inspect(db.engine)
-            tables = inspector.get_table_names()
-            if 'users' not in tables:
-                return jsonify({
-                    'success': False,
-                    'error': get_user_friendly_error('Database not initialized', current_app.debug)
-                }), 500
-        except Exception as db_check_error:
-            # If we can't check, continue and let the query fail with a better error
-            pass
-        
         # Find user by email - handle missing columns gracefully
         try:
             user = User.query.filter_by(email=email.lower().strip()).first()
@@ -87,6 +74,9 @@ def login():
         # Update last login
         try:
             user.last_login = datetime.utcnow()
+            # Upgrade the stored hash when BCRYPT_ROUNDS has changed
+            if user.password_needs_rehash():
+                user.set_password(password)
             db.session.commit()
         except (OperationalError, DatabaseError) as commit_error:
             db.session.rollback()
@@ -142,9 +132,12 @@ def login():
                 'is_active': user.is_active
             }
         
+        token, expires_in = issue_token(user)
         return jsonify({
             'success': True,
-            'user': user_dict
+            'user': user_dict,
+            'token': token,
+            'expires_in': expires_in
         }), 200
         
     except (OperationalError, DatabaseError) as e:
@@ -182,10 +175,35 @@ def get_current_user():
     }), 200
 
 
+@bp_auth.route('/auth/refresh', methods=['POST'])
+def refresh_token():
+    """Exchange a valid or recently expired token for a new one"""
+    refresh_window = current_app.config.get('AUTH_TOKEN_REFRESH_WINDOW', DEFAULT_REFRESH_WINDOW)
+    claims = verify_token(get_bearer_token(), allow_expired_for=refresh_window)
+    if not claims:
+        return jsonify({'success': False, 'error': 'Invalid or expired token'}), 401
+
+    # Re-read the user so a refresh picks up role and status changes
+    user = db.session.get(User, claims['uid'])
+    if not user or not user.is_active:
+        return jsonify({'success': False, 'error': 'Account is inactive'}), 403
+
+    revoke_token(claims)
+    token, expires_in = issue_token(user)
+    return jsonify({
+        'success': True,
+        'token': token,
+        'expires_in': expires_in
+    }), 200
+
+
 @bp_auth.route('/auth/logout', methods=['POST'])
 def logout():
-    """Logout user (client-side session cleanup)"""
+    """Logout user (session cleanup and token revocation)"""
     session.pop('user_id', None)
+    claims = verify_token(get_bearer_token())
+    if claims:
+        revoke_token(claims)
     return jsonify({'success': True, 'message': 'Logged out successfully'}), 200
 
 
@@ -236,6 +254,7 @@ def signup():
                 stripe_subscription_id=None,
             )
             db.session.add(sub)
+            new_user.set_current_subscription(sub)
         db.session.commit()
         
         # Store user ID in session
@@ -244,9 +263,12 @@ def signup():
         except RuntimeError:
             pass
         
+        token, expires_in = issue_token(new_user)
         return jsonify({
             'success': True,
             'user': new_user.to_dict(),
+            'token': token,
+            'expires_in': expires_in,
             'message': 'Account created successfully'
         }), 201
         
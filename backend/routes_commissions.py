@@ -1,19 +1,57 @@
 """
 Commission routes for the POS Salon backend.
 """
-from flask import Blueprint, request, jsonify, send_file, current_app
-from models import CommissionPayment, CommissionPaymentItem, Staff, Sale, SaleService, User
+from flask import Blueprint, request, jsonify, send_file, current_app, g
+from models import CommissionPayment, CommissionPaymentItem, Staff, Sale, SaleService, User, StaffCommissionBalance
 from db import db
 from sqlalchemy import func, and_, or_
+from sqlalchemy.exc import IntegrityError
 from datetime import datetime, date
 from utils import get_demo_filter, get_current_week_range, parse_date, calculate_gross_pay, calculate_total_deductions, calculate_net_pay
 from validators import validate_mpesa_code, validate_date_format
-from pdf_generators import generate_commission_receipt_pdf
+from pdf_generators import generate_commission_receipt_pdf, commission_receipt_fingerprint
+from pdf_cache import cached_pdf
 from auth_helpers import require_manager_or_admin
+from pagination import get_page_size, paginate_keyset, page_response, InvalidCursor
+from sequences import next_commission_receipt_number
+from commission_ledger import record_payout
+from commission_pay_run import run_pay_run, commission_lines, lock_staff
 
 bp_commissions = Blueprint('commissions', __name__)
 
 
+def _pending_commissions_response(rows):
+    """
+    Build the pending commissions payload from per-staff total rows.
+    
+    Args:
+        rows: (staff_id, staff_name, total_sales, total_commission, transaction_count, paid_amount) tuples
+    
+    Returns:
+        dict: pending_commissions and total_pending
+    """
+    pending_commissions = []
+    for staff_id, staff_name, total_sales, total_commission, transaction_count, paid in rows:
+        pending_amount = round((total_commission or 0) - (paid or 0), 2)
+        # Amounts under half a cent round to zero and are dropped like before
+        if pending_amount <= 0:
+            continue
+        pending_commissions.append({
+            'staff_id': staff_id,
+            'staff_name': staff_name if staff_name else f'Staff {staff_id}',
+            'total_sales': round(total_sales or 0, 2),
+            'total_commission': round(total_commission or 0, 2),
+            'transaction_count': transaction_count,
+            'paid_amount': round(paid or 0, 2),
+            'pending_amount': pending_amount
+        })
+    
+    return {
+        'pending_commissions': pending_commissions,
+        'total_pending': round(sum(c['pending_amount'] for c in pending_commissions), 2)
+    }
+
+
 @bp_commissions.route('/commissions/pending', methods=['GET'])
 def get_pending_commissions():
     """Get unpaid commissions by staff"""
@@ -24,8 +62,30 @@ def get_pending_commissions():
         start_date = request.args.get('start_date')
         end_date = request.args.get('end_date')
         
-        # Query completed sales
-        query = Sale.query.filter(
+        # All-time totals are kept per staff member by the commission ledger
+        if not start_date and not end_date:
+            rows = db.session.query(
+                StaffCommissionBalance.staff_id,
+                Staff.name,
+                StaffCommissionBalance.sales_total,
+                StaffCommissionBalance.earned,
+                StaffCommissionBalance.sale_count,
+                StaffCommissionBalance.paid
+            ).outerjoin(
+                Staff, Staff.id == StaffCommissionBalance.staff_id
+            ).filter(
+                StaffCommissionBalance.is_demo == bool(demo_filter['is_demo']),
+                StaffCommissionBalance.earned - StaffCommissionBalance.paid > 0
+            ).order_by(StaffCommissionBalance.staff_id).all()
+            return jsonify(_pending_commissions_response(rows)), 200
+        
+        # Per-staff sales totals for the date range, grouped in the database
+        sales_query = db.session.query(
+            Sale.staff_id.label('staff_id'),
+            func.sum(Sale.subtotal).label('total_sales'),
+            func.sum(Sale.commission_amount).label('total_commission'),
+            func.count(Sale.id).label('transaction_count')
+        ).filter(
             Sale.status == 'completed',
             Sale.is_demo == demo_filter['is_demo']
         )
@@ -34,58 +94,41 @@ def get_pending_commissions():
             is_valid, parsed_date, error = validate_date_format(start_date)
             if not is_valid:
                 return jsonify({'error': error}), 400
-            query = query.filter(func.date(Sale.created_at) >= parsed_date)
+            sales_query = sales_query.filter(Sale.business_date >= parsed_date)
         
         if end_date:
             is_valid, parsed_date, error = validate_date_format(end_date)
             if not is_valid:
                 return jsonify({'error': error}), 400
-            query = query.filter(func.date(Sale.created_at) <= parsed_date)
-        
-        sales = query.all()
-        
-        # Group by staff and calculate totals
-        staff_commissions = {}
-        for sale in sales:
-            if sale.staff_id not in staff_commissions:
-                staff = Staff.query.get(sale.staff_id)
-                staff_commissions[sale.staff_id] = {
-                    'staff_id': sale.staff_id,
-                    'staff_name': staff.name if staff else f'Staff {sale.staff_id}',
-                    'total_sales': 0,
-                    'total_commission': 0,
-                    'transaction_count': 0
-                }
-            
-            staff_commissions[sale.staff_id]['total_sales'] += sale.subtotal
-            staff_commissions[sale.staff_id]['total_commission'] += sale.commission_amount
-            staff_commissions[sale.staff_id]['transaction_count'] += 1
-        
-        # Subtract already paid commissions
-        for staff_id in staff_commissions:
-            paid_amount = db.session.query(func.sum(CommissionPayment.amount_paid)).filter(
-                CommissionPayment.staff_id == staff_id,
-                CommissionPayment.is_demo == demo_filter['is_demo']
-            ).scalar() or 0
-            
-            staff_commissions[staff_id]['paid_amount'] = round(paid_amount, 2)
-            staff_commissions[staff_id]['pending_amount'] = round(
-                staff_commissions[staff_id]['total_commission'] - paid_amount, 2
-            )
-            staff_commissions[staff_id]['total_sales'] = round(staff_commissions[staff_id]['total_sales'], 2)
-            staff_commissions[staff_id]['total_commission'] = round(staff_commissions[staff_id]['total_commission'], 2)
+            sales_query = sales_query.filter(Sale.business_date <= parsed_date)
         
-        # Filter out staff with zero pending
-        pending_commissions = [
-            {**comm, 'pending_amount': comm['pending_amount']}
-            for comm in staff_commissions.values()
-            if comm['pending_amount'] > 0
-        ]
+        sales_totals = sales_query.group_by(Sale.staff_id).subquery()
         
-        return jsonify({
-            'pending_commissions': pending_commissions,
-            'total_pending': round(sum(c['pending_amount'] for c in pending_commissions), 2)
-        }), 200
+        # Everything already paid to each staff member (all time, as before)
+        paid_totals = db.session.query(
+            CommissionPayment.staff_id.label('staff_id'),
+            func.sum(CommissionPayment.amount_paid).label('paid_amount')
+        ).filter(
+            CommissionPayment.is_demo == demo_filter['is_demo']
+        ).group_by(CommissionPayment.staff_id).subquery()
+        
+        paid_amount = func.coalesce(paid_totals.c.paid_amount, 0)
+        rows = db.session.query(
+            sales_totals.c.staff_id,
+            Staff.name,
+            sales_totals.c.total_sales,
+            sales_totals.c.total_commission,
+            sales_totals.c.transaction_count,
+            paid_amount
+        ).outerjoin(
+            paid_totals, paid_totals.c.staff_id == sales_totals.c.staff_id
+        ).outerjoin(
+            Staff, Staff.id == sales_totals.c.staff_id
+        ).filter(
+            sales_totals.c.total_commission - paid_amount > 0
+        ).order_by(sales_totals.c.staff_id).all()
+        
+        return jsonify(_pending_commissions_response(rows)), 200
         
     except Exception as e:
         import traceback
@@ -108,9 +151,16 @@ def get_commission_payments():
         if staff_id:
             query = query.filter(CommissionPayment.staff_id == staff_id)
         
-        payments = query.order_by(CommissionPayment.payment_date.desc()).all()
+        page_size = get_page_size(request)
+        try:
+            payments, next_cursor = paginate_keyset(
+                query, [(CommissionPayment.payment_date, True), (CommissionPayment.id, True)],
+                request.args.get('cursor'), page_size
+            )
+        except InvalidCursor:
+            return jsonify({'error': 'Invalid cursor'}), 400
         
-        return jsonify([payment.to_dict() for payment in payments]), 200
+        return jsonify(page_response([payment.to_dict() for payment in payments], next_cursor, page_size)), 200
         
     except Exception as e:
         return jsonify({'error': str(e)}), 500
@@ -135,8 +185,9 @@ def create_commission_payment():
         if not staff_id:
             return jsonify({'error': 'Staff ID is required'}), 400
         
-        # Check if staff exists
-        staff = Staff.query.get(staff_id)
+        # Check if staff exists, locking the row so a concurrent payment or
+        # pay run for this staff member waits until this one commits
+        staff = next(iter(lock_staff(Staff.query.filter(Staff.id == staff_id))), None)
         if not staff:
             return jsonify({'error': 'Staff not found'}), 404
         
@@ -168,48 +219,22 @@ def create_commission_payment():
         
         # Auto-populate commission items from sales if requested
         if auto_populate_commissions:
-            # Query completed sales for this staff in the period
-            # Use completed_at if available, otherwise use created_at
-            date_filter = or_(
-                and_(
-                    Sale.completed_at.isnot(None),
-                    func.date(Sale.completed_at) >= period_start_date,
-                    func.date(Sale.completed_at) <= period_end_date
-                ),
-                and_(
-                    Sale.completed_at.is_(None),
-                    func.date(Sale.created_at) >= period_start_date,
-                    func.date(Sale.created_at) <= period_end_date
-                )
-            )
-            
-            sales = Sale.query.filter(
-                Sale.staff_id == staff_id,
-                Sale.status == 'completed',
-                Sale.is_demo == is_demo,
-                date_filter
-            ).all()
-            
-            # Create commission items for each sale/service
-            commission_items_added = False
-            for sale in sales:
-                for sale_service in sale.sale_services:
-                    if sale_service.commission_amount and sale_service.commission_amount > 0:
-                        service_name = sale_service.service.name if sale_service.service else f"Service #{sale_service.service_id}"
-                        commission_item = {
-                            'item_name': f"Commission - {service_name}",
-                            'amount': sale_service.commission_amount,
-                            'is_percentage': False,
-                            'sale_id': sale.id,
-                            'sale_service_id': sale_service.id,
-                            'service_name': service_name,
-                            'sale_number': sale.sale_number
-                        }
-                        earnings_data.append(commission_item)
-                        commission_items_added = True
+            # Unpaid commission lines from completed sales in the period (salon-local business day)
+            lines = commission_lines(period_start_date, period_end_date, is_demo, [staff.id]).get(staff.id, [])
+            for sale_id, sale_number, sale_service_id, service_id, service_name, commission in lines:
+                service_name = service_name or f"Service #{service_id}"
+                earnings_data.append({
+                    'item_name': f"Commission - {service_name}",
+                    'amount': commission,
+                    'is_percentage': False,
+                    'sale_id': sale_id,
+                    'sale_service_id': sale_service_id,
+                    'service_name': service_name,
+                    'sale_number': sale_number
+                })
         
         # Generate receipt number
-        receipt_number = data.get('receipt_number') or f"COMM-{datetime.now().strftime('%Y%m%d')}-{CommissionPayment.query.count() + 1:04d}"
+        receipt_number = data.get('receipt_number') or next_commission_receipt_number()
         
         # Validate M-Pesa transaction reference format if provided
         if payment_method and payment_method.lower() in ['m_pesa', 'm-pesa', 'mpesa'] and transaction_reference:
@@ -291,11 +316,15 @@ def create_commission_payment():
         payment.total_deductions = total_deductions
         payment.net_pay = net_pay
         payment.amount_paid = net_pay  # For backward compatibility
+        record_payout(payment)
         
         db.session.commit()
         
         return jsonify(payment.to_dict()), 201
         
+    except IntegrityError:
+        db.session.rollback()
+        return jsonify({'error': 'A commission line or receipt number in this payment has already been paid'}), 409
     except Exception as e:
         db.session.rollback()
         import traceback
@@ -304,6 +333,81 @@ def create_commission_payment():
         return jsonify({'error': str(e)}), 500
 
 
+@bp_commissions.route('/commissions/pay-run', methods=['POST'])
+@require_manager_or_admin
+def create_commission_pay_run():
+    """Pay commissions for every selected staff member for a period in one transaction"""
+    try:
+        data = request.get_json() or {}
+        demo_filter = get_demo_filter(None, request)
+        
+        # Default period to Monday-Sunday of current week if not provided
+        period_start = data.get('period_start')
+        period_end = data.get('period_end')
+        if not period_start or not period_end:
+            period_start_date, period_end_date = get_current_week_range()
+        else:
+            is_valid, period_start_date, error = validate_date_format(period_start)
+            if not is_valid:
+                return jsonify({'error': error}), 400
+            
+            is_valid, period_end_date, error = validate_date_format(period_end)
+            if not is_valid:
+                return jsonify({'error': error}), 400
+        
+        if period_start_date > period_end_date:
+            return jsonify({'error': 'period_start must be on or before period_end'}), 400
+        
+        staff_ids = data.get('staff_ids')
+        if staff_ids is not None:
+            if not isinstance(staff_ids, list):
+                return jsonify({'error': 'staff_ids must be a list'}), 400
+            try:
+                staff_ids = [int(staff_id) for staff_id in staff_ids]
+            except (TypeError, ValueError):
+                return jsonify({'error': 'staff_ids must contain staff IDs'}), 400
+        
+        deductions = data.get('deductions', [])
+        if not isinstance(deductions, list):
+            return jsonify({'error': 'deductions must be a list'}), 400
+        
+        summary, skipped = run_pay_run(
+            period_start_date,
+            period_end_date,
+            demo_filter['is_demo'],
+            staff_ids=staff_ids,
+            include_base_pay=bool(data.get('include_base_pay', False)),
+            deductions=deductions,
+            payment_method=data.get('payment_method'),
+            notes=data.get('notes'),
+            paid_by=data.get('paid_by') or g.current_user.id
+        )
+        db.session.commit()
+        
+        return jsonify({
+            'success': True,
+            'period_start': period_start_date.isoformat(),
+            'period_end': period_end_date.isoformat(),
+            'payments_created': len(summary),
+            'payment_ids': [row['payment_id'] for row in summary],
+            'total_gross_pay': round(sum(row['gross_pay'] for row in summary), 2),
+            'total_deductions': round(sum(row['total_deductions'] for row in summary), 2),
+            'total_net_pay': round(sum(row['net_pay'] for row in summary), 2),
+            'payments': summary,
+            'skipped': skipped
+        }), 201 if summary else 200
+        
+    except IntegrityError:
+        db.session.rollback()
+        return jsonify({'error': 'Commission lines in this pay run were paid by another payment, please retry'}), 409
+    except Exception as e:
+        db.session.rollback()
+        import traceback
+        print(f"Error in create_commission_pay_run: {str(e)}")
+        traceback.print_exc()
+        return jsonify({'error': str(e)}), 500
+
+
 @bp_commissions.route('/commissions/payments/<int:id>/receipt', methods=['GET'])
 def get_commission_payment_receipt(id):
     """Generate PDF receipt for commission payment"""
@@ -312,8 +416,12 @@ def get_commission_payment_receipt(id):
         staff = Staff.query.get(payment.staff_id)
         payer = User.query.get(payment.paid_by) if payment.paid_by else None
         
-        # Generate PDF buffer
-        pdf_buffer = generate_commission_receipt_pdf(payment, staff, payer)
+        # Generate PDF buffer (payments are never edited, so payslips are cached)
+        pdf_buffer = cached_pdf(
+            'payslip',
+            commission_receipt_fingerprint(payment, staff, payer),
+            lambda: generate_commission_receipt_pdf(payment, staff, payer)
+        )
         
         # Return PDF
         return send_file(
@@ -5,6 +5,7 @@ from flask import Blueprint, request, jsonify
 from models import Customer, Staff, Sale, Payment
 from db import db
 from utils import get_demo_filter
+from pagination import get_page_size, paginate_keyset, page_response, InvalidCursor
 from sqlalchemy.orm import joinedload
 
 bp_customers = Blueprint('customers', __name__)
@@ -14,8 +15,16 @@ bp_customers = Blueprint('customers', __name__)
 def get_customers():
     # Get demo filter from request
     demo_filter = get_demo_filter(None, request)
-    customers = Customer.query.filter(Customer.is_demo == demo_filter['is_demo']).all()
-    return jsonify([customer.to_dict() for customer in customers])
+    page_size = get_page_size(request)
+    query = Customer.query.filter(Customer.is_demo == demo_filter['is_demo'])
+    try:
+        customers, next_cursor = paginate_keyset(
+            query, [(Customer.created_at, True), (Customer.id, True)],
+            request.args.get('cursor'), page_size
+        )
+    except InvalidCursor:
+        return jsonify({'error': 'Invalid cursor'}), 400
+    return jsonify(page_response([customer.to_dict() for customer in customers], next_cursor, page_size))
 
 
 @bp_customers.route('/customers', methods=['POST'])
@@ -1,12 +1,17 @@
 """
 Dashboard routes for the POS Salon backend.
 """
-from flask import Blueprint, request, jsonify
-from models import Sale, CommissionPayment, Staff, StaffLoginLog, Payment
+from flask import Blueprint, request, jsonify, current_app, Response
+from models import Sale, Staff, StaffLoginLog, Payment
 from db import db
 from sqlalchemy import func
 from datetime import datetime, date, timedelta
+import queue
 from utils import get_demo_filter
+from business_time import business_today
+from commission_ledger import get_total_pending
+from dashboard_cache import get_cached_stats, set_cached_stats, current_generation
+from dashboard_events import subscribe, unsubscribe, format_sse
 
 bp_dashboard = Blueprint('dashboard', __name__)
 
@@ -14,34 +19,81 @@ bp_dashboard = Blueprint('dashboard', __name__)
 @bp_dashboard.route('/dashboard/stats', methods=['GET'])
 def get_dashboard_stats():
     """Get dashboard statistics for admin/manager"""
-    today = date.today()
+    today = business_today()
     
     # Get demo filter from request (admin/manager use query parameter)
     demo_filter = get_demo_filter(None, request)
     
+    ttl = current_app.config.get('DASHBOARD_CACHE_TTL', 30)
+    stats = get_cached_stats(demo_filter['is_demo'], today, ttl)
+    if stats is None:
+        generation = current_generation()
+        stats = build_dashboard_stats(demo_filter, today)
+        set_cached_stats(demo_filter['is_demo'], today, stats, generation)
+    
+    return jsonify(stats), 200
+
+
+@bp_dashboard.route('/dashboard/stream', methods=['GET'])
+def stream_dashboard_events():
+    """Stream dashboard change events (Server-Sent Events)"""
+    demo_filter = get_demo_filter(None, request)
+    is_demo = demo_filter['is_demo']
+    heartbeat = current_app.config.get('DASHBOARD_STREAM_HEARTBEAT', 15)
+    
+    def generate():
+        # Subscribe only once the stream is iterated: a response that is never
+        # sent would otherwise leave its queue registered for good
+        subscriber = None
+        try:
+            subscriber = subscribe()
+            # Tell EventSource how long to wait before reconnecting
+            yield 'retry: 5000\n\n'
+            yield format_sse('connected', {'is_demo': is_demo})
+            while True:
+                try:
+                    message = subscriber.get(timeout=heartbeat)
+                except queue.Empty:
+                    # Comment line keeps proxies from closing an idle stream
+                    yield ': keep-alive\n\n'
+                    continue
+                event_is_demo = message['data'].get('is_demo')
+                if event_is_demo is not None and event_is_demo != is_demo:
+                    continue
+                yield format_sse(message['type'], message['data'])
+        finally:
+            if subscriber is not None:
+                unsubscribe(subscriber)
+    
+    return Response(generate(), mimetype='text/event-stream', headers={
+        'Cache-Control': 'no-cache',
+        'X-Accel-Buffering': 'no'
+    })
+
+
+def build_dashboard_stats(demo_filter, today):
+    """
+    Build the dashboard statistics payload.
+    
+    Args:
+        demo_filter: dict with 'is_demo' key for filtering
+        today: Current business date
+    
+    Returns:
+        dict: Dashboard stats
+    """
     # Today's sales revenue (from completed sales - subtotal before VAT)
     today_sales = Sale.query.filter(
-        func.date(Sale.created_at) == today,
+        Sale.business_date == today,
         Sale.status == 'completed',
         Sale.is_demo == demo_filter['is_demo']
     ).all()
     
     today_revenue = sum(sale.subtotal for sale in today_sales)
     
-    # Total commission earned (all time from completed sales, filtered by demo)
-    all_sales = Sale.query.filter(
-        Sale.status == 'completed',
-        Sale.is_demo == demo_filter['is_demo']
-    ).all()
-    total_commission_earned = sum(sale.commission_amount for sale in all_sales)
-    
-    # Total commission paid (from CommissionPayment table, filtered by demo)
-    total_commission_paid = db.session.query(func.sum(CommissionPayment.amount_paid)).filter(
-        CommissionPayment.is_demo == demo_filter['is_demo']
-    ).scalar() or 0
-    
-    # Total commission pending (earned - paid) - this is what's actually owed
-    total_commission = max(0, total_commission_earned - total_commission_paid)  # Ensure non-negative
+    # Total commission pending (earned - paid) - this is what's actually owed,
+    # read from the per-staff commission balances
+    total_commission = max(0, get_total_pending(demo_filter['is_demo']))  # Ensure non-negative
     
     # Active staff count (staff with is_active=True, exclude demo staff if not in demo mode)
     if demo_filter['is_demo']:
@@ -93,9 +145,12 @@ def get_dashboard_stats():
     # Staff performance summary (today's sales and commission per staff)
     staff_performance = []
     staff_ids = set([sale.staff_id for sale in today_sales if sale.staff_id])
+    staff_by_id = {
+        staff.id: staff for staff in Staff.query.filter(Staff.id.in_(staff_ids)).all()
+    } if staff_ids else {}
     
     for staff_id in staff_ids:
-        staff = Staff.query.get(staff_id)
+        staff = staff_by_id.get(staff_id)
         if staff:
             # Skip if staff demo status doesn't match filter
             if demo_filter['is_demo'] and not (hasattr(staff, 'is_demo') and staff.is_demo):
@@ -132,7 +187,7 @@ def get_dashboard_stats():
             'session_duration': log.session_duration
         })
     
-    return jsonify({
+    return {
         'today_revenue': round(today_revenue, 2),
         'total_commission': round(total_commission, 2),
         'active_staff_count': active_staff_count,
@@ -141,7 +196,7 @@ def get_dashboard_stats():
         'recent_transactions': recent_transactions,
         'staff_performance': staff_performance,
         'recent_login_history': recent_login_history
-    }), 200
+    }
 
 
 @bp_dashboard.route('/dashboard/stats/demo', methods=['GET'])
@@ -231,8 +286,7 @@ def get_staff_weekly_transactions(id):
     """Get weekly transaction list for a staff member"""
     staff = Staff.query.get_or_404(id)
     
-    from datetime import timedelta
-    today = date.today()
+    today = business_today()
     week_start = today - timedelta(days=6)  # Last 7 days including today
     
     # Get demo filter
@@ -241,7 +295,7 @@ def get_staff_weekly_transactions(id):
     # Get completed sales for the week
     sales = Sale.query.filter(
         Sale.staff_id == id,
-        func.date(Sale.created_at) >= week_start,
+        Sale.business_date >= week_start,
         Sale.status == 'completed',
         Sale.is_demo == demo_filter['is_demo']
     ).order_by(Sale.created_at.desc()).all()
@@ -5,6 +5,8 @@ from flask import Blueprint, request, jsonify
 from models import Expense
 from db import db
 from datetime import datetime
+from pagination import get_page_size, paginate_keyset, page_response, InvalidCursor
+from business_time import business_now
 
 bp_expenses = Blueprint('expenses', __name__)
 
@@ -26,8 +28,15 @@ def get_expenses():
     if category:
         query = query.filter_by(category=category)
     
-    expenses = query.order_by(Expense.expense_date.desc()).all()
-    return jsonify([expense.to_dict() for expense in expenses])
+    page_size = get_page_size(request)
+    try:
+        expenses, next_cursor = paginate_keyset(
+            query, [(Expense.expense_date, True), (Expense.id, True)],
+            request.args.get('cursor'), page_size
+        )
+    except InvalidCursor:
+        return jsonify({'error': 'Invalid cursor'}), 400
+    return jsonify(page_response([expense.to_dict() for expense in expenses], next_cursor, page_size))
 
 
 @bp_expenses.route('/expenses', methods=['POST'])
@@ -38,7 +47,7 @@ def create_expense():
         category=data.get('category'),
         description=data.get('description'),
         amount=data.get('amount'),
-        expense_date=datetime.fromisoformat(data.get('expense_date')) if data.get('expense_date') else datetime.utcnow(),
+        expense_date=datetime.fromisoformat(data.get('expense_date')) if data.get('expense_date') else business_now(),
         receipt_number=data.get('receipt_number'),
         paid_by=data.get('paid_by'),
         created_by=data.get('created_by')
@@ -0,0 +1,108 @@
+"""
+Background job routes: queue receipt/payslip renders and calendar exports,
+poll their progress and download the result (see jobs.py).
+"""
+import os
+from flask import Blueprint, request, jsonify, current_app, send_file, url_for
+from models import Job, Sale, CommissionPayment
+from db import db
+from utils import get_demo_filter
+from auth_helpers import get_current_user
+from jobs import enqueue, wake_runners, ensure_runners, SUCCEEDED, EXPIRED
+
+bp_jobs = Blueprint('jobs', __name__)
+
+
+@bp_jobs.before_request
+def _start_runners():
+    ensure_runners(current_app._get_current_object())
+
+
+def _job_response(job):
+    result = job.to_dict()
+    result['status_url'] = url_for('api.jobs.get_job', job_id=job.id)
+    result['download_url'] = url_for('api.jobs.download_job_result', job_id=job.id) if job.status == SUCCEEDED else None
+    return result
+
+
+def _queue(kind, params):
+    """Queue a job, wake a runner and return the 202 response."""
+    try:
+        user = get_current_user()
+        job = enqueue(kind, params, created_by=user.id if user else None)
+        db.session.commit()
+    except Exception as e:
+        db.session.rollback()
+        import traceback
+        print(f"Error queueing {kind} job: {str(e)}")
+        traceback.print_exc()
+        return jsonify({'error': str(e)}), 500
+
+    wake_runners()
+    return jsonify(_job_response(job)), 202
+
+
+@bp_jobs.route('/jobs/sales-receipt', methods=['POST'])
+def create_sales_receipt_job():
+    """Queue a sales receipt PDF render"""
+    data = request.get_json() or {}
+    sale_id = data.get('sale_id')
+    if not sale_id or not db.session.query(Sale.query.filter(Sale.id == sale_id).exists()).scalar():
+        return jsonify({'error': 'Sale not found'}), 404
+    return _queue('sales_receipt', {'sale_id': sale_id})
+
+
+@bp_jobs.route('/jobs/commission-receipt', methods=['POST'])
+def create_commission_receipt_job():
+    """Queue a commission payslip PDF render"""
+    data = request.get_json() or {}
+    payment_id = data.get('payment_id')
+    if not payment_id or not db.session.query(CommissionPayment.query.filter(CommissionPayment.id == payment_id).exists()).scalar():
+        return jsonify({'error': 'Commission payment not found'}), 404
+    return _queue('commission_receipt', {'payment_id': payment_id})
+
+
+@bp_jobs.route('/jobs/calendar-export', methods=['POST'])
+def create_calendar_export_job():
+    """Queue an iCal or CSV appointments export"""
+    data = request.get_json() or {}
+    format_type = (data.get('format') or 'ical').lower()
+    if format_type not in ('ical', 'csv'):
+        return jsonify({'error': "format must be 'ical' or 'csv'"}), 400
+    demo_filter = get_demo_filter(None, request)
+    return _queue('calendar_export', {
+        'format': format_type,
+        'start_date': data.get('start_date'),
+        'end_date': data.get('end_date'),
+        'is_demo': demo_filter['is_demo']
+    })
+
+
+@bp_jobs.route('/jobs/<job_id>', methods=['GET'])
+def get_job(job_id):
+    """Get a job's status and progress"""
+    job = db.session.get(Job, job_id)
+    if job is None:
+        return jsonify({'error': 'Job not found'}), 404
+    return jsonify(_job_response(job)), 200
+
+
+@bp_jobs.route('/jobs/<job_id>/download', methods=['GET'])
+def download_job_result(job_id):
+    """Download a finished job's artifact"""
+    job = db.session.get(Job, job_id)
+    if job is None:
+        return jsonify({'error': 'Job not found'}), 404
+    if job.status == EXPIRED:
+        return jsonify({'error': 'Job result has expired'}), 410
+    if job.status != SUCCEEDED:
+        return jsonify({'error': f'Job is {job.status}', 'status': job.status, 'progress': job.progress or 0}), 409
+    if not job.result_path or not os.path.exists(job.result_path):
+        return jsonify({'error': 'Job result has expired'}), 410
+
+    return send_file(
+        job.result_path,
+        mimetype=job.result_mimetype,
+        as_attachment=True,
+        download_name=job.result_filename
+    )
@@ -5,7 +5,8 @@ from flask import Blueprint, request, jsonify
 from models import Payment, Sale
 from db import db
 from utils import get_demo_filter
-from sqlalchemy.orm import joinedload
+from sqlalchemy.orm import joinedload, selectinload
+from pagination import get_page_size, paginate_keyset, page_response, InvalidCursor
 
 bp_payments = Blueprint('payments', __name__)
 
@@ -16,16 +17,27 @@ def get_payments():
     # Get demo filter from request
     demo_filter = get_demo_filter(None, request)
     
+    page_size = get_page_size(request)
+    
     # Filter payments by sale's demo status (since Payment doesn't have is_demo field)
-    payments = Payment.query.join(Sale).filter(
+    # EXISTS rather than a join, so pages are read in ix_payments_created_at_id order
+    # Collections use selectinload so LIMIT applies to payments, not joined rows
+    query = Payment.query.filter(
         Payment.sale_id.isnot(None),
-        Sale.is_demo == demo_filter['is_demo']
+        Payment.sale.has(Sale.is_demo == demo_filter['is_demo'])
     ).options(
         joinedload(Payment.sale).joinedload(Sale.staff),
         joinedload(Payment.sale).joinedload(Sale.customer),
-        joinedload(Payment.sale).joinedload(Sale.sale_services),
-        joinedload(Payment.sale).joinedload(Sale.sale_products)
-    ).order_by(Payment.created_at.desc()).all()
+        joinedload(Payment.sale).selectinload(Sale.sale_services),
+        joinedload(Payment.sale).selectinload(Sale.sale_products)
+    )
+    try:
+        payments, next_cursor = paginate_keyset(
+            query, [(Payment.created_at, True), (Payment.id, True)],
+            request.args.get('cursor'), page_size
+        )
+    except InvalidCursor:
+        return jsonify({'error': 'Invalid cursor'}), 400
     
     # Include sale and staff information
     result = []
@@ -56,7 +68,7 @@ def get_payments():
                 }
         result.append(payment_dict)
     
-    return jsonify(result)
+    return jsonify(page_response(result, next_cursor, page_size))
 
 
 @bp_payments.route('/payments', methods=['POST'])
@@ -1,15 +1,18 @@
 """
 Product/Inventory routes for the POS Salon backend.
 """
-from flask import Blueprint, request, jsonify
+from flask import Blueprint, request, jsonify, abort
 from models import Product
 from db import db
 from datetime import datetime
+from inventory import adjust_stock as adjust_stock_atomic
+from table_versions import versioned_etag
 
 bp_products = Blueprint('products', __name__)
 
 
 @bp_products.route('/products', methods=['GET'])
+@versioned_etag('products')
 def get_products():
     """Get all products with optional filtering"""
     category = request.args.get('category')
@@ -85,10 +88,9 @@ def delete_product(id):
 @bp_products.route('/products/<int:id>/adjust-stock', methods=['POST'])
 def adjust_stock(id):
     """Adjust product stock (add or subtract)"""
-    product = Product.query.get_or_404(id)
     data = request.get_json()
     adjustment = data.get('adjustment', 0)  # Positive to add, negative to subtract
-    product.stock_quantity = max(0, product.stock_quantity + adjustment)
-    product.updated_at = datetime.utcnow()
+    if not adjust_stock_atomic(id, adjustment):
+        abort(404)
     db.session.commit()
-    return jsonify(product.to_dict())
+    return jsonify(Product.query.get(id).to_dict())
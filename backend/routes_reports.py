@@ -4,6 +4,7 @@ Report routes for the POS Salon backend.
 from flask import Blueprint, request, jsonify
 from datetime import datetime, date, timedelta
 from utils import get_demo_filter
+from business_time import business_today
 from report_calculators import (
     calculate_daily_sales_report,
     calculate_commission_payout_report,
@@ -23,7 +24,7 @@ def get_daily_sales_report():
     if report_date:
         target_date = datetime.fromisoformat(report_date).date()
     else:
-        target_date = date.today()
+        target_date = business_today()
     
     demo_filter = get_demo_filter(None, request)
     report_data = calculate_daily_sales_report(target_date, demo_filter, db.session)
@@ -42,12 +43,12 @@ def get_commission_payout_report():
     if start_date:
         start_dt = datetime.fromisoformat(start_date)
     else:
-        start_dt = datetime.combine(date.today() - timedelta(days=30), datetime.min.time())
+        start_dt = datetime.combine(business_today() - timedelta(days=30), datetime.min.time())
     
     if end_date:
         end_dt = datetime.fromisoformat(end_date)
     else:
-        end_dt = datetime.combine(date.today(), datetime.max.time())
+        end_dt = datetime.combine(business_today(), datetime.max.time())
     
     demo_filter = get_demo_filter(None, request)
     
@@ -69,12 +70,12 @@ def get_financial_summary():
     if start_date:
         start_dt = datetime.fromisoformat(start_date)
     else:
-        start_dt = datetime.combine(date.today() - timedelta(days=30), datetime.min.time())
+        start_dt = datetime.combine(business_today() - timedelta(days=30), datetime.min.time())
     
     if end_date:
         end_dt = datetime.fromisoformat(end_date)
     else:
-        end_dt = datetime.combine(date.today(), datetime.max.time())
+        end_dt = datetime.combine(business_today(), datetime.max.time())
     
     demo_filter = get_demo_filter(None, request)
     summary_data = calculate_financial_summary(start_dt, end_dt, demo_filter, db.session, compare_with_previous=compare_with_previous)
@@ -1,16 +1,25 @@
 """
 Sales routes for the POS Salon backend.
 """
-from flask import Blueprint, request, jsonify, current_app, send_file
+from flask import Blueprint, Response, request, jsonify, current_app, send_file, stream_with_context
 from models import Sale, SaleService, SaleProduct, Customer, Staff, Service, Product, ProductUsage, Payment, Appointment, AppointmentService
 from db import db
-from sqlalchemy import func
+from sqlalchemy import func, update, or_
 from sqlalchemy.orm import joinedload
 from datetime import datetime, date
 from utils import get_demo_filter, generate_sale_number
 from validators import validate_mpesa_code
-from pdf_generators import generate_sales_receipt_pdf
+from pdf_generators import generate_sales_receipt_pdf, sales_receipt_fingerprint, sales_receipt_filename
+from pdf_cache import cached_pdf
+from receipt_export import stream_receipts_zip
+from thermal_receipt import render_text_receipt, render_escpos_receipt
 from error_helpers import get_user_friendly_error, handle_database_error
+from sales_rollup import apply_sale_to_rollup
+from commission_ledger import record_earning
+from inventory import deduct_stock
+from sales_batch import ingest_sales
+from catalog_cache import get_services, get_products
+from pagination import get_page_size, paginate_keyset, page_response, InvalidCursor
 
 bp_sales = Blueprint('sales', __name__)
 
@@ -25,9 +34,6 @@ def create_sale():
     if not staff_id:
         return jsonify({'error': 'Staff ID is required'}), 400
     
-    # Generate unique sale number
-    sale_number = generate_sale_number()
-    
     # Get staff to check demo status
     staff = Staff.query.get(staff_id)
     is_demo_user = staff.is_demo if staff and hasattr(staff, 'is_demo') and staff.is_demo else False
@@ -88,6 +94,9 @@ def create_sale():
             customer_name = customer.name
             customer_phone = customer.phone
     
+    # Draw the sale number last: the per-day counter row stays locked until commit
+    sale_number = generate_sale_number()
+    
     # Create sale with demo flag
     sale = Sale(
         sale_number=sale_number,
@@ -115,46 +124,29 @@ def create_sale():
                 'quantity': 1
             })
     
+    # Resolve every referenced service and product in one lookup each
+    cache_ttl = current_app.config.get('CATALOG_CACHE_TTL', 60)
+    catalog_services = get_services([_line_id(service_data, 'service_id') for service_data in services], cache_ttl)
+    products = data.get('products', [])
+    catalog_products = get_products([_line_id(product_data, 'product_id') for product_data in products], cache_ttl)
+    
+    # Services the till knows about but the database does not (rare)
+    missing_services = [
+        service_data for service_data in services
+        if _line_id(service_data, 'service_id') not in catalog_services
+    ]
+    if missing_services:
+        catalog_services.update(_create_missing_services(missing_services))
+    
     for service_data in services:
-        service_id = service_data.get('service_id') or service_data.get('id')
+        service_id = _line_id(service_data, 'service_id')
         quantity = service_data.get('quantity', 1)
-        service_name = service_data.get('name')
         service_price = service_data.get('price')
         commission_rate = service_data.get('commission_rate', 0.50)
         
-        # Get or create Service record
-        service = Service.query.get(service_id)
+        service = catalog_services.get(service_id)
         if not service:
-            # Service doesn't exist in database - create it with frontend data
-            if service_name and service_price is not None:
-                # Get duration from frontend if provided, default to 30 minutes
-                duration = service_data.get('duration', 30)
-                try:
-                    # Try to create service with the specified ID
-                    service = Service(
-                        id=service_id,  # Try to use the ID from frontend
-                        name=service_name,
-                        price=service_price,
-                        duration=duration
-                    )
-                    db.session.add(service)
-                    db.session.flush()
-                except Exception:
-                    # If setting ID fails, create without ID
-                    db.session.rollback()
-                    existing_service = Service.query.filter_by(name=service_name).first()
-                    if existing_service:
-                        service = existing_service
-                    else:
-                        service = Service(
-                            name=service_name,
-                            price=service_price,
-                            duration=duration
-                        )
-                        db.session.add(service)
-                        db.session.flush()
-            else:
-                continue
+            continue
         
         # Use price from frontend if provided, otherwise use database price
         unit_price = service_price if service_price is not None else service.price
@@ -175,12 +167,11 @@ def create_sale():
         db.session.add(sale_service)
     
     # Add products to sale (stock NOT deducted yet)
-    products = data.get('products', [])
     for product_data in products:
-        product_id = product_data.get('product_id') or product_data.get('id')
+        product_id = _line_id(product_data, 'product_id')
         quantity = product_data.get('quantity', 1)
         
-        product = Product.query.get(product_id)
+        product = catalog_products.get(product_id)
         if product:
             unit_price = product.selling_price or product.unit_price
             total_price = unit_price * quantity
@@ -215,6 +206,86 @@ def create_sale():
     return jsonify(sale.to_dict()), 201
 
 
+def _line_id(line, key):
+    """Catalog ID of a service/product line as an int (None if absent or invalid)."""
+    try:
+        return int(line.get(key) or line.get('id'))
+    except (TypeError, ValueError):
+        return None
+
+
+def _create_missing_services(service_lines):
+    """
+    Create services that a till sent but the database does not have.
+    
+    Kept out of the normal checkout path: it only runs for IDs the catalog
+    lookup could not find. Each insert runs in a savepoint so a failure
+    cannot discard the pending sale.
+    
+    Args:
+        service_lines: Service line dicts from the request (id, name, price, duration)
+    
+    Returns:
+        dict: {requested service_id: Service} for the services created or matched by name
+    """
+    resolved = {}
+    for service_data in service_lines:
+        service_id = _line_id(service_data, 'service_id')
+        service_name = service_data.get('name')
+        service_price = service_data.get('price')
+        if service_id in resolved or not service_name or service_price is None:
+            continue
+        
+        # Get duration from frontend if provided, default to 30 minutes
+        duration = service_data.get('duration', 30)
+        try:
+            # Try to create service with the ID from frontend
+            if service_id is None:
+                raise ValueError('no usable service ID')
+            with db.session.begin_nested():
+                service = Service(id=service_id, name=service_name, price=service_price, duration=duration)
+                db.session.add(service)
+        except Exception:
+            # ID taken or not accepted: reuse a service with the same name, or create one
+            service = Service.query.filter_by(name=service_name).first()
+            if not service:
+                with db.session.begin_nested():
+                    service = Service(name=service_name, price=service_price, duration=duration)
+                    db.session.add(service)
+        resolved[service_id] = service
+    return resolved
+
+
+@bp_sales.route('/sales/batch', methods=['POST'])
+def create_sales_batch():
+    """Store completed sales queued by a till while it was offline"""
+    data = request.get_json(silent=True)
+    items = data.get('sales') if isinstance(data, dict) else data
+    if not isinstance(items, list) or not items:
+        return jsonify({'error': 'sales must be a non-empty list'}), 400
+    
+    max_items = current_app.config.get('SALES_BATCH_MAX_ITEMS', 500)
+    if len(items) > max_items:
+        return jsonify({'error': f'At most {max_items} sales can be sent per batch'}), 400
+    
+    try:
+        results = ingest_sales(items, current_app.config.get('SALES_BATCH_CHUNK_SIZE', 100))
+    except Exception as e:
+        db.session.rollback()
+        import traceback
+        print(f"Error in create_sales_batch: {str(e)}")
+        if current_app.debug:
+            traceback.print_exc()
+        return jsonify({'error': get_user_friendly_error(e, current_app.debug)}), 500
+    
+    return jsonify({
+        'results': results,
+        'created': sum(1 for r in results if r['status'] == 'created'),
+        'duplicates': sum(1 for r in results if r['status'] == 'duplicate'),
+        'failed': sum(1 for r in results if r['status'] == 'error')
+    }), 200
+
+
 @bp_sales.route('/sales/<int:id>/complete', methods=['POST'])
 def complete_sale(id):
     """Complete a sale - deduct stock, finalize commission, create payment"""
@@ -266,39 +337,71 @@ def complete_sale(id):
         transaction_code = normalized_code
     
     try:
+        # Claim the sale before any side effects: of two concurrent completions
+        # only one sees a row still not completed, the other gets a 409 instead
+        # of double-counting stock, rollups and commission
+        claimed = db.session.execute(
+            update(Sale)
+            .where(Sale.id == sale.id, or_(Sale.status.is_(None), Sale.status != 'completed'))
+            .values(status='completed')
+            .execution_options(synchronize_session=False)
+        ).rowcount
+        if not claimed:
+            db.session.rollback()
+            return jsonify({'error': 'Sale is already completed'}), 409
+        
         # STEP 1: Deduct product stock (if any products in sale)
-        if sale.sale_products:
-            for sale_product in sale.sale_products:
-                if not sale_product.stock_deducted:
-                    try:
-                        product = sale_product.product
-                    except AttributeError:
-                        # Product relationship not loaded, query it directly
-                        product = Product.query.get(sale_product.product_id)
-                    
-                    if not product:
-                        return jsonify({
-                            'error': f'Product not found for sale product ID {sale_product.id} (product_id: {sale_product.product_id}). Product may have been deleted.'
-                        }), 400
-                    
-                    # Handle None stock_quantity (default to 0)
-                    current_stock = product.stock_quantity if product.stock_quantity is not None else 0
-                    if current_stock < sale_product.quantity:
+        pending_products = [sp for sp in sale.sale_products if not sp.stock_deducted]
+        if pending_products:
+            missing = [sp for sp in pending_products if not sp.product]
+            if missing:
+                db.session.rollback()
+                return jsonify({
+                    'error': f'Product not found for sale product ID {missing[0].id} (product_id: {missing[0].product_id}). Product may have been deleted.'
+                }), 400
+            
+            # Claim the lines first so a concurrent completion of the same
+            # sale cannot deduct them a second time
+            claimed = db.session.execute(
+                update(SaleProduct)
+                .where(SaleProduct.id.in_([sp.id for sp in pending_products]), SaleProduct.stock_deducted == False)
+                .values(stock_deducted=True)
+                .execution_options(synchronize_session=False)
+            ).rowcount
+            if claimed != len(pending_products):
+                db.session.rollback()
+                return jsonify({'error': 'Sale is already being completed'}), 409
+            
+            required = {}
+            for sale_product in pending_products:
+                required[sale_product.product_id] = required.get(sale_product.product_id, 0) + sale_product.quantity
+            
+            if not deduct_stock(required):
+                db.session.rollback()
+                # Report the first product that is short, using fresh stock levels
+                available = dict(
+                    db.session.query(Product.id, Product.stock_quantity)
+                    .filter(Product.id.in_(list(required))).all()
+                )
+                for sale_product in pending_products:
+                    current_stock = available.get(sale_product.product_id) or 0
+                    if current_stock < required[sale_product.product_id]:
                         return jsonify({
-                            'error': f'Insufficient stock for {product.name}. Available: {current_stock}, Required: {sale_product.quantity}'
+                            'error': f'Insufficient stock for {sale_product.product.name}. Available: {current_stock}, Required: {required[sale_product.product_id]}'
                         }), 400
-                    
-                    product.stock_quantity = current_stock - sale_product.quantity
-                    sale_product.stock_deducted = True
-                    
-                    # Record product usage
-                    product_usage = ProductUsage(
-                        product_id=product.id,
-                        sale_id=sale.id,
-                        quantity_used=sale_product.quantity,
-                        used_at=datetime.utcnow()
-                    )
-                    db.session.add(product_usage)
+                return jsonify({'error': 'Stock changed during checkout, please retry'}), 409
+            
+            for sale_product in pending_products:
+                sale_product.stock_deducted = True
+                
+                # Record product usage
+                product_usage = ProductUsage(
+                    product_id=sale_product.product_id,
+                    sale_id=sale.id,
+                    quantity_used=sale_product.quantity,
+                    used_at=datetime.utcnow()
+                )
+                db.session.add(product_usage)
         
         # STEP 2: Generate receipt number
         receipt_number = data.get('receipt_number') or f"RCP-{sale.sale_number.replace('SALE-', '')}"
@@ -315,7 +418,8 @@ def complete_sale(id):
         )
         db.session.add(payment)
         
-        # STEP 4: Mark sale as completed
+        # STEP 4: Mark sale as completed (already claimed above; setting it on
+        # the instance too keeps the change in its history for the dashboard hooks)
         sale.status = 'completed'
         sale.completed_at = datetime.utcnow()
         
@@ -360,6 +464,10 @@ def complete_sale(id):
             if points_earned > 0:
                 customer.loyalty_points = (customer.loyalty_points or 0) + points_earned
         
+        # STEP 6: Fold the sale into its day's rollup and the commission ledger in the same transaction
+        apply_sale_to_rollup(sale, payment)
+        record_earning(sale)
+        
         db.session.commit()
         
         # Return sale with payment info
@@ -393,34 +501,84 @@ def get_sale(id):
     return jsonify(sale_dict)
 
 
+@bp_sales.route('/sales/receipts/export', methods=['GET'])
+def export_receipts_zip():
+    """Stream a ZIP of receipt PDFs for a date range (optional staff filter)"""
+    staff_id = request.args.get('staff_id', type=int)
+    status = request.args.get('status', 'completed')
+    try:
+        start_date = datetime.fromisoformat(request.args['start_date']).date()
+        end_date = datetime.fromisoformat(request.args['end_date']).date()
+    except KeyError:
+        return jsonify({'error': 'start_date and end_date are required'}), 400
+    except ValueError:
+        return jsonify({'error': 'start_date and end_date must be ISO dates'}), 400
+    if end_date < start_date:
+        return jsonify({'error': 'end_date must not be before start_date'}), 400
+    
+    staff = Staff.query.get(staff_id) if staff_id else None
+    demo_filter = get_demo_filter(staff, request)
+    query = Sale.query.filter(
+        Sale.is_demo == demo_filter['is_demo'],
+        Sale.business_date >= start_date,
+        Sale.business_date <= end_date
+    )
+    if staff_id:
+        query = query.filter(Sale.staff_id == staff_id)
+    if status != 'all':
+        query = query.filter(Sale.status == status)
+    query = query.order_by(Sale.business_date, Sale.id)
+    
+    filename = f"receipts_{start_date.strftime('%Y%m%d')}_{end_date.strftime('%Y%m%d')}"
+    if staff_id:
+        filename += f"_staff{staff_id}"
+    return Response(
+        stream_with_context(stream_receipts_zip(
+            query,
+            chunk_size=current_app.config['RECEIPT_EXPORT_CHUNK_SIZE'],
+            render_processes=current_app.config['RENDER_PROCESSES']
+        )),
+        mimetype='application/zip',
+        headers={'Content-Disposition': f'attachment; filename={filename}.zip'}
+    )
+
+
 @bp_sales.route('/sales/<int:id>/receipt', methods=['GET'])
 def download_receipt_pdf(id):
-    """Download sales receipt as PDF"""
-    sale = Sale.query.options(
-        joinedload(Sale.staff),
-        joinedload(Sale.customer),
-        joinedload(Sale.payment),
-        joinedload(Sale.sale_services).joinedload(SaleService.service),
-        joinedload(Sale.sale_products).joinedload(SaleProduct.product)
-    ).get_or_404(id)
-    
-    # Generate PDF
-    pdf_buffer = generate_sales_receipt_pdf(
+    """Download sales receipt as PDF, or as text/ESC/POS for thermal printers (?format=text|escpos)"""
+    format_type = request.args.get('format', 'pdf').lower()
+    if format_type not in ('pdf', 'text', 'escpos'):
+        return jsonify({'error': "format must be 'pdf', 'text' or 'escpos'"}), 400
+    
+    sale = Sale.query.options(*Sale.receipt_load_options()).get_or_404(id)
+    
+    if format_type == 'text':
+        text = render_text_receipt(sale, sale.staff, sale.customer, sale.payment,
+                                   width=current_app.config['THERMAL_RECEIPT_WIDTH'])
+        return Response(text, mimetype='text/plain')
+    if format_type == 'escpos':
+        data = render_escpos_receipt(sale, sale.staff, sale.customer, sale.payment,
+                                     width=current_app.config['THERMAL_RECEIPT_WIDTH'])
+        return Response(data, mimetype='application/octet-stream')
+    
+    # Generate PDF (completed sales no longer change, so their receipt is cached)
+    render = lambda: generate_sales_receipt_pdf(
         sale=sale,
         staff=sale.staff,
         customer=sale.customer,
         payment=sale.payment
     )
-    
-    # Generate filename
-    receipt_number = sale.payment.receipt_number if sale.payment and sale.payment.receipt_number else sale.sale_number
-    filename = f"receipt_{receipt_number.replace(' ', '_')}.pdf"
+    if sale.status == 'completed':
+        fingerprint = sales_receipt_fingerprint(sale, sale.staff, sale.customer, sale.payment)
+        pdf_buffer = cached_pdf('sales_receipt', fingerprint, render)
+    else:
+        pdf_buffer = render()
     
     return send_file(
         pdf_buffer,
         mimetype='application/pdf',
         as_attachment=True,
-        download_name=filename
+        download_name=sales_receipt_filename(sale)
     )
 
 
@@ -431,7 +589,7 @@ def get_sales():
     status = request.args.get('status')
     start_date = request.args.get('start_date')
     end_date = request.args.get('end_date')
-    limit = request.args.get('limit', type=int, default=100)
+    page_size = get_page_size(request)
     
     query = Sale.query
     
@@ -448,11 +606,17 @@ def get_sales():
     if status:
         query = query.filter(Sale.status == status)
     if start_date:
-        query = query.filter(func.date(Sale.created_at) >= datetime.fromisoformat(start_date).date())
+        query = query.filter(Sale.business_date >= datetime.fromisoformat(start_date).date())
     if end_date:
-        query = query.filter(func.date(Sale.created_at) <= datetime.fromisoformat(end_date).date())
+        query = query.filter(Sale.business_date <= datetime.fromisoformat(end_date).date())
     
-    sales = query.order_by(Sale.created_at.desc()).limit(limit).all()
+    try:
+        sales, next_cursor = paginate_keyset(
+            query, [(Sale.created_at, True), (Sale.id, True)],
+            request.args.get('cursor'), page_size
+        )
+    except InvalidCursor:
+        return jsonify({'error': 'Invalid cursor'}), 400
     
     # Include payment information in response
     result = []
@@ -469,4 +633,4 @@ def get_sales():
         sale_dict['time'] = sale.created_at.strftime('%H:%M') if sale.created_at else ''
         result.append(sale_dict)
     
-    return jsonify(result)
+    return jsonify(page_response(result, next_cursor, page_size))
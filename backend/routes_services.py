@@ -3,12 +3,14 @@ Service routes for the POS Salon backend.
 """
 from flask import Blueprint, request, jsonify
 from models import Service, ServicePriceHistory
+from table_versions import versioned_etag
 from db import db
 
 bp_services = Blueprint('services', __name__)
 
 
 @bp_services.route('/services', methods=['GET'])
+@versioned_etag('services')
 def get_services():
     services = Service.query.all()
     return jsonify([service.to_dict() for service in services])
@@ -4,6 +4,7 @@ Settings routes (admin-side). Business type and other org-level config.
 from flask import Blueprint, request, jsonify
 from auth_helpers import require_auth
 from models import Setting
+from table_versions import versioned_etag
 from db import db
 
 bp_settings = Blueprint('settings', __name__)
@@ -36,6 +37,7 @@ def get_settings():
 
 
 @bp_settings.route('/settings/public', methods=['GET'])
+@versioned_etag('settings')
 def get_settings_public():
     """Public read-only: business_type only. Used by POS for labels (staff login)."""
     business_type = _get_setting(BUSINESS_TYPE_KEY)
@@ -5,6 +5,8 @@ from flask import Blueprint, request, jsonify
 from models import Shift
 from db import db
 from datetime import datetime, date
+from business_time import business_today
+from pagination import get_page_size, paginate_keyset, page_response, InvalidCursor
 
 bp_shifts = Blueprint('shifts', __name__)
 
@@ -26,8 +28,15 @@ def get_shifts():
         end_dt = datetime.fromisoformat(end_date).date()
         query = query.filter(Shift.shift_date <= end_dt)
     
-    shifts = query.order_by(Shift.shift_date.desc(), Shift.start_time).all()
-    return jsonify([shift.to_dict() for shift in shifts])
+    page_size = get_page_size(request)
+    try:
+        shifts, next_cursor = paginate_keyset(
+            query, [(Shift.shift_date, True), (Shift.start_time, False), (Shift.id, False)],
+            request.args.get('cursor'), page_size
+        )
+    except InvalidCursor:
+        return jsonify({'error': 'Invalid cursor'}), 400
+    return jsonify(page_response([shift.to_dict() for shift in shifts], next_cursor, page_size))
 
 
 @bp_shifts.route('/shifts', methods=['POST'])
@@ -36,7 +45,7 @@ def create_shift():
     data = request.get_json()
     shift = Shift(
         staff_id=data.get('staff_id'),
-        shift_date=datetime.fromisoformat(data.get('shift_date')).date() if data.get('shift_date') else date.today(),
+        shift_date=datetime.fromisoformat(data.get('shift_date')).date() if data.get('shift_date') else business_today(),
         start_time=datetime.strptime(data.get('start_time'), '%H:%M').time(),
         end_time=datetime.strptime(data.get('end_time'), '%H:%M').time(),
         notes=data.get('notes')
@@ -80,7 +89,7 @@ def update_shift(id):
     if 'staff_id' in data:
         shift.staff_id = data.get('staff_id')
     if 'shift_date' in data:
-        shift.shift_date = datetime.fromisoformat(data.get('shift_date')).date() if data.get('shift_date') else date.today()
+        shift.shift_date = datetime.fromisoformat(data.get('shift_date')).date() if data.get('shift_date') else business_today()
     if 'start_time' in data:
         shift.start_time = datetime.strptime(data.get('start_time'), '%H:%M').time()
     if 'end_time' in data:
@@ -7,13 +7,17 @@ from db import db
 from sqlalchemy import func
 from datetime import datetime, date, timedelta
 from utils import get_demo_filter
+from business_time import business_today
 from validators import validate_pin_format, validate_staff_id
 from auth_helpers import require_manager_or_admin
+from table_versions import versioned_etag
+from commission_ledger import delete_staff_entries
 
 bp_staff = Blueprint('staff', __name__)
 
 
 @bp_staff.route('/staff', methods=['GET'])
+@versioned_etag('staff')
 def get_staff():
     staff_list = Staff.query.all()
     return jsonify([staff.to_dict() for staff in staff_list])
@@ -142,7 +146,7 @@ def get_staff_performance(id):
     end_date = request.args.get('end_date')
     today_only = request.args.get('today_only', 'false').lower() == 'true'
     
-    today = date.today()
+    today = business_today()
     
     query = Sale.query.filter(
         Sale.staff_id == id,
@@ -150,7 +154,7 @@ def get_staff_performance(id):
     )
     
     if today_only:
-        query = query.filter(func.date(Sale.created_at) == today)
+        query = query.filter(Sale.business_date == today)
     else:
         if start_date:
             start_dt = datetime.fromisoformat(start_date)
@@ -264,7 +268,7 @@ def staff_login():
 @bp_staff.route('/staff/logout', methods=['POST'])
 def staff_logout():
     """Log staff logout event and cleanup demo data if demo user"""
-    from models import SaleService, SaleProduct, ProductUsage, Expense
+    from models import SaleService, SaleProduct, ProductUsage, Expense, DailySalesRollup
     data = request.get_json()
     login_log_id = data.get('login_log_id')
     staff_id = data.get('staff_id')
@@ -299,6 +303,9 @@ def staff_logout():
                     Sale.is_demo == True
                 ).all()
                 
+                # Ledger entries reference the sales, so they go first
+                delete_staff_entries(staff.id, True)
+                
                 for sale in demo_sales:
                     SaleService.query.filter_by(sale_id=sale.id).delete()
                     SaleProduct.query.filter_by(sale_id=sale.id).delete()
@@ -306,6 +313,8 @@ def staff_logout():
                     Payment.query.filter_by(sale_id=sale.id).delete()
                     db.session.delete(sale)
                 
+                DailySalesRollup.query.filter_by(staff_id=staff.id, is_demo=True).delete()
+                
                 demo_customers = Customer.query.filter(Customer.is_demo == True).all()
                 for customer in demo_customers:
                     non_demo_sales = Sale.query.filter(
@@ -401,13 +410,13 @@ def toggle_demo_mode(id):
 @bp_staff.route('/staff/<int:id>/stats', methods=['GET'])
 def get_staff_stats(id):
     staff = Staff.query.get_or_404(id)
-    today = datetime.now().date()
+    today = business_today()
     
     demo_filter = get_demo_filter(staff, request)
     
     today_sales = Sale.query.filter(
         Sale.staff_id == id,
-        func.date(Sale.created_at) == today,
+        Sale.business_date == today,
         Sale.status == 'completed',
         Sale.is_demo == demo_filter['is_demo']
     ).all()
@@ -420,7 +429,7 @@ def get_staff_stats(id):
     week_start = today - timedelta(days=6)
     week_sales = Sale.query.filter(
         Sale.staff_id == id,
-        func.date(Sale.created_at) >= week_start,
+        Sale.business_date >= week_start,
         Sale.status == 'completed',
         Sale.is_demo == demo_filter['is_demo']
     ).all()
@@ -6,6 +6,7 @@ from models import User
 from db import db
 from datetime import datetime
 from auth_helpers import require_auth, require_admin, get_current_user
+from auth_tokens import revoke_user_tokens
 import bcrypt
 
 bp_users = Blueprint('users', __name__)
@@ -22,11 +23,11 @@ def get_users():
         users = User.query.all()
     else:
         # Manager can only see themselves
-        users = [current_user]
+        users = [db.session.get(User, current_user.id)]
     
     return jsonify({
         'success': True,
-        'users': [user.to_dict() for user in users]
+        'users': User.to_dict_many(users)
     }), 200
 
 
@@ -37,7 +38,7 @@ def get_managers():
     managers = User.query.filter_by(role='manager').all()
     return jsonify({
         'success': True,
-        'managers': [manager.to_dict() for manager in managers]
+        'managers': User.to_dict_many(managers)
     }), 200
 
 
@@ -126,6 +127,10 @@ def update_user(user_id):
                 return jsonify({'error': 'Cannot change manager assignment'}), 403
         
         data = request.get_json()
+        # Tokens carry the role and active flag, so remember them to know
+        # whether issued tokens must be revoked
+        previous_claims = (user.role, user.is_active)
+        password_changed = False
         
         # Update fields
         if 'name' in data:
@@ -139,6 +144,7 @@ def update_user(user_id):
                 user.email = new_email
         if 'password' in data and data['password']:
             user.set_password(data['password'])
+            password_changed = True
         if 'is_active' in data and current_user.is_admin():
             user.is_active = data['is_active']
         if 'role' in data and current_user.is_admin():
@@ -147,6 +153,9 @@ def update_user(user_id):
             user.managed_by = data['managed_by']
         
         db.session.commit()
+        # A new password must also sign out sessions holding tokens issued under the old one
+        if password_changed or (user.role, user.is_active) != previous_claims:
+            revoke_user_tokens(user.id)
         
         return jsonify({
             'success': True,
@@ -178,6 +187,7 @@ def delete_user(user_id):
         
         db.session.delete(user)
         db.session.commit()
+        revoke_user_tokens(user_id)
         
         return jsonify({
             'success': True,
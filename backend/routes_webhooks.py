@@ -80,4 +80,5 @@ def _handle_charge_success(body: dict) -> None:
         stripe_subscription_id=reference,
     )
     db.session.add(sub)
+    user.set_current_subscription(sub)
     db.session.commit()
@@ -0,0 +1,446 @@
+"""
+Bulk ingestion of completed sales queued by offline tills.
+
+POST /api/sales/batch receives sales that were rung up while the till had
+no connection, each tagged with a client-generated UUID. Items are handled
+in chunks: every chunk is validated with a few IN queries, its stock is
+deducted in one conditional UPDATE, its rows are inserted in one flush and
+it commits once. If anything in a chunk fails as a whole (stock ran out,
+a unique constraint), the chunk is retried one item per transaction so the
+other items still go through.
+
+A UUID that is already stored is reported as a duplicate with the original
+sale, so a till can safely replay its queue after a lost response.
+"""
+import uuid
+from datetime import datetime, timezone
+from sqlalchemy.exc import IntegrityError
+from db import db
+from models import Sale, SaleService, SaleProduct, Customer, Staff, Service, Product, ProductUsage, Payment
+from validators import validate_mpesa_code
+from business_time import business_date_for, get_salon_timezone
+from sequences import next_sale_sequence
+from utils import format_sale_number
+from inventory import deduct_stock
+from sales_rollup import apply_sales_to_rollup
+from commission_ledger import record_earnings
+
+
+class BatchItemError(ValueError):
+    """Raised when a queued sale cannot be accepted."""
+
+
+def ingest_sales(items, chunk_size):
+    """
+    Validate and store a list of queued sales.
+
+    Args:
+        items: List of sale payloads (see _parse_item for the fields)
+        chunk_size: Number of sales stored per transaction
+
+    Returns:
+        list: One result dict per item, in input order, with 'index',
+              'client_uuid', 'status' ('created', 'duplicate' or 'error')
+              and either the sale fields or an 'error' message
+    """
+    indexed = list(enumerate(items))
+    results = []
+    for start in range(0, len(indexed), chunk_size):
+        results.extend(_ingest_chunk(indexed[start:start + chunk_size]))
+    return sorted(results, key=lambda r: r['index'])
+
+
+def _ingest_chunk(indexed_items):
+    """Store one chunk in a single transaction, falling back to one item at a time."""
+    results = []
+    parsed = []
+    first_by_uuid = {}
+    repeats = []
+
+    for index, item in indexed_items:
+        try:
+            data = _parse_item(item)
+        except BatchItemError as e:
+            client_uuid = item.get('client_uuid') if isinstance(item, dict) else None
+            results.append(_error(index, client_uuid, str(e)))
+            continue
+        if data['client_uuid'] in first_by_uuid:
+            repeats.append((index, data['client_uuid']))
+            continue
+        first_by_uuid[data['client_uuid']] = index
+        parsed.append((index, data))
+
+    existing = _existing_sales([data['client_uuid'] for _, data in parsed])
+    pending = []
+    for index, data in parsed:
+        if data['client_uuid'] in existing:
+            results.append(_sale_result(index, data['client_uuid'], 'duplicate', existing[data['client_uuid']]))
+        else:
+            pending.append((index, data))
+
+    if pending:
+        results.extend(_store(pending))
+
+    # Repeats of a UUID within the same request share the first item's outcome
+    by_index = {r['index']: r for r in results}
+    for index, client_uuid in repeats:
+        first = by_index[first_by_uuid[client_uuid]]
+        if first['status'] == 'error':
+            results.append(_error(index, client_uuid, first['error']))
+        else:
+            results.append(dict(first, index=index, status='duplicate'))
+    return results
+
+
+def _store(pending):
+    """Insert validated, not-yet-stored sales; returns their results."""
+    results = []
+    staff_by_id = _by_id(Staff, {data['staff_id'] for _, data in pending})
+    services_by_id = _by_id(Service, {line['id'] for _, data in pending for line in data['services']})
+    products_by_id = _by_id(Product, {line['id'] for _, data in pending for line in data['products']})
+
+    built = []
+    for index, data in pending:
+        try:
+            built.append((index, data, _build_sale(data, staff_by_id, services_by_id, products_by_id)))
+        except BatchItemError as e:
+            results.append(_error(index, data['client_uuid'], str(e)))
+    if not built:
+        return results
+
+    required = {}
+    for _, _, sale in built:
+        for sale_product in sale.sale_products:
+            required[sale_product.product_id] = required.get(sale_product.product_id, 0) + sale_product.quantity
+
+    if not deduct_stock(required):
+        db.session.rollback()
+        if len(built) > 1:
+            return results + _store_one_by_one([(index, data) for index, data, _ in built])
+        index, data, _ = built[0]
+        return results + [_error(index, data['client_uuid'], _shortage_message(required, products_by_id))]
+
+    _attach_customers([(data, sale) for _, data, sale in built])
+    _number_sales([sale for _, _, sale in built])
+    db.session.add_all([sale for _, _, sale in built])
+
+    try:
+        db.session.flush()  # One multi-row INSERT per table for the whole chunk
+        apply_sales_to_rollup([(sale, sale.payment) for _, _, sale in built])
+        record_earnings([sale for _, _, sale in built])
+        # Read the results before commit expires the objects
+        created = [
+            _sale_result(index, data['client_uuid'], 'created', (sale.id, sale.sale_number, sale.payment.receipt_number))
+            for index, data, sale in built
+        ]
+        db.session.commit()
+    except IntegrityError as e:
+        db.session.rollback()
+        if len(built) > 1:
+            return results + _store_one_by_one([(index, data) for index, data, _ in built])
+        index, data, _ = built[0]
+        # Another request may have stored the same UUID since we checked
+        existing = _existing_sales([data['client_uuid']])
+        if data['client_uuid'] in existing:
+            return results + [_sale_result(index, data['client_uuid'], 'duplicate', existing[data['client_uuid']])]
+        return results + [_error(index, data['client_uuid'], f'Failed to store sale: {e.orig}')]
+
+    return results + created
+
+
+def _store_one_by_one(pending):
+    results = []
+    for entry in pending:
+        results.extend(_store([entry]))
+    return results
+
+
+def _parse_item(item):
+    """Validate the shape of one queued sale and normalise its fields."""
+    if not isinstance(item, dict):
+        raise BatchItemError('Each sale must be an object')
+
+    try:
+        client_uuid = str(uuid.UUID(str(item.get('client_uuid'))))
+    except ValueError:
+        raise BatchItemError('client_uuid must be a UUID')
+
+    if not item.get('staff_id'):
+        raise BatchItemError('Staff ID is required')
+    staff_id = _parse_id(item['staff_id'], 'staff_id')
+    if item.get('appointment_id'):
+        raise BatchItemError('Sales linked to an appointment must be completed online')
+
+    payment_method = _parse_text(item, 'payment_method')
+    if not payment_method:
+        raise BatchItemError('Payment method is required')
+    payment_method = payment_method.lower().replace('-', '_')
+
+    transaction_code = _parse_text(item, 'transaction_code')
+    if payment_method in ['m_pesa', 'mpesa'] and transaction_code:
+        is_valid, error, transaction_code = validate_mpesa_code(transaction_code)
+        if not is_valid:
+            raise BatchItemError(error)
+
+    services = [_parse_line(line, 'service') for line in item.get('services') or []]
+    products = [_parse_line(line, 'product') for line in item.get('products') or []]
+    if not services and not products:
+        raise BatchItemError('Sale has no services or products')
+
+    return {
+        'client_uuid': client_uuid,
+        'staff_id': staff_id,
+        'payment_method': payment_method,
+        'transaction_code': transaction_code,
+        'receipt_number': _parse_text(item, 'receipt_number'),
+        'customer_name': _parse_text(item, 'customer_name'),
+        'customer_phone': _parse_text(item, 'customer_phone'),
+        'customer_email': _parse_text(item, 'customer_email'),
+        'service_location': _parse_text(item, 'service_location'),
+        'home_service_address': _parse_text(item, 'home_service_address'),
+        'notes': _parse_text(item, 'notes'),
+        'created_at': _parse_time(item.get('created_at'), 'created_at') or datetime.utcnow(),
+        'service_start_time': _parse_time(item.get('service_start_time'), 'service_start_time'),
+        'service_end_time': _parse_time(item.get('service_end_time'), 'service_end_time'),
+        'services': services,
+        'products': products
+    }
+
+
+def _parse_line(line, kind):
+    if not isinstance(line, dict):
+        raise BatchItemError(f'Each {kind} must be an object')
+    line_id = line.get(f'{kind}_id') or line.get('id')
+    quantity = line.get('quantity', 1)
+    if not line_id:
+        raise BatchItemError(f'{kind.capitalize()} ID is required')
+    line_id = _parse_id(line_id, f'{kind}_id')
+    if not isinstance(quantity, int) or quantity < 1:
+        raise BatchItemError(f'Invalid quantity for {kind} {line_id}')
+    return {
+        'id': line_id,
+        'quantity': quantity,
+        'price': _parse_number(line.get('price'), f'price for {kind} {line_id}'),
+        'commission_rate': _parse_number(line.get('commission_rate', 0.50), f'commission_rate for {kind} {line_id}')
+    }
+
+
+def _parse_id(value, field):
+    try:
+        return int(value)
+    except (TypeError, ValueError):
+        raise BatchItemError(f'Invalid {field}')
+
+
+def _parse_number(value, field):
+    if value is not None and (isinstance(value, bool) or not isinstance(value, (int, float))):
+        raise BatchItemError(f'Invalid {field}')
+    return value
+
+
+def _parse_text(item, field):
+    """A string field of a queued sale, or None when it is missing."""
+    value = item.get(field)
+    if value is not None and not isinstance(value, str):
+        raise BatchItemError(f'{field} must be a string')
+    return value
+
+
+def _parse_time(value, field):
+    """Parse an ISO timestamp into naive UTC (naive input is taken as UTC)."""
+    if not value:
+        return None
+    try:
+        parsed = datetime.fromisoformat(str(value).replace('Z', '+00:00'))
+    except ValueError:
+        raise BatchItemError(f'Invalid {field}')
+    if parsed.tzinfo is not None:
+        parsed = parsed.astimezone(timezone.utc).replace(tzinfo=None)
+    return parsed
+
+
+def _build_sale(data, staff_by_id, services_by_id, products_by_id):
+    """Build an unsaved completed Sale with its lines, payment and product usage."""
+    staff = staff_by_id.get(data['staff_id'])
+    if not staff:
+        raise BatchItemError(f"Staff {data['staff_id']} not found")
+
+    sale_services = []
+    for line in data['services']:
+        service = services_by_id.get(line['id'])
+        if not service:
+            raise BatchItemError(f"Service {line['id']} not found")
+        # Use price from the till if provided, otherwise the database price
+        unit_price = line['price'] if line['price'] is not None else service.price
+        total_price = unit_price * line['quantity']
+        # Commission is calculated on subtotal (excluding tax)
+        subtotal_price = round(total_price / 1.16, 2)
+        sale_services.append(SaleService(
+            service_id=service.id,
+            quantity=line['quantity'],
+            unit_price=unit_price,
+            total_price=total_price,
+            commission_rate=line['commission_rate'],
+            commission_amount=round(subtotal_price * line['commission_rate'], 2)
+        ))
+
+    sale_products = []
+    for line in data['products']:
+        product = products_by_id.get(line['id'])
+        if not product:
+            raise BatchItemError(f"Product {line['id']} not found")
+        unit_price = product.selling_price or product.unit_price
+        sale_products.append(SaleProduct(
+            product_id=product.id,
+            quantity=line['quantity'],
+            unit_price=unit_price,
+            total_price=unit_price * line['quantity'],
+            stock_deducted=True
+        ))
+
+    total_amount = sum(ss.total_price for ss in sale_services) + sum(sp.total_price for sp in sale_products)
+    subtotal = round(total_amount / 1.16, 2)
+    created_at = data['created_at']
+
+    sale = Sale(
+        client_uuid=data['client_uuid'],
+        staff_id=staff.id,
+        customer_name=data['customer_name'],
+        customer_phone=data['customer_phone'],
+        service_location=data['service_location'],
+        home_service_address=data['home_service_address'],
+        status='completed',
+        subtotal=subtotal,
+        tax_amount=round(total_amount - subtotal, 2),
+        total_amount=total_amount,
+        commission_amount=sum(ss.commission_amount for ss in sale_services),
+        notes=data['notes'],
+        is_demo=bool(staff.is_demo),
+        created_at=created_at,
+        business_date=business_date_for(created_at),
+        completed_at=created_at,
+        service_start_time=data['service_start_time'],
+        service_end_time=data['service_end_time']
+    )
+    if sale.service_start_time and sale.service_end_time:
+        duration = sale.service_end_time - sale.service_start_time
+        sale.service_duration_minutes = int(duration.total_seconds() / 60)
+
+    sale.sale_services = sale_services
+    sale.sale_products = sale_products
+    sale.product_usage = [
+        ProductUsage(product_id=sp.product_id, quantity_used=sp.quantity, used_at=created_at)
+        for sp in sale_products
+    ]
+    sale.payment = Payment(
+        appointment_id=None,
+        amount=total_amount,
+        payment_method=data['payment_method'],
+        status='completed',
+        transaction_code=data['transaction_code'],
+        receipt_number=data['receipt_number'],
+        created_at=created_at
+    )
+    return sale
+
+
+def _attach_customers(entries):
+    """Link sales to customers by phone (creating missing ones) and update their stats."""
+    phones = {sale.customer_phone for _, sale in entries if sale.customer_phone}
+    customers = {}
+    if phones:
+        for customer in Customer.query.filter(Customer.phone.in_(phones)).all():
+            customers[(customer.phone, bool(customer.is_demo))] = customer
+
+    for data, sale in entries:
+        customer = None
+        if sale.customer_phone:
+            key = (sale.customer_phone, bool(sale.is_demo))
+            customer = customers.get(key)
+            if customer is None:
+                customer = Customer(
+                    name=sale.customer_name or "Walk-in Customer",
+                    phone=sale.customer_phone,
+                    email=data['customer_email'],
+                    is_demo=bool(sale.is_demo),
+                    total_visits=0,
+                    total_spent=0.0,
+                    loyalty_points=0
+                )
+                db.session.add(customer)
+                customers[key] = customer
+        if customer is None:
+            continue
+
+        sale.customer = customer
+        sale.customer_name = sale.customer_name or customer.name
+        customer.total_visits = (customer.total_visits or 0) + 1
+        customer.total_spent = (customer.total_spent or 0) + sale.total_amount
+        if customer.last_visit is None or customer.last_visit < sale.created_at:
+            customer.last_visit = sale.created_at
+        # Award loyalty points: 1 point per KES 100 spent
+        points_earned = int(sale.total_amount / 100)
+        if points_earned > 0:
+            customer.loyalty_points = (customer.loyalty_points or 0) + points_earned
+
+
+def _number_sales(sales):
+    """Assign sale and receipt numbers, reserving one block per business day."""
+    by_day = {}
+    for sale in sales:
+        by_day.setdefault(sale.business_date, []).append(sale)
+
+    salon_tz = get_salon_timezone()
+    for business_day, day_sales in by_day.items():
+        day_sales.sort(key=lambda s: s.created_at)
+        sequences = next_sale_sequence(business_day, count=len(day_sales))
+        for sale, sequence in zip(day_sales, sequences):
+            local_time = sale.created_at.replace(tzinfo=timezone.utc).astimezone(salon_tz)
+            sale.sale_number = format_sale_number(business_day, local_time, sequence)
+            if not sale.payment.receipt_number:
+                sale.payment.receipt_number = f"RCP-{sale.sale_number.replace('SALE-', '')}"
+
+
+def _existing_sales(client_uuids):
+    """Map client_uuid -> (sale id, sale number, receipt number) for stored sales."""
+    if not client_uuids:
+        return {}
+    rows = db.session.query(
+        Sale.client_uuid, Sale.id, Sale.sale_number, Payment.receipt_number
+    ).outerjoin(Payment, Payment.sale_id == Sale.id).filter(Sale.client_uuid.in_(client_uuids)).all()
+    return {row[0]: (row[1], row[2], row[3]) for row in rows}
+
+
+def _by_id(model, ids):
+    if not ids:
+        return {}
+    return {obj.id: obj for obj in model.query.filter(model.id.in_(ids)).all()}
+
+
+def _shortage_message(required, products_by_id):
+    available = dict(
+        db.session.query(Product.id, Product.stock_quantity).filter(Product.id.in_(list(required))).all()
+    )
+    for product_id, quantity in required.items():
+        current_stock = available.get(product_id) or 0
+        if current_stock < quantity:
+            product = products_by_id.get(product_id)
+            name = product.name if product else f'product {product_id}'
+            return f'Insufficient stock for {name}. Available: {current_stock}, Required: {quantity}'
+    return 'Stock changed during sync, please retry'
+
+
+def _sale_result(index, client_uuid, status, sale_fields):
+    sale_id, sale_number, receipt_number = sale_fields
+    return {
+        'index': index,
+        'client_uuid': client_uuid,
+        'status': status,
+        'sale_id': sale_id,
+        'sale_number': sale_number,
+        'receipt_number': receipt_number
+    }
+
+
+def _error(index, client_uuid, message):
+    return {'index': index, 'client_uuid': client_uuid, 'status': 'error', 'error': message}
@@ -0,0 +1,254 @@
+"""
+Daily sales rollup maintenance for the POS Salon backend.
+
+Completed sales are folded into one DailySalesRollup row per
+(business_date, staff_id, is_demo) when they are completed, so reports for
+closed days can read a handful of rows instead of every sale.
+"""
+import json
+from datetime import timedelta
+from sqlalchemy import func, insert
+from sqlalchemy.exc import IntegrityError
+from db import db
+from models import Sale, SaleService, SaleProduct, Payment, DailySalesRollup
+from business_time import business_date_for, business_today
+
+
+def apply_sale_to_rollup(sale, payment):
+    """
+    Add a just-completed sale to its day's rollup row.
+
+    Runs inside the caller's transaction; the caller commits.
+
+    Args:
+        sale: Sale being completed
+        payment: Payment created for the sale (or None)
+    """
+    apply_sales_to_rollup([(sale, payment)])
+
+
+def _lock_rollup_row(business_date, staff_id, is_demo):
+    """
+    Lock a rollup row with SELECT ... FOR UPDATE, creating it on first use.
+
+    Concurrent completions for the same staff/day serialize on the row lock.
+    Two first sales of a day can race to create the row; the loser hits
+    uq_daily_sales_rollup_day_staff_demo inside its savepoint and locks the winner's row
+    instead (the same pattern as commission_ledger._adjust_balance).
+    """
+    query = DailySalesRollup.query.filter_by(
+        business_date=business_date,
+        staff_id=staff_id,
+        is_demo=is_demo
+    ).with_for_update()
+    rollup = query.first()
+    if rollup is not None:
+        return rollup
+
+    try:
+        with db.session.begin_nested():
+            db.session.execute(insert(DailySalesRollup).values(
+                business_date=business_date,
+                staff_id=staff_id,
+                is_demo=is_demo,
+                services_revenue=0.0,
+                products_revenue=0.0,
+                subtotal=0.0,
+                vat_amount=0.0,
+                total_amount=0.0,
+                commission_amount=0.0,
+                transaction_count=0,
+                payment_methods='{}'
+            ))
+    except IntegrityError:
+        pass
+    return query.populate_existing().one()
+
+
+def apply_sales_to_rollup(completed):
+    """
+    Add several just-completed sales to their rollup rows.
+
+    Sales are grouped by (business_date, staff_id, is_demo) first, so each
+    rollup row is locked and updated once however many sales it receives.
+    Runs inside the caller's transaction; the caller commits.
+
+    Args:
+        completed: List of (sale, payment) tuples; payment may be None
+    """
+    groups = {}
+    for sale, payment in completed:
+        business_date = sale.business_date or business_date_for(sale.created_at)
+        groups.setdefault((business_date, sale.staff_id, bool(sale.is_demo)), []).append((sale, payment))
+
+    for (business_date, staff_id, is_demo), pairs in groups.items():
+        rollup = _lock_rollup_row(business_date, staff_id, is_demo)
+
+        methods = json.loads(rollup.payment_methods) if rollup.payment_methods else {}
+        for sale, payment in pairs:
+            rollup.services_revenue += sum(ss.total_price or 0 for ss in sale.sale_services)
+            rollup.products_revenue += sum(sp.total_price or 0 for sp in sale.sale_products)
+            rollup.subtotal += sale.subtotal or 0
+            rollup.vat_amount += sale.tax_amount or 0
+            rollup.total_amount += sale.total_amount or 0
+            rollup.commission_amount += sale.commission_amount or 0
+            rollup.transaction_count += 1
+
+            if payment is not None:
+                method = payment.payment_method or 'cash'
+                methods[method] = methods.get(method, 0) + (payment.amount or 0)
+        rollup.payment_methods = json.dumps(methods)
+
+
+def rebuild_rollups(start_date=None, end_date=None):
+    """
+    Recompute rollup rows from raw sales for a business-date range.
+
+    Existing rows in the range are replaced. The caller commits.
+
+    Args:
+        start_date: First business date to rebuild (None for no lower bound)
+        end_date: Last business date to rebuild (None for no upper bound)
+
+    Returns:
+        int: Number of rollup rows written
+    """
+    sale_criteria = [Sale.status == 'completed', Sale.business_date.isnot(None)]
+    rollup_criteria = []
+    if start_date:
+        sale_criteria.append(Sale.business_date >= start_date)
+        rollup_criteria.append(DailySalesRollup.business_date >= start_date)
+    if end_date:
+        sale_criteria.append(Sale.business_date <= end_date)
+        rollup_criteria.append(DailySalesRollup.business_date <= end_date)
+
+    key = (Sale.business_date, Sale.staff_id, Sale.is_demo)
+
+    rows = {}
+    for business_date, staff_id, is_demo, subtotal, vat, total, commission, count in db.session.query(
+        *key,
+        func.coalesce(func.sum(Sale.subtotal), 0),
+        func.coalesce(func.sum(Sale.tax_amount), 0),
+        func.coalesce(func.sum(Sale.total_amount), 0),
+        func.coalesce(func.sum(Sale.commission_amount), 0),
+        func.count(Sale.id)
+    ).filter(*sale_criteria).group_by(*key).all():
+        rows[(business_date, staff_id, bool(is_demo))] = {
+            'business_date': business_date,
+            'staff_id': staff_id,
+            'is_demo': bool(is_demo),
+            'services_revenue': 0.0,
+            'products_revenue': 0.0,
+            'subtotal': subtotal,
+            'vat_amount': vat,
+            'total_amount': total,
+            'commission_amount': commission,
+            'transaction_count': count,
+            'payment_methods': {}
+        }
+
+    for line_model, field in ((SaleService, 'services_revenue'), (SaleProduct, 'products_revenue')):
+        for business_date, staff_id, is_demo, amount in db.session.query(
+            *key, func.sum(line_model.total_price)
+        ).join(Sale, line_model.sale_id == Sale.id).filter(*sale_criteria).group_by(*key).all():
+            row = rows.get((business_date, staff_id, bool(is_demo)))
+            if row is not None:
+                row[field] = amount or 0
+
+    for business_date, staff_id, is_demo, method, amount in db.session.query(
+        *key, Payment.payment_method, func.sum(Payment.amount)
+    ).join(Sale, Payment.sale_id == Sale.id).filter(*sale_criteria).group_by(*key, Payment.payment_method).all():
+        row = rows.get((business_date, staff_id, bool(is_demo)))
+        if row is not None:
+            method = method or 'cash'
+            row['payment_methods'][method] = row['payment_methods'].get(method, 0) + (amount or 0)
+
+    DailySalesRollup.query.filter(*rollup_criteria).delete(synchronize_session=False)
+
+    mappings = []
+    for row in rows.values():
+        row['payment_methods'] = json.dumps(row['payment_methods'])
+        mappings.append(row)
+    if mappings:
+        db.session.bulk_insert_mappings(DailySalesRollup, mappings)
+
+    return len(mappings)
+
+
+def split_rollup_range(start_date, end_date):
+    """
+    Split a business-date range into the closed days served by the rollup
+    and the remaining days (today onwards) that must be read from raw sales.
+
+    Args:
+        start_date: First business date (date)
+        end_date: Last business date (date)
+
+    Returns:
+        tuple: ((rollup_start, rollup_end) or None, (raw_start, raw_end) or None)
+    """
+    today = business_today()
+    rollup_range = None
+    raw_range = None
+
+    if start_date < today:
+        rollup_range = (start_date, min(end_date, today - timedelta(days=1)))
+    if end_date >= today:
+        raw_range = (max(start_date, today), end_date)
+
+    return rollup_range, raw_range
+
+
+def get_rollup_totals(start_date, end_date, is_demo, db_session=None, include_payment_methods=False):
+    """
+    Sum rollup rows over a business-date range.
+
+    Args:
+        start_date: First business date (date, None for no lower bound)
+        end_date: Last business date (date)
+        is_demo: Demo flag to filter on
+        db_session: SQLAlchemy session (defaults to db.session)
+        include_payment_methods: Also merge the per-method totals
+
+    Returns:
+        dict: Summed totals (plus payment_methods if requested)
+    """
+    session = db_session or db.session
+
+    criteria = [
+        DailySalesRollup.is_demo == is_demo,
+        DailySalesRollup.business_date <= end_date
+    ]
+    if start_date:
+        criteria.append(DailySalesRollup.business_date >= start_date)
+
+    row = session.query(
+        func.coalesce(func.sum(DailySalesRollup.services_revenue), 0),
+        func.coalesce(func.sum(DailySalesRollup.products_revenue), 0),
+        func.coalesce(func.sum(DailySalesRollup.subtotal), 0),
+        func.coalesce(func.sum(DailySalesRollup.vat_amount), 0),
+        func.coalesce(func.sum(DailySalesRollup.total_amount), 0),
+        func.coalesce(func.sum(DailySalesRollup.commission_amount), 0),
+        func.coalesce(func.sum(DailySalesRollup.transaction_count), 0)
+    ).filter(*criteria).one()
+
+    totals = {
+        'services_revenue': row[0] or 0,
+        'products_revenue': row[1] or 0,
+        'subtotal': row[2] or 0,
+        'vat_amount': row[3] or 0,
+        'total_amount': row[4] or 0,
+        'commission_amount': row[5] or 0,
+        'transaction_count': row[6] or 0
+    }
+
+    if include_payment_methods:
+        payment_methods = {}
+        for (methods_json,) in session.query(DailySalesRollup.payment_methods).filter(*criteria).all():
+            if not methods_json:
+                continue
+            for method, amount in json.loads(methods_json).items():
+                payment_methods[method] = payment_methods.get(method, 0) + amount
+        totals['payment_methods'] = payment_methods
+
+    return totals
@@ -0,0 +1,96 @@
+"""
+Database connectivity and schema verification for the readiness probe.
+
+Catalog introspection is expensive on Postgres, so it runs once at startup
+and then at most every SCHEMA_CHECK_INTERVAL seconds when /api/ready is
+polled. Request handlers read the cached result instead of inspecting the
+database themselves.
+"""
+import threading
+import time
+from datetime import datetime
+from sqlalchemy import inspect, text
+from flask import current_app
+from db import db
+
+_lock = threading.Lock()
+_status = None  # Last schema check result
+_checked_at = None  # time.monotonic() of the last schema check
+
+
+def check_schema():
+    """
+    Inspect the database and compare its tables with the models.
+
+    Returns:
+        dict: {'ready', 'missing_tables', 'error', 'checked_at'}
+    """
+    global _status, _checked_at
+    try:
+        tables = set(inspect(db.engine).get_table_names())
+        missing = sorted(set(db.metadata.tables) - tables)
+        status = {'ready': not missing, 'missing_tables': missing, 'error': None}
+    except Exception as e:
+        status = {'ready': False, 'missing_tables': [], 'error': str(e)}
+    status['checked_at'] = datetime.utcnow().isoformat()
+
+    with _lock:
+        _status = status
+        _checked_at = time.monotonic()
+    return status
+
+
+def get_schema_status(max_age=None):
+    """
+    Get the cached schema check, re-running it when older than max_age.
+
+    Args:
+        max_age: Maximum age in seconds (None never re-checks; returns None
+                 if no check has run yet)
+
+    Returns:
+        dict: Schema status (see check_schema) or None
+    """
+    with _lock:
+        status, checked_at = _status, _checked_at
+    if max_age is not None and (checked_at is None or time.monotonic() - checked_at > max_age):
+        return check_schema()
+    return status
+
+
+def table_missing(name):
+    """
+    Whether the last schema check found a table missing.
+
+    Never touches the database; returns False if no check has run yet.
+    """
+    status = get_schema_status()
+    return bool(status) and name in status['missing_tables']
+
+
+def readiness():
+    """
+    Build the readiness probe result: a live connectivity check plus the cached schema check.
+
+    Returns:
+        tuple: (body dict, ready bool)
+    """
+    try:
+        db.session.execute(text('SELECT 1'))
+        database_ok = True
+    except Exception as e:
+        db.session.rollback()
+        database_ok = False
+        connection_error = str(e)
+
+    schema = get_schema_status(max_age=current_app.config.get('SCHEMA_CHECK_INTERVAL', 300)) if database_ok else None
+    ready = database_ok and bool(schema) and schema['ready']
+
+    body = {
+        'status': 'ready' if ready else 'not_ready',
+        'database': 'ok' if database_ok else 'unavailable',
+        'schema': schema
+    }
+    if not database_ok and current_app.debug:
+        body['error'] = connection_error
+    return body, ready
@@ -0,0 +1,121 @@
+"""
+Atomic named counters backing sale and receipt numbers.
+
+Each counter is one row in the `sequences` table. Taking the next value is a
+single `UPDATE ... SET value = value + 1 ... RETURNING value`, so concurrent
+requests (including other Gunicorn workers) never receive the same number and
+no COUNT(*) over the numbered table is needed.
+
+The increment runs in the caller's transaction: the row stays locked until
+that transaction commits, and a rolled-back request gives its number back.
+"""
+from sqlalchemy import update, insert, select
+from sqlalchemy.exc import IntegrityError
+from db import db
+from models import NumberSequence
+from business_time import business_today
+
+SALE_SEQUENCE_PREFIX = 'sale:'
+COMMISSION_RECEIPT_SEQUENCE = 'commission_receipt'
+
+
+def _increment(name, count=1):
+    """Increment an existing counter; returns the new value or None if the row is missing."""
+    stmt = (
+        update(NumberSequence)
+        .where(NumberSequence.name == name)
+        .values(value=NumberSequence.value + count)
+    )
+    if db.session.get_bind().dialect.update_returning:
+        return db.session.execute(stmt.returning(NumberSequence.value)).scalar()
+
+    # SQLite before 3.35 has no RETURNING. SQLite holds the database write
+    # lock from the UPDATE until commit, so reading our own write back is safe.
+    if db.session.execute(stmt).rowcount == 0:
+        return None
+    return db.session.execute(
+        select(NumberSequence.value).where(NumberSequence.name == name)
+    ).scalar()
+
+
+def next_value(name):
+    """
+    Take the next value of a named counter, creating it at 1 on first use.
+
+    Args:
+        name: Counter name
+
+    Returns:
+        int: Next value (1, 2, 3, ...)
+    """
+    return next_values(name, 1)[0]
+
+
+def next_values(name, count):
+    """
+    Reserve a block of consecutive values from a named counter in one statement.
+
+    Args:
+        name: Counter name
+        count: Number of values to reserve (at least 1)
+
+    Returns:
+        range: The reserved values, in order
+    """
+    value = _increment(name, count)
+    if value is None:
+        # First use of this counter. Two requests can race to create it; the
+        # loser hits the primary key and increments the winner's row instead.
+        try:
+            with db.session.begin_nested():
+                db.session.execute(insert(NumberSequence).values(name=name, value=count))
+            value = count
+        except IntegrityError:
+            value = _increment(name, count)
+    return range(value - count + 1, value + 1)
+
+
+def next_sale_sequence(business_day=None, count=None):
+    """
+    Take the next per-day sale sequence number(s).
+
+    Args:
+        business_day: Salon-local date (defaults to today)
+        count: Reserve this many numbers at once and return them as a range
+
+    Returns:
+        int or range: Sequence number(s) within that business day
+    """
+    business_day = business_day or business_today()
+    name = f"{SALE_SEQUENCE_PREFIX}{business_day.strftime('%Y%m%d')}"
+    if count is None:
+        return next_value(name)
+    return next_values(name, count)
+
+
+def next_commission_receipt_number():
+    """
+    Generate the next commission receipt number: COMM-YYYYMMDD-NNNN
+
+    The running number continues the previous count-based numbering
+    (the migration seeds it with the existing number of payments).
+
+    Returns:
+        str: Receipt number
+    """
+    value = next_value(COMMISSION_RECEIPT_SEQUENCE)
+    return f"COMM-{business_today().strftime('%Y%m%d')}-{value:04d}"
+
+
+def next_commission_receipt_numbers(count):
+    """
+    Reserve a block of commission receipt numbers in one statement (bulk pay runs).
+
+    Args:
+        count: Number of receipts needed
+
+    Returns:
+        list: Receipt numbers in COMM-YYYYMMDD-NNNN form, in order
+    """
+    day = business_today().strftime('%Y%m%d')
+    return [f"COMM-{day}-{value:04d}" for value in next_values(COMMISSION_RECEIPT_SEQUENCE, count)]
@@ -0,0 +1,120 @@
+"""
+Per-table version counters and weak ETags for rarely-changing lists.
+
+Each tracked table has a counter that is bumped after a committed
+transaction wrote to it. GET handlers decorated with @versioned_etag derive
+a weak ETag from the counters they depend on and answer a matching
+If-None-Match with 304 Not Modified before running the view, so unchanged
+catalogs cost no database work.
+
+Counters live in each process and tags start with a random boot token, so a
+restart never reuses an old tag. Commits are announced through broadcast.py,
+so every worker bumps its counters when any of them writes a tracked table.
+"""
+import secrets
+import threading
+from functools import wraps
+from itertools import chain
+from flask import request, make_response, current_app
+from sqlalchemy import event
+from sqlalchemy.orm import Session
+from models import Service, Product, Staff, Setting
+from broadcast import broadcast, handles
+
+TRACKED_MODELS = {
+    Service: 'services',
+    Product: 'products',
+    Staff: 'staff',
+    Setting: 'settings',
+}
+
+# Browsers keep the body but revalidate with If-None-Match on every fetch()
+DEFAULT_CACHE_CONTROL = 'no-cache'
+
+_CHANGED_KEY = 'changed_tables'
+
+_boot_token = secrets.token_hex(4)
+_lock = threading.Lock()
+_versions = {name: 0 for name in TRACKED_MODELS.values()}
+
+
+def get_versions(*tables):
+    """Current version of each named table, as a tuple."""
+    with _lock:
+        return tuple(_versions[name] for name in tables)
+
+
+@handles('tables_changed')
+def bump(tables):
+    """Advance this process's version of the named tables."""
+    with _lock:
+        for name in tables:
+            _versions[name] += 1
+
+
+def mark_changed(session, *tables):
+    """
+    Record a write that the flush hook cannot see (bulk UPDATE/DELETE).
+
+    The versions are bumped when the session commits.
+
+    Args:
+        session: SQLAlchemy session doing the write
+        tables: Names of the tables written
+    """
+    session.info.setdefault(_CHANGED_KEY, set()).update(tables)
+
+
+def etag_for(*tables):
+    """Weak ETag value (unquoted) for the current versions of the named tables."""
+    versions = get_versions(*tables)
+    return f"{_boot_token}-" + '.'.join(f"{name}{version}" for name, version in zip(tables, versions))
+
+
+def versioned_etag(*tables, cache_control=DEFAULT_CACHE_CONTROL):
+    """
+    Decorator adding a weak ETag, If-None-Match handling and Cache-Control to a GET view.
+
+    The tag is computed before the view runs, so a write that commits while
+    the body is being built only makes the next request refetch.
+
+    Args:
+        tables: Names of the tables the response is built from
+        cache_control: Cache-Control header value
+    """
+    def decorator(f):
+        @wraps(f)
+        def decorated_function(*args, **kwargs):
+            tag = etag_for(*tables)
+            if request.if_none_match.contains_weak(tag):
+                response = current_app.response_class(status=304)
+            else:
+                response = make_response(f(*args, **kwargs))
+                if response.status_code != 200:
+                    return response
+            response.set_etag(tag, weak=True)
+            response.headers['Cache-Control'] = cache_control
+            return response
+        return decorated_function
+    return decorator
+
+
+@event.listens_for(Session, 'after_flush')
+def _track_table_changes(session, flush_context):
+    # new/dirty/deleted still hold the pre-flush state here
+    for obj in chain(session.new, session.dirty, session.deleted):
+        name = TRACKED_MODELS.get(type(obj))
+        if name is not None:
+            session.info.setdefault(_CHANGED_KEY, set()).add(name)
+
+
+@event.listens_for(Session, 'after_commit')
+def _bump_on_commit(session):
+    changed = session.info.pop(_CHANGED_KEY, None)
+    if changed:
+        broadcast(session.get_bind(), [('tables_changed', sorted(changed))])
+
+
+@event.listens_for(Session, 'after_rollback')
+def _clear_on_rollback(session):
+    session.info.pop(_CHANGED_KEY, None)
@@ -0,0 +1,194 @@
+"""
+Shared fixtures: the Flask app on a throwaway SQLite file, a clean database
+per test, and small factories for the rows most tests need.
+
+The database is a SQLite file rather than sqlite:// so that threads in the
+concurrency tests share it. Set TEST_DATABASE_URL to run against another
+database instead (every table in it is emptied after each test).
+Run from backend/: python -m pytest -q
+"""
+import os
+import sys
+import tempfile
+from contextlib import contextmanager
+from datetime import datetime, time, timedelta
+
+_DB_DIR = tempfile.mkdtemp(prefix='pos_salon_tests_')
+os.environ['DATABASE_URL'] = os.getenv('TEST_DATABASE_URL') or f"sqlite:///{os.path.join(_DB_DIR, 'test.db')}"
+os.environ.setdefault('BCRYPT_ROUNDS', '4')
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import pytest
+from sqlalchemy import event
+
+from app import app as flask_app
+from db import db
+from models import Staff, Service, Product, User, Sale, SaleService, SaleProduct, Payment
+from schema_check import check_schema
+from catalog_cache import invalidate_catalog
+from dashboard_cache import invalidate_dashboard_stats
+
+
+@pytest.fixture(scope='session')
+def app():
+    flask_app.config.update(TESTING=True, PDF_CACHE_DIR='')
+    with flask_app.app_context():
+        db.create_all()
+        check_schema()
+    return flask_app
+
+
+@pytest.fixture(autouse=True)
+def clean_db(app, tmp_path):
+    """Run each test in an app context against empty tables."""
+    app.config['PDF_CACHE_DIR'] = ''
+    app.config['JOB_ARTIFACT_DIR'] = str(tmp_path / 'job_artifacts')
+    with app.app_context():
+        yield
+        db.session.remove()
+        with db.engine.begin() as connection:
+            for table in reversed(db.metadata.sorted_tables):
+                connection.execute(table.delete())
+    invalidate_catalog()
+    invalidate_dashboard_stats()
+
+
+@pytest.fixture
+def client(app):
+    return app.test_client()
+
+
+@pytest.fixture
+def admin_user():
+    user = User(name='Admin', email='admin@example.com', role='admin', is_active=True)
+    user.set_password('correct horse')
+    db.session.add(user)
+    db.session.commit()
+    return user
+
+
+@pytest.fixture
+def admin_headers(admin_user):
+    return {'X-User-Id': str(admin_user.id)}
+
+
+@pytest.fixture
+def make_staff():
+    def make(name='Stylist', **fields):
+        staff = Staff(name=name, role=fields.pop('role', 'stylist'), is_active=True, **fields)
+        db.session.add(staff)
+        db.session.commit()
+        return staff
+    return make
+
+
+@pytest.fixture
+def make_service():
+    def make(name='Haircut', price=1000.0, duration=30, **fields):
+        service = Service(name=name, price=price, duration=duration, **fields)
+        db.session.add(service)
+        db.session.commit()
+        return service
+    return make
+
+
+@pytest.fixture
+def make_product():
+    def make(name='Shampoo', selling_price=500.0, stock_quantity=10, **fields):
+        product = Product(
+            name=name, unit_price=fields.pop('unit_price', selling_price / 2),
+            selling_price=selling_price, stock_quantity=stock_quantity, **fields
+        )
+        db.session.add(product)
+        db.session.commit()
+        return product
+    return make
+
+
+@pytest.fixture
+def checkout(client):
+    """Create and complete a sale through the API; returns the completed sale JSON."""
+    def run(staff, services=(), products=(), payment_method='cash', **extra):
+        response = client.post('/api/sales', json={
+            'staff_id': staff.id,
+            'services': [{'service_id': s.id} for s in services],
+            'products': [{'product_id': p.id, 'quantity': q} for p, q in products],
+            **extra
+        })
+        assert response.status_code == 201, response.get_json()
+        response = client.post(f"/api/sales/{response.get_json()['id']}/complete",
+                               json={'payment_method': payment_method})
+        assert response.status_code == 200, response.get_json()
+        return response.get_json()
+    return run
+
+
+@pytest.fixture
+def count_queries():
+    """
+    Count SQL statements run inside a with-block.
+
+    Usage: with count_queries() as statements: ...; len(statements)
+    """
+    @contextmanager
+    def counter():
+        statements = []
+
+        def record(conn, cursor, statement, parameters, context, executemany):
+            statements.append(statement)
+
+        event.listen(db.engine, 'before_cursor_execute', record)
+        try:
+            yield statements
+        finally:
+            event.remove(db.engine, 'before_cursor_execute', record)
+    return counter
+
+
+@pytest.fixture
+def seed_sales(make_staff, make_service, make_product):
+    """
+    Insert completed sales (with lines and payments) directly, for days in the past.
+
+    Returns a function seed(days, start, per_day=2) -> list of Sale. Sales
+    rotate over two staff, payment methods, demo flags and a mix of service
+    and product lines, with created_at in UTC at 06:00 and 22:30 so some land
+    on the next salon business day.
+    """
+    def seed(days, start, per_day=2):
+        staff = [make_staff('Amina'), make_staff('Brian')]
+        services = [make_service('Cut', 1200.0), make_service('Braids', 3500.0)]
+        products = [make_product('Oil', 800.0, stock_quantity=0)]
+        methods = ['cash', 'm_pesa', 'card']
+        sales = []
+        for day in range(days):
+            for n in range(per_day):
+                i = len(sales)
+                created_at = datetime.combine(start + timedelta(days=day), time(6 if n % 2 == 0 else 22, 30))
+                service = services[i % 2]
+                quantity = 1 + i % 3
+                service_total = service.price * quantity
+                product_total = products[0].selling_price if i % 4 == 0 else 0.0
+                subtotal = service_total + product_total
+                sale = Sale(
+                    sale_number=f'SEED-{i:06d}', staff_id=staff[i % 2].id, status='completed',
+                    subtotal=subtotal, tax_amount=round(subtotal * 0.16, 2), total_amount=subtotal,
+                    commission_amount=round(service_total * 0.5, 2), is_demo=(i % 5 == 0),
+                    created_at=created_at, completed_at=created_at
+                )
+                sale.sale_services.append(SaleService(
+                    service_id=service.id, quantity=quantity, unit_price=service.price,
+                    total_price=service_total, commission_rate=0.5, commission_amount=round(service_total * 0.5, 2)
+                ))
+                if product_total:
+                    sale.sale_products.append(SaleProduct(
+                        product_id=products[0].id, quantity=1, unit_price=product_total,
+                        total_price=product_total, stock_deducted=True
+                    ))
+                sale.payment = Payment(amount=subtotal, payment_method=methods[i % 3], status='completed',
+                                       created_at=created_at)
+                sales.append(sale)
+        db.session.add_all(sales)
+        db.session.commit()
+        return sales
+    return seed
@@ -0,0 +1,65 @@
+"""
+GET /api/appointments serializes a page with the loader options of
+Appointment.to_dict_load_options, so its statement count must not grow with
+the number of appointments on the page.
+"""
+from datetime import datetime, timedelta
+
+from db import db
+from models import (
+    Appointment, AppointmentService, AppointmentNote, Customer, Resource, Sale, Subscription, User
+)
+
+
+def _add_appointments(numbers, staff, service):
+    resource = Resource(name=f'Room {numbers[0]}')
+    db.session.add(resource)
+    db.session.flush()
+    start = datetime(2026, 3, 2, 9, 0)
+    for i in numbers:
+        customer = Customer(name=f'Customer {i}', phone=f'07000{i:05d}')
+        author = User(name=f'Reception {i}', email=f'reception{i}@example.com', role='staff', is_active=True)
+        author.set_password('front desk')
+        db.session.add_all([customer, author])
+        db.session.flush()
+        subscription = Subscription(user_id=author.id, plan_name='essential', status='active')
+        db.session.add(subscription)
+        db.session.flush()
+        author.current_subscription_id = subscription.id
+
+        appointment = Appointment(
+            customer_id=customer.id, staff_id=staff.id, resource_id=resource.id,
+            appointment_date=start + timedelta(hours=i), status='completed'
+        )
+        appointment.services.append(AppointmentService(service_id=service.id))
+        appointment.appointment_notes.append(AppointmentNote(note_text='Prefers warm water', created_by=author.id))
+        db.session.add(appointment)
+        db.session.flush()
+        db.session.add(Sale(
+            sale_number=f'APT-{i:05d}', staff_id=staff.id, customer_id=customer.id, appointment_id=appointment.id,
+            status='completed', subtotal=1000.0, tax_amount=160.0, total_amount=1000.0
+        ))
+    db.session.commit()
+
+
+def _list_statements(client, count_queries, count):
+    with count_queries() as statements:
+        response = client.get('/api/appointments', query_string={'page_size': 100})
+    assert response.status_code == 200, response.get_json()
+    body = response.get_json()
+    items = body['items']
+    assert len(items) == count
+    assert all(item['sale'] and item['appointment_notes'] and item['services'] and item['resource'] for item in items)
+    return len(statements)
+
+
+def test_statement_count_does_not_grow_with_appointments(client, count_queries, make_staff, make_service):
+    staff, service = make_staff(), make_service()
+
+    _add_appointments(range(5), staff, service)
+    few = _list_statements(client, count_queries, 5)
+
+    _add_appointments(range(5, 50), staff, service)
+    many = _list_statements(client, count_queries, 50)
+
+    assert few == many
@@ -0,0 +1,70 @@
+"""
+calculate_cash_flow groups payments, expenses and commission payments by day
+in SQL, so the number of statements must not grow with the range it covers.
+"""
+import time
+from datetime import datetime, timedelta
+
+import pytest
+
+from db import db
+from models import Expense
+from business_time import business_today
+from report_calculators import calculate_cash_flow
+
+RANGES = (30, 365, 1095)
+
+
+def _add_expenses(start, days):
+    for day in range(0, days, 7):
+        db.session.add(Expense(
+            category='supplies', description='Weekly supplies', amount=1500.0,
+            expense_date=datetime.combine(start + timedelta(days=day), datetime.min.time()).replace(hour=10)
+        ))
+    db.session.commit()
+
+
+def _cash_flow(days):
+    end = business_today() - timedelta(days=1)
+    return calculate_cash_flow(end - timedelta(days=days - 1), end, {'is_demo': False}, db.session, 0, 0)
+
+
+def test_statement_count_does_not_grow_with_range(seed_sales, count_queries):
+    start = business_today() - timedelta(days=60)
+    seed_sales(59, start)
+    _add_expenses(start, 59)
+
+    counts = {}
+    for days in RANGES:
+        with count_queries() as statements:
+            result = _cash_flow(days)
+        counts[days] = len(statements)
+        assert len(result['daily_breakdown']) == days
+
+    assert len(set(counts.values())) == 1, counts
+
+
+def test_daily_breakdown_adds_up_to_totals(seed_sales):
+    start = business_today() - timedelta(days=31)
+    seed_sales(30, start)
+    _add_expenses(start, 30)
+
+    result = _cash_flow(30)
+
+    assert round(sum(day['cash_in'] for day in result['daily_breakdown']), 2) == result['cash_in']
+    assert result['cash_in'] > 0
+
+
+@pytest.mark.benchmark
+def test_cash_flow_latency(seed_sales):
+    start = business_today() - timedelta(days=RANGES[-1] + 1)
+    seed_sales(RANGES[-1], start)
+    _add_expenses(start, RANGES[-1])
+
+    for days in RANGES:
+        runs = 5
+        began = time.perf_counter()
+        for _ in range(runs):
+            _cash_flow(days)
+        elapsed = (time.perf_counter() - began) / runs
+        print(f"\ncash flow over {days} days: {elapsed * 1000:.1f} ms")
@@ -0,0 +1,58 @@
+"""
+Checkout resolves every service and product of a sale with one lookup per
+model (see catalog_cache.py), so creating and completing a sale reads and
+updates with the same statements for 2 lines as for 10.
+
+Line INSERTs are left out of the count: SQLAlchemy batches them into one
+statement on PostgreSQL but sends one per row on SQLite.
+"""
+import time
+
+import pytest
+
+from db import db
+from models import Product
+
+
+def _catalog(make_service, make_product, lines):
+    services = [make_service(f'Service {i}', 1000.0 + i * 100) for i in range(lines // 2)]
+    products = [make_product(f'Product {i}', 300.0 + i * 50, stock_quantity=10_000) for i in range(lines - lines // 2)]
+    return services, [(product, 1) for product in products]
+
+
+def _checkout_statements(checkout, count_queries, staff, services, products):
+    # Warm the catalog snapshot so both sizes compare the same path
+    checkout(staff, services=services, products=products)
+    # Reload the ids for the request bodies outside the count; the commit expired them
+    db.session.refresh(staff)
+    for row in [*services, *(product for product, _ in products)]:
+        db.session.refresh(row)
+    with count_queries() as statements:
+        sale = checkout(staff, services=services, products=products)
+    assert sale['total_amount'] == sum(s.price for s in services) + sum(p.selling_price * q for p, q in products)
+    return len([statement for statement in statements if not statement.lstrip().upper().startswith('INSERT')])
+
+
+def test_statement_count_does_not_grow_with_lines(checkout, count_queries, make_staff, make_service, make_product):
+    staff = make_staff()
+    services, products = _catalog(make_service, make_product, 10)
+
+    two = _checkout_statements(checkout, count_queries, staff, services[:1], products[:1])
+    ten = _checkout_statements(checkout, count_queries, staff, services, products)
+
+    assert two == ten
+
+
+@pytest.mark.benchmark
+def test_ten_line_checkout_latency(checkout, make_staff, make_service, make_product):
+    staff = make_staff()
+    services, products = _catalog(make_service, make_product, 10)
+    checkout(staff, services=services, products=products)
+
+    runs = 50
+    began = time.perf_counter()
+    for _ in range(runs):
+        checkout(staff, services=services, products=products)
+    elapsed = (time.perf_counter() - began) / runs
+    print(f"\n10-line checkout (create + complete): {elapsed * 1000:.1f} ms")
+    assert db.session.get(Product, products[0][0].id).stock_quantity == 10_000 - runs - 1
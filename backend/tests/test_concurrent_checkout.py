@@ -0,0 +1,102 @@
+"""
+Concurrent completions must never oversell stock or complete a sale twice.
+
+Each thread completes sales through its own test client, so every request
+runs in its own app context, session and connection, as under gunicorn
+threads or workers. On SQLite, transactions start with BEGIN IMMEDIATE so
+that writers queue on the database lock (SQLite cannot upgrade a read lock
+while another connection writes); PostgreSQL (TEST_DATABASE_URL) runs the
+code's own row locks and conditional updates unchanged.
+"""
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from contextlib import contextmanager
+
+from sqlalchemy import event
+
+from db import db
+from models import Product, Sale
+
+THREADS = 16
+
+
+@contextmanager
+def _serialized_sqlite_writes():
+    engine = db.engine
+    if engine.dialect.name != 'sqlite':
+        yield
+        return
+
+    def connect(dbapi_connection, connection_record):
+        dbapi_connection.isolation_level = None  # Let the begin hook issue BEGIN itself
+        dbapi_connection.execute('PRAGMA busy_timeout = 30000')
+
+    def begin(connection):
+        connection.exec_driver_sql('BEGIN IMMEDIATE')
+
+    event.listen(engine, 'connect', connect)
+    event.listen(engine, 'begin', begin)
+    engine.dispose()
+    try:
+        yield
+    finally:
+        event.remove(engine, 'connect', connect)
+        event.remove(engine, 'begin', begin)
+        engine.dispose()
+
+
+def _open_sales(client, staff, product, count, quantity):
+    ids = []
+    for _ in range(count):
+        response = client.post('/api/sales', json={
+            'staff_id': staff.id, 'products': [{'product_id': product.id, 'quantity': quantity}]
+        })
+        assert response.status_code == 201, response.get_json()
+        ids.append(response.get_json()['id'])
+    return ids
+
+
+def _complete_all(app, sale_ids):
+    """Complete the sales from THREADS threads; returns the response status codes in order."""
+    local = threading.local()
+
+    def complete(sale_id):
+        if not hasattr(local, 'client'):
+            local.client = app.test_client()
+        response = local.client.post(f'/api/sales/{sale_id}/complete', json={'payment_method': 'cash'})
+        return response.status_code
+
+    # Release the test's own connection first; it would hold the lock on SQLite
+    db.session.remove()
+    with _serialized_sqlite_writes(), ThreadPoolExecutor(max_workers=THREADS) as executor:
+        return list(executor.map(complete, sale_ids))
+
+
+def test_concurrent_completions_never_oversell(app, client, make_staff, make_product):
+    staff = make_staff()
+    product = make_product(stock_quantity=150)
+    product_id = product.id
+    sale_ids = _open_sales(client, staff, product, 200, quantity=1)
+
+    statuses = _complete_all(app, sale_ids)
+
+    assert set(statuses) <= {200, 400, 409}, statuses
+    completed = statuses.count(200)
+    stock = db.session.get(Product, product_id).stock_quantity
+    assert stock >= 0
+    assert completed == 150
+    assert stock == 150 - completed
+    assert Sale.query.filter_by(status='completed').count() == completed
+
+
+def test_concurrent_completions_of_one_sale_deduct_once(app, client, make_staff, make_product):
+    staff = make_staff()
+    product = make_product(stock_quantity=10)
+    product_id = product.id
+    (sale_id,) = _open_sales(client, staff, product, 1, quantity=2)
+
+    statuses = _complete_all(app, [sale_id] * THREADS)
+
+    assert statuses.count(200) == 1, statuses
+    assert set(statuses) <= {200, 400, 409}, statuses
+    assert db.session.get(Product, product_id).stock_quantity == 8
@@ -0,0 +1,19 @@
+"""
+Each dashboard stream holds a subscriber queue (see dashboard_events.py)
+only while its response is being sent.
+"""
+from dashboard_events import subscriber_count
+from routes_dashboard import stream_dashboard_events
+
+
+def test_stream_subscribes_only_while_sent(app):
+    # Called directly: the test client reads the first chunk on its own
+    with app.test_request_context('/api/dashboard/stream'):
+        response = stream_dashboard_events()
+    assert subscriber_count() == 0
+
+    assert next(response.response) == 'retry: 5000\n\n'
+    assert subscriber_count() == 1
+
+    response.close()
+    assert subscriber_count() == 0
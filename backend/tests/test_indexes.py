@@ -0,0 +1,147 @@
+"""
+The hot Sale/Payment/Appointment filters must be served by an index, and the
+paginated list endpoints must read their pages in index order.
+
+Each query is explained on the test database. On SQLite a plan step that
+reads the table with a bare SCAN is a full table scan; on PostgreSQL
+sequential scans are disabled first, so a remaining Seq Scan means no index
+can serve the query. A page that has to be sorted after it is read shows a
+TEMP B-TREE step on SQLite, or a Sort node on PostgreSQL with sorting
+disabled. Set TEST_DATABASE_URL to run against PostgreSQL.
+"""
+from datetime import date, datetime
+
+import pytest
+from sqlalchemy import event, func, select, text
+
+from db import db
+from pagination import encode_cursor
+from models import (
+    Sale, Payment, SaleService, SaleProduct, Appointment, AppointmentService, Expense,
+    CommissionPayment, CommissionPaymentItem, StaffLoginLog
+)
+
+DAY = date(2026, 2, 2)
+START = datetime(2026, 2, 1)
+
+HOT_QUERIES = {
+    # routes_dashboard.build_dashboard_stats, report_calculators.calculate_daily_sales_report
+    'sales_by_demo_status_day': select(Sale.id).where(
+        Sale.is_demo == False, Sale.status == 'completed', Sale.business_date == DAY
+    ),
+    # routes_staff.get_staff_stats
+    'sales_by_staff_status_day': select(Sale.id).where(
+        Sale.staff_id == 1, Sale.business_date >= DAY, Sale.status == 'completed'
+    ),
+    'sales_by_demo_status_created_at': select(Sale.id).where(
+        Sale.is_demo == False, Sale.status == 'completed', Sale.created_at >= START
+    ),
+    'sales_by_staff_status_created_at': select(Sale.id).where(
+        Sale.staff_id == 1, Sale.status == 'completed', Sale.created_at >= START
+    ),
+    'sales_by_customer': select(Sale.id).where(Sale.customer_id == 1),
+    'payment_by_sale': select(Payment.id).where(Payment.sale_id == 1),
+    'payments_by_day': select(Payment.id).where(Payment.business_date >= DAY),
+    'sale_services_by_sale': select(SaleService.id).where(SaleService.sale_id == 1),
+    'sale_products_by_sale': select(SaleProduct.id).where(SaleProduct.sale_id == 1),
+    'appointments_by_staff_date': select(Appointment.id).where(
+        Appointment.staff_id == 1, Appointment.appointment_date >= START
+    ),
+    'appointments_by_day': select(Appointment.id).where(Appointment.business_date == DAY),
+    'appointment_services_by_appointment': select(AppointmentService.id).where(AppointmentService.appointment_id == 1),
+    'expenses_by_demo_day': select(Expense.id).where(Expense.is_demo == False, Expense.business_date >= DAY),
+    'commission_payments_by_demo_day': select(CommissionPayment.id).where(
+        CommissionPayment.is_demo == False, CommissionPayment.business_date >= DAY
+    ),
+    'commission_items_by_payment': select(CommissionPaymentItem.id).where(CommissionPaymentItem.commission_payment_id == 1),
+    'login_logs_by_staff': select(StaffLoginLog.id).where(
+        StaffLoginLog.staff_id == 1, StaffLoginLog.login_time >= START
+    ),
+}
+
+
+def _compile(query):
+    return str(query.compile(db.engine, compile_kwargs={'literal_binds': True}))
+
+
+def _full_scans(query):
+    """Plan steps that read a whole table."""
+    sql = _compile(query)
+    with db.engine.connect() as connection:
+        if db.engine.dialect.name == 'postgresql':
+            connection.execute(text('SET enable_seqscan = off'))
+            plan = [row[0] for row in connection.execute(text(f'EXPLAIN {sql}'))]
+            return [step for step in plan if 'Seq Scan' in step]
+        plan = [row[-1] for row in connection.execute(text(f'EXPLAIN QUERY PLAN {sql}'))]
+        return [step for step in plan if step.startswith('SCAN') and 'INDEX' not in step]
+
+
+@pytest.mark.parametrize('name', sorted(HOT_QUERIES))
+def test_hot_query_uses_an_index(name):
+    assert _full_scans(HOT_QUERIES[name]) == []
+
+
+def test_full_scan_is_detected():
+    # Guard against the check passing vacuously: notes has no index
+    assert _full_scans(select(Sale.id).where(func.lower(Sale.notes) == 'x'))
+
+
+# List endpoint -> table whose rows it pages through, and a cursor into it
+PAGED_ENDPOINTS = {
+    '/api/sales': ('sales', [START.isoformat(), 10]),
+    '/api/customers': ('customers', [START.isoformat(), 10]),
+    '/api/payments': ('payments', [START.isoformat(), 10]),
+    '/api/commissions/payments': ('commission_payments', [START.isoformat(), 10]),
+    '/api/expenses': ('expenses', [START.isoformat(), 10]),
+    '/api/appointments': ('appointments', [START.isoformat(), 10]),
+}
+
+
+def _page_statement(client, headers, path, table, cursor):
+    """The SELECT ... ORDER BY ... LIMIT an endpoint runs for its page, with its parameters."""
+    executed = []
+
+    def record(conn, cursor_, statement, parameters, context, executemany):
+        executed.append((statement, parameters))
+
+    event.listen(db.engine, 'before_cursor_execute', record)
+    try:
+        response = client.get(path, headers=headers, query_string={'cursor': cursor} if cursor else {})
+    finally:
+        event.remove(db.engine, 'before_cursor_execute', record)
+    assert response.status_code == 200, response.get_json()
+    pages = [
+        (statement, parameters) for statement, parameters in executed
+        if 'ORDER BY' in statement and 'LIMIT' in statement and f'FROM {table}' in statement
+    ]
+    assert len(pages) == 1, [statement for statement, _ in executed]
+    return pages[0]
+
+
+def _sorts(statement, parameters):
+    """Plan steps that sort rows after reading them."""
+    with db.engine.connect() as connection:
+        if db.engine.dialect.name == 'postgresql':
+            connection.execute(text('SET enable_seqscan = off'))
+            connection.execute(text('SET enable_sort = off'))
+            plan = [row[0] for row in connection.exec_driver_sql(f'EXPLAIN {statement}', parameters)]
+            return [step for step in plan if 'Sort' in step and 'Sort Key' not in step]
+        plan = [row[-1] for row in connection.exec_driver_sql(f'EXPLAIN QUERY PLAN {statement}', parameters)]
+        return [step for step in plan if 'TEMP B-TREE' in step]
+
+
+@pytest.mark.parametrize('with_cursor', [False, True])
+@pytest.mark.parametrize('path', sorted(PAGED_ENDPOINTS))
+def test_list_page_is_read_in_index_order(client, admin_headers, path, with_cursor):
+    table, cursor_values = PAGED_ENDPOINTS[path]
+    cursor = encode_cursor(cursor_values) if with_cursor else None
+
+    statement, parameters = _page_statement(client, admin_headers, path, table, cursor)
+
+    assert _sorts(statement, parameters) == []
+
+
+def test_sorted_page_is_detected():
+    # Guard against the check passing vacuously: nothing indexes sales.notes
+    assert _sorts(_compile(select(Sale.id).order_by(Sale.notes).limit(5)), ())
+
@@ -0,0 +1,98 @@
+"""
+A queued job is claimed once, run by its handler and downloaded; the sweep
+fails jobs whose runner stopped and expires artifacts past
+JOB_RETENTION_HOURS. The tests claim and run jobs themselves instead of
+starting the runner threads.
+"""
+import os
+import time
+from datetime import datetime, timedelta
+
+import pytest
+
+import jobs
+import routes_jobs
+from db import db
+from models import Job
+
+
+@pytest.fixture
+def no_runners(monkeypatch):
+    monkeypatch.setattr(routes_jobs, 'ensure_runners', lambda app: None)
+
+
+def _queue_export(client, headers):
+    response = client.post('/api/jobs/calendar-export', headers=headers, json={'format': 'csv'})
+    assert response.status_code == 202, response.get_json()
+    assert response.get_json()['status'] == jobs.QUEUED
+    return response.get_json()['id']
+
+
+def _run_next():
+    job = jobs._claim_next()
+    assert job is not None
+    job_id = job.id
+    jobs._run(job)
+    db.session.expire_all()
+    return db.session.get(Job, job_id)
+
+
+def test_queued_job_runs_once_and_downloads(client, admin_headers, no_runners):
+    job_id = _queue_export(client, admin_headers)
+
+    job = _run_next()
+
+    assert job.id == job_id
+    assert (job.status, job.progress) == (jobs.SUCCEEDED, 100)
+    assert jobs._claim_next() is None
+    response = client.get(f'/api/jobs/{job_id}/download', headers=admin_headers)
+    assert response.status_code == 200
+    assert response.mimetype == 'text/csv'
+    with open(job.result_path, 'rb') as artifact:
+        assert response.data == artifact.read()
+
+
+def test_unknown_kind_fails(client, admin_headers, no_runners):
+    job_id = jobs.enqueue('no_such_kind', {}).id
+    db.session.commit()
+
+    job = _run_next()
+
+    assert job.status == jobs.FAILED
+    assert job.error == "Unknown job kind 'no_such_kind'"
+    response = client.get(f'/api/jobs/{job_id}/download', headers=admin_headers)
+    assert response.status_code == 409
+
+
+def test_sweep_expires_old_artifacts(app, client, admin_headers, monkeypatch, no_runners):
+    monkeypatch.setitem(app.config, 'JOB_RETENTION_HOURS', 1)
+    job_id = _queue_export(client, admin_headers)
+    job = _run_next()
+    two_hours_ago = datetime.utcnow() - timedelta(hours=2)
+    job.finished_at = two_hours_ago
+    db.session.commit()
+    artifact_dir = os.path.dirname(job.result_path)
+    os.utime(artifact_dir, (time.time() - 7200,) * 2)
+
+    assert jobs.sweep() == {'failed': 0, 'expired': 1, 'removed_dirs': 1}
+
+    assert not os.path.exists(artifact_dir)
+    db.session.expire_all()
+    assert db.session.get(Job, job_id).status == jobs.EXPIRED
+    response = client.get(f'/api/jobs/{job_id}/download', headers=admin_headers)
+    assert response.status_code == 410
+
+
+def test_job_failed_by_sweep_stays_failed(app, client, admin_headers, no_runners):
+    job_id = _queue_export(client, admin_headers)
+    job = jobs._claim_next()
+    # The runner's heartbeat stops; the sweep takes the job for dead
+    job.updated_at = datetime.utcnow() - timedelta(seconds=app.config['JOB_STALE_SECONDS'] + 60)
+    db.session.commit()
+    assert jobs.sweep()['failed'] == 1
+
+    jobs._run(job)
+
+    db.session.expire_all()
+    job = db.session.get(Job, job_id)
+    assert (job.status, job.error, job.result_path) == (jobs.FAILED, 'Job was interrupted', None)
@@ -0,0 +1,87 @@
+"""
+Login cost is set by BCRYPT_ROUNDS: hashes made with another work factor are
+upgraded on the next successful login, and the benchmark shows how
+throughput falls as the factor rises.
+"""
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+import pytest
+
+from db import db
+from models import User
+from password_hashing import hash_password
+
+PASSWORD = 'correct horse'
+
+
+@pytest.fixture
+def bcrypt_rounds(app):
+    original = app.config.get('BCRYPT_ROUNDS')
+
+    def set_rounds(rounds):
+        app.config['BCRYPT_ROUNDS'] = rounds
+
+    yield set_rounds
+    app.config['BCRYPT_ROUNDS'] = original
+
+
+def _add_manager(rounds):
+    user = User(name='Manager', email='manager@example.com', role='manager', is_active=True,
+                password_hash=hash_password(PASSWORD, rounds))
+    db.session.add(user)
+    db.session.commit()
+    return user.id
+
+
+def _stored_rounds(user_id):
+    db.session.expire_all()
+    return int(db.session.get(User, user_id).password_hash.split('$')[2])
+
+
+def test_login_rehashes_to_configured_rounds(client, bcrypt_rounds):
+    bcrypt_rounds(4)
+    user_id = _add_manager(rounds=6)
+
+    response = client.post('/api/auth/login', json={'email': 'manager@example.com', 'password': PASSWORD})
+
+    assert response.status_code == 200, response.get_json()
+    assert _stored_rounds(user_id) == 4
+    response = client.post('/api/auth/login', json={'email': 'manager@example.com', 'password': PASSWORD})
+    assert response.status_code == 200, response.get_json()
+
+
+def test_wrong_password_keeps_hash(client, bcrypt_rounds):
+    bcrypt_rounds(4)
+    user_id = _add_manager(rounds=6)
+
+    response = client.post('/api/auth/login', json={'email': 'manager@example.com', 'password': 'wrong'})
+
+    assert response.status_code == 401
+    assert _stored_rounds(user_id) == 6
+
+
+@pytest.mark.benchmark
+@pytest.mark.parametrize('rounds', [4, 6, 8])
+def test_login_throughput(app, bcrypt_rounds, rounds):
+    bcrypt_rounds(rounds)
+    _add_manager(rounds)
+    db.session.remove()
+    local = threading.local()
+
+    def login(_):
+        if not hasattr(local, 'client'):
+            local.client = app.test_client()
+        return local.client.post(
+            '/api/auth/login', json={'email': 'manager@example.com', 'password': PASSWORD}
+        ).status_code
+
+    logins = 40
+    began = time.perf_counter()
+    with ThreadPoolExecutor(max_workers=8) as executor:
+        statuses = list(executor.map(login, range(logins)))
+    elapsed = time.perf_counter() - began
+
+    assert statuses == [200] * logins
+    print(f"\nlogin at {rounds} bcrypt rounds: {logins / elapsed:.0f} logins/s")
@@ -0,0 +1,47 @@
+"""
+GET /api/sales/receipts/export streams every receipt of a date range as one
+ZIP, read in chunks with yield_per.
+"""
+import io
+import zipfile
+from datetime import timedelta
+
+import pytest
+
+from business_time import business_today
+
+
+@pytest.fixture
+def small_chunks(app):
+    original = app.config['RECEIPT_EXPORT_CHUNK_SIZE']
+    app.config['RECEIPT_EXPORT_CHUNK_SIZE'] = 2
+    yield
+    app.config['RECEIPT_EXPORT_CHUNK_SIZE'] = original
+
+
+@pytest.mark.usefixtures('small_chunks')
+def test_export_contains_a_receipt_per_sale(client, seed_sales):
+    start = business_today() - timedelta(days=4)
+    sales = seed_sales(3, start)
+    live = sorted(sale.sale_number for sale in sales if not sale.is_demo)
+
+    response = client.get('/api/sales/receipts/export', query_string={
+        'start_date': start.isoformat(), 'end_date': business_today().isoformat()
+    })
+
+    assert response.status_code == 200
+    assert response.mimetype == 'application/zip'
+    with zipfile.ZipFile(io.BytesIO(response.data)) as archive:
+        names = archive.namelist()
+        assert 'errors.txt' not in names
+        assert len(names) == len(live)
+        assert sorted(name.split('/')[1] for name in names) == sorted(
+            f'receipt_{number}.pdf' for number in live
+        )
+        assert all(archive.read(name).startswith(b'%PDF') for name in names)
+
+
+def test_export_requires_dates(client):
+    response = client.get('/api/sales/receipts/export')
+
+    assert response.status_code == 400
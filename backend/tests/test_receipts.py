@@ -0,0 +1,140 @@
+"""
+Receipts of completed sales and payslips are rendered once and then served
+from the PDF cache (see pdf_cache.py), and every render reuses the styles
+built once at import; the benchmark shows what a render costs without the
+cache.
+"""
+import time
+
+import pytest
+from reportlab.platypus import TableStyle
+
+import pdf_generators
+import routes_commissions
+import routes_sales
+from db import db
+from models import CommissionPayment, Sale
+from pdf_generators import generate_sales_receipt_pdf, generate_commission_receipt_pdf
+
+
+@pytest.fixture
+def pdf_cache_dir(app, tmp_path):
+    app.config['PDF_CACHE_DIR'] = str(tmp_path / 'pdf_cache')
+    return tmp_path / 'pdf_cache'
+
+
+@pytest.fixture
+def count_renders(monkeypatch):
+    """Count calls to a route module's PDF generator; returns the list of calls."""
+    def count(module, name):
+        calls = []
+        render = getattr(module, name)
+
+        def counted(*args, **kwargs):
+            calls.append(args)
+            return render(*args, **kwargs)
+
+        monkeypatch.setattr(module, name, counted)
+        return calls
+    return count
+
+
+@pytest.fixture
+def completed_sale(checkout, make_staff, make_service, make_product):
+    staff = make_staff()
+    services = [make_service('Cut', 1200.0), make_service('Braids', 3500.0)]
+    return checkout(staff, services=services, products=[(make_product('Oil', 800.0), 2)])
+
+
+def _download(client, path):
+    response = client.get(path)
+    assert response.status_code == 200, response.get_json()
+    assert response.mimetype == 'application/pdf'
+    return response.data
+
+
+def _pay_commission(client, headers, staff_id):
+    response = client.post('/api/commissions/pay', headers=headers, json={
+        'staff_id': staff_id, 'payment_method': 'cash'
+    })
+    assert response.status_code == 201, response.get_json()
+    return CommissionPayment.query.one()
+
+
+def test_completed_sale_receipt_is_rendered_once(client, pdf_cache_dir, count_renders, completed_sale):
+    renders = count_renders(routes_sales, 'generate_sales_receipt_pdf')
+    path = f"/api/sales/{completed_sale['id']}/receipt"
+
+    first = _download(client, path)
+    second = _download(client, path)
+
+    assert len(renders) == 1
+    assert second == first
+    assert first.startswith(b'%PDF')
+    assert len(list(pdf_cache_dir.rglob('*.pdf'))) == 1
+
+
+def test_receipt_is_not_cached_when_disabled(client, count_renders, completed_sale):
+    renders = count_renders(routes_sales, 'generate_sales_receipt_pdf')
+    path = f"/api/sales/{completed_sale['id']}/receipt"
+
+    _download(client, path)
+    _download(client, path)
+
+    assert len(renders) == 2
+
+
+def test_payslip_is_rendered_once(client, pdf_cache_dir, count_renders, admin_headers, completed_sale):
+    payment_id = _pay_commission(client, admin_headers, completed_sale['staff_id']).id
+    renders = count_renders(routes_commissions, 'generate_commission_receipt_pdf')
+    path = f"/api/commissions/payments/{payment_id}/receipt"
+
+    first = _download(client, path)
+    second = _download(client, path)
+
+    assert len(renders) == 1
+    assert second == first
+
+
+def _shared_styles():
+    """The module-level styles every render reuses, with their current settings."""
+    paragraph = {name: (style, dict(vars(style))) for name, style in pdf_generators._STYLES.items()}
+    tables = {name: (style, list(style.getCommands())) for name, style in vars(pdf_generators).items()
+              if name.endswith('_STYLE') and isinstance(style, TableStyle)}
+    return paragraph, tables
+
+
+def test_rendering_reuses_shared_styles(client, admin_headers, monkeypatch, completed_sale):
+    payment = _pay_commission(client, admin_headers, completed_sale['staff_id'])
+    sale = db.session.get(Sale, completed_sale['id'])
+    builds = []
+    monkeypatch.setattr(pdf_generators, '_create_pdf_styles', lambda: builds.append(1))
+    before = _shared_styles()
+
+    generate_sales_receipt_pdf(sale, sale.staff, sale.customer, sale.payment)
+    generate_commission_receipt_pdf(payment, payment.staff)
+
+    assert builds == []
+    assert pdf_generators._STYLES['normal'].fontSize == 10
+    # Same objects, same settings: renders neither rebuild nor modify them
+    assert _shared_styles() == before
+
+
+@pytest.mark.benchmark
+def test_render_latency(client, pdf_cache_dir, admin_headers, completed_sale):
+    payment = _pay_commission(client, admin_headers, completed_sale['staff_id'])
+    sale = db.session.get(Sale, completed_sale['id'])
+    runs = 20
+
+    timings = {
+        'sales receipt': lambda: generate_sales_receipt_pdf(sale, sale.staff, sale.customer, sale.payment),
+        'payslip': lambda: generate_commission_receipt_pdf(payment, payment.staff),
+        'cached sales receipt download': lambda: _download(client, f"/api/sales/{sale.id}/receipt"),
+    }
+    for name, render in timings.items():
+        render()
+        began = time.perf_counter()
+        for _ in range(runs):
+            render()
+        elapsed = (time.perf_counter() - began) / runs
+        print(f"\n{name}: {elapsed * 1000:.1f} ms")
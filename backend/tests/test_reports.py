@@ -0,0 +1,125 @@
+"""
+Reports read closed days from daily_sales_rollup and open ranges from raw
+sales; both must give the figures a plain sum over the sales would.
+"""
+import json
+from datetime import timedelta
+
+import pytest
+
+from db import db
+from models import DailySalesRollup
+from business_time import business_date_for, business_today
+from report_calculators import calculate_daily_sales_report, calculate_financial_summary
+from sales_rollup import rebuild_rollups
+
+DAYS = 6
+
+
+def _expected(sales, is_demo, start, end):
+    """Totals for the sales in a business-date range, summed in Python."""
+    totals = {'services': 0.0, 'products': 0.0, 'commission': 0.0, 'count': 0, 'methods': {}}
+    for sale in sales:
+        if bool(sale.is_demo) != is_demo or not start <= business_date_for(sale.created_at) <= end:
+            continue
+        totals['services'] += sum(ss.total_price for ss in sale.sale_services)
+        totals['products'] += sum(sp.total_price for sp in sale.sale_products)
+        totals['commission'] += sale.commission_amount
+        totals['count'] += 1
+        method = sale.payment.payment_method
+        totals['methods'][method] = totals['methods'].get(method, 0) + sale.payment.amount
+    return totals
+
+
+@pytest.fixture
+def history(seed_sales):
+    start = business_today() - timedelta(days=DAYS + 1)
+    sales = seed_sales(DAYS, start, per_day=5)
+    rebuild_rollups()
+    db.session.commit()
+    return start, sales
+
+
+@pytest.mark.parametrize('is_demo', [False, True])
+def test_daily_report_from_rollup_matches_raw_sales(history, is_demo):
+    start, sales = history
+    # The 22:30 UTC sales of the last seeded day fall on the next salon day
+    for offset in range(DAYS + 1):
+        day = start + timedelta(days=offset)
+        expected = _expected(sales, is_demo, day, day)
+
+        report = calculate_daily_sales_report(day, {'is_demo': is_demo}, db.session)
+
+        assert report['services_revenue'] == round(expected['services'], 2)
+        assert report['products_revenue'] == round(expected['products'], 2)
+        assert report['total_commission'] == round(expected['commission'], 2)
+        assert report['transaction_count'] == expected['count']
+        assert report['payment_methods'] == {k: round(v, 2) for k, v in expected['methods'].items()}
+
+
+def test_daily_report_methods_follow_edited_payment(client, admin_headers, history):
+    start, sales = history
+    day = start + timedelta(days=1)
+    sale = next(sale for sale in sales if not sale.is_demo and business_date_for(sale.created_at) == day)
+    payment_id = sale.payment.id
+
+    response = client.put(f'/api/payments/{payment_id}', headers=admin_headers, json={
+        'amount': sale.payment.amount + 100, 'payment_method': 'bank_transfer'
+    })
+    assert response.status_code == 200, response.get_json()
+
+    report = calculate_daily_sales_report(day, {'is_demo': False}, db.session)
+    methods = {}
+    for payment in report['payments']:
+        methods[payment['payment_method']] = methods.get(payment['payment_method'], 0) + payment['amount']
+    assert report['payment_methods'] == {k: round(v, 2) for k, v in methods.items()}
+    assert 'bank_transfer' in report['payment_methods']
+
+@pytest.mark.parametrize('is_demo', [False, True])
+def test_financial_summary_matches_raw_sales(history, is_demo):
+    start, sales = history
+    end = start + timedelta(days=DAYS)
+    expected = _expected(sales, is_demo, start, end)
+
+    summary = calculate_financial_summary(start, end, {'is_demo': is_demo}, db.session)
+
+    assert summary['revenue']['services_revenue'] == round(expected['services'], 2)
+    assert summary['revenue']['products_revenue'] == round(expected['products'], 2)
+    assert summary['costs']['total_commission_earned'] == round(expected['commission'], 2)
+    assert summary['metrics']['transaction_count'] == expected['count']
+    assert summary['cash_flow']['payment_methods'] == {k: round(v, 2) for k, v in expected['methods'].items()}
+
+
+def _rollup_rows():
+    rows = []
+    for row in DailySalesRollup.query.all():
+        methods = json.loads(row.payment_methods or '{}')
+        rows.append((
+            row.business_date, row.staff_id, row.is_demo,
+            *(round(getattr(row, field), 2) for field in (
+                'services_revenue', 'products_revenue', 'subtotal', 'vat_amount', 'total_amount', 'commission_amount'
+            )),
+            row.transaction_count,
+            sorted((method, round(amount, 2)) for method, amount in methods.items())
+        ))
+    return sorted(rows)
+
+
+def test_completed_sales_keep_rollup_equal_to_rebuild(checkout, make_staff, make_service, make_product):
+    amina, brian = make_staff('Amina'), make_staff('Brian')
+    cut, braids = make_service('Cut', 1200.0), make_service('Braids', 3500.0)
+    oil = make_product('Oil', 800.0, stock_quantity=50)
+
+    checkout(amina, services=[cut], payment_method='cash')
+    checkout(amina, services=[cut, braids], products=[(oil, 2)], payment_method='m_pesa')
+    checkout(brian, services=[braids], payment_method='card')
+    checkout(brian, products=[(oil, 1)], payment_method='cash')
+    checkout(amina, services=[braids], is_demo=True)
+
+    incremental = _rollup_rows()
+    assert sum(row[9] for row in incremental) == 5
+
+    rebuild_rollups()
+    db.session.commit()
+
+    assert _rollup_rows() == incremental
@@ -0,0 +1,50 @@
+"""
+POST /api/sales/batch stores sales queued by offline tills; a malformed item
+is reported on its own and never keeps the valid items out.
+"""
+import uuid
+
+import pytest
+
+from models import Sale
+
+
+def _item(staff, service, **fields):
+    return {
+        'client_uuid': str(uuid.uuid4()),
+        'staff_id': staff.id,
+        'payment_method': 'cash',
+        'services': [{'service_id': service.id}],
+        **fields
+    }
+
+
+@pytest.mark.parametrize('fields, line', [
+    ({'payment_method': 5}, {}),
+    ({'payment_method': 'm_pesa', 'transaction_code': 1234567890}, {}),
+    ({'customer_name': ['Amina']}, {}),
+    ({'customer_phone': 700000000}, {}),
+    ({'notes': {'text': 'late'}}, {}),
+    ({}, {'price': '1000'}),
+    ({}, {'commission_rate': 'half'}),
+])
+def test_malformed_item_is_reported_alone(client, make_staff, make_service, fields, line):
+    staff, service = make_staff(), make_service()
+    bad = _item(staff, service, **fields)
+    bad['services'][0].update(line)
+
+    response = client.post('/api/sales/batch', json={'sales': [_item(staff, service), bad]})
+
+    assert response.status_code == 200, response.get_json()
+    body = response.get_json()
+    assert [result['status'] for result in body['results']] == ['created', 'error']
+    assert Sale.query.count() == 1
+
+
+def test_batch_over_the_limit_is_refused(app, client, make_staff, make_service):
+    staff, service = make_staff(), make_service()
+    limit = app.config['SALES_BATCH_MAX_ITEMS']
+
+    response = client.post('/api/sales/batch', json={'sales': [_item(staff, service) for _ in range(limit + 1)]})
+
+    assert response.status_code == 400
@@ -0,0 +1,46 @@
+"""
+User.to_dict_many loads the current subscriptions of a whole list in one
+query, so listing users runs the same statements for 5 managers as for 40.
+"""
+import pytest
+
+from db import db
+from models import Subscription, User
+
+
+def _add_managers(numbers, admin_id):
+    for i in numbers:
+        manager = User(name=f'Manager {i}', email=f'manager{i}@example.com', role='manager',
+                       is_active=True, managed_by=admin_id, password_hash='unused')
+        db.session.add(manager)
+        db.session.flush()
+        subscription = Subscription(user_id=manager.id, plan_name='essential', status='active')
+        db.session.add(subscription)
+        db.session.flush()
+        manager.current_subscription_id = subscription.id
+    db.session.commit()
+
+
+def _list_statements(client, count_queries, headers, path, key, count):
+    # The request shares this session; make it reload the rows just added
+    db.session.expire_all()
+    with count_queries() as statements:
+        response = client.get(path, headers=headers)
+    assert response.status_code == 200, response.get_json()
+    managers = [user for user in response.get_json()[key] if user['role'] == 'manager']
+    assert len(managers) == count
+    assert all(user['subscription_status'] == 'active' for user in managers)
+    return len(statements)
+
+
+@pytest.mark.parametrize('path, key', [('/api/users', 'users'), ('/api/users/managers', 'managers')])
+def test_statement_count_does_not_grow_with_users(client, count_queries, admin_user, admin_headers, path, key):
+    admin_id = admin_user.id
+
+    _add_managers(range(5), admin_id)
+    few = _list_statements(client, count_queries, admin_headers, path, key, 5)
+
+    _add_managers(range(5, 40), admin_id)
+    many = _list_statements(client, count_queries, admin_headers, path, key, 40)
+
+    assert few == many
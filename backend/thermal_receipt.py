@@ -0,0 +1,141 @@
+"""
+Plain-text and ESC/POS sales receipts for 80 mm thermal printers.
+
+The front desk prints walk-in receipts on thermal printers, where an A4
+ReportLab PDF is slow to build and has to be rasterized by the print bridge.
+These renderers lay the same sale data out as fixed-width text lines (48
+columns, Font A on 80 mm paper; see THERMAL_RECEIPT_WIDTH) and, for ESC/POS,
+wrap them in the printer's own alignment, emphasis and cut commands. A
+typical sale comes to a few hundred bytes, built with plain string
+formatting in tens of microseconds.
+
+Served by GET /api/sales/<id>/receipt?format=text|escpos.
+"""
+from datetime import datetime
+
+CENTER = 'center'
+LEFT = 'left'
+
+# ESC/POS commands
+_ESC_INIT = b'\x1b@'
+_ESC_ALIGN = {LEFT: b'\x1ba\x00', CENTER: b'\x1ba\x01'}
+_ESC_BOLD_ON = b'\x1bE\x01'
+_ESC_BOLD_OFF = b'\x1bE\x00'
+_GS_FEED_AND_CUT = b'\x1dVB\x03'  # Feed 3 lines, then partial cut
+
+# Printers start in code page 437
+_ESCPOS_ENCODING = 'cp437'
+
+
+def _columns(left, right, width):
+    """Left text and right-aligned text on one line, truncating the left side."""
+    room = width - len(right) - 1
+    if len(left) > room:
+        left = left[:max(room, 0)]
+    return f"{left}{' ' * (width - len(left) - len(right))}{right}"
+
+
+def _item_lines(name, quantity, unit_price, total_price, width):
+    lines = [(LEFT, False, _columns(name, f"{total_price:,.2f}", width))]
+    if quantity != 1:
+        quantity = f"{quantity:g}" if isinstance(quantity, float) else str(quantity)
+        lines.append((LEFT, False, f"  {quantity} x {unit_price:,.2f}"))
+    return lines
+
+
+def _receipt_lines(sale, staff=None, customer=None, payment=None, width=48):
+    """
+    Lay out a sales receipt as (alignment, bold, text) lines.
+
+    Takes the same arguments as generate_sales_receipt_pdf.
+    """
+    rule = '-' * width
+    receipt_number = payment.receipt_number if payment and payment.receipt_number else sale.sale_number
+    created_at = sale.created_at.strftime('%d/%m/%Y %H:%M') if sale.created_at else 'N/A'
+
+    lines = [
+        (CENTER, True, 'PREMIUM BEAUTY SALON'),
+        (CENTER, False, 'Nairobi, Kenya'),
+        (CENTER, False, 'SALES RECEIPT'),
+        (LEFT, False, rule),
+        (LEFT, False, f"Receipt: {receipt_number or ''}"),
+        (LEFT, False, f"Sale: {sale.sale_number or ''}"),
+        (LEFT, False, f"Date: {created_at}"),
+    ]
+    if customer:
+        lines.append((LEFT, False, f"Customer: {customer.name or ''}"[:width]))
+    if staff:
+        lines.append((LEFT, False, f"Served by: {staff.name or ''}"[:width]))
+    lines.append((LEFT, False, rule))
+
+    for ss in sale.sale_services:
+        name = ss.service.name if ss.service else f"Service #{ss.service_id}"
+        lines.extend(_item_lines(name, ss.quantity, ss.unit_price or 0, ss.total_price or 0, width))
+    for sp in sale.sale_products:
+        name = sp.product.name if sp.product else f"Product #{sp.product_id}"
+        lines.extend(_item_lines(name, sp.quantity, sp.unit_price or 0, sp.total_price or 0, width))
+
+    lines.extend([
+        (LEFT, False, rule),
+        (LEFT, False, _columns('Subtotal', f"{sale.subtotal or 0:,.2f}", width)),
+        (LEFT, False, _columns('Tax', f"{sale.tax_amount or 0:,.2f}", width)),
+        (LEFT, True, _columns('TOTAL KES', f"{sale.total_amount or 0:,.2f}", width)),
+    ])
+    if payment:
+        lines.append((LEFT, False, f"Paid by: {(payment.payment_method or 'N/A').upper().replace('_', ' ')}"))
+        if payment.transaction_code:
+            lines.append((LEFT, False, f"Ref: {payment.transaction_code}"))
+    lines.extend([
+        (LEFT, False, rule),
+        (CENTER, False, 'Thank you for your business!'),
+        (CENTER, False, datetime.now().strftime('Printed %d/%m/%Y %H:%M')),
+    ])
+    return lines
+
+
+def render_text_receipt(sale, staff=None, customer=None, payment=None, width=48):
+    """
+    Render a sales receipt as plain text.
+
+    Args:
+        sale: Sale object (with sale_services and sale_products loaded)
+        staff: Staff object (optional)
+        customer: Customer object (optional)
+        payment: Payment object (optional)
+        width: Characters per line
+
+    Returns:
+        str: Receipt text, one printer line per text line
+    """
+    lines = []
+    for align, _bold, text in _receipt_lines(sale, staff, customer, payment, width):
+        lines.append(text.center(width).rstrip() if align == CENTER else text)
+    return '\n'.join(lines) + '\n'
+
+
+def render_escpos_receipt(sale, staff=None, customer=None, payment=None, width=48):
+    """
+    Render a sales receipt as an ESC/POS print job.
+
+    Takes the same arguments as render_text_receipt.
+
+    Returns:
+        bytes: Commands and text ready to send to the printer, ending with a cut
+    """
+    out = [_ESC_INIT]
+    current_align, current_bold = LEFT, False
+    for align, bold, text in _receipt_lines(sale, staff, customer, payment, width):
+        if align != current_align:
+            out.append(_ESC_ALIGN[align])
+            current_align = align
+        if bold != current_bold:
+            out.append(_ESC_BOLD_ON if bold else _ESC_BOLD_OFF)
+            current_bold = bold
+        out.append(text.encode(_ESCPOS_ENCODING, errors='replace'))
+        out.append(b'\n')
+    if current_bold:
+        out.append(_ESC_BOLD_OFF)
+    if current_align != LEFT:
+        out.append(_ESC_ALIGN[LEFT])
+    out.append(_GS_FEED_AND_CUT)
+    return b''.join(out)
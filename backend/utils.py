@@ -2,9 +2,11 @@
 Utility functions for the POS Salon backend.
 """
 from datetime import datetime, date, timedelta
-from models import Staff, Sale, SlotBlocker, Appointment
+from models import Staff, Sale, SlotBlocker, Appointment, Customer
 from sqlalchemy import func, and_, or_
 from db import db
+from business_time import business_today, business_now, business_date_for
+from sequences import next_sale_sequence
 
 
 def get_demo_filter(user=None, request_obj=None):
@@ -49,7 +51,7 @@ def get_current_week_range():
     Returns:
         tuple: (monday_date, sunday_date) as date objects
     """
-    today = date.today()
+    today = business_today()
     # Monday is 0, Sunday is 6
     days_since_monday = today.weekday()
     monday = today - timedelta(days=days_since_monday)
@@ -87,28 +89,30 @@ def generate_sale_number():
     """
     Generate unique sale number: SALE-YYYYMMDD-HHMMSS-XXX
     
+    Date and time are salon-local (SALON_TIMEZONE), whatever the server's
+    own timezone. XXX comes from the per-day counter in the sequences table, so numbers
+    are unique without counting or probing existing sales.
+    
     Returns:
         str: Unique sale number
     """
-    now = datetime.now()
-    today = now.strftime('%Y%m%d')
-    time_part = now.strftime('%H%M%S')
-    # Get count of sales today to generate sequence number
-    today_sales_count = Sale.query.filter(
-        func.date(Sale.created_at) == date.today()
-    ).count()
-    # Add timestamp to ensure uniqueness
-    sale_number = f"SALE-{today}-{time_part}-{today_sales_count + 1:03d}"
-    
-    # Ensure uniqueness by checking if sale_number already exists (retry if needed)
-    max_retries = 5
-    retry_count = 0
-    while Sale.query.filter_by(sale_number=sale_number).first() and retry_count < max_retries:
-        today_sales_count += 1
-        sale_number = f"SALE-{today}-{time_part}-{today_sales_count + 1:03d}"
-        retry_count += 1
-    
-    return sale_number
+    moment = business_now()
+    return format_sale_number(moment.date(), moment, next_sale_sequence(moment.date()))
+
+
+def format_sale_number(business_day, moment, sequence):
+    """
+    Format a sale number: SALE-YYYYMMDD-HHMMSS-XXX
+    
+    Args:
+        business_day: Salon-local date of the sale
+        moment: Time of day shown in the number
+        sequence: Per-day sequence number
+    
+    Returns:
+        str: Sale number
+    """
+    return f"SALE-{business_day.strftime('%Y%m%d')}-{moment.strftime('%H%M%S')}-{sequence:03d}"
 
 
 def format_currency(amount):
@@ -276,6 +280,42 @@ def generate_recurring_appointments(pattern, start_date, end_date, template_appo
     return dates
 
 
+def get_appointments_for_export(start_date=None, end_date=None, is_demo=None):
+    """
+    Load appointments for the iCal/CSV calendar export.
+    
+    Args:
+        start_date: ISO date/datetime string for the first day (optional, ignored if invalid)
+        end_date: ISO date/datetime string for the last day (optional, ignored if invalid)
+        is_demo: Only demo or only live customers' appointments (None for both)
+    
+    Returns:
+        list: Appointment objects ordered by date, with export relationships loaded
+    """
+    query = Appointment.query
+    
+    # Filter by demo status
+    if is_demo is not None:
+        query = query.join(Customer).filter(Customer.is_demo == is_demo)
+    
+    # Date range filtering
+    if start_date:
+        try:
+            start_dt = datetime.fromisoformat(start_date.replace('Z', '+00:00'))
+            query = query.filter(Appointment.business_date >= business_date_for(start_dt, naive_is_utc=False))
+        except ValueError:
+            pass
+    
+    if end_date:
+        try:
+            end_dt = datetime.fromisoformat(end_date.replace('Z', '+00:00'))
+            query = query.filter(Appointment.business_date <= business_date_for(end_dt, naive_is_utc=False))
+        except ValueError:
+            pass
+    
+    return query.options(*Appointment.export_load_options()).order_by(Appointment.appointment_date.asc()).all()
+
+
 def export_appointments_ical(appointments):
     """
     Generate iCal format string for appointments.
@@ -47,8 +47,9 @@ export default function AppointmentNotesDialog({ open, onOpenChange, appointment
         fetch(`http://localhost:5001/api/appointments?customer_id=${appointment.customer_id}&demo_mode=${demoModeParam}`).catch(() => null)
       ])
       
-      const sales = salesRes?.ok ? await salesRes.json() : []
-      const appointments = appointmentsRes?.ok ? await appointmentsRes.json() : []
+      // List endpoints are paginated; the first page holds the most recent history
+      const sales = salesRes?.ok ? (await salesRes.json()).items : []
+      const appointments = appointmentsRes?.ok ? (await appointmentsRes.json()).items : []
       
       setCustomerHistory({
         sales: sales || [],
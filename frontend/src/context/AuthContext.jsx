@@ -1,5 +1,7 @@
 import { createContext, useContext, useState, useEffect } from "react"
 import { toast } from "sonner"
+import { API_BASE_URL } from "@/config/api"
+import { storeToken, clearToken } from "@/lib/api"
 
 const AuthContext = createContext(null) 
 // createContext is a function that creates a new context object.
@@ -98,6 +100,7 @@ export function AuthProvider({ children }) {
         setIsAuthenticated(true)
         localStorage.setItem("salon_user", JSON.stringify(data.user))
         localStorage.setItem("salon_auth", "true")
+        storeToken(data.token, data.expires_in)
         return { success: true }
       } else {
         return { success: false, error: "Invalid email or password" }
@@ -193,6 +196,15 @@ export function AuthProvider({ children }) {
   }
 
   const logout = () => {
+    // Revoke the access token server-side; local logout doesn't wait for it
+    const token = localStorage.getItem("salon_token")
+    if (token) {
+      fetch(`${API_BASE_URL}/auth/logout`, {
+        method: "POST",
+        headers: { "Authorization": `Bearer ${token}` }
+      }).catch((err) => console.error("Failed to revoke token:", err))
+    }
+    clearToken()
     setUser(null)
     setIsAuthenticated(false)
     localStorage.removeItem("salon_user")
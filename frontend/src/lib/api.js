@@ -3,10 +3,77 @@
  */
 import { API_BASE_URL } from '../config/api'
 
+const TOKEN_KEY = 'salon_token'
+const TOKEN_EXPIRY_KEY = 'salon_token_expires_at'
+
+// Refresh a little before expiry so in-flight requests don't race it
+const TOKEN_EXPIRY_MARGIN_MS = 30 * 1000
+
+let refreshPromise = null
+
+/**
+ * Store an access token returned by login, signup or refresh
+ */
+export function storeToken(token, expiresIn) {
+  if (!token) return
+  localStorage.setItem(TOKEN_KEY, token)
+  localStorage.setItem(TOKEN_EXPIRY_KEY, String(Date.now() + expiresIn * 1000))
+}
+
+/**
+ * Remove the stored access token
+ */
+export function clearToken() {
+  localStorage.removeItem(TOKEN_KEY)
+  localStorage.removeItem(TOKEN_EXPIRY_KEY)
+}
+
+function tokenIsFresh() {
+  const expiresAt = Number(localStorage.getItem(TOKEN_EXPIRY_KEY) || 0)
+  return expiresAt - TOKEN_EXPIRY_MARGIN_MS > Date.now()
+}
+
+/**
+ * Exchange the stored token for a new one; resolves to true on success.
+ * Concurrent callers share one request.
+ */
+export function refreshToken() {
+  const token = localStorage.getItem(TOKEN_KEY)
+  if (!token) return Promise.resolve(false)
+  if (!refreshPromise) {
+    refreshPromise = fetch(`${API_BASE_URL}/auth/refresh`, {
+      method: 'POST',
+      headers: { 'Authorization': `Bearer ${token}` }
+    })
+      .then(async (response) => {
+        if (!response.ok) {
+          clearToken()
+          return false
+        }
+        const data = await response.json()
+        storeToken(data.token, data.expires_in)
+        return true
+      })
+      .catch(() => false)
+      .finally(() => { refreshPromise = null })
+  }
+  return refreshPromise
+}
+
 /**
- * Get auth headers with user ID
+ * Get auth headers: a Bearer token when one is held and fresh, otherwise
+ * the user ID (and an expired token is refreshed in the background)
  */
 export function getAuthHeaders() {
+  const token = localStorage.getItem(TOKEN_KEY)
+  if (token && tokenIsFresh()) {
+    return {
+      'Authorization': `Bearer ${token}`,
+      'Content-Type': 'application/json'
+    }
+  }
+  if (token) refreshToken()
+
   const userStr = localStorage.getItem('salon_user')
   if (!userStr) return {}
   
@@ -26,16 +93,23 @@ export function getAuthHeaders() {
  */
 export async function apiRequest(endpoint, options = {}) {
   const url = endpoint.startsWith('http') ? endpoint : `${API_BASE_URL}${endpoint}`
-  const headers = {
-    ...getAuthHeaders(),
-    ...(options.headers || {})
+  if (localStorage.getItem(TOKEN_KEY) && !tokenIsFresh()) {
+    await refreshToken()
   }
-  
-  const response = await fetch(url, {
+  const send = () => fetch(url, {
     ...options,
-    headers
+    headers: {
+      ...getAuthHeaders(),
+      ...(options.headers || {})
+    }
   })
   
+  let response = await send()
+  // Token revoked or expired server-side: refresh once and retry
+  if (response.status === 401 && localStorage.getItem(TOKEN_KEY) && await refreshToken()) {
+    response = await send()
+  }
+  
   if (!response.ok) {
     const error = await response.json().catch(() => ({ error: 'Request failed' }))
     throw new Error(error.error || `HTTP ${response.status}`)
@@ -44,6 +118,33 @@ export async function apiRequest(endpoint, options = {}) {
   return response.json()
 }
 
+/**
+ * Add a pagination cursor to a list endpoint URL
+ */
+export function withCursor(url, cursor) {
+  if (!cursor) return url
+  const separator = url.includes('?') ? '&' : '?'
+  return `${url}${separator}cursor=${encodeURIComponent(cursor)}`
+}
+
+/**
+ * Fetch every page of a cursor-paginated list endpoint and return all items
+ */
+export async function fetchAllPages(url, options = {}) {
+  const items = []
+  let cursor = null
+  do {
+    const response = await fetch(withCursor(url, cursor), options)
+    if (!response.ok) {
+      throw new Error(`HTTP ${response.status}`)
+    }
+    const page = await response.json()
+    items.push(...page.items)
+    cursor = page.next_cursor
+  } while (cursor)
+  return items
+}
+
 /**
  * Check if current user is admin
  */
@@ -0,0 +1,105 @@
+/**
+ * Offline queue for POS sales
+ *
+ * When the till cannot reach the API, completed walk-in sales are kept in
+ * localStorage with a client-generated UUID and sent later, in slices, to
+ * POST /sales/batch. The server ignores UUIDs it has already stored, so
+ * replaying the queue after a lost response is safe.
+ */
+import { API_BASE_URL } from '../config/api'
+
+const QUEUE_KEY = 'salon_offline_sales'
+const FAILED_KEY = 'salon_offline_sales_failed'
+// Sales per POST /sales/batch request, below the server's SALES_BATCH_MAX_ITEMS
+const SYNC_SLICE_SIZE = 100
+
+function readList(key) {
+  try {
+    return JSON.parse(localStorage.getItem(key) || '[]')
+  } catch (e) {
+    return []
+  }
+}
+
+function writeList(key, items) {
+  localStorage.setItem(key, JSON.stringify(items))
+}
+
+/**
+ * Sales waiting to be synced
+ */
+export function getQueuedSales() {
+  return readList(QUEUE_KEY)
+}
+
+/**
+ * Queue a completed sale (POST /sales body plus payment fields) for later sync
+ */
+export function queueSale(sale) {
+  const entry = {
+    ...sale,
+    client_uuid: crypto.randomUUID(),
+    created_at: new Date().toISOString()
+  }
+  writeList(QUEUE_KEY, [...getQueuedSales(), entry])
+  return entry
+}
+
+/**
+ * Send queued sales to the server
+ *
+ * The queue goes out in slices of at most SYNC_SLICE_SIZE sales (the server
+ * refuses more than SALES_BATCH_MAX_ITEMS per request), and each slice's
+ * outcome is saved before the next one is sent. Stored and duplicate sales
+ * leave the queue. Sales the server rejected, alone or as a whole slice
+ * with a 4xx reply, are moved aside (salon_offline_sales_failed) so they
+ * are not retried forever. A network error or 5xx reply stops the sync and
+ * leaves the rest queued for the next attempt.
+ */
+export async function syncQueuedSales() {
+  const queued = getQueuedSales()
+  const totals = { created: 0, duplicates: 0, failed: [] }
+
+  for (let start = 0; start < queued.length; start += SYNC_SLICE_SIZE) {
+    const slice = queued.slice(start, start + SYNC_SLICE_SIZE)
+    const response = await fetch(`${API_BASE_URL}/sales/batch`, {
+      method: 'POST',
+      headers: { 'Content-Type': 'application/json' },
+      body: JSON.stringify({ sales: slice })
+    })
+
+    let failed
+    if (response.ok) {
+      const data = await response.json()
+      failed = data.results
+        .filter(result => result.status === 'error')
+        .map(result => ({ ...slice[result.index], error: result.error }))
+      totals.created += data.created
+      totals.duplicates += data.duplicates
+    } else {
+      const error = await response.json().catch(() => ({ error: 'Sync failed' }))
+      const message = error.error || `HTTP ${response.status}`
+      if (response.status >= 500) {
+        throw new Error(message)
+      }
+      failed = slice.map(sale => ({ ...sale, error: message }))
+    }
+
+    settle(slice, failed)
+    totals.failed.push(...failed)
+  }
+
+  return totals
+}
+
+/**
+ * Take a sent slice off the queue, moving its failed sales aside
+ */
+function settle(slice, failed) {
+  const handled = new Set(slice.map(sale => sale.client_uuid))
+  // Keep anything queued while the request was in flight
+  writeList(QUEUE_KEY, getQueuedSales().filter(sale => !handled.has(sale.client_uuid)))
+  if (failed.length > 0) {
+    writeList(FAILED_KEY, [...readList(FAILED_KEY), ...failed])
+  }
+}
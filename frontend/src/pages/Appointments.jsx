@@ -17,7 +17,7 @@ import {
 } from "lucide-react"
 import { useAuth } from "@/context/AuthContext"
 import { toast } from "sonner"
-import { apiRequest, isAdmin } from "@/lib/api"
+import { apiRequest, isAdmin, fetchAllPages } from "@/lib/api"
 import AppointmentCalendar from "@/components/appointments/AppointmentCalendar"
 import SlotBlockerDialog from "@/components/appointments/SlotBlockerDialog"
 import AppointmentNotesDialog from "@/components/appointments/AppointmentNotesDialog"
@@ -92,18 +92,11 @@ export default function Appointments() {
       if (endDate) params.append("end_date", endDate)
       const demoModeParam = isDemoUser ? 'true' : (demoMode ? 'true' : 'false')
       params.append("demo_mode", demoModeParam)
-      if (params.toString()) url += "?" + params.toString()
+      // The calendar needs every appointment in range, so follow all pages
+      params.append("page_size", "200")
+      url += "?" + params.toString()
       
-      const response = await fetch(url)
-      if (!response.ok) {
-        const errorData = await response.json().catch(() => ({}))
-        const errorMessage = errorData.error || 'Failed to fetch appointments'
-        setError(errorMessage)
-        toast.error(errorMessage)
-        return
-      }
-      
-      const data = await response.json()
+      const data = await fetchAllPages(url)
       setAppointments(data)
       setFilteredAppointments(data)
     } catch (err) {
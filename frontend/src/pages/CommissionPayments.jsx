@@ -12,7 +12,7 @@ import { Badge } from "@/components/ui/badge"
 import { Tabs, TabsContent, TabsList, TabsTrigger } from "@/components/ui/tabs"
 import { DollarSign, Download, Calendar, AlertCircle, CheckCircle2 } from "lucide-react"
 import { useAuth } from "@/context/AuthContext"
-import { apiRequest } from "@/lib/api"
+import { apiRequest, withCursor } from "@/lib/api"
 
 const formatKES = (amount) => {
   return `KES ${amount.toLocaleString('en-KE', { minimumFractionDigits: 2, maximumFractionDigits: 2 })}`
@@ -22,6 +22,8 @@ export default function CommissionPayments() {
   const { user, demoMode } = useAuth()
   const [pendingCommissions, setPendingCommissions] = useState([])
   const [paymentHistory, setPaymentHistory] = useState([])
+  const [historyCursor, setHistoryCursor] = useState(null)
+  const [loadingMoreHistory, setLoadingMoreHistory] = useState(false)
   const [loading, setLoading] = useState(true)
   const [error, setError] = useState("")
   const [success, setSuccess] = useState("")
@@ -66,16 +68,21 @@ export default function CommissionPayments() {
     }
   }
 
-  const fetchPaymentHistory = async () => {
+  const fetchPaymentHistory = async (cursor = null) => {
+    if (cursor) setLoadingMoreHistory(true)
     try {
       const demoModeParam = demoMode ? 'true' : 'false'
-      const response = await fetch(`http://localhost:5001/api/commissions/payments?demo_mode=${demoModeParam}`)
+      const response = await fetch(withCursor(`http://localhost:5001/api/commissions/payments?demo_mode=${demoModeParam}`, cursor))
       if (response.ok) {
         const data = await response.json()
-        setPaymentHistory(data || [])
+        const items = data.items || []
+        setPaymentHistory((prev) => (cursor ? [...prev, ...items] : items))
+        setHistoryCursor(data.next_cursor)
       }
     } catch (err) {
       console.error("Failed to fetch payment history:", err)
+    } finally {
+      setLoadingMoreHistory(false)
     }
   }
 
@@ -344,6 +351,13 @@ export default function CommissionPayments() {
                   </TableBody>
                 </Table>
               )}
+              {historyCursor && (
+                <div className="flex justify-center pt-4">
+                  <Button variant="outline" onClick={() => fetchPaymentHistory(historyCursor)} disabled={loadingMoreHistory}>
+                    {loadingMoreHistory ? "Loading..." : "Load more"}
+                  </Button>
+                </div>
+              )}
             </CardContent>
           </Card>
         </TabsContent>
@@ -9,7 +9,7 @@ import { Badge } from "@/components/ui/badge"
 import { AlertDialog, AlertDialogAction, AlertDialogCancel, AlertDialogContent, AlertDialogDescription, AlertDialogFooter, AlertDialogHeader, AlertDialogTitle, AlertDialogTrigger } from "@/components/ui/alert-dialog"
 import { Alert, AlertDescription } from "@/components/ui/alert"
 import { Plus, Edit, Trash2, Search, Eye, Star, Calendar, DollarSign, Package } from "lucide-react"
-import { apiRequest } from "@/lib/api"
+import { apiRequest, withCursor } from "@/lib/api"
 import { useAuth } from "@/context/AuthContext"
 import { Tabs, TabsContent, TabsList, TabsTrigger } from "@/components/ui/tabs"
 
@@ -22,6 +22,8 @@ export default function Customers() {
   const [customers, setCustomers] = useState([])
   const [filteredCustomers, setFilteredCustomers] = useState([])
   const [loading, setLoading] = useState(true)
+  const [nextCursor, setNextCursor] = useState(null)
+  const [loadingMore, setLoadingMore] = useState(false)
   const [error, setError] = useState("")
   const [searchQuery, setSearchQuery] = useState("")
   const [isDialogOpen, setIsDialogOpen] = useState(false)
@@ -58,16 +60,16 @@ export default function Customers() {
     }
   }, [searchQuery, customers])
 
-  const fetchCustomers = async () => {
+  const fetchCustomers = async (cursor = null) => {
     try {
-      setLoading(true)
+      cursor ? setLoadingMore(true) : setLoading(true)
       setError("")
       const demoModeParam = demoMode ? 'true' : 'false'
-      const response = await fetch(`http://localhost:5001/api/customers?demo_mode=${demoModeParam}`)
+      const response = await fetch(withCursor(`http://localhost:5001/api/customers?demo_mode=${demoModeParam}`, cursor))
       if (response.ok) {
         const data = await response.json()
-        setCustomers(data)
-        setFilteredCustomers(data)
+        setCustomers((prev) => (cursor ? [...prev, ...data.items] : data.items))
+        setNextCursor(data.next_cursor)
       } else {
         setError("Failed to fetch customers")
       }
@@ -76,6 +78,7 @@ export default function Customers() {
       console.error("Failed to fetch customers:", err)
     } finally {
       setLoading(false)
+      setLoadingMore(false)
     }
   }
 
@@ -289,6 +292,13 @@ export default function Customers() {
               </TableBody>
             </Table>
           )}
+          {nextCursor && (
+            <div className="flex justify-center pt-4">
+              <Button variant="outline" onClick={() => fetchCustomers(nextCursor)} disabled={loadingMore}>
+                {loadingMore ? "Loading..." : "Load more"}
+              </Button>
+            </div>
+          )}
         </CardContent>
       </Card>
 
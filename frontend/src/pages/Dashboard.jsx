@@ -8,6 +8,10 @@ import { Label } from "@/components/ui/label"
 import { Switch } from "@/components/ui/switch"
 import { Users, DollarSign, TrendingUp, Clock, UserPlus, FileText, Eye, Settings } from "lucide-react"
 import { useAuth } from "@/context/AuthContext"
+import { API_BASE_URL } from "@/config/api"
+
+// Events pushed by /api/dashboard/stream that change the stats payload
+const DASHBOARD_STREAM_EVENTS = ["sale_completed", "commission_paid", "staff_login", "staff_logout"]
 
 const formatKES = (amount) => {
   return `KES ${amount.toLocaleString('en-KE', { minimumFractionDigits: 2, maximumFractionDigits: 2 })}`
@@ -30,9 +34,40 @@ export default function Dashboard() {
 
   useEffect(() => {
     fetchDashboardStats()
-    // Auto-refresh every 30 seconds
-    const interval = setInterval(fetchDashboardStats, 30000)
-    return () => clearInterval(interval)
+
+    // Live updates: refetch stats when the server pushes a change event.
+    // Polling every 30 seconds stays as the fallback while the stream is down.
+    let streamOpen = false
+    let refetchTimer = null
+    let source = null
+
+    if (typeof EventSource !== "undefined") {
+      const demoModeParam = demoMode ? 'true' : 'false'
+      source = new EventSource(`${API_BASE_URL}/dashboard/stream?demo_mode=${demoModeParam}`)
+      const scheduleRefetch = () => {
+        // Coalesce bursts (e.g. several sales completed together) into one request
+        clearTimeout(refetchTimer)
+        refetchTimer = setTimeout(fetchDashboardStats, 500)
+      }
+
+      source.onopen = () => {
+        // Events sent before this (re)connect were missed, so refetch once it is open
+        streamOpen = true
+        scheduleRefetch()
+      }
+      source.onerror = () => { streamOpen = false }
+      DASHBOARD_STREAM_EVENTS.forEach((type) => source.addEventListener(type, scheduleRefetch))
+    }
+
+    const interval = setInterval(() => {
+      if (!streamOpen) fetchDashboardStats()
+    }, 30000)
+
+    return () => {
+      clearInterval(interval)
+      clearTimeout(refetchTimer)
+      if (source) source.close()
+    }
   }, [demoMode])
 
   const fetchDashboardStats = async () => {
@@ -10,6 +10,7 @@ import { Badge } from "@/components/ui/badge"
 import { Plus, Edit, Trash2, TrendingDown } from "lucide-react"
 import { AlertDialog, AlertDialogAction, AlertDialogCancel, AlertDialogContent, AlertDialogDescription, AlertDialogFooter, AlertDialogHeader, AlertDialogTitle, AlertDialogTrigger } from "@/components/ui/alert-dialog"
 import { toast } from "sonner"
+import { withCursor } from "@/lib/api"
 
 const formatKES = (amount) => {
   return `KES ${amount.toLocaleString('en-KE', { minimumFractionDigits: 2, maximumFractionDigits: 2 })}`
@@ -18,6 +19,8 @@ const formatKES = (amount) => {
 export default function Expenses() {
   const [expenses, setExpenses] = useState([])
   const [loading, setLoading] = useState(true)
+  const [nextCursor, setNextCursor] = useState(null)
+  const [loadingMore, setLoadingMore] = useState(false)
   const [isDialogOpen, setIsDialogOpen] = useState(false)
   const [selectedExpense, setSelectedExpense] = useState(null)
   const [isDeleteOpen, setIsDeleteOpen] = useState(false)
@@ -36,17 +39,20 @@ export default function Expenses() {
     fetchExpenses()
   }, [])
 
-  const fetchExpenses = async () => {
+  const fetchExpenses = async (cursor = null) => {
+    if (cursor) setLoadingMore(true)
     try {
-      const response = await fetch("http://localhost:5001/api/expenses")
+      const response = await fetch(withCursor("http://localhost:5001/api/expenses", cursor))
       if (response.ok) {
         const data = await response.json()
-        setExpenses(data)
+        setExpenses((prev) => (cursor ? [...prev, ...data.items] : data.items))
+        setNextCursor(data.next_cursor)
       }
     } catch (err) {
       console.error("Failed to fetch expenses:", err)
     } finally {
       setLoading(false)
+      setLoadingMore(false)
     }
   }
 
@@ -258,6 +264,7 @@ export default function Expenses() {
           </CardHeader>
           <CardContent>
             <div className="text-2xl font-bold">{formatKES(totalExpenses)}</div>
+            {nextCursor && <p className="text-xs text-muted-foreground">Loaded entries only</p>}
           </CardContent>
         </Card>
         <Card>
@@ -391,6 +398,13 @@ export default function Expenses() {
               </TableBody>
             </Table>
           )}
+          {nextCursor && (
+            <div className="flex justify-center pt-4">
+              <Button variant="outline" onClick={() => fetchExpenses(nextCursor)} disabled={loadingMore}>
+                {loadingMore ? "Loading..." : "Load more"}
+              </Button>
+            </div>
+          )}
         </CardContent>
       </Card>
     </div>
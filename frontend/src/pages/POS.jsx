@@ -17,6 +17,7 @@ import {
 import { Tabs, TabsContent, TabsList, TabsTrigger } from "@/components/ui/tabs"
 import { useAuth } from "@/context/AuthContext"
 import ReceiptTemplate from "@/components/ReceiptTemplate"
+import { queueSale, getQueuedSales, syncQueuedSales } from "@/lib/offlineSales"
 import { toast } from "sonner"
 import { 
   Plus,
@@ -105,6 +106,29 @@ export default function POS() {
     fetchBusinessType()
   }, [])
 
+  // Send sales queued while offline, now and whenever the connection returns
+  useEffect(() => {
+    const syncOfflineSales = async () => {
+      if (getQueuedSales().length === 0) return
+      try {
+        const result = await syncQueuedSales()
+        if (result.created > 0) {
+          toast.success(`Synced ${result.created} offline sale${result.created === 1 ? "" : "s"}`)
+          fetchStaffStats()
+          fetchRecentTransactions()
+        }
+        if (result.failed.length > 0) {
+          toast.error(`${result.failed.length} offline sale${result.failed.length === 1 ? "" : "s"} could not be synced: ${result.failed[0].error}`)
+        }
+      } catch (err) {
+        console.error("Offline sales sync failed:", err)
+      }
+    }
+    syncOfflineSales()
+    window.addEventListener("online", syncOfflineSales)
+    return () => window.removeEventListener("online", syncOfflineSales)
+  }, [])
+
   const fetchBusinessType = async () => {
     try {
       const res = await fetch("http://localhost:5001/api/settings/public")
@@ -347,11 +371,11 @@ export default function POS() {
       // Fetch recent completed sales for this staff
       // Add demo_mode parameter: true for demo users, use demoMode for others
       const demoModeParam = isDemoUser ? 'true' : (demoMode ? 'true' : 'false')
-      const response = await fetch(`http://localhost:5001/api/sales?staff_id=${staff.id}&status=completed&limit=10&demo_mode=${demoModeParam}`)
+      const response = await fetch(`http://localhost:5001/api/sales?staff_id=${staff.id}&status=completed&page_size=10&demo_mode=${demoModeParam}`)
       if (response.ok) {
         const data = await response.json()
         // Transform API response to match frontend expectations
-        const transformedData = data.map(sale => {
+        const transformedData = data.items.map(sale => {
           const transformed = {
             ...sale,
             grand_total: sale.grand_total ?? sale.total_amount ?? 0,
@@ -618,32 +642,68 @@ export default function POS() {
     // Lock session immediately to prevent further entries
     setSessionLocked(true)
     
+    const salePayload = {
+      staff_id: staff?.id,
+      appointment_id: selectedAppointment?.id || null,
+      customer_name: clientName || null,
+      customer_phone: clientPhone || null,
+      service_location: serviceLocation,
+      home_service_address: serviceLocation === "home" ? homeServiceAddress : null,
+      services: currentSaleServices.map(item => ({
+        service_id: item.id,
+        name: item.name,
+        price: item.price,
+        duration: item.duration || 30,
+        quantity: item.quantity,
+        commission_rate: item.commissionRate || defaultCommissionRate
+      })),
+      products: currentSaleProducts.map(item => ({
+        product_id: item.id,
+        name: item.name,
+        quantity: item.quantity
+      }))
+    }
+    const paymentPayload = {
+      payment_method: paymentMethod,
+      transaction_code: paymentMethod === "M-Pesa" ? transactionCode : null,
+      service_start_time: serviceStartTime ? serviceStartTime.toISOString() : null,
+      service_end_time: serviceEndTime ? serviceEndTime.toISOString() : null,
+      service_location: serviceLocation,
+      home_service_address: serviceLocation === "home" ? homeServiceAddress : null
+    }
+    const receiptNum = `RCP-${Date.now().toString().slice(-6)}`
+    let saleId = null
+    
+    const showAndPrintReceipt = () => {
+      setShowReceipt(true)
+      
+      // Trigger print after a short delay to ensure receipt is rendered
+      setTimeout(() => {
+        // Save original document title
+        const originalTitle = document.title
+        
+        // Set document title to receipt number for PDF filename
+        document.title = receiptNum
+        
+        // Trigger print dialog
+        window.print()
+        
+        // Restore original title after a short delay
+        setTimeout(() => {
+          document.title = originalTitle
+        }, 500)
+        
+        setReceiptPrinted(true)
+        // Show success popup - no automatic logout
+      }, 100)
+    }
+    
     try {
       // STEP 1: Create Sale (walk-in transaction)
       const saleResponse = await fetch("http://localhost:5001/api/sales", {
         method: "POST",
         headers: { "Content-Type": "application/json" },
-        body: JSON.stringify({
-          staff_id: staff?.id,
-          appointment_id: selectedAppointment?.id || null,
-          customer_name: clientName || null,
-          customer_phone: clientPhone || null,
-          service_location: serviceLocation,
-          home_service_address: serviceLocation === "home" ? homeServiceAddress : null,
-          services: currentSaleServices.map(item => ({
-            service_id: item.id,
-            name: item.name,
-            price: item.price,
-            duration: item.duration || 30,
-            quantity: item.quantity,
-            commission_rate: item.commissionRate || defaultCommissionRate
-          })),
-          products: currentSaleProducts.map(item => ({
-            product_id: item.id,
-            name: item.name,
-            quantity: item.quantity
-          }))
-        })
+        body: JSON.stringify(salePayload)
       })
 
       if (!saleResponse.ok) {
@@ -652,24 +712,15 @@ export default function POS() {
       }
 
       const saleData = await saleResponse.json()
-      const saleId = saleData.id
+      saleId = saleData.id
       
       // STEP 2: Complete Sale (deducts stock, finalizes commission, creates payment)
-      const receiptNum = `RCP-${Date.now().toString().slice(-6)}`
       setReceiptNumber(receiptNum)
       
       const completeResponse = await fetch(`http://localhost:5001/api/sales/${saleId}/complete`, {
         method: "POST",
         headers: { "Content-Type": "application/json" },
-        body: JSON.stringify({
-          payment_method: paymentMethod,
-          transaction_code: paymentMethod === "M-Pesa" ? transactionCode : null,
-          receipt_number: receiptNum,
-          service_start_time: serviceStartTime ? serviceStartTime.toISOString() : null,
-          service_end_time: serviceEndTime ? serviceEndTime.toISOString() : null,
-          service_location: serviceLocation,
-          home_service_address: serviceLocation === "home" ? homeServiceAddress : null
-        })
+        body: JSON.stringify({ ...paymentPayload, receipt_number: receiptNum })
       })
 
       if (!completeResponse.ok) {
@@ -693,28 +744,18 @@ export default function POS() {
       await fetchPendingAppointments()
       
       // STEP 3: Show receipt and print
-      setShowReceipt(true)
-      
-      // Trigger print after a short delay to ensure receipt is rendered
-      setTimeout(() => {
-        // Save original document title
-        const originalTitle = document.title
-        
-        // Set document title to receipt number for PDF filename
-        document.title = receiptNum
-        
-        // Trigger print dialog
-        window.print()
-        
-        // Restore original title after a short delay
-        setTimeout(() => {
-          document.title = originalTitle
-        }, 500)
-        
-        setReceiptPrinted(true)
-        // Show success popup - no automatic logout
-      }, 100)
+      showAndPrintReceipt()
     } catch (err) {
+      // fetch() rejects with a TypeError when the API is unreachable. Walk-in
+      // sales that never reached the server are queued for /sales/batch.
+      if (err instanceof TypeError && saleId === null && !selectedAppointment) {
+        queueSale({ ...salePayload, ...paymentPayload, receipt_number: receiptNum })
+        setReceiptNumber(receiptNum)
+        setTransactionSaved(true)
+        toast.warning("No connection. Sale saved on this till and will sync automatically.")
+        showAndPrintReceipt()
+        return
+      }
       console.error("Failed to save transaction:", err)
       toast.error(`Error saving transaction: ${err.message}. Please try again.`)
       setSessionLocked(false) // Unlock session on error
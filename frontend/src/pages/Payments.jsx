@@ -6,6 +6,7 @@ import { Button } from "@/components/ui/button"
 import { useAuth } from "@/context/AuthContext"
 import { ChevronDown, ChevronUp, Printer } from "lucide-react"
 import ReceiptTemplate from "@/components/ReceiptTemplate"
+import { withCursor } from "@/lib/api"
 
 const formatKES = (amount) => {
   return `KES ${amount.toLocaleString('en-KE', { minimumFractionDigits: 2, maximumFractionDigits: 2 })}`
@@ -14,6 +15,8 @@ const formatKES = (amount) => {
 export default function Payments() {
   const [payments, setPayments] = useState([])
   const [loading, setLoading] = useState(true)
+  const [nextCursor, setNextCursor] = useState(null)
+  const [loadingMore, setLoadingMore] = useState(false)
   const [expandedRows, setExpandedRows] = useState(new Set())
   const { demoMode, isDemoUser } = useAuth()
   const [receiptToPrint, setReceiptToPrint] = useState(null)
@@ -67,20 +70,22 @@ export default function Payments() {
     fetchPayments()
   }, [demoMode, isDemoUser])
 
-  const fetchPayments = async () => {
-    setLoading(true)
+  const fetchPayments = async (cursor = null) => {
+    cursor ? setLoadingMore(true) : setLoading(true)
     try {
       // Add demo_mode parameter
       const demoModeParam = isDemoUser ? 'true' : (demoMode ? 'true' : 'false')
-      const response = await fetch(`http://localhost:5001/api/payments?demo_mode=${demoModeParam}`)
+      const response = await fetch(withCursor(`http://localhost:5001/api/payments?demo_mode=${demoModeParam}`, cursor))
       if (response.ok) {
         const data = await response.json()
-        setPayments(data)
+        setPayments((prev) => (cursor ? [...prev, ...data.items] : data.items))
+        setNextCursor(data.next_cursor)
       }
     } catch (err) {
       console.error("Failed to fetch payments:", err)
     } finally {
       setLoading(false)
+      setLoadingMore(false)
     }
   }
 
@@ -240,6 +245,13 @@ export default function Payments() {
               </TableBody>
             </Table>
           )}
+          {nextCursor && (
+            <div className="flex justify-center pt-4">
+              <Button variant="outline" onClick={() => fetchPayments(nextCursor)} disabled={loadingMore}>
+                {loadingMore ? "Loading..." : "Load more"}
+              </Button>
+            </div>
+          )}
         </CardContent>
       </Card>
       
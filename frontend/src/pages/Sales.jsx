@@ -10,7 +10,7 @@ import { Select, SelectContent, SelectItem, SelectTrigger, SelectValue } from "@
 import { Badge } from "@/components/ui/badge"
 import { Alert, AlertDescription } from "@/components/ui/alert"
 import { Eye, Printer, Search, Calendar, User, DollarSign, Package, Scissors, Calendar as CalendarIcon, MapPin, Clock } from "lucide-react"
-import { apiRequest } from "@/lib/api"
+import { apiRequest, withCursor } from "@/lib/api"
 import { useAuth } from "@/context/AuthContext"
 import { Collapsible, CollapsibleContent, CollapsibleTrigger } from "@/components/ui/collapsible"
 import { ChevronDown, ChevronUp } from "lucide-react"
@@ -25,6 +25,8 @@ export default function Sales() {
   const [filteredSales, setFilteredSales] = useState([])
   const [staff, setStaff] = useState([])
   const [loading, setLoading] = useState(true)
+  const [nextCursor, setNextCursor] = useState(null)
+  const [loadingMore, setLoadingMore] = useState(false)
   const [error, setError] = useState("")
   const [selectedSale, setSelectedSale] = useState(null)
   const [isDetailsOpen, setIsDetailsOpen] = useState(false)
@@ -76,9 +78,9 @@ export default function Sales() {
     }
   }
 
-  const fetchSales = async () => {
+  const fetchSales = async (cursor = null) => {
     try {
-      setLoading(true)
+      cursor ? setLoadingMore(true) : setLoading(true)
       setError("")
       let url = "http://localhost:5001/api/sales"
       const params = new URLSearchParams()
@@ -90,11 +92,11 @@ export default function Sales() {
       params.append("demo_mode", demoModeParam)
       if (params.toString()) url += "?" + params.toString()
       
-      const response = await fetch(url)
+      const response = await fetch(withCursor(url, cursor))
       if (response.ok) {
         const data = await response.json()
-        setSales(data)
-        setFilteredSales(data)
+        setSales((prev) => (cursor ? [...prev, ...data.items] : data.items))
+        setNextCursor(data.next_cursor)
       } else {
         setError("Failed to fetch sales")
       }
@@ -103,6 +105,7 @@ export default function Sales() {
       console.error("Failed to fetch sales:", err)
     } finally {
       setLoading(false)
+      setLoadingMore(false)
     }
   }
 
@@ -435,6 +438,13 @@ export default function Sales() {
               </TableBody>
             </Table>
           )}
+          {nextCursor && (
+            <div className="flex justify-center pt-4">
+              <Button variant="outline" onClick={() => fetchSales(nextCursor)} disabled={loadingMore}>
+                {loadingMore ? "Loading..." : "Load more"}
+              </Button>
+            </div>
+          )}
         </CardContent>
       </Card>
 
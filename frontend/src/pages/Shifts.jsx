@@ -9,13 +9,15 @@ import { Select, SelectContent, SelectItem, SelectTrigger, SelectValue } from "@
 import { Badge } from "@/components/ui/badge"
 import { Alert, AlertDescription } from "@/components/ui/alert"
 import { Plus, Edit, Clock, LogIn, LogOut, Calendar, User, Search, Trash2 } from "lucide-react"
-import { apiRequest } from "@/lib/api"
+import { apiRequest, withCursor } from "@/lib/api"
 import { AlertDialog, AlertDialogAction, AlertDialogCancel, AlertDialogContent, AlertDialogDescription, AlertDialogFooter, AlertDialogHeader, AlertDialogTitle, AlertDialogTrigger } from "@/components/ui/alert-dialog"
 
 export default function Shifts() {
   const [shifts, setShifts] = useState([])
   const [staff, setStaff] = useState([])
   const [loading, setLoading] = useState(true)
+  const [nextCursor, setNextCursor] = useState(null)
+  const [loadingMore, setLoadingMore] = useState(false)
   const [error, setError] = useState("")
   const [isDialogOpen, setIsDialogOpen] = useState(false)
   const [editingShift, setEditingShift] = useState(null)
@@ -53,9 +55,9 @@ export default function Shifts() {
     }
   }
 
-  const fetchShifts = async () => {
+  const fetchShifts = async (cursor = null) => {
     try {
-      setLoading(true)
+      cursor ? setLoadingMore(true) : setLoading(true)
       setError("")
       let url = "http://localhost:5001/api/shifts"
       const params = new URLSearchParams()
@@ -64,10 +66,11 @@ export default function Shifts() {
       if (endDate) params.append("end_date", endDate)
       if (params.toString()) url += "?" + params.toString()
       
-      const response = await fetch(url)
+      const response = await fetch(withCursor(url, cursor))
       if (response.ok) {
         const data = await response.json()
-        setShifts(data)
+        setShifts((prev) => (cursor ? [...prev, ...data.items] : data.items))
+        setNextCursor(data.next_cursor)
       } else {
         setError("Failed to fetch shifts")
       }
@@ -76,6 +79,7 @@ export default function Shifts() {
       console.error("Failed to fetch shifts:", err)
     } finally {
       setLoading(false)
+      setLoadingMore(false)
     }
   }
 
@@ -410,6 +414,13 @@ export default function Shifts() {
               </TableBody>
             </Table>
           )}
+          {nextCursor && (
+            <div className="flex justify-center pt-4">
+              <Button variant="outline" onClick={() => fetchShifts(nextCursor)} disabled={loadingMore}>
+                {loadingMore ? "Loading..." : "Load more"}
+              </Button>
+            </div>
+          )}
         </CardContent>
       </Card>
 